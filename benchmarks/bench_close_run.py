@@ -0,0 +1,135 @@
+"""Latency and statement-count benchmark for ``CloseRunService.close_run``.
+
+For each participant count, seeds one channel with that many users in a
+file SQLite database, then repeatedly opens a run, gives every user an
+order and closes it. Only the close is measured. Reports the statements
+each close issued (which should not depend on the participant count) and
+p50/p95 close latency.
+
+Usage::
+
+    PYTHONPATH=src python benchmarks/bench_close_run.py --participants 10 100 1000 --closes 20
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from uuid import uuid4
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import sessionmaker
+
+from coffeebuddy.core.runs import CloseRunRequest, CloseRunService
+from coffeebuddy.infra.db.models import Base, Channel, Order, Run, RunStatus, User
+from coffeebuddy.services.fairness.index import FairnessIndex
+from coffeebuddy.services.fairness.service import FairnessService
+
+
+class _AnyoneMayClose:
+    def is_authorized(self, *, run: Run, actor_user_id: str) -> bool:
+        return True
+
+
+def _seed(engine: Engine, participants: int) -> tuple[Channel, list[User]]:
+    now = datetime.now(timezone.utc)
+    channel = Channel(id=uuid4(), slack_channel_id="C1", name="coffee", created_at=now, updated_at=now)
+    users = [
+        User(id=uuid4(), slack_user_id=f"U{index}", display_name=f"Bench {index}", created_at=now, updated_at=now)
+        for index in range(participants)
+    ]
+    with sessionmaker(bind=engine, expire_on_commit=False)() as session:
+        session.add_all([channel, *users])
+        session.commit()
+    return channel, users
+
+
+def _open_run(engine: Engine, channel: Channel, users: list[User]) -> Run:
+    now = datetime.now(timezone.utc)
+    run = Run(
+        id=uuid4(),
+        channel_id=channel.id,
+        initiator_user_id=users[0].id,
+        status=RunStatus.OPEN,
+        started_at=now,
+        created_at=now,
+        updated_at=now,
+    )
+    with sessionmaker(bind=engine, expire_on_commit=False)() as session:
+        session.add(run)
+        session.flush()
+        session.execute(
+            insert(Order),
+            [
+                {
+                    "id": uuid4(),
+                    "run_id": run.id,
+                    "user_id": user.id,
+                    "order_text": f"Flat white #{index % 7}",
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for index, user in enumerate(users)
+            ],
+        )
+        session.commit()
+    return run
+
+
+def _bench(path: Path, participants: int, closes: int) -> tuple[list[int], list[float]]:
+    engine = create_engine(f"sqlite+pysqlite:///{path}")
+    Base.metadata.create_all(engine)
+    channel, users = _seed(engine, participants)
+    session_factory = sessionmaker(bind=engine, expire_on_commit=False)
+    index = FairnessIndex()
+    statements = [0]
+
+    def count(*_args: object) -> None:
+        statements[0] += 1
+
+    counts: list[int] = []
+    latencies: list[float] = []
+    for _ in range(closes):
+        run = _open_run(engine, channel, users)
+        with session_factory() as session:
+            service = CloseRunService(
+                session=session,
+                fairness=FairnessService(session, index=index),
+                authorizer=_AnyoneMayClose(),
+            )
+            statements[0] = 0
+            event.listen(engine, "before_cursor_execute", count)
+            started = time.perf_counter()
+            service.close_run(CloseRunRequest(run_id=str(run.id), actor_user_id=str(users[0].id)))
+            session.commit()
+            latencies.append(time.perf_counter() - started)
+            event.remove(engine, "before_cursor_execute", count)
+            counts.append(statements[0])
+    engine.dispose()
+    return counts, latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--participants", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--closes", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for participants in args.participants:
+            counts, latencies = _bench(Path(directory) / f"close-{participants}.db", participants, args.closes)
+            ordered = sorted(latencies)
+            p95 = ordered[max(int(len(ordered) * 0.95) - 1, 0)]
+            print(
+                f"{participants:>5} participants: statements first={counts[0]} "
+                f"then min={min(counts[1:] or counts)} max={max(counts[1:] or counts)} "
+                f"p50={statistics.median(ordered) * 1e3:7.2f}ms p95={p95 * 1e3:7.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Microbenchmark for ``parse_command_text``.
+
+Replays a workload where a handful of command texts repeat, as they do in a
+single office, and compares the previous ``shlex.split`` parser with the
+compiled, memoized one. ``--distinct`` controls how many different texts
+appear in the workload.
+
+Usage::
+
+    PYTHONPATH=src python benchmarks/bench_command_parser.py --iterations 100000 --distinct 20
+"""
+from __future__ import annotations
+
+import argparse
+import shlex
+import time
+from datetime import datetime, time as clock_time, timezone
+
+from coffeebuddy.api.slack_runs.models import RunCommandOptions
+from coffeebuddy.api.slack_runs.parsers import _parse_cached, parse_command_text
+
+
+def _legacy_parse(text: str) -> RunCommandOptions:
+    options = RunCommandOptions(errors=[])
+    normalized = text.strip()
+    if not normalized:
+        return options
+    for token in shlex.split(normalized):
+        if "=" not in token:
+            continue
+        key, value = token.split("=", 1)
+        key = key.lower()
+        value = value.strip()
+        if key in {"pickup", "pickup_time"}:
+            try:
+                if len(value) == 5 and value[2] == ":":
+                    hour, minute = map(int, value.split(":"))
+                    today = datetime.now(timezone.utc).date()
+                    options.pickup_time = datetime.combine(
+                        today, clock_time(hour=hour, minute=minute, tzinfo=timezone.utc)
+                    )
+                else:
+                    parsed = datetime.fromisoformat(value)
+                    options.pickup_time = parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+            except ValueError:
+                options.errors.append("pickup_time must be ISO-8601 date-time or HH:MM (24h).")
+        elif key in {"note", "pickup_note"}:
+            options.pickup_note = value
+        else:
+            options.errors.append(f"Unknown parameter '{key}'.")
+    if not options.errors:
+        options.errors = None
+    return options
+
+
+def _workload(distinct: int, iterations: int) -> list[str]:
+    texts = [
+        f'pickup={9 + index % 8:02d}:{(index * 15) % 60:02d} note="Lobby {index}"'
+        for index in range(distinct)
+    ]
+    return [texts[index % distinct] for index in range(iterations)]
+
+
+def _bench(parse, workload: list[str]) -> float:
+    started = time.perf_counter()
+    for text in workload:
+        parse(text)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=100_000)
+    parser.add_argument("--distinct", type=int, default=20)
+    args = parser.parse_args()
+
+    workload = _workload(args.distinct, args.iterations)
+    _parse_cached.cache_clear()
+    for name, parse in (("shlex", _legacy_parse), ("compiled", parse_command_text)):
+        elapsed = _bench(parse, workload)
+        print(
+            f"{name:>8}: {elapsed / args.iterations * 1e6:6.2f} us/parse "
+            f"({args.iterations / elapsed:,.0f} parses/s, {args.distinct} distinct texts)"
+        )
+    print(f"cache: {_parse_cached.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
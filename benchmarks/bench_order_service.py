@@ -0,0 +1,125 @@
+"""Throughput benchmark: ``OrderService`` in a threadpool vs ``AsyncOrderService``.
+
+Seeds one open run and ``--submissions`` users in a file SQLite database,
+then submits one order per user, all at once:
+
+* ``sync``: ``OrderService`` on a pysqlite ``Session``, each call hopped onto
+  the default executor with ``asyncio.to_thread`` (what an async handler has
+  to do with the sync service),
+* ``async``: ``AsyncOrderService`` on an aiosqlite ``AsyncSession``, awaited
+  directly on the event loop.
+
+Each submission uses its own session and commits. Reports wall time,
+throughput and p50/p95 latency, measured from the moment the batch is
+scheduled so time spent queued for a thread or a pooled connection counts.
+
+Usage::
+
+    PYTHONPATH=src python benchmarks/bench_order_service.py --submissions 200
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from uuid import uuid4
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from coffeebuddy.core.orders import AsyncOrderService, OrderService, OrderSubmissionRequest
+from coffeebuddy.infra.db.models import Base, Channel, Run, RunStatus, User
+
+
+def _seed(path: Path, submissions: int) -> list[OrderSubmissionRequest]:
+    engine = create_engine(f"sqlite+pysqlite:///{path}")
+    Base.metadata.create_all(engine)
+    now = datetime.now(timezone.utc)
+    channel = Channel(id=uuid4(), slack_channel_id="C1", name="coffee", created_at=now, updated_at=now)
+    users = [
+        User(id=uuid4(), slack_user_id=f"U{index}", display_name=f"Bench {index}", created_at=now, updated_at=now)
+        for index in range(submissions)
+    ]
+    run = Run(
+        id=uuid4(),
+        channel_id=channel.id,
+        initiator_user_id=users[0].id,
+        status=RunStatus.OPEN,
+        started_at=now,
+        created_at=now,
+        updated_at=now,
+    )
+    with sessionmaker(bind=engine)() as session:
+        session.add_all([channel, *users])
+        session.flush()
+        session.add(run)
+        session.commit()
+        requests = [
+            OrderSubmissionRequest(run_id=str(run.id), user_id=str(user.id), order_text=f"Flat white #{index}")
+            for index, user in enumerate(users)
+        ]
+    engine.dispose()
+    return requests
+
+
+async def _sync_backend(path: Path, requests: list[OrderSubmissionRequest]) -> tuple[float, list[float]]:
+    engine = create_engine(f"sqlite+pysqlite:///{path}", connect_args={"timeout": 60})
+    session_factory = sessionmaker(bind=engine, expire_on_commit=False)
+
+    def submit(request: OrderSubmissionRequest) -> float:
+        with session_factory() as session:
+            OrderService(session).submit_order(request)
+            session.commit()
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(asyncio.to_thread(submit, request) for request in requests))
+    elapsed = time.perf_counter() - started
+    engine.dispose()
+    return elapsed, list(latencies)
+
+
+async def _async_backend(path: Path, requests: list[OrderSubmissionRequest]) -> tuple[float, list[float]]:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", connect_args={"timeout": 60})
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    async def submit(request: OrderSubmissionRequest) -> float:
+        async with session_factory() as session:
+            await AsyncOrderService(session).submit_order(request)
+            await session.commit()
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(submit(request) for request in requests))
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+    return elapsed, list(latencies)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--submissions", type=int, default=200)
+    args = parser.parse_args()
+
+    backends = {"sync": _sync_backend, "async": _async_backend}
+    with tempfile.TemporaryDirectory() as directory:
+        for name, backend in backends.items():
+            path = Path(directory) / f"{name}.db"
+            requests = _seed(path, args.submissions)
+            elapsed, latencies = asyncio.run(backend(path, requests))
+            ordered = sorted(latencies)
+            p95 = ordered[max(int(len(ordered) * 0.95) - 1, 0)]
+            print(
+                f"{name:>5}: {len(requests)} submissions in {elapsed:6.2f}s "
+                f"({len(requests) / elapsed:7.1f}/s) p50={statistics.median(ordered) * 1e3:7.2f}ms "
+                f"p95={p95 * 1e3:7.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Load benchmark for ``POST /slack/commands``.
+
+Fires ``--requests`` signed slash commands with ``--concurrency`` in flight and
+compares two publishers with the same simulated broker ack latency:
+
+* ``blocking``: sleeps on the event loop thread, like the old kafka-python
+  ``future.get(timeout=10)`` path did.
+* ``async``: awaits the ack, like ``KafkaRunEventPublisher`` over aiokafka.
+
+Usage::
+
+    PYTHONPATH=src python benchmarks/bench_slack_commands.py --requests 200 --concurrency 50
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import time
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from coffeebuddy.app import create_app
+from coffeebuddy.config import Settings
+from coffeebuddy.events.run import RunCreatedEvent
+from coffeebuddy.models import Base
+
+_SECRET = "benchmark-signing-secret"
+
+
+class BlockingPublisher:
+    def __init__(self, latency: float) -> None:
+        self._latency = latency
+
+    async def publish_run_created(self, event: RunCreatedEvent) -> None:
+        time.sleep(self._latency)
+
+
+class AsyncPublisher:
+    def __init__(self, latency: float) -> None:
+        self._latency = latency
+
+    async def publish_run_created(self, event: RunCreatedEvent) -> None:
+        await asyncio.sleep(self._latency)
+
+
+def _signed_request(index: int) -> tuple[bytes, dict[str, str]]:
+    body = (
+        f"token=abc&team_id=T1&channel_id=C{index}&channel_name=general&user_id=U1"
+        "&user_name=bench&text=note=Lobby&trigger_id=1&response_url=https://example"
+    ).encode()
+    timestamp = str(int(time.time()))
+    digest = hmac.new(_SECRET.encode(), b"v0:" + timestamp.encode() + b":" + body, hashlib.sha256)
+    headers = {
+        "X-Slack-Request-Timestamp": timestamp,
+        "X-Slack-Signature": f"v0={digest.hexdigest()}",
+        "Content-Type": "application/x-www-form-urlencoded",
+    }
+    return body, headers
+
+
+async def _run(publisher, *, requests: int, concurrency: int) -> float:
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    app = create_app(
+        settings=Settings(
+            slack_signing_secret=_SECRET,
+            database_url="sqlite+aiosqlite://",
+            kafka_bootstrap_servers="localhost:9092",
+            # Measures the handler itself; one workspace would otherwise be shed.
+            slack_admission_enabled=False,
+        ),
+        session_factory=async_sessionmaker(bind=engine, expire_on_commit=False),
+        event_publisher=publisher,
+    )
+    semaphore = asyncio.Semaphore(concurrency)
+    payloads = [_signed_request(i) for i in range(requests)]
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+
+        async def _one(body: bytes, headers: dict[str, str]) -> None:
+            async with semaphore:
+                response = await client.post("/slack/commands", content=body, headers=headers)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(_one(body, headers) for body, headers in payloads))
+        elapsed = time.perf_counter() - started
+
+    await engine.dispose()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Simulated broker ack latency.")
+    args = parser.parse_args()
+
+    latency = args.latency_ms / 1000
+    for name, publisher in (("blocking", BlockingPublisher(latency)), ("async", AsyncPublisher(latency))):
+        elapsed = asyncio.run(_run(publisher, requests=args.requests, concurrency=args.concurrency))
+        print(
+            f"{name:>8}: {args.requests} requests in {elapsed:.3f}s "
+            f"({args.requests / elapsed:,.0f} req/s, concurrency={args.concurrency})"
+        )
+
+
+if __name__ == "__main__":
+    main()
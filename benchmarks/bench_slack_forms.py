@@ -0,0 +1,79 @@
+"""Microbenchmark for decoding slash command form bodies.
+
+Compares the previous ``parse_qs`` path (decode the body, build a list per
+key, keep ``values[0]``, then look every field up again to build
+``SlackCommandPayload``) with the single-pass ``decode_command_form``.
+
+Usage::
+
+    PYTHONPATH=src python benchmarks/bench_slack_forms.py --iterations 100000
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from urllib.parse import parse_qs, urlencode
+
+from coffeebuddy.api.slack_runs.forms import decode_command_form
+from coffeebuddy.api.slack_runs.models import SlackCommandPayload
+
+_BODY = urlencode(
+    {
+        "token": "gIkuvaNzQIHg97ATvDxqgjtO",
+        "team_id": "T0001",
+        "team_domain": "example",
+        "enterprise_id": "E0001",
+        "enterprise_name": "Globular Construct Inc",
+        "channel_id": "C2147483705",
+        "channel_name": "coffee",
+        "user_id": "U2147483697",
+        "user_name": "alex",
+        "command": "/coffee",
+        "text": "pickup=09:30 note=\"Lobby by the plants\"",
+        "api_app_id": "A123456",
+        "is_enterprise_install": "false",
+        "response_url": "https://hooks.slack.com/commands/1234/5678",
+        "trigger_id": "13345224609.738474920.8088930838d88f008e0",
+    }
+).encode()
+
+
+def _legacy(body: bytes) -> SlackCommandPayload:
+    parsed = parse_qs(body.decode())
+    payload = {key: values[0] for key, values in parsed.items()}
+    return SlackCommandPayload(
+        token=payload.get("token", ""),
+        team_id=payload.get("team_id", ""),
+        channel_id=payload.get("channel_id", ""),
+        channel_name=payload.get("channel_name", ""),
+        user_id=payload.get("user_id", ""),
+        user_name=payload.get("user_name", ""),
+        text=payload.get("text", ""),
+        trigger_id=payload.get("trigger_id", ""),
+        response_url=payload.get("response_url", ""),
+    )
+
+
+def _bench(decode, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        decode(_BODY)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=100_000)
+    args = parser.parse_args()
+
+    assert _legacy(_BODY) == decode_command_form(_BODY)
+    for name, decode in (("parse_qs", _legacy), ("single-pass", decode_command_form)):
+        elapsed = _bench(decode, args.iterations)
+        print(
+            f"{name:>11}: {elapsed / args.iterations * 1e6:6.2f} us/body "
+            f"({args.iterations / elapsed:,.0f} bodies/s, {len(_BODY)} bytes)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Latency benchmark for ``POST /slack/interactions``.
+
+Seeds ``--runs`` open runs, then drives each action through the full route
+(signature check, payload decode, dispatch, DB work, rendering):
+
+* ``order:new`` once per run,
+* ``order:reuse`` once per run (reuses the preference saved by ``order:new``),
+* ``run:close`` once per run.
+
+Reports p50/p95/max per action against Slack's 3-second budget.
+
+Usage::
+
+    PYTHONPATH=src python benchmarks/bench_slack_interactions.py --runs 200
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import statistics
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+from uuid import uuid4
+
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from coffeebuddy.app import create_app
+from coffeebuddy.config import Settings
+from coffeebuddy.infra.db.models import Base, Channel, Run, RunStatus, User
+
+_SECRET = "benchmark-signing-secret"
+_BUDGET_SECONDS = 3.0
+
+
+class _NullPublisher:
+    async def publish_run_created(self, event) -> None:
+        return None
+
+
+class _NullSender:
+    async def send(self, response_url: str, body: bytes) -> None:
+        return None
+
+
+def _signed(payload: dict) -> tuple[bytes, dict[str, str]]:
+    body = urlencode({"payload": json.dumps(payload)}).encode()
+    timestamp = str(int(time.time()))
+    digest = hmac.new(_SECRET.encode(), b"v0:" + timestamp.encode() + b":" + body, hashlib.sha256)
+    return body, {
+        "X-Slack-Request-Timestamp": timestamp,
+        "X-Slack-Signature": f"v0={digest.hexdigest()}",
+        "Content-Type": "application/x-www-form-urlencoded",
+    }
+
+
+def _action(action_id: str, run_id: str, index: int) -> dict:
+    return {
+        "type": "block_actions",
+        "user": {"id": "U1"},
+        "response_url": "https://hooks.example/bench",
+        "actions": [{"action_id": action_id, "value": run_id}],
+        "state": {"values": {"order": {"order_text": {"value": f"Flat white #{index}"}}}},
+    }
+
+
+async def _seed(session_factory, runs: int) -> list[str]:
+    now = datetime.now(timezone.utc)
+    channel = Channel(id=uuid4(), slack_channel_id="C1", name="coffee", created_at=now, updated_at=now)
+    user = User(id=uuid4(), slack_user_id="U1", display_name="Bench", created_at=now, updated_at=now)
+    run_rows = [
+        Run(
+            id=uuid4(),
+            channel_id=channel.id,
+            initiator_user_id=user.id,
+            status=RunStatus.OPEN,
+            started_at=now,
+            created_at=now,
+            updated_at=now,
+        )
+        for _ in range(runs)
+    ]
+    async with session_factory() as session:
+        session.add_all([channel, user])
+        await session.flush()
+        session.add_all(run_rows)
+        await session.commit()
+    return [str(run.id) for run in run_rows]
+
+
+async def _run(runs: int) -> dict[str, list[float]]:
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    run_ids = await _seed(session_factory, runs)
+    app = create_app(
+        settings=Settings(
+            slack_signing_secret=_SECRET,
+            database_url="sqlite+aiosqlite://",
+            kafka_bootstrap_servers="localhost:9092",
+        ),
+        session_factory=session_factory,
+        event_publisher=_NullPublisher(),
+        response_sender=_NullSender(),
+    )
+
+    latencies: dict[str, list[float]] = {}
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        for action_id in ("order:new", "order:reuse", "run:close"):
+            samples = latencies.setdefault(action_id, [])
+            for index, run_id in enumerate(run_ids):
+                body, headers = _signed(_action(action_id, run_id, index))
+                started = time.perf_counter()
+                response = await client.post("/slack/interactions", content=body, headers=headers)
+                samples.append(time.perf_counter() - started)
+                response.raise_for_status()
+                reply = response.json()
+                if "blocks" not in reply:
+                    raise RuntimeError(f"{action_id} rejected: {reply.get('text')}")
+
+    await engine.dispose()
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    for action_id, samples in asyncio.run(_run(args.runs)).items():
+        ordered = sorted(samples)
+        p95 = ordered[int(len(ordered) * 0.95) - 1]
+        print(
+            f"{action_id:>12}: p50={statistics.median(ordered) * 1e3:7.2f}ms "
+            f"p95={p95 * 1e3:7.2f}ms max={ordered[-1] * 1e3:7.2f}ms "
+            f"budget={'ok' if ordered[-1] < _BUDGET_SECONDS else 'EXCEEDED'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Microbenchmark for Slack request signature verification.
+
+Compares the previous per-request verifier, which built a new verifier and
+decoded/re-encoded the body into an f-string, with the long-lived
+``SlackSignatureVerifier`` that hashes the raw bytes and reuses its HMAC key
+schedule. Every request has a unique timestamp, so the shared verifier also
+pays for a replay-cache insert (and capacity eviction) on each call.
+
+Usage::
+
+    PYTHONPATH=src python benchmarks/bench_slack_signature.py --iterations 20000
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import hmac
+import time
+
+from coffeebuddy.api.slack_runs.signature import SlackSignatureVerifier
+
+_SECRET = "benchmark-signing-secret"
+_NOW = 1_700_000_000
+_TOLERANCE = 10**9
+
+
+class LegacyVerifier:
+    def __init__(self, *, signing_secret: str, tolerance_seconds: int = _TOLERANCE) -> None:
+        self._secret = signing_secret.encode()
+        self._tolerance = tolerance_seconds
+
+    def verify(self, *, timestamp: str, signature: str, body: bytes) -> None:
+        if abs(_NOW - int(timestamp)) > self._tolerance:
+            raise ValueError("stale")
+        basestring = f"v0:{timestamp}:{body.decode()}".encode()
+        expected = f"v0={hmac.new(self._secret, basestring, hashlib.sha256).hexdigest()}"
+        if not hmac.compare_digest(expected, signature):
+            raise ValueError("mismatch")
+
+
+def _requests(size: int, count: int) -> list[tuple[str, str, bytes]]:
+    body = (b"payload=" + b"x" * size)[:size]
+    requests = []
+    for index in range(count):
+        timestamp = str(_NOW + index)
+        digest = hmac.new(_SECRET.encode(), b"v0:" + timestamp.encode() + b":" + body, hashlib.sha256)
+        requests.append((timestamp, f"v0={digest.hexdigest()}", body))
+    return requests
+
+
+def _bench_legacy(requests: list[tuple[str, str, bytes]]) -> float:
+    started = time.perf_counter()
+    for timestamp, signature, body in requests:
+        verifier = LegacyVerifier(signing_secret=_SECRET)
+        verifier.verify(timestamp=timestamp, signature=signature, body=body)
+    return time.perf_counter() - started
+
+
+def _bench_shared(requests: list[tuple[str, str, bytes]]) -> float:
+    verifier = SlackSignatureVerifier(
+        signing_secret=_SECRET, tolerance_seconds=_TOLERANCE, clock=lambda: _NOW
+    )
+    started = time.perf_counter()
+    for timestamp, signature, body in requests:
+        verifier.verify(timestamp=timestamp, signature=signature, body=body)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20_000)
+    args = parser.parse_args()
+
+    for label, size in (("1KB", 1024), ("100KB", 100 * 1024)):
+        requests = _requests(size, args.iterations)
+        for name, bench in (("legacy", _bench_legacy), ("shared", _bench_shared)):
+            elapsed = bench(requests)
+            print(
+                f"{label:>6} {name:>7}: {elapsed / args.iterations * 1e6:8.2f} us/verify "
+                f"({args.iterations / elapsed:,.0f} verifies/s)"
+            )
+
+
+if __name__ == "__main__":
+    main()
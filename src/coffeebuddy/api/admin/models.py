@@ -60,4 +60,5 @@ class DataResetResult:
     orders_deleted: int
     runs_deleted: int
     preferences_deleted: int
-    runner_stats_deleted: int
\ No newline at end of file
+    runner_stats_deleted: int
+    runner_window_slots_deleted: int = 0
\ No newline at end of file
@@ -20,7 +20,18 @@ from coffeebuddy.api.admin.models import (
     DataResetResult,
 )
 from coffeebuddy.core.audit import AdminAuditLogger
-from coffeebuddy.infra.db.models import Channel, Order, Run, RunnerStat, UserPreference
+from coffeebuddy.infra.db.hooks import after_commit
+from coffeebuddy.infra.db.identity import IdentityCache
+from coffeebuddy.infra.db.models import (
+    Channel,
+    Order,
+    Run,
+    RunnerStat,
+    RunnerWindowSlot,
+    UserPreference,
+)
+from coffeebuddy.services.fairness.index import FairnessIndex
+from coffeebuddy.services.preferences.cache import PreferenceCache, PreferenceInvalidation
 
 Clock = Callable[[], datetime]
 
@@ -35,11 +46,17 @@ class AdminService:
         authorizer: SlackAdminAuthorizer,
         audit_logger: AdminAuditLogger | None = None,
         clock: Clock | None = None,
+        preference_cache: PreferenceCache | None = None,
+        identity_cache: IdentityCache | None = None,
+        fairness_index: FairnessIndex | None = None,
     ) -> None:
         self._session = session
         self._authorizer = authorizer
-        self._audit = audit_logger or AdminAuditLogger(session)
         self._clock = clock or (lambda: datetime.now(timezone.utc))
+        self._preference_cache = preference_cache
+        self._identity_cache = identity_cache
+        self._fairness_index = fairness_index
+        self._audit = audit_logger or AdminAuditLogger(session, clock=self._clock)
 
     def update_channel_config(
         self,
@@ -60,6 +77,7 @@ class AdminService:
         for field, value in updates.items():
             setattr(channel, field, value)
         channel.updated_at = timestamp
+        self._invalidate_channel(channel)
         self._audit.log_action(
             channel_id=channel.id,
             admin_user_id=actor.user_id,
@@ -86,6 +104,7 @@ class AdminService:
         previous_state = bool(channel.enabled)
         channel.enabled = enabled
         channel.updated_at = timestamp
+        self._invalidate_channel(channel)
         action_type = (
             ChannelAdminActionType.ENABLE if enabled else ChannelAdminActionType.DISABLE
         )
@@ -115,9 +134,12 @@ class AdminService:
         channel = self._get_channel(slack_channel_id)
         self._authorizer.assert_authorized(actor)
         counts = self._purge_channel_data(channel_id=channel.id)
+        self._invalidate_preferences(channel.id)
+        self._invalidate_fairness(channel.id)
         timestamp = self._clock()
         channel.last_reset_at = timestamp
         channel.updated_at = timestamp
+        self._invalidate_channel(channel)
         self._audit.log_action(
             channel_id=channel.id,
             admin_user_id=actor.user_id,
@@ -131,8 +153,13 @@ class AdminService:
         )
 
     def _get_channel(self, slack_channel_id: str) -> Channel:
-        stmt = select(Channel).where(Channel.slack_channel_id == slack_channel_id)
-        channel = self._session.execute(stmt).scalar_one_or_none()
+        if self._identity_cache is not None:
+            # Admin writes start from the stored row; only the ID mapping is cached.
+            channel_id = self._identity_cache.resolve_channel_id(self._session, slack_channel_id)
+            channel = self._session.get(Channel, channel_id) if channel_id else None
+        else:
+            stmt = select(Channel).where(Channel.slack_channel_id == slack_channel_id)
+            channel = self._session.execute(stmt).scalar_one_or_none()
         if not channel:
             raise ChannelNotFoundError(slack_channel_id)
         return channel
@@ -199,13 +226,39 @@ class AdminService:
         runner_stats_deleted = self._execute_delete(
             delete(RunnerStat).where(RunnerStat.channel_id == channel_id)
         )
+        runner_window_slots_deleted = self._execute_delete(
+            delete(RunnerWindowSlot).where(RunnerWindowSlot.channel_id == channel_id)
+        )
         return {
             "orders_deleted": orders_deleted,
             "runs_deleted": runs_deleted,
             "preferences_deleted": preferences_deleted,
             "runner_stats_deleted": runner_stats_deleted,
+            "runner_window_slots_deleted": runner_window_slots_deleted,
         }
 
+    def _invalidate_channel(self, channel: Channel) -> None:
+        if self._identity_cache is not None:
+            self._identity_cache.invalidate_channel(channel, session=self._session)
+
+    def _invalidate_preferences(self, channel_id) -> None:
+        cache = self._preference_cache
+        if cache is None:
+            return
+        invalidation = PreferenceInvalidation(channel_id=channel_id)
+        cache.apply(invalidation)
+        # Evict again and fan out once the delete is durable.
+        after_commit(self._session, lambda: cache.invalidate(invalidation))
+
+    def _invalidate_fairness(self, channel_id) -> None:
+        index = self._fairness_index
+        if index is None:
+            return
+        # Runner stats only grow otherwise; a reset must drop the channel. Other
+        # processes notice the re-created rows on their next selection.
+        index.invalidate(channel_id)
+        after_commit(self._session, lambda: index.invalidate(channel_id))
+
     def _execute_delete(self, statement) -> int:
         result = self._session.execute(statement)
         return max(0, result.rowcount or 0)
\ No newline at end of file
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from coffeebuddy.api.slack_runs.metrics import SLACK_ADMITTED_TOTAL, SLACK_SHED_TOTAL
+
+
+@dataclass(slots=True)
+class _Bucket:
+    tokens: float
+    refilled_at: float
+
+
+class TokenBucketLimiter:
+    """Keyed token buckets refilled lazily on access.
+
+    Each key may burst up to ``burst`` requests and then sustains
+    ``rate_per_second``. Only the ``max_keys`` most recently used keys are
+    tracked; an evicted key simply starts again with a full bucket.
+    """
+
+    def __init__(
+        self,
+        *,
+        rate_per_second: float,
+        burst: int,
+        max_keys: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if rate_per_second <= 0 or burst < 1:
+            raise ValueError("rate_per_second must be positive and burst at least 1")
+        self._rate = rate_per_second
+        self._burst = float(burst)
+        self._max_keys = max_keys
+        self._clock = clock
+        self._buckets: OrderedDict[str, _Bucket] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def try_acquire(self, key: str) -> bool:
+        """Takes one token for ``key``; returns False when the bucket is empty."""
+        now = self._clock()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = _Bucket(tokens=self._burst, refilled_at=now)
+            self._buckets[key] = bucket
+            if len(self._buckets) > self._max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            elapsed = now - bucket.refilled_at
+            if elapsed > 0:
+                bucket.tokens = min(self._burst, bucket.tokens + elapsed * self._rate)
+                bucket.refilled_at = now
+        if bucket.tokens < 1.0:
+            return False
+        bucket.tokens -= 1.0
+        return True
+
+    def refund(self, key: str) -> None:
+        """Returns a token taken by ``try_acquire`` that ended up unused."""
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            bucket.tokens = min(self._burst, bucket.tokens + 1.0)
+
+
+class SlackAdmissionController:
+    """Sheds slash commands before they reach the database pool.
+
+    A request needs a token from its channel's bucket and from its
+    workspace's bucket, so one noisy channel cannot starve the rest of the
+    workspace and one workspace cannot starve the app.
+    """
+
+    def __init__(self, *, channel: TokenBucketLimiter, workspace: TokenBucketLimiter) -> None:
+        self._channel = channel
+        self._workspace = workspace
+
+    def admit(self, *, team_id: str, channel_id: str) -> bool:
+        channel_key = f"{team_id}:{channel_id}"
+        if not self._channel.try_acquire(channel_key):
+            SLACK_SHED_TOTAL.labels(scope="channel").inc()
+            return False
+        if not self._workspace.try_acquire(team_id):
+            self._channel.refund(channel_key)
+            SLACK_SHED_TOTAL.labels(scope="workspace").inc()
+            return False
+        SLACK_ADMITTED_TOTAL.inc()
+        return True
+
+    def refund(self, *, team_id: str, channel_id: str) -> None:
+        """Returns both tokens of an admitted request that did no work."""
+        self._channel.refund(f"{team_id}:{channel_id}")
+        self._workspace.refund(team_id)
+
+
+__all__ = ["SlackAdmissionController", "TokenBucketLimiter"]
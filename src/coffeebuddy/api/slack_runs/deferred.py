@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Protocol
+
+import httpx
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from coffeebuddy.api.slack_runs.messages import SlackMessageBuilder
+from coffeebuddy.api.slack_runs.metrics import (
+    SLACK_DEFERRED_JOB_SECONDS,
+    SLACK_DEFERRED_JOBS_TOTAL,
+    SLACK_DEFERRED_QUEUE_DEPTH,
+)
+from coffeebuddy.api.slack_runs.models import RunCommandOptions, SlackCommandPayload
+from coffeebuddy.api.slack_runs.service import SlackRunCommandService
+from coffeebuddy.events.run import RunEventPublisher
+
+logger = logging.getLogger(__name__)
+
+PublisherFactory = Callable[[AsyncSession], RunEventPublisher]
+
+FAILURE_MESSAGE = "Sorry, CoffeeBuddy could not start this run. Please try again."
+_FAILURE_REPLY = SlackMessageBuilder.render_ephemeral(FAILURE_MESSAGE)
+
+
+class DeferredQueueFullError(Exception):
+    """Raised when the deferred command queue cannot accept more work."""
+
+
+class ResponseUrlSender(Protocol):
+    """Delivers a rendered Slack message (JSON bytes) to a command's ``response_url``."""
+
+    async def send(self, response_url: str, body: bytes) -> None: ...
+
+
+class HttpxResponseUrlSender:
+    """``ResponseUrlSender`` backed by a shared ``httpx.AsyncClient``."""
+
+    def __init__(self, *, timeout_seconds: float = 5.0, client: httpx.AsyncClient | None = None) -> None:
+        self._client = client or httpx.AsyncClient(timeout=timeout_seconds)
+
+    async def send(self, response_url: str, body: bytes) -> None:
+        response = await self._client.post(
+            response_url, content=body, headers={"Content-Type": "application/json"}
+        )
+        response.raise_for_status()
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+@dataclass(slots=True)
+class _DeferredCommand:
+    command: SlackCommandPayload
+    options: RunCommandOptions
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class DeferredCommandQueue:
+    """Bounded in-process queue that finishes slash commands after the ack.
+
+    ``max_pending`` caps acknowledged-but-unprocessed commands (``submit``
+    raises once it is reached) and ``concurrency`` caps how many commands
+    hold a DB session at the same time.
+    """
+
+    def __init__(
+        self,
+        *,
+        session_factory: Callable[[], AsyncSession],
+        event_publisher_factory: PublisherFactory,
+        sender: ResponseUrlSender,
+        max_pending: int = 100,
+        concurrency: int = 4,
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
+        self._session_factory = session_factory
+        self._event_publisher_factory = event_publisher_factory
+        self._sender = sender
+        self._concurrency = concurrency
+        self._queue: asyncio.Queue[_DeferredCommand] = asyncio.Queue(maxsize=max_pending)
+        self._workers: list[asyncio.Task] = []
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    async def start(self) -> None:
+        if self._workers:
+            return
+        self._workers = [
+            asyncio.create_task(self._worker_loop(), name=f"slack-deferred-{index}")
+            for index in range(self._concurrency)
+        ]
+        logger.info("Deferred Slack command queue started", extra={"workers": self._concurrency})
+
+    async def stop(self) -> None:
+        """Drain queued commands, then cancel the workers."""
+        if not self._workers:
+            return
+        await self._queue.join()
+        for worker in self._workers:
+            worker.cancel()
+        for worker in self._workers:
+            with contextlib.suppress(asyncio.CancelledError):
+                await worker
+        self._workers = []
+        logger.info("Deferred Slack command queue stopped")
+
+    def submit(self, command: SlackCommandPayload, options: RunCommandOptions) -> None:
+        try:
+            self._queue.put_nowait(_DeferredCommand(command=command, options=options))
+        except asyncio.QueueFull as exc:
+            SLACK_DEFERRED_JOBS_TOTAL.labels(status="rejected").inc()
+            raise DeferredQueueFullError("Deferred command queue is full.") from exc
+        SLACK_DEFERRED_QUEUE_DEPTH.set(self._queue.qsize())
+
+    async def _worker_loop(self) -> None:
+        while True:
+            job = await self._queue.get()
+            SLACK_DEFERRED_QUEUE_DEPTH.set(self._queue.qsize())
+            try:
+                await self._process(job)
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, job: _DeferredCommand) -> None:
+        try:
+            async with self._session_factory() as session:
+                service = SlackRunCommandService(
+                    session=session,
+                    event_publisher=self._event_publisher_factory(session),
+                )
+                response = await service.handle(command=job.command, options=job.options)
+                await session.commit()
+            await self._sender.send(job.command.response_url, response)
+        except Exception:
+            SLACK_DEFERRED_JOBS_TOTAL.labels(status="error").inc()
+            logger.exception(
+                "Deferred slash command failed",
+                extra={"channel_id": job.command.channel_id, "trigger_id": job.command.trigger_id},
+            )
+            await self._notify_failure(job)
+            return
+        SLACK_DEFERRED_JOBS_TOTAL.labels(status="success").inc()
+        SLACK_DEFERRED_JOB_SECONDS.observe(time.perf_counter() - job.enqueued_at)
+
+    async def _notify_failure(self, job: _DeferredCommand) -> None:
+        with contextlib.suppress(Exception):
+            await self._sender.send(job.command.response_url, _FAILURE_REPLY)
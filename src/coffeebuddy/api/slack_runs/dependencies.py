@@ -1,19 +1,35 @@
 from __future__ import annotations
 
 from collections.abc import Callable
-from contextlib import contextmanager
-from typing import Iterator, Protocol
-
-from sqlalchemy.orm import Session
-
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Protocol
+
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from coffeebuddy.api.slack_runs.admission import SlackAdmissionController
+from coffeebuddy.api.slack_runs.deferred import (
+    DeferredCommandQueue,
+    PublisherFactory,
+    ResponseUrlSender,
+)
+from coffeebuddy.api.slack_runs.idempotency import InMemoryIdempotencyStore, SlackIdempotencyGuard
+from coffeebuddy.api.slack_runs.interactions import InteractionDispatcher
+from coffeebuddy.api.slack_runs.signature import SlackSignatureVerifier
 from coffeebuddy.config import Settings
 from coffeebuddy.events.run import RunEventPublisher
 
 
 class _SlackRunDependencyState:
     settings: Settings | None = None
-    session_factory: Callable[[], Session] | None = None
-    event_publisher: RunEventPublisher | None = None
+    session_factory: Callable[[], AsyncSession] | None = None
+    event_publisher_factory: PublisherFactory | None = None
+    command_queue: DeferredCommandQueue | None = None
+    signature_verifier: SlackSignatureVerifier | None = None
+    interaction_dispatcher: InteractionDispatcher | None = None
+    response_sender: ResponseUrlSender | None = None
+    idempotency_guard: SlackIdempotencyGuard | None = None
+    admission_controller: SlackAdmissionController | None = None
 
 
 _state = _SlackRunDependencyState()
@@ -22,12 +38,42 @@ _state = _SlackRunDependencyState()
 def configure_dependencies(
     *,
     settings: Settings,
-    session_factory: Callable[[], Session],
-    event_publisher: RunEventPublisher,
+    session_factory: Callable[[], AsyncSession],
+    event_publisher: RunEventPublisher | None = None,
+    event_publisher_factory: PublisherFactory | None = None,
+    command_queue: DeferredCommandQueue | None = None,
+    interaction_dispatcher: InteractionDispatcher | None = None,
+    response_sender: ResponseUrlSender | None = None,
+    idempotency_guard: SlackIdempotencyGuard | None = None,
+    admission_controller: SlackAdmissionController | None = None,
 ) -> None:
+    """Registers request dependencies.
+
+    Pass either a shared ``event_publisher`` or an ``event_publisher_factory``
+    that binds a publisher to the request session (transactional outbox).
+    """
+    if event_publisher_factory is None:
+        if event_publisher is None:
+            raise ValueError("event_publisher or event_publisher_factory is required")
+        event_publisher_factory = lambda _session: event_publisher  # noqa: E731
     _state.settings = settings
     _state.session_factory = session_factory
-    _state.event_publisher = event_publisher
+    _state.event_publisher_factory = event_publisher_factory
+    _state.command_queue = command_queue
+    _state.interaction_dispatcher = interaction_dispatcher or InteractionDispatcher()
+    _state.response_sender = response_sender
+    _state.admission_controller = admission_controller
+    _state.idempotency_guard = idempotency_guard or SlackIdempotencyGuard(
+        InMemoryIdempotencyStore(
+            ttl_seconds=settings.slack_idempotency_ttl_seconds,
+            max_entries=settings.slack_idempotency_cache_size,
+        )
+    )
+    _state.signature_verifier = SlackSignatureVerifier(
+        signing_secret=settings.slack_signing_secret,
+        tolerance_seconds=settings.slack_timestamp_tolerance_seconds,
+        replay_cache_size=settings.slack_replay_cache_size,
+    )
 
 
 def get_settings() -> Settings:
@@ -36,30 +82,63 @@ def get_settings() -> Settings:
     return _state.settings
 
 
-@contextmanager
-def _session_manager() -> Iterator[Session]:
+@asynccontextmanager
+async def _session_manager() -> AsyncIterator[AsyncSession]:
     if not _state.session_factory:
         raise RuntimeError("Session factory not configured")
     session = _state.session_factory()
     try:
         yield session
-        session.commit()
+        await session.commit()
     except Exception:
-        session.rollback()
+        await session.rollback()
         raise
     finally:
-        session.close()
+        await session.close()
 
 
-def get_session() -> Iterator[Session]:
-    with _session_manager() as session:
+async def get_session() -> AsyncIterator[AsyncSession]:
+    async with _session_manager() as session:
         yield session
 
 
-def get_run_event_publisher() -> RunEventPublisher:
-    if not _state.event_publisher:
+def get_run_event_publisher(session: AsyncSession = Depends(get_session)) -> RunEventPublisher:
+    if not _state.event_publisher_factory:
         raise RuntimeError("Run event publisher not configured")
-    return _state.event_publisher
+    return _state.event_publisher_factory(session)
+
+
+def get_signature_verifier() -> SlackSignatureVerifier:
+    if not _state.signature_verifier:
+        raise RuntimeError("Slack signature verifier not configured")
+    return _state.signature_verifier
+
+
+def get_interaction_dispatcher() -> InteractionDispatcher:
+    if not _state.interaction_dispatcher:
+        raise RuntimeError("Slack interaction dispatcher not configured")
+    return _state.interaction_dispatcher
+
+
+def get_idempotency_guard() -> SlackIdempotencyGuard:
+    if not _state.idempotency_guard:
+        raise RuntimeError("Slack idempotency guard not configured")
+    return _state.idempotency_guard
+
+
+def get_response_sender() -> ResponseUrlSender | None:
+    """Returns the response_url sender, or None when follow-ups are disabled."""
+    return _state.response_sender
+
+
+def get_admission_controller() -> SlackAdmissionController | None:
+    """Returns the slash command rate limiter, or None when admission is disabled."""
+    return _state.admission_controller
+
+
+def get_command_queue() -> DeferredCommandQueue | None:
+    """Returns the deferred-ack queue, or None when commands answer inline."""
+    return _state.command_queue
 
 
 class RouterProtocol(Protocol):
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from dataclasses import fields
+from urllib.parse import unquote_to_bytes
+
+from coffeebuddy.api.slack_runs.models import SlackCommandPayload
+
+DEFAULT_MAX_BODY_BYTES = 64 * 1024
+
+_COMMAND_FIELDS = {field.name.encode(): field.name for field in fields(SlackCommandPayload)}
+
+
+class SlackFormError(Exception):
+    """Raised when a Slack form body cannot be decoded."""
+
+
+class SlackPayloadTooLargeError(SlackFormError):
+    """Raised when a Slack form body exceeds the configured size limit."""
+
+
+def decode_command_form(
+    body: bytes,
+    *,
+    max_bytes: int = DEFAULT_MAX_BODY_BYTES,
+) -> SlackCommandPayload:
+    """Decodes an ``application/x-www-form-urlencoded`` slash command body.
+
+    Makes one pass over the ``&``-separated pairs and only unquotes the values
+    of ``SlackCommandPayload`` fields; unknown keys are skipped untouched. As
+    with ``parse_qs``, the first occurrence of a repeated key wins.
+    """
+    if len(body) > max_bytes:
+        raise SlackPayloadTooLargeError(
+            f"Slack payload is {len(body)} bytes; the limit is {max_bytes}."
+        )
+
+    values: dict[str, str] = {}
+    for pair in body.split(b"&"):
+        key, _, raw_value = pair.partition(b"=")
+        name = _COMMAND_FIELDS.get(key)
+        if name is None or name in values:
+            continue
+        values[name] = _decode_value(raw_value)
+
+    return SlackCommandPayload(
+        token=values.get("token", ""),
+        team_id=values.get("team_id", ""),
+        channel_id=values.get("channel_id", ""),
+        channel_name=values.get("channel_name", ""),
+        user_id=values.get("user_id", ""),
+        user_name=values.get("user_name", ""),
+        text=values.get("text", ""),
+        trigger_id=values.get("trigger_id", ""),
+        response_url=values.get("response_url", ""),
+    )
+
+
+def decode_form_field(
+    body: bytes,
+    name: str,
+    *,
+    max_bytes: int = DEFAULT_MAX_BODY_BYTES,
+) -> str | None:
+    """Returns the first value of ``name`` in a urlencoded body, or None."""
+    if len(body) > max_bytes:
+        raise SlackPayloadTooLargeError(
+            f"Slack payload is {len(body)} bytes; the limit is {max_bytes}."
+        )
+    key = name.encode()
+    for pair in body.split(b"&"):
+        pair_key, _, raw_value = pair.partition(b"=")
+        if pair_key == key:
+            return _decode_value(raw_value)
+    return None
+
+
+def _decode_value(raw: bytes) -> str:
+    if b"%" in raw:
+        raw = unquote_to_bytes(raw.replace(b"+", b" "))
+    elif b"+" in raw:
+        raw = raw.replace(b"+", b" ")
+    try:
+        return raw.decode()
+    except UnicodeDecodeError as exc:
+        raise SlackFormError("Slack payload is not valid UTF-8.") from exc
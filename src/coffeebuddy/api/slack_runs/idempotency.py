@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Protocol
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from coffeebuddy.api.slack_runs.metrics import SLACK_IDEMPOTENCY_TOTAL
+from coffeebuddy.infra.db.models import SlackIdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 600
+DEFAULT_LEASE_SECONDS = 30
+
+
+class IdempotencyStore(Protocol):
+    """Records the response of a Slack request so retries can reuse it.
+
+    ``claim`` reserves a key for the first request; it returns False while
+    another request holds the key or once a response is recorded.
+    """
+
+    async def get(self, key: str) -> bytes | None: ...
+
+    async def claim(self, key: str) -> bool: ...
+
+    async def put(self, key: str, response: bytes) -> None: ...
+
+    async def release(self, key: str) -> None: ...
+
+
+@dataclass(slots=True)
+class _Entry:
+    response: bytes | None
+    expires_at: float
+
+
+class InMemoryIdempotencyStore:
+    """Per-process TTL cache; enough for a single replica."""
+
+    def __init__(
+        self,
+        *,
+        ttl_seconds: int = DEFAULT_TTL_SECONDS,
+        lease_seconds: int = DEFAULT_LEASE_SECONDS,
+        max_entries: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._ttl = ttl_seconds
+        self._lease = lease_seconds
+        self._max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._live_entry(key)
+        return entry.response if entry else None
+
+    async def claim(self, key: str) -> bool:
+        if self._live_entry(key) is not None:
+            return False
+        self._entries[key] = _Entry(response=None, expires_at=self._clock() + self._lease)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+        return True
+
+    async def put(self, key: str, response: bytes) -> None:
+        self._entries[key] = _Entry(response=response, expires_at=self._clock() + self._ttl)
+        self._entries.move_to_end(key)
+
+    async def release(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def _live_entry(self, key: str) -> _Entry | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= self._clock():
+            del self._entries[key]
+            return None
+        return entry
+
+
+class SqlIdempotencyStore:
+    """Shares keys across replicas through the ``slack_idempotency_keys`` table.
+
+    Every call runs in its own short transaction so a claim is visible to
+    other replicas before the request's own work commits.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        *,
+        ttl_seconds: int = DEFAULT_TTL_SECONDS,
+        lease_seconds: int = DEFAULT_LEASE_SECONDS,
+        clock: Callable[[], datetime] | None = None,
+    ) -> None:
+        self._session_factory = session_factory
+        self._ttl = timedelta(seconds=ttl_seconds)
+        self._lease = timedelta(seconds=lease_seconds)
+        self._clock = clock or (lambda: datetime.now(timezone.utc))
+
+    async def get(self, key: str) -> bytes | None:
+        async with self._session_factory() as session:
+            return await session.scalar(
+                select(SlackIdempotencyKey.response).where(
+                    SlackIdempotencyKey.key == key,
+                    SlackIdempotencyKey.expires_at > self._clock(),
+                )
+            )
+
+    async def claim(self, key: str) -> bool:
+        now = self._clock()
+        async with self._session_factory() as session:
+            insert = _insert_for(session)(SlackIdempotencyKey).values(
+                key=key, response=None, created_at=now, expires_at=now + self._lease
+            )
+            # Take over keys whose lease or TTL has lapsed; live keys are left alone.
+            stmt = insert.on_conflict_do_update(
+                index_elements=[SlackIdempotencyKey.key],
+                set_={"response": None, "created_at": now, "expires_at": now + self._lease},
+                where=SlackIdempotencyKey.expires_at <= now,
+            ).returning(SlackIdempotencyKey.key)
+            claimed = (await session.execute(stmt)).scalar_one_or_none()
+            await session.commit()
+        return claimed is not None
+
+    async def put(self, key: str, response: bytes) -> None:
+        async with self._session_factory() as session:
+            await session.execute(
+                update(SlackIdempotencyKey)
+                .where(SlackIdempotencyKey.key == key)
+                .values(response=response, expires_at=self._clock() + self._ttl)
+            )
+            await session.commit()
+
+    async def release(self, key: str) -> None:
+        async with self._session_factory() as session:
+            await session.execute(delete(SlackIdempotencyKey).where(SlackIdempotencyKey.key == key))
+            await session.commit()
+
+
+def _insert_for(session: AsyncSession):
+    return sqlite.insert if session.get_bind().dialect.name == "sqlite" else postgresql.insert
+
+
+class SlackIdempotencyGuard:
+    """Runs a Slack handler at most once per idempotency key.
+
+    Returns the recorded response for a repeat, ``None`` while the first
+    request is still running (the caller should ack without a body), or
+    the fresh response otherwise.
+    """
+
+    def __init__(self, store: IdempotencyStore) -> None:
+        self._store = store
+
+    async def recorded(self, key: str) -> bytes | None:
+        """Returns the response recorded for ``key``, if the request already ran."""
+        cached = await self._store.get(key)
+        if cached is not None:
+            SLACK_IDEMPOTENCY_TOTAL.labels(outcome="replayed").inc()
+        return cached
+
+    async def run(
+        self, key: str, handler: Callable[[], Awaitable[bytes]], *, checked: bool = False
+    ) -> bytes | None:
+        """``checked=True`` skips the lookup when the caller just called :meth:`recorded`."""
+        if not checked:
+            cached = await self.recorded(key)
+            if cached is not None:
+                return cached
+        if not await self._store.claim(key):
+            SLACK_IDEMPOTENCY_TOTAL.labels(outcome="in_flight").inc()
+            logger.info("Duplicate Slack request while original in flight", extra={"idempotency_key": key})
+            return None
+
+        SLACK_IDEMPOTENCY_TOTAL.labels(outcome="executed").inc()
+        try:
+            response = await handler()
+        except BaseException:
+            await self._store.release(key)
+            raise
+        await self._store.put(key, response)
+        return response
+
+
+def idempotency_key(kind: str, body: bytes) -> str:
+    """Keys a request on its raw body.
+
+    Slack retries resend the original body byte for byte, and every command
+    body carries its ``trigger_id``, so the hash separates distinct
+    invocations while matching their retries.
+    """
+    return f"{kind}:{hashlib.sha256(body).hexdigest()}"
+
+
+__all__ = [
+    "IdempotencyStore",
+    "InMemoryIdempotencyStore",
+    "SlackIdempotencyGuard",
+    "SqlIdempotencyStore",
+    "idempotency_key",
+]
@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Awaitable, Callable, Mapping
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any
+from uuid import UUID
+
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from coffeebuddy.api.slack_runs.forms import DEFAULT_MAX_BODY_BYTES, decode_form_field
+from coffeebuddy.api.slack_runs.messages import ORDER_TEXT_ACTION_ID, SlackMessageBuilder
+from coffeebuddy.api.slack_runs.metrics import SLACK_INTERACTION_SECONDS
+from coffeebuddy.core.orders import AsyncOrderService
+from coffeebuddy.core.orders.async_repository import AsyncUserRepository
+from coffeebuddy.core.orders.exceptions import OrderError
+from coffeebuddy.core.orders.models import Clock, OrderSubmissionRequest
+from coffeebuddy.core.runs.exceptions import RunCloseError
+from coffeebuddy.core.runs.models import CloseRunRequest, CloseRunResult
+from coffeebuddy.core.runs.service import CloseRunAuthorizer, CloseRunService
+from coffeebuddy.infra.db.identity import IdentityCache
+from coffeebuddy.infra.db.models import Run
+from coffeebuddy.services.fairness.index import FairnessIndex
+from coffeebuddy.services.fairness.service import FairnessService
+from coffeebuddy.services.preferences import PreferenceCache
+
+logger = logging.getLogger(__name__)
+
+class SlackInteractionError(Exception):
+    """Raised when an interactive payload is malformed or not supported."""
+
+
+@dataclass(frozen=True, slots=True)
+class SlackInteraction:
+    """The parts of a ``block_actions``/``view_submission`` payload we act on."""
+
+    type: str
+    action_id: str
+    run_id: str
+    slack_user_id: str
+    response_url: str | None = None
+    order_text: str | None = None
+
+
+InteractionHandler = Callable[["InteractionContext", SlackInteraction], Awaitable[bytes]]
+
+
+@dataclass(frozen=True, slots=True)
+class InteractionContext:
+    """Per-dispatch collaborators handed to a handler."""
+
+    session: AsyncSession
+    user_id: str
+    clock: Clock
+    authorizer: CloseRunAuthorizer
+    preference_cache: PreferenceCache | None = None
+    identity_cache: IdentityCache | None = None
+    fairness_index: FairnessIndex | None = None
+
+
+class InitiatorCloseRunAuthorizer:
+    """Allows only the user who started a run to close it."""
+
+    def is_authorized(self, *, run: Run, actor_user_id: str) -> bool:
+        return str(run.initiator_user_id) == actor_user_id
+
+
+def decode_interaction(body: bytes, *, max_bytes: int = DEFAULT_MAX_BODY_BYTES) -> SlackInteraction:
+    """Extracts the ``payload`` form field and parses its JSON exactly once."""
+    raw = decode_form_field(body, "payload", max_bytes=max_bytes)
+    if raw is None:
+        raise SlackInteractionError("Interactive request has no payload field.")
+    try:
+        payload: dict[str, Any] = orjson.loads(raw)
+    except orjson.JSONDecodeError as exc:
+        raise SlackInteractionError("Interactive payload is not valid JSON.") from exc
+    if not isinstance(payload, dict):
+        raise SlackInteractionError("Interactive payload must be a JSON object.")
+
+    payload_type = payload.get("type")
+    if payload_type == "block_actions":
+        actions = payload.get("actions") or ()
+        if not actions:
+            raise SlackInteractionError("block_actions payload has no actions.")
+        action = actions[0]
+        action_id, run_id = action.get("action_id", ""), action.get("value") or ""
+        state = payload.get("state") or {}
+    elif payload_type == "view_submission":
+        view = payload.get("view") or {}
+        action_id, run_id = view.get("callback_id", ""), view.get("private_metadata") or ""
+        state = view.get("state") or {}
+    else:
+        raise SlackInteractionError(f"Unsupported interaction type '{payload_type}'.")
+
+    return SlackInteraction(
+        type=payload_type,
+        action_id=action_id,
+        run_id=run_id,
+        slack_user_id=(payload.get("user") or {}).get("id", ""),
+        response_url=payload.get("response_url"),
+        order_text=_find_order_text(state),
+    )
+
+
+def _find_order_text(state: Mapping[str, Any]) -> str | None:
+    for block in (state.get("values") or {}).values():
+        element = block.get(ORDER_TEXT_ACTION_ID)
+        if element is not None:
+            return element.get("value")
+    return None
+
+
+def _order_service(context: InteractionContext) -> AsyncOrderService:
+    return AsyncOrderService(
+        context.session,
+        clock=context.clock,
+        preference_cache=context.preference_cache,
+        identity_cache=context.identity_cache,
+    )
+
+
+async def _submit_order(context: InteractionContext, interaction: SlackInteraction) -> bytes:
+    if not (interaction.order_text or "").strip():
+        raise SlackInteractionError("Type your order in the box above, then press Place order.")
+    result = await _order_service(context).submit_order(
+        OrderSubmissionRequest(
+            run_id=interaction.run_id,
+            user_id=context.user_id,
+            order_text=interaction.order_text,
+        )
+    )
+    return SlackMessageBuilder.render_order_confirmation(result)
+
+
+async def _use_last_order(context: InteractionContext, interaction: SlackInteraction) -> bytes:
+    result = await _order_service(context).use_last_order(
+        run_id=interaction.run_id, user_id=context.user_id
+    )
+    return SlackMessageBuilder.render_order_confirmation(result.submission)
+
+
+async def _close_run(context: InteractionContext, interaction: SlackInteraction) -> bytes:
+    # Closing a run is rare and CloseRunService is synchronous, so it runs
+    # on the request's connection through run_sync.
+    def close(session: Session) -> CloseRunResult:
+        service = CloseRunService(
+            session=session,
+            fairness=FairnessService(session, clock=context.clock, index=context.fairness_index),
+            authorizer=context.authorizer,
+            clock=context.clock,
+            identity_cache=context.identity_cache,
+        )
+        return service.close_run(
+            CloseRunRequest(run_id=interaction.run_id, actor_user_id=context.user_id)
+        )
+
+    result = await context.session.run_sync(close)
+    return SlackMessageBuilder.render_run_summary(result)
+
+
+DEFAULT_HANDLERS: Mapping[str, InteractionHandler] = {
+    "order:new": _submit_order,
+    "order:reuse": _use_last_order,
+    "run:close": _close_run,
+}
+
+
+class InteractionDispatcher:
+    """Routes interactions to domain services through an ``action_id`` table.
+
+    Handlers are coroutines on the request's ``AsyncSession``; order actions
+    go through :class:`AsyncOrderService`, so the hot path never leaves the
+    event loop. Domain failures roll the transaction back and become
+    ephemeral replies.
+    """
+
+    def __init__(
+        self,
+        *,
+        handlers: Mapping[str, InteractionHandler] = DEFAULT_HANDLERS,
+        authorizer: CloseRunAuthorizer | None = None,
+        clock: Clock | None = None,
+        preference_cache: PreferenceCache | None = None,
+        identity_cache: IdentityCache | None = None,
+        fairness_index: FairnessIndex | None = None,
+    ) -> None:
+        self._handlers = dict(handlers)
+        self._authorizer = authorizer or InitiatorCloseRunAuthorizer()
+        self._clock = clock or (lambda: datetime.now(timezone.utc))
+        self._preference_cache = preference_cache
+        self._identity_cache = identity_cache
+        self._fairness_index = fairness_index
+
+    def supports(self, action_id: str) -> bool:
+        return action_id in self._handlers
+
+    async def dispatch(self, session: AsyncSession, interaction: SlackInteraction) -> bytes:
+        handler = self._handlers.get(interaction.action_id)
+        if handler is None:
+            raise SlackInteractionError(f"Unknown action '{interaction.action_id}'.")
+        try:
+            UUID(interaction.run_id)
+        except ValueError as exc:
+            raise SlackInteractionError("Interaction does not reference a valid run.") from exc
+
+        started = time.perf_counter()
+        status = "success"
+        try:
+            return await self._invoke(session, handler, interaction)
+        except (OrderError, RunCloseError, SlackInteractionError) as exc:
+            status = "rejected"
+            await session.rollback()
+            logger.info(
+                "Slack interaction rejected",
+                extra={"action_id": interaction.action_id, "run_id": interaction.run_id, "reason": str(exc)},
+            )
+            return SlackMessageBuilder.render_ephemeral(str(exc))
+        except Exception:
+            status = "error"
+            raise
+        finally:
+            SLACK_INTERACTION_SECONDS.labels(action_id=interaction.action_id, status=status).observe(
+                time.perf_counter() - started
+            )
+
+    async def _invoke(
+        self,
+        session: AsyncSession,
+        handler: InteractionHandler,
+        interaction: SlackInteraction,
+    ) -> bytes:
+        user = await AsyncUserRepository(session, identity_cache=self._identity_cache).get_by_slack_id(
+            interaction.slack_user_id
+        )
+        context = InteractionContext(
+            session=session,
+            user_id=str(user.id),
+            clock=self._clock,
+            authorizer=self._authorizer,
+            preference_cache=self._preference_cache,
+            identity_cache=self._identity_cache,
+            fairness_index=self._fairness_index,
+        )
+        return await handler(context, interaction)
+
+
+__all__ = [
+    "DEFAULT_HANDLERS",
+    "InitiatorCloseRunAuthorizer",
+    "InteractionContext",
+    "InteractionDispatcher",
+    "InteractionHandler",
+    "SlackInteraction",
+    "SlackInteractionError",
+    "decode_interaction",
+]
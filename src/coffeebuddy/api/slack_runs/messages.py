@@ -1,16 +1,45 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
 
-from coffeebuddy.models.run import Run
+from coffeebuddy.api.slack_runs.templates import BlockTemplate, spread_slot, slot
+from coffeebuddy.core.orders.models import OrderSubmissionResult
+from coffeebuddy.core.runs.models import CloseRunResult
+from coffeebuddy.infra.db.models import Run
 
+_PICKUP_FORMAT = "%Y-%m-%d %H:%M UTC"
 
-class SlackMessageBuilder:
-    """Constructs Slack block-kit payloads."""
+# Slack sends every input's value in ``state.values`` with a block action, so
+# "Place order" reads the typed text from here (see ``_find_order_text``).
+ORDER_TEXT_ACTION_ID = "order_text"
+_ORDER_INPUT = {
+    "type": "input",
+    "block_id": "order",
+    "optional": True,
+    "label": {"type": "plain_text", "text": "Your order"},
+    "element": {
+        "type": "plain_text_input",
+        "action_id": ORDER_TEXT_ACTION_ID,
+        "placeholder": {"type": "plain_text", "text": "e.g. Flat white, oat milk"},
+    },
+}
 
-    @staticmethod
-    def build_run_created(run: Run) -> dict:
-        blocks: list[dict] = [
+# Buttons carry the run id as ``value`` so /slack/interactions can route them.
+_RUN_ACTIONS = {
+    "type": "actions",
+    "elements": [
+        {"type": "button", "text": {"type": "plain_text", "text": "Place order"}, "action_id": "order:new", "value": slot("run_id")},
+        {"type": "button", "text": {"type": "plain_text", "text": "Use last order"}, "action_id": "order:reuse", "value": slot("run_id")},
+        {"type": "button", "text": {"type": "plain_text", "text": "Close run"}, "style": "danger", "action_id": "run:close", "value": slot("run_id")},
+    ],
+}
+
+_RUN_CREATED = BlockTemplate(
+    {
+        "response_type": "in_channel",
+        "text": "Coffee run is live.",
+        "blocks": [
             {
                 "type": "header",
                 "text": {"type": "plain_text", "text": "☕ Coffee run started!", "emoji": True},
@@ -18,49 +47,137 @@ class SlackMessageBuilder:
             {
                 "type": "section",
                 "fields": [
-                    {"type": "mrkdwn", "text": f"*Channel*\n<{run.channel_id}>"},
-                    {"type": "mrkdwn", "text": f"*Initiator*\n<@{run.initiator_user_id}>"},
+                    {"type": "mrkdwn", "text": f"*Channel*\n<{slot('channel_id')}>"},
+                    {"type": "mrkdwn", "text": f"*Initiator*\n<@{slot('initiator_user_id')}>"},
                 ],
             },
             {
                 "type": "context",
                 "elements": [
-                    {"type": "mrkdwn", "text": f"Run ID: `{run.id}`"},
-                    {"type": "mrkdwn", "text": f"Correlation: `{run.correlation_id}`"},
+                    {"type": "mrkdwn", "text": f"Run ID: `{slot('run_id')}`"},
+                    {"type": "mrkdwn", "text": f"Correlation: `{slot('correlation_id')}`"},
+                ],
+            },
+            spread_slot("optional_blocks"),
+            _ORDER_INPUT,
+            _RUN_ACTIONS,
+        ],
+    }
+)
+_PICKUP_TIME_BLOCK = BlockTemplate(
+    {"type": "section", "fields": [{"type": "mrkdwn", "text": f"*Pickup time*\n{slot('pickup_time')}"}]}
+)
+_PICKUP_NOTE_BLOCK = BlockTemplate(
+    {"type": "section", "text": {"type": "mrkdwn", "text": f"*Pickup note*\n{slot('pickup_note')}"}}
+)
+_ORDER_GROUPS_BLOCK = BlockTemplate(
+    {"type": "section", "text": {"type": "mrkdwn", "text": f"*To order*\n{slot('order_groups')}"}}
+)
+
+_ORDER_CONFIRMATION = BlockTemplate(
+    {
+        "response_type": "ephemeral",
+        "text": f"Order saved: {slot('order_text')}",
+        "blocks": [
+            {"type": "section", "text": {"type": "mrkdwn", "text": f"✅ Order saved: *{slot('order_text')}*"}},
+            {
+                "type": "context",
+                "elements": [
+                    {"type": "mrkdwn", "text": f"{slot('participant_count')} order(s) in this run · {slot('preference')}"},
                 ],
             },
-        ]
+        ],
+    }
+)
+
+_RUN_SUMMARY = BlockTemplate(
+    {
+        "response_type": "in_channel",
+        "text": "Coffee run closed.",
+        "blocks": [
+            {"type": "header", "text": {"type": "plain_text", "text": "☕ Coffee run closed", "emoji": True}},
+            {
+                "type": "section",
+                "fields": [
+                    {"type": "mrkdwn", "text": f"*Runner*\n<@{slot('runner_slack_user_id')}>"},
+                    {"type": "mrkdwn", "text": f"*Orders*\n{slot('total_orders')}"},
+                ],
+            },
+            spread_slot("optional_blocks"),
+            {"type": "section", "text": {"type": "mrkdwn", "text": slot("order_lines")}},
+            {"type": "context", "elements": [{"type": "mrkdwn", "text": slot("fairness_note")}]},
+        ],
+    }
+)
+
+_EPHEMERAL = BlockTemplate({"response_type": "ephemeral", "text": slot("text")})
+
+
+class SlackMessageBuilder:
+    """Renders Slack Block Kit payloads as pre-serialized JSON bytes."""
 
+    @staticmethod
+    def render_run_created(run: Run, *, slack_channel_id: str, slack_user_id: str) -> bytes:
+        """``run`` holds internal IDs; Slack mentions need the Slack ones."""
+        optional: list[bytes] = []
         if run.pickup_time:
-            pickup_display = run.pickup_time.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
-            blocks.append(
-                {
-                    "type": "section",
-                    "fields": [{"type": "mrkdwn", "text": f"*Pickup time*\n{pickup_display}"}],
-                }
+            optional.append(
+                _PICKUP_TIME_BLOCK.render(pickup_time=_format_pickup(run.pickup_time, run.pickup_timezone))
             )
-
         if run.pickup_note:
-            blocks.append(
-                {
-                    "type": "section",
-                    "text": {"type": "mrkdwn", "text": f"*Pickup note*\n{run.pickup_note}"},
-                }
-            )
+            optional.append(_PICKUP_NOTE_BLOCK.render(pickup_note=run.pickup_note))
+        return _RUN_CREATED.render(
+            channel_id=slack_channel_id,
+            initiator_user_id=slack_user_id,
+            run_id=str(run.id),
+            correlation_id=run.correlation_id,
+            optional_blocks=optional,
+        )
 
-        blocks.append(
-            {
-                "type": "actions",
-                "elements": [
-                    {"type": "button", "text": {"type": "plain_text", "text": "Place order"}, "action_id": "order:new"},
-                    {"type": "button", "text": {"type": "plain_text", "text": "Use last order"}, "action_id": "order:reuse"},
-                    {"type": "button", "text": {"type": "plain_text", "text": "Close run"}, "style": "danger", "action_id": "run:close"},
-                ],
-            }
+    @staticmethod
+    def render_order_confirmation(result: OrderSubmissionResult) -> bytes:
+        return _ORDER_CONFIRMATION.render(
+            order_text=result.order_text,
+            participant_count=result.participant_count,
+            preference="saved as your usual" if result.preference_updated else "usual order unchanged",
         )
 
-        return {
-            "response_type": "in_channel",
-            "text": "Coffee run is live.",
-            "blocks": blocks,
-        }
\ No newline at end of file
+    @staticmethod
+    def render_run_summary(result: CloseRunResult) -> bytes:
+        summary = result.summary
+        optional: list[bytes] = []
+        if summary.pickup_time:
+            optional.append(
+                _PICKUP_TIME_BLOCK.render(
+                    pickup_time=_format_pickup(summary.pickup_time, summary.pickup_timezone)
+                )
+            )
+        if summary.pickup_note:
+            optional.append(_PICKUP_NOTE_BLOCK.render(pickup_note=summary.pickup_note))
+        if summary.grouped_orders:
+            optional.append(
+                _ORDER_GROUPS_BLOCK.render(
+                    order_groups="\n".join(f"{group.quantity}x {group.order_text}" for group in summary.grouped_orders)
+                )
+            )
+        order_lines = "\n".join(
+            f"• <@{participant.slack_user_id}> — {participant.order_text}" for participant in summary.participants
+        )
+        return _RUN_SUMMARY.render(
+            runner_slack_user_id=summary.runner_slack_user_id,
+            total_orders=summary.total_orders,
+            optional_blocks=optional,
+            order_lines=order_lines or "_No orders were placed._",
+            fairness_note=result.fairness_note,
+        )
+
+    @staticmethod
+    def render_ephemeral(text: str) -> bytes:
+        return _EPHEMERAL.render(text=text)
+
+
+def _format_pickup(pickup_time: datetime, zone_name: str | None) -> str:
+    """Shows the pickup in the zone the initiator typed it in, UTC otherwise."""
+    if not zone_name:
+        return pickup_time.astimezone(timezone.utc).strftime(_PICKUP_FORMAT)
+    return f"{pickup_time.astimezone(ZoneInfo(zone_name)):%Y-%m-%d %H:%M} {zone_name}"
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from prometheus_client import Counter, Gauge, Histogram
+
+SLACK_DEFERRED_QUEUE_DEPTH = Gauge(
+    "coffeebuddy_slack_deferred_queue_depth",
+    "Slash commands acknowledged and waiting for a deferred worker.",
+)
+
+SLACK_DEFERRED_JOBS_TOTAL = Counter(
+    "coffeebuddy_slack_deferred_jobs_total",
+    "Deferred slash command jobs segmented by outcome.",
+    ("status",),
+)
+
+SLACK_DEFERRED_JOB_SECONDS = Histogram(
+    "coffeebuddy_slack_deferred_job_seconds",
+    "Time from acknowledgement to response_url delivery for deferred commands.",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf")),
+)
+
+SLACK_INTERACTION_SECONDS = Histogram(
+    "coffeebuddy_slack_interaction_seconds",
+    "Time spent dispatching Slack interactive actions, by action and outcome.",
+    ("action_id", "status"),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 3.0, float("inf")),
+)
+
+SLACK_IDEMPOTENCY_TOTAL = Counter(
+    "coffeebuddy_slack_idempotency_total",
+    "Slack requests seen by the idempotency guard, by outcome.",
+    ("outcome",),
+)
+
+SLACK_ADMITTED_TOTAL = Counter(
+    "coffeebuddy_slack_admitted_total",
+    "Slash commands admitted by per-channel and per-workspace rate limits.",
+)
+
+SLACK_SHED_TOTAL = Counter(
+    "coffeebuddy_slack_shed_total",
+    "Slash commands shed with a busy reply, by the limit that rejected them.",
+    ("scope",),
+)
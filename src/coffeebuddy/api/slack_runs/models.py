@@ -22,6 +22,9 @@ class SlackCommandPayload:
 class RunCommandOptions:
     pickup_time: datetime | None = None
     pickup_note: str | None = None
+    excluded_runner_ids: tuple[str, ...] = ()
+    max_participants: int | None = None
+    timezone: str | None = None
     errors: list[str] | None = None
 
     def has_errors(self) -> bool:
@@ -1,53 +1,172 @@
 from __future__ import annotations
 
-import shlex
+import re
+from collections.abc import Callable
+from dataclasses import dataclass, field
 from datetime import datetime, time, timezone
-from typing import Iterable
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from coffeebuddy.api.slack_runs.models import RunCommandOptions
 
+PARSE_CACHE_SIZE = 1024
+MAX_NOTE_LENGTH = 120
+# Well inside runs.max_participants (INTEGER), so no cap reaches the database.
+MAX_PARTICIPANTS = 1000
 
-def parse_command_text(text: str) -> RunCommandOptions:
-    options = RunCommandOptions(errors=[])
-    normalized = text.strip()
-    if not normalized:
-        return options
+# One ``key=value`` pair (value bare, single- or double-quoted) or a free word.
+# Both must end at whitespace so ``note="a"b`` is rejected instead of guessed at.
+_TOKEN_RE = re.compile(
+    r"""
+    \s*
+    (?:
+        (?P<key>[^\s="']+)=(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<bare>[^\s"']*))
+      | "[^"]*" | '[^']*' | [^\s="']+
+    )
+    (?=\s|$)
+    """,
+    re.VERBOSE,
+)
+_CLOCK_RE = re.compile(r"(?P<hour>[01]\d|2[0-3]):(?P<minute>[0-5]\d)")
+_USER_REF_RE = re.compile(r"<?@?(?P<user_id>[UW][A-Z0-9]{2,})(?:\|[^>]*)?>?")
 
-    tokens = shlex.split(normalized)
-    for token in tokens:
-        if "=" not in token:
+
+@dataclass(frozen=True, slots=True)
+class _ParsedCommand:
+    """Date-independent parse result; safe to share between calls."""
+
+    pickup_clock: time | None = None
+    pickup_at: datetime | None = None
+    pickup_note: str | None = None
+    excluded_runner_ids: tuple[str, ...] = ()
+    max_participants: int | None = None
+    timezone: str | None = None
+    errors: tuple[str, ...] = ()
+
+
+@dataclass(slots=True)
+class _ParseState:
+    values: dict[str, object] = field(default_factory=dict)
+    errors: list[str] = field(default_factory=list)
+
+
+def parse_command_text(text: str, *, now: datetime | None = None) -> RunCommandOptions:
+    """Parses ``/coffee`` arguments into ``RunCommandOptions``.
+
+    Tokenizing and validation are memoized per command text; ``HH:MM``
+    pickup times are resolved against ``now`` on every call, so cached
+    entries never go stale across midnight.
+    """
+    parsed = _parse_cached(text.strip())
+    zone = ZoneInfo(parsed.timezone) if parsed.timezone else timezone.utc
+    pickup_time = parsed.pickup_at
+    if parsed.pickup_clock is not None:
+        today = (now or datetime.now(timezone.utc)).astimezone(zone).date()
+        pickup_time = datetime.combine(today, parsed.pickup_clock, tzinfo=zone)
+    elif pickup_time is not None and pickup_time.tzinfo is None:
+        pickup_time = pickup_time.replace(tzinfo=zone)
+
+    return RunCommandOptions(
+        pickup_time=pickup_time,
+        pickup_note=parsed.pickup_note,
+        excluded_runner_ids=parsed.excluded_runner_ids,
+        max_participants=parsed.max_participants,
+        timezone=parsed.timezone,
+        errors=list(parsed.errors) or None,
+    )
+
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_cached(text: str) -> _ParsedCommand:
+    state = _ParseState()
+    position, length = 0, len(text)
+    while position < length:
+        match = _TOKEN_RE.match(text, position)
+        if match is None:
+            state.errors.append("Could not parse command text; check for unbalanced quotes.")
+            break
+        position = match.end()
+        key = match.group("key")
+        if key is None:
             continue
-        key, value = token.split("=", 1)
-        key = key.lower()
-        value = value.strip()
-
-        if key in {"pickup", "pickup_time"}:
-            _apply_pickup_time(value, options)
-        elif key in {"note", "pickup_note"}:
-            if len(value) > 120:
-                options.errors.append("Pickup note must be <= 120 characters.")
-            else:
-                options.pickup_note = value
+        value = match.group("dq")
+        if value is None:
+            value = match.group("sq")
+        if value is None:
+            value = match.group("bare")
+        handler = _HANDLERS.get(key.lower())
+        if handler is None:
+            state.errors.append(f"Unknown parameter '{key.lower()}'.")
         else:
-            options.errors.append(f"Unknown parameter '{key}'.")
+            handler(value.strip(), state)
 
-    if not options.errors:
-        options.errors = None
-    return options
+    return _ParsedCommand(
+        **state.values,  # type: ignore[arg-type]
+        errors=tuple(state.errors),
+    )
 
 
-def _apply_pickup_time(value: str, options: RunCommandOptions) -> None:
+def _apply_pickup_time(value: str, state: _ParseState) -> None:
+    clock = _CLOCK_RE.fullmatch(value)
+    if clock is not None:
+        state.values["pickup_clock"] = time(int(clock["hour"]), int(clock["minute"]))
+        state.values.pop("pickup_at", None)
+        return
     try:
-        options.pickup_time = _parse_pickup_time(value)
+        state.values["pickup_at"] = datetime.fromisoformat(value)
+        state.values.pop("pickup_clock", None)
     except ValueError:
-        options.errors.append("pickup_time must be ISO-8601 date-time or HH:MM (24h).")
+        state.errors.append("pickup_time must be ISO-8601 date-time or HH:MM (24h).")
+
+
+def _apply_pickup_note(value: str, state: _ParseState) -> None:
+    if len(value) > MAX_NOTE_LENGTH:
+        state.errors.append(f"Pickup note must be <= {MAX_NOTE_LENGTH} characters.")
+    else:
+        state.values["pickup_note"] = value
+
+
+def _apply_excluded_runners(value: str, state: _ParseState) -> None:
+    user_ids: list[str] = []
+    for reference in filter(None, value.split(",")):
+        match = _USER_REF_RE.fullmatch(reference.strip())
+        if match is None:
+            state.errors.append("exclude must be a comma-separated list of Slack users.")
+            return
+        if match["user_id"] not in user_ids:
+            user_ids.append(match["user_id"])
+    state.values["excluded_runner_ids"] = tuple(user_ids)
 
 
-def _parse_pickup_time(value: str) -> datetime:
-    if len(value) == 5 and value[2] == ":":
-        hour, minute = map(int, value.split(":"))
-        today = datetime.now(timezone.utc).date()
-        return datetime.combine(today, time(hour=hour, minute=minute, tzinfo=timezone.utc))
+def _apply_max_participants(value: str, state: _ParseState) -> None:
+    digits = value.lstrip("0")
+    if not (value.isascii() and value.isdigit()) or not digits:
+        state.errors.append("max_participants must be a positive whole number.")
+    # Length first: int() refuses very long digit strings outright.
+    elif len(digits) > len(str(MAX_PARTICIPANTS)) or int(digits) > MAX_PARTICIPANTS:
+        state.errors.append(f"max_participants must be <= {MAX_PARTICIPANTS}.")
+    else:
+        state.values["max_participants"] = int(digits)
+
+
+def _apply_timezone(value: str, state: _ParseState) -> None:
+    try:
+        ZoneInfo(value)
+    except (ZoneInfoNotFoundError, ValueError):
+        state.errors.append(f"Unknown time zone '{value}'.")
+    else:
+        state.values["timezone"] = value
+
 
-    parsed = datetime.fromisoformat(value)
-    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
\ No newline at end of file
+_HANDLERS: dict[str, Callable[[str, _ParseState], None]] = {
+    "pickup": _apply_pickup_time,
+    "pickup_time": _apply_pickup_time,
+    "note": _apply_pickup_note,
+    "pickup_note": _apply_pickup_note,
+    "exclude": _apply_excluded_runners,
+    "exclude_runners": _apply_excluded_runners,
+    "max": _apply_max_participants,
+    "max_participants": _apply_max_participants,
+    "tz": _apply_timezone,
+    "timezone": _apply_timezone,
+}
@@ -1,21 +1,52 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, Request
-from starlette.responses import JSONResponse
+import logging
 
-from coffeebuddy.api.slack_runs.models import SlackCommandPayload
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
+from starlette.responses import Response
+
+from coffeebuddy.api.slack_runs.admission import SlackAdmissionController
+from coffeebuddy.api.slack_runs.deferred import (
+    DeferredCommandQueue,
+    DeferredQueueFullError,
+    ResponseUrlSender,
+)
+from coffeebuddy.api.slack_runs.forms import (
+    SlackFormError,
+    SlackPayloadTooLargeError,
+    decode_command_form,
+)
+from coffeebuddy.api.slack_runs.idempotency import SlackIdempotencyGuard, idempotency_key
+from coffeebuddy.api.slack_runs.interactions import (
+    InteractionDispatcher,
+    SlackInteractionError,
+    decode_interaction,
+)
+from coffeebuddy.api.slack_runs.messages import SlackMessageBuilder
 from coffeebuddy.api.slack_runs.parsers import parse_command_text
+from coffeebuddy.api.slack_runs.responses import SlackJSONResponse
 from coffeebuddy.api.slack_runs.service import SlackRunCommandService
 from coffeebuddy.api.slack_runs.signature import SlackSignatureVerifier, SlackVerificationError
 from coffeebuddy.api.slack_runs.dependencies import (
+    get_admission_controller,
+    get_command_queue,
+    get_idempotency_guard,
+    get_interaction_dispatcher,
+    get_response_sender,
     get_run_event_publisher,
     get_session,
     get_settings,
+    get_signature_verifier,
 )
 from coffeebuddy.events.run import RunEventPublisher
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(tags=["slack"])
 
+BUSY_MESSAGE = "CoffeeBuddy is busy right now, please try again in a moment."
+_BUSY_REPLY = SlackMessageBuilder.render_ephemeral(BUSY_MESSAGE)
+
 
 @router.post("/slack/commands")
 async def handle_slack_command(
@@ -23,53 +54,132 @@ async def handle_slack_command(
     session=Depends(get_session),
     publisher: RunEventPublisher = Depends(get_run_event_publisher),
     settings=Depends(get_settings),
+    verifier: SlackSignatureVerifier = Depends(get_signature_verifier),
+    command_queue: DeferredCommandQueue | None = Depends(get_command_queue),
+    guard: SlackIdempotencyGuard = Depends(get_idempotency_guard),
+    admission: SlackAdmissionController | None = Depends(get_admission_controller),
 ):
-    body = await request.body()
+    max_bytes = settings.slack_max_body_bytes
+    body = await _read_verified_body(request, verifier, max_bytes=max_bytes)
 
-    verifier = SlackSignatureVerifier(
-        signing_secret=settings.slack_signing_secret,
-        tolerance_seconds=settings.slack_timestamp_tolerance_seconds,
-    )
     try:
-        verifier.verify(
-            timestamp=request.headers.get("X-Slack-Request-Timestamp"),
-            signature=request.headers.get("X-Slack-Signature"),
-            body=body,
-        )
-    except SlackVerificationError as exc:
-        raise HTTPException(status_code=401, detail=str(exc)) from exc
+        command = decode_command_form(body, max_bytes=max_bytes)
+    except SlackPayloadTooLargeError as exc:
+        raise HTTPException(status_code=413, detail=str(exc)) from exc
+    except SlackFormError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
 
-    payload = _parse_form_payload(body)
-
-    command = SlackCommandPayload(
-        token=payload.get("token", ""),
-        team_id=payload.get("team_id", ""),
-        channel_id=payload.get("channel_id", ""),
-        channel_name=payload.get("channel_name", ""),
-        user_id=payload.get("user_id", ""),
-        user_name=payload.get("user_name", ""),
-        text=payload.get("text", ""),
-        trigger_id=payload.get("trigger_id", ""),
-        response_url=payload.get("response_url", ""),
-    )
+    # A retry of a handled command gets its recorded reply without spending a
+    # token, so it can never be answered "busy".
+    key = idempotency_key("command", body)
+    recorded = await guard.recorded(key)
+    if recorded is not None:
+        return _reply(recorded)
+    if admission is not None and not admission.admit(team_id=command.team_id, channel_id=command.channel_id):
+        return SlackJSONResponse(content=_BUSY_REPLY)
 
     options = parse_command_text(command.text)
     if options.has_errors():
-        return JSONResponse(
-            content={
-                "response_type": "ephemeral",
-                "text": "\n".join(options.errors or []),
-            }
+        return SlackJSONResponse(
+            content=SlackMessageBuilder.render_ephemeral("\n".join(options.errors or []))
         )
 
-    service = SlackRunCommandService(session=session, event_publisher=publisher)
-    response = service.handle(command=command, options=options)
+    executed = False
 
-    return JSONResponse(content=response)
+    async def execute() -> bytes:
+        nonlocal executed
+        executed = True
+        if command_queue is not None:
+            command_queue.submit(command, options)
+            return b""
+        service = SlackRunCommandService(session=session, event_publisher=publisher)
+        reply = await service.handle(command=command, options=options)
+        # Commit before the reply is recorded so a retry never sees an unsaved run.
+        await session.commit()
+        return reply
 
+    try:
+        response = await guard.run(key, execute, checked=True)
+    except DeferredQueueFullError:
+        return SlackJSONResponse(content=_BUSY_REPLY)
+    finally:
+        if admission is not None and not executed:
+            # The original is still in flight; this duplicate did no work.
+            admission.refund(team_id=command.team_id, channel_id=command.channel_id)
+    return _reply(response)
 
-def _parse_form_payload(body: bytes) -> dict[str, str]:
-    from urllib.parse import parse_qs
 
-    parsed = parse_qs(body.decode())
-    return {key: values[0] for key, values in parsed.items()}
\ No newline at end of file
+@router.post("/slack/interactions")
+async def handle_slack_interaction(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    session=Depends(get_session),
+    settings=Depends(get_settings),
+    verifier: SlackSignatureVerifier = Depends(get_signature_verifier),
+    dispatcher: InteractionDispatcher = Depends(get_interaction_dispatcher),
+    sender: ResponseUrlSender | None = Depends(get_response_sender),
+    guard: SlackIdempotencyGuard = Depends(get_idempotency_guard),
+):
+    max_bytes = settings.slack_max_body_bytes
+    body = await _read_verified_body(request, verifier, max_bytes=max_bytes)
+
+    try:
+        interaction = decode_interaction(body, max_bytes=max_bytes)
+    except SlackPayloadTooLargeError as exc:
+        raise HTTPException(status_code=413, detail=str(exc)) from exc
+    except (SlackFormError, SlackInteractionError) as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    if not dispatcher.supports(interaction.action_id):
+        # Acknowledge actions we do not own (e.g. input elements) without a reply.
+        return Response(status_code=200)
+
+    async def execute() -> bytes:
+        reply = await dispatcher.dispatch(session, interaction)
+        await session.commit()
+        # Slack ignores the HTTP body of block_actions; the reply goes to response_url.
+        if interaction.type == "block_actions" and interaction.response_url and sender is not None:
+            background_tasks.add_task(_send_follow_up, sender, interaction.response_url, reply)
+        return reply
+
+    try:
+        response = await guard.run(idempotency_key("interaction", body), execute)
+    except SlackInteractionError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return _reply(response)
+
+
+def _reply(response: bytes | None) -> Response:
+    """Empty bodies (deferred acks, in-flight duplicates) become a bare 200."""
+    if not response:
+        return Response(status_code=200)
+    return SlackJSONResponse(content=response)
+
+
+async def _read_verified_body(
+    request: Request, verifier: SlackSignatureVerifier, *, max_bytes: int
+) -> bytes:
+    declared_length = request.headers.get("content-length")
+    if declared_length and declared_length.isdigit() and int(declared_length) > max_bytes:
+        raise HTTPException(status_code=413, detail="Slack payload too large.")
+    body = await request.body()
+
+    try:
+        verifier.verify(
+            timestamp=request.headers.get("X-Slack-Request-Timestamp"),
+            signature=request.headers.get("X-Slack-Signature"),
+            body=body,
+        )
+    except SlackVerificationError as exc:
+        # Includes SlackReplayError. Genuine Slack retries are re-signed with a
+        # fresh timestamp, so they pass here and the idempotency guard answers
+        # them; the unsigned X-Slack-Retry-Num header is never trusted.
+        raise HTTPException(status_code=401, detail=str(exc)) from exc
+    return body
+
+
+async def _send_follow_up(sender: ResponseUrlSender, response_url: str, body: bytes) -> None:
+    try:
+        await sender.send(response_url, body)
+    except Exception:
+        logger.exception("Failed to deliver Slack interaction reply to response_url")
@@ -1,24 +1,33 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from typing import Callable
-from uuid import uuid4
+from typing import Any, Callable
+from uuid import UUID, uuid4
 
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from coffeebuddy.api.slack_runs.messages import SlackMessageBuilder
 from coffeebuddy.api.slack_runs.models import RunCommandOptions, SlackCommandPayload
 from coffeebuddy.events.run import RunCreatedEvent, RunEventPublisher
-from coffeebuddy.models.run import Run
+from coffeebuddy.infra.db.models import Channel, Run, RunStatus, User
+
+CHANNEL_DISABLED_MESSAGE = "CoffeeBuddy is disabled in this channel."
 
 
 class SlackRunCommandService:
-    """Coordinates slash command handling, persistence, and event emission."""
+    """Coordinates slash command handling, persistence, and event emission.
+
+    Slack channel and user IDs are resolved to ``channels.id``/``users.id``;
+    both rows are registered on first sight so a new channel works without
+    an admin step.
+    """
 
     def __init__(
         self,
         *,
-        session: Session,
+        session: AsyncSession,
         event_publisher: RunEventPublisher,
         clock: Callable[[], datetime] | None = None,
     ) -> None:
@@ -26,33 +35,90 @@ class SlackRunCommandService:
         self._event_publisher = event_publisher
         self._clock = clock or (lambda: datetime.now(timezone.utc))
 
-    def handle(self, command: SlackCommandPayload, options: RunCommandOptions) -> dict:
+    async def handle(self, command: SlackCommandPayload, options: RunCommandOptions) -> bytes:
+        """Creates the run, emits ``run_created`` and returns the rendered Slack reply."""
         now = self._clock()
+        channel_id, enabled = await self._resolve_channel(command, now)
+        if not enabled:
+            return SlackMessageBuilder.render_ephemeral(CHANNEL_DISABLED_MESSAGE)
+        initiator_id = await self._resolve_user(command, now)
 
         run = Run(
-            id=str(uuid4()),
-            channel_id=command.channel_id,
-            initiator_user_id=command.user_id,
-            status="open",
+            id=uuid4(),
+            channel_id=channel_id,
+            initiator_user_id=initiator_id,
+            status=RunStatus.OPEN.value,
             pickup_time=options.pickup_time,
             pickup_note=options.pickup_note,
-            correlation_id=str(uuid4()),
+            pickup_timezone=options.timezone,
+            max_participants=options.max_participants,
+            excluded_runner_slack_ids=list(options.excluded_runner_ids),
+            correlation_id=uuid4().hex,
             started_at=now,
             created_at=now,
             updated_at=now,
         )
         self._session.add(run)
-        self._session.flush()
+        await self._session.flush()
 
         event = RunCreatedEvent(
-            run_id=run.id,
-            channel_id=run.channel_id,
-            initiator_user_id=run.initiator_user_id,
+            run_id=str(run.id),
+            channel_id=str(run.channel_id),
+            initiator_user_id=str(run.initiator_user_id),
             pickup_time=run.pickup_time.isoformat() if run.pickup_time else None,
             pickup_note=run.pickup_note,
             correlation_id=run.correlation_id,
             created_at=run.started_at.isoformat(),
         )
-        self._event_publisher.publish_run_created(event)
+        await self._event_publisher.publish_run_created(event)
+
+        return SlackMessageBuilder.render_run_created(
+            run, slack_channel_id=command.channel_id, slack_user_id=command.user_id
+        )
+
+    async def _resolve_channel(self, command: SlackCommandPayload, now: datetime) -> tuple[UUID, bool]:
+        row = (
+            await self._session.execute(
+                select(Channel.id, Channel.enabled).where(Channel.slack_channel_id == command.channel_id)
+            )
+        ).first()
+        if row is None:
+            await self._register(
+                Channel,
+                Channel.slack_channel_id,
+                slack_channel_id=command.channel_id,
+                name=command.channel_name or command.channel_id,
+                created_at=now,
+                updated_at=now,
+            )
+            row = (
+                await self._session.execute(
+                    select(Channel.id, Channel.enabled).where(Channel.slack_channel_id == command.channel_id)
+                )
+            ).one()
+        return row[0], bool(row[1])
+
+    async def _resolve_user(self, command: SlackCommandPayload, now: datetime) -> UUID:
+        lookup = select(User.id).where(User.slack_user_id == command.user_id)
+        user_id = await self._session.scalar(lookup)
+        if user_id is None:
+            await self._register(
+                User,
+                User.slack_user_id,
+                slack_user_id=command.user_id,
+                display_name=command.user_name or command.user_id,
+                created_at=now,
+                updated_at=now,
+            )
+            user_id = await self._session.scalar(lookup)
+        return user_id
 
-        return SlackMessageBuilder.build_run_created(run)
\ No newline at end of file
+    async def _register(self, model: type, slack_column: Any, **values: Any) -> None:
+        """Inserts a row for a Slack ID unless a concurrent command already did."""
+        values = {"id": uuid4(), **values}
+        dialect = self._session.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            statement = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(model).values(**values)
+            await self._session.execute(statement.on_conflict_do_nothing(index_elements=[slack_column]))
+        else:
+            await self._session.execute(insert(model).values(**values))
@@ -3,29 +3,114 @@ from __future__ import annotations
 import hashlib
 import hmac
 import time
+from collections import OrderedDict
+from collections.abc import Callable
+
+_VERSION_PREFIX = b"v0:"
+_SEPARATOR = b":"
 
 
 class SlackVerificationError(Exception):
     """Raised when Slack signature validation fails."""
 
 
+class SlackReplayError(SlackVerificationError):
+    """Raised when a validly signed request has already been accepted."""
+
+
+class _ReplayCache:
+    """Bounded set of recently accepted ``(timestamp, signature)`` pairs.
+
+    Entries expire once their timestamp falls out of the tolerance window
+    (after that the request is rejected as stale anyway). When the cache is
+    full the oldest entry is dropped.
+    """
+
+    __slots__ = ("_entries", "_max_entries")
+
+    def __init__(self, max_entries: int) -> None:
+        self._entries: OrderedDict[tuple[str, str], float] = OrderedDict()
+        self._max_entries = max_entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def check_and_add(self, key: tuple[str, str], *, expires_at: float, now: float) -> bool:
+        """Returns False if ``key`` was already seen, otherwise records it."""
+        self._evict_expired(now)
+        if key in self._entries:
+            return False
+        self._entries[key] = expires_at
+        if len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+        return True
+
+    def _evict_expired(self, now: float) -> None:
+        entries = self._entries
+        while entries:
+            key, expires_at = next(iter(entries.items()))
+            if expires_at >= now:
+                return
+            del entries[key]
+
+
 class SlackSignatureVerifier:
-    def __init__(self, *, signing_secret: str, tolerance_seconds: int = 300) -> None:
+    """Validates Slack request signatures; meant to live for the whole app.
+
+    The HMAC key schedule is computed once and copied per request, and the
+    body is fed to the digest as-is, so ``bytes`` and ``memoryview`` bodies
+    are hashed without being copied. Accepted signatures are remembered for
+    the tolerance window so a replayed request is rejected.
+    """
+
+    def __init__(
+        self,
+        *,
+        signing_secret: str,
+        tolerance_seconds: int = 300,
+        replay_cache_size: int = 10_000,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
         self._secret = signing_secret.encode()
         self._tolerance = tolerance_seconds
+        self._clock = clock
+        self._base_mac = hmac.new(self._secret, digestmod=hashlib.sha256)
+        self._replay_cache = _ReplayCache(replay_cache_size)
 
-    def verify(self, *, timestamp: str | None, signature: str | None, body: bytes) -> None:
+    def verify(
+        self,
+        *,
+        timestamp: str | None,
+        signature: str | None,
+        body: bytes | memoryview,
+    ) -> None:
         if not timestamp or not signature:
             raise SlackVerificationError("Missing Slack signature headers.")
 
-        if abs(time.time() - int(timestamp)) > self._tolerance:
+        try:
+            issued_at = int(timestamp)
+        except ValueError as exc:
+            raise SlackVerificationError("Invalid Slack request timestamp.") from exc
+
+        now = self._clock()
+        if abs(now - issued_at) > self._tolerance:
             raise SlackVerificationError("Stale Slack request timestamp.")
 
         expected_signature = self._compute_signature(timestamp, body)
         if not hmac.compare_digest(expected_signature, signature):
             raise SlackVerificationError("Slack signature mismatch.")
 
-    def _compute_signature(self, timestamp: str, body: bytes) -> str:
-        basestring = f"v0:{timestamp}:{body.decode()}".encode()
-        digest = hmac.new(self._secret, basestring, hashlib.sha256).hexdigest()
-        return f"v0={digest}"
\ No newline at end of file
+        if not self._replay_cache.check_and_add(
+            (timestamp, signature),
+            expires_at=issued_at + self._tolerance,
+            now=now,
+        ):
+            raise SlackReplayError("Replayed Slack request.")
+
+    def _compute_signature(self, timestamp: str, body: bytes | memoryview) -> str:
+        mac = self._base_mac.copy()
+        mac.update(_VERSION_PREFIX)
+        mac.update(timestamp.encode())
+        mac.update(_SEPARATOR)
+        mac.update(body)
+        return f"v0={mac.hexdigest()}"
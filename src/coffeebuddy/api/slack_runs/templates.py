@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import re
+from typing import Any
+
+import orjson
+
+# orjson escapes control characters, so markers show up as ``\u0000name\u0000``
+# (text slot, inside a string) or ``,"\u0001name\u0001"`` (spread slot, an array item).
+_SLOT_RE = re.compile(
+    rb',"\\u0001(?P<spread>[A-Za-z_][A-Za-z0-9_]*)\\u0001"'
+    rb"|\\u0000(?P<text>[A-Za-z_][A-Za-z0-9_]*)\\u0000"
+)
+
+
+def slot(name: str) -> str:
+    """Placeholder for a text value spliced into a template string."""
+    return f"\x00{name}\x00"
+
+
+def spread_slot(name: str) -> str:
+    """Placeholder for zero or more pre-rendered items inside an array.
+
+    It must not be the first item of its array.
+    """
+    return f"\x01{name}\x01"
+
+
+class BlockTemplate:
+    """JSON document serialized once, with named slots spliced in per render.
+
+    Text slots are JSON-escaped on render; spread slots take a sequence of
+    already-rendered JSON items. Static segments are never rebuilt or
+    re-encoded.
+    """
+
+    __slots__ = ("_segments", "_slots")
+
+    def __init__(self, document: Any) -> None:
+        encoded = orjson.dumps(document)
+        segments: list[bytes] = []
+        slots: list[tuple[str, bool]] = []
+        position = 0
+        for match in _SLOT_RE.finditer(encoded):
+            segments.append(encoded[position : match.start()])
+            spread_name = match.group("spread")
+            if spread_name is not None:
+                slots.append((spread_name.decode(), True))
+            else:
+                slots.append((match.group("text").decode(), False))
+            position = match.end()
+        segments.append(encoded[position:])
+        self._segments: tuple[bytes, ...] = tuple(segments)
+        self._slots: tuple[tuple[str, bool], ...] = tuple(slots)
+
+    @property
+    def slots(self) -> frozenset[str]:
+        return frozenset(name for name, _ in self._slots)
+
+    def render(self, **values: Any) -> bytes:
+        segments = self._segments
+        chunks = [segments[0]]
+        for index, (name, spread) in enumerate(self._slots, start=1):
+            value = values[name]
+            if spread:
+                for item in value:
+                    chunks.append(b",")
+                    chunks.append(item)
+            else:
+                chunks.append(escape(value))
+            chunks.append(segments[index])
+        return b"".join(chunks)
+
+
+def escape(value: Any) -> bytes:
+    """JSON-escapes ``value`` for use inside an already-quoted string."""
+    return orjson.dumps(str(value))[1:-1]
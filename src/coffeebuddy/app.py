@@ -1,15 +1,37 @@
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
+from dataclasses import replace
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 
 from coffeebuddy.api.slack_runs import router as slack_router
+from coffeebuddy.api.slack_runs.admission import SlackAdmissionController, TokenBucketLimiter
+from coffeebuddy.api.slack_runs.deferred import DeferredCommandQueue, HttpxResponseUrlSender
 from coffeebuddy.api.slack_runs.dependencies import (
     configure_dependencies,
     get_router_with_dependencies,
 )
+from coffeebuddy.api.slack_runs.idempotency import (
+    IdempotencyStore,
+    InMemoryIdempotencyStore,
+    SlackIdempotencyGuard,
+    SqlIdempotencyStore,
+)
+from coffeebuddy.api.slack_runs.interactions import InteractionDispatcher
 from coffeebuddy.config import Settings, get_settings
-from coffeebuddy.infra.db import build_session_factory
-from coffeebuddy.infra.kafka import KafkaRunEventPublisher
+from coffeebuddy.infra.db import DatabaseConfig, IdentityCache, create_async_session_factory
+from coffeebuddy.infra.kafka import (
+    RUN_EVENTS_TOPIC,
+    KafkaEventProducer,
+    KafkaRunEventPublisher,
+    KafkaSettings,
+    OutboxRelay,
+    OutboxRunEventPublisher,
+)
+from coffeebuddy.services.fairness.index import FairnessIndex
+from coffeebuddy.services.preferences import PreferenceCache
 
 
 def create_app(
@@ -17,22 +39,123 @@ def create_app(
     settings: Settings | None = None,
     session_factory=None,
     event_publisher=None,
+    response_sender=None,
 ) -> FastAPI:
     app_settings = settings or get_settings()
 
-    session_factory = session_factory or build_session_factory(app_settings.database_url)
-    event_publisher = event_publisher or KafkaRunEventPublisher(
-        bootstrap_servers=app_settings.kafka_bootstrap_servers,
-        topic=app_settings.run_events_topic,
+    session_factory = session_factory or create_async_session_factory(
+        DatabaseConfig(url=app_settings.database_url)
+    )
+    run_topic = replace(RUN_EVENTS_TOPIC, name=app_settings.run_events_topic)
+    kafka_settings = KafkaSettings(bootstrap_servers=app_settings.kafka_bootstrap_servers)
+    owned_publisher: KafkaRunEventPublisher | None = None
+    outbox_relay: OutboxRelay | None = None
+    if app_settings.run_events_outbox:
+        # Events are staged in the command's transaction; the relay ships them.
+        event_publisher_factory = lambda session: OutboxRunEventPublisher(  # noqa: E731
+            session, topic=run_topic
+        )
+        outbox_relay = OutboxRelay(
+            session_factory=session_factory,
+            producer=KafkaEventProducer(kafka_settings),
+            topics=[run_topic],
+            batch_size=app_settings.outbox_relay_batch_size,
+            poll_interval_seconds=app_settings.outbox_relay_poll_interval_seconds,
+            max_attempts=app_settings.outbox_relay_max_attempts,
+            backoff_base_seconds=app_settings.outbox_relay_backoff_base_seconds,
+            backoff_max_seconds=app_settings.outbox_relay_backoff_max_seconds,
+        )
+    else:
+        if event_publisher is None:
+            owned_publisher = KafkaRunEventPublisher(
+                KafkaEventProducer(kafka_settings), topic=run_topic
+            )
+            event_publisher = owned_publisher
+        event_publisher_factory = lambda _session: event_publisher  # noqa: E731
+
+    owned_sender: HttpxResponseUrlSender | None = None
+    if response_sender is None:
+        owned_sender = HttpxResponseUrlSender()
+        response_sender = owned_sender
+
+    command_queue: DeferredCommandQueue | None = None
+    if app_settings.slack_deferred_ack:
+        command_queue = DeferredCommandQueue(
+            session_factory=session_factory,
+            event_publisher_factory=event_publisher_factory,
+            sender=response_sender,
+            max_pending=app_settings.slack_deferred_max_pending,
+            concurrency=app_settings.slack_deferred_concurrency,
+        )
+
+    admission_controller: SlackAdmissionController | None = None
+    if app_settings.slack_admission_enabled:
+        admission_controller = SlackAdmissionController(
+            channel=TokenBucketLimiter(
+                rate_per_second=app_settings.slack_admission_channel_rate_per_second,
+                burst=app_settings.slack_admission_channel_burst,
+            ),
+            workspace=TokenBucketLimiter(
+                rate_per_second=app_settings.slack_admission_workspace_rate_per_second,
+                burst=app_settings.slack_admission_workspace_burst,
+            ),
+        )
+
+    preference_cache: PreferenceCache | None = None
+    if app_settings.preference_cache_enabled:
+        preference_cache = PreferenceCache(
+            max_entries=app_settings.preference_cache_size,
+            ttl_seconds=app_settings.preference_cache_ttl_seconds,
+        )
+
+    identity_cache = IdentityCache(
+        max_entries=app_settings.identity_cache_size,
+        ttl_seconds=app_settings.identity_cache_ttl_seconds,
+        negative_ttl_seconds=app_settings.identity_cache_negative_ttl_seconds,
     )
+    fairness_index = FairnessIndex(ttl_seconds=app_settings.fairness_index_ttl_seconds)
 
     configure_dependencies(
         settings=app_settings,
+        interaction_dispatcher=InteractionDispatcher(
+            preference_cache=preference_cache,
+            identity_cache=identity_cache,
+            fairness_index=fairness_index,
+        ),
+        admission_controller=admission_controller,
+        idempotency_guard=SlackIdempotencyGuard(_build_idempotency_store(app_settings, session_factory)),
         session_factory=session_factory,
-        event_publisher=event_publisher,
+        event_publisher_factory=event_publisher_factory,
+        command_queue=command_queue,
+        response_sender=response_sender,
     )
 
-    app = FastAPI(title="CoffeeBuddy")
+    @asynccontextmanager
+    async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+        if owned_publisher is not None:
+            await owned_publisher.start()
+        if outbox_relay is not None:
+            await outbox_relay.start()
+        if command_queue is not None:
+            await command_queue.start()
+        try:
+            yield
+        finally:
+            if command_queue is not None:
+                await command_queue.stop()
+            if owned_sender is not None:
+                await owned_sender.aclose()
+            if outbox_relay is not None:
+                await outbox_relay.stop()
+            if owned_publisher is not None:
+                await owned_publisher.stop()
+
+    app = FastAPI(title="CoffeeBuddy", lifespan=lifespan)
+    app.state.command_queue = command_queue
+    app.state.outbox_relay = outbox_relay
+    app.state.preference_cache = preference_cache
+    app.state.identity_cache = identity_cache
+    app.state.fairness_index = fairness_index
     app.include_router(
         get_router_with_dependencies(slack_router.router),
         prefix="",
@@ -40,7 +163,16 @@ def create_app(
     return app
 
 
-app = create_app()
+def _build_idempotency_store(settings: Settings, session_factory) -> IdempotencyStore:
+    if settings.slack_idempotency_store == "postgres":
+        # Shared across replicas so a retry landing elsewhere is still deduplicated.
+        return SqlIdempotencyStore(session_factory, ttl_seconds=settings.slack_idempotency_ttl_seconds)
+    if settings.slack_idempotency_store == "memory":
+        return InMemoryIdempotencyStore(
+            ttl_seconds=settings.slack_idempotency_ttl_seconds,
+            max_entries=settings.slack_idempotency_cache_size,
+        )
+    raise ValueError(f"Unknown slack_idempotency_store '{settings.slack_idempotency_store}'")
 
 
-__all__ = ["app", "create_app"]
\ No newline at end of file
+__all__ = ["create_app"]
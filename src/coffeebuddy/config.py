@@ -15,6 +15,32 @@ class Settings(BaseSettings):
     run_events_topic: str = "coffeebuddy.run.events"
     app_name: str = "CoffeeBuddy"
     slack_timestamp_tolerance_seconds: int = 300
+    slack_replay_cache_size: int = 10_000
+    slack_max_body_bytes: int = 64 * 1024
+    slack_idempotency_store: str = Field("memory", description="'memory' or 'postgres'")
+    slack_idempotency_ttl_seconds: int = 600
+    slack_idempotency_cache_size: int = 10_000
+    slack_admission_enabled: bool = True
+    slack_admission_channel_rate_per_second: float = 1.0
+    slack_admission_channel_burst: int = 10
+    slack_admission_workspace_rate_per_second: float = 10.0
+    slack_admission_workspace_burst: int = 50
+    slack_deferred_ack: bool = False
+    slack_deferred_max_pending: int = 100
+    slack_deferred_concurrency: int = 4
+    preference_cache_enabled: bool = True
+    preference_cache_size: int = 10_000
+    preference_cache_ttl_seconds: float = 300.0
+    identity_cache_size: int = 10_000
+    identity_cache_ttl_seconds: float = 600.0
+    identity_cache_negative_ttl_seconds: float = 30.0
+    fairness_index_ttl_seconds: float = 600.0
+    run_events_outbox: bool = False
+    outbox_relay_batch_size: int = 100
+    outbox_relay_poll_interval_seconds: float = 0.5
+    outbox_relay_max_attempts: int = 10
+    outbox_relay_backoff_base_seconds: float = 1.0
+    outbox_relay_backoff_max_seconds: float = 300.0
 
     class Config:
         env_file = ".env"
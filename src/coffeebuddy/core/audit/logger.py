@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from typing import Any, Mapping
+from datetime import datetime, timezone
+from typing import Any, Callable, Mapping
+from uuid import UUID, uuid4
 
 from sqlalchemy.orm import Session
 
@@ -10,23 +12,37 @@ from coffeebuddy.infra.db.models import ChannelAdminAction
 class AdminAuditLogger:
     """Persists channel admin actions for auditability."""
 
-    def __init__(self, session: Session) -> None:
+    def __init__(
+        self,
+        session: Session,
+        *,
+        clock: Callable[[], datetime] | None = None,
+    ) -> None:
         self._session = session
+        self._clock = clock or (lambda: datetime.now(timezone.utc))
 
     def log_action(
         self,
         *,
-        channel_id: str,
-        admin_user_id: str,
+        channel_id: str | UUID,
+        admin_user_id: str | UUID,
         action_type: str,
         details: Mapping[str, Any] | None = None,
     ) -> ChannelAdminAction:
         entry = ChannelAdminAction(
-            channel_id=channel_id,
-            admin_user_id=admin_user_id,
+            id=uuid4(),
+            channel_id=_as_uuid(channel_id),
+            admin_user_id=_as_uuid(admin_user_id),
             action_type=action_type,
             action_details=dict(details or {}),
+            created_at=self._clock(),
         )
         self._session.add(entry)
         self._session.flush()
-        return entry
\ No newline at end of file
+        return entry
+
+
+def _as_uuid(value: str | UUID) -> UUID:
+    if isinstance(value, UUID):
+        return value
+    return UUID(value)
@@ -1,15 +1,20 @@
 """Order management domain services for CoffeeBuddy."""
 
+from .async_service import AsyncOrderService
 from .exceptions import (
+    OrderConflictError,
     OrderError,
     OrderNotFoundError,
     OrderValidationError,
     PreferenceNotFoundError,
+    RunFullError,
     RunNotFoundError,
     RunNotOpenError,
     UserNotFoundError,
 )
 from .models import (
+    BulkOrderItemResult,
+    BulkOrderSubmissionResult,
     OrderCancellationResult,
     OrderProvenance,
     OrderSubmissionRequest,
@@ -19,17 +24,22 @@ from .models import (
 from .service import OrderService, OrderValidator
 
 __all__ = [
+    "AsyncOrderService",
     "OrderService",
     "OrderValidator",
     "OrderSubmissionRequest",
     "OrderSubmissionResult",
+    "BulkOrderItemResult",
+    "BulkOrderSubmissionResult",
     "OrderCancellationResult",
     "UseLastOrderResult",
     "OrderProvenance",
     "OrderValidationError",
+    "OrderConflictError",
     "OrderError",
     "OrderNotFoundError",
     "PreferenceNotFoundError",
+    "RunFullError",
     "RunNotFoundError",
     "RunNotOpenError",
     "UserNotFoundError",
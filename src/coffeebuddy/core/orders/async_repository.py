@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Iterable, Sequence
+from uuid import UUID
+
+from sqlalchemy import Row, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from coffeebuddy.core.orders.exceptions import RunNotFoundError, UserNotFoundError
+from coffeebuddy.core.orders.models import Clock, OrderProvenance
+from coffeebuddy.core.orders.repository import (
+    BulkUpsertedOrders,
+    CanceledOrder,
+    OrderRepository,
+    OrderWrite,
+    UpsertedOrder,
+)
+from coffeebuddy.core.orders.statements import (
+    REFRESH,
+    activation_deltas,
+    active_participants_statement,
+    add_to_active_count_statement,
+    as_uuid,
+    cancel_statement,
+    conflict_error,
+    counted_cancel_statement,
+    counted_upsert_statement,
+    ensure_open,
+    observe_statement,
+    observed_by_key,
+    open_run_with_user,
+    participants_by_run,
+    run_with_user_statement,
+    sync_loaded,
+    unwritten,
+    upsert_statement,
+)
+from coffeebuddy.infra.db.identity import IdentityCache
+from coffeebuddy.infra.db.models import Order, Run, User
+from coffeebuddy.services.catalog import AsyncOrderCatalog
+
+
+class AsyncOrderRepository:
+    """:class:`OrderRepository` for an ``AsyncSession``.
+
+    Issues the same compare-and-swap statements with the same semantics.
+    Dialects without ``ON CONFLICT`` run the sync repository's ORM fallback
+    through ``run_sync``.
+    """
+
+    def __init__(self, session: AsyncSession, *, clock: Clock | None = None) -> None:
+        self._session = session
+        self._clock = clock or (lambda: datetime.now(timezone.utc))
+        self._catalog = AsyncOrderCatalog(session, clock=self._clock)
+
+    async def upsert_order_with_count(
+        self,
+        *,
+        run_id: str | UUID,
+        user_id: str | UUID,
+        order_text: str,
+        confirm: bool,
+        provenance: OrderProvenance,
+        interned: bool = False,
+    ) -> UpsertedOrder:
+        dialect = self._session.get_bind().dialect.name
+        if dialect not in ("postgresql", "sqlite"):
+            return await self._session.run_sync(
+                lambda session: self._fallback(session).upsert_order_with_count(
+                    run_id=run_id,
+                    user_id=user_id,
+                    order_text=order_text,
+                    confirm=confirm,
+                    provenance=provenance,
+                    interned=interned,
+                )
+            )
+
+        run_uuid = as_uuid(run_id)
+        user_uuid = as_uuid(user_id)
+        previous = (await self._observe([run_uuid], [user_uuid])).get((run_uuid, user_uuid))
+        if not interned:
+            await self._catalog.intern([order_text])
+        revived = previous is not None and previous.canceled_at is not None
+        write = OrderWrite(
+            run_id=run_uuid,
+            user_id=user_uuid,
+            order_text=order_text,
+            confirm=confirm,
+            provenance=provenance,
+        )
+        upsert = upsert_statement(
+            dialect, [write], {(run_uuid, user_uuid): previous.version} if previous else {}, self._clock()
+        )
+        delta = 1 if previous is None or revived else 0
+        if dialect == "sqlite":
+            result = await self._session.scalars(upsert.returning(Order), execution_options=REFRESH)
+            order = result.one_or_none()
+            if order is None:
+                raise conflict_error(write)
+            return UpsertedOrder(order=order, participant_count=await self._add_to_active_count(run_uuid, delta))
+
+        result = await self._session.execute(
+            counted_upsert_statement(upsert, run_uuid, delta), execution_options=REFRESH
+        )
+        row = result.first()
+        if row is None:
+            raise conflict_error(write)
+        count = int(row[1])
+        sync_loaded(self._session.sync_session, Run, run_uuid, active_order_count=count)
+        return UpsertedOrder(order=row[0], participant_count=count)
+
+    async def upsert_orders_with_counts(
+        self, writes: Sequence[OrderWrite], *, interned: bool = False
+    ) -> BulkUpsertedOrders:
+        if not writes:
+            return BulkUpsertedOrders(orders={}, participant_counts={})
+        dialect = self._session.get_bind().dialect.name
+        if dialect not in ("postgresql", "sqlite"):
+            return await self._session.run_sync(
+                lambda session: self._fallback(session).upsert_orders_with_counts(writes, interned=interned)
+            )
+
+        run_ids = {write.run_id for write in writes}
+        observed = await self._observe(run_ids, {write.user_id for write in writes})
+        if not interned:
+            await self._catalog.intern([write.order_text for write in writes])
+        previous = {key: row.canceled_at for key, row in observed.items()}
+        upsert = upsert_statement(dialect, writes, {key: row.version for key, row in observed.items()}, self._clock())
+        returned = (await self._session.scalars(upsert.returning(Order), execution_options=REFRESH)).all()
+        inserted_keys = {(order.run_id, order.user_id) for order in returned} - set(previous)
+        orders = {(order.run_id, order.user_id): order for order in returned}
+
+        deltas = activation_deltas(run_ids, orders, inserted_keys, previous)
+        counts = {run_id: await self._add_to_active_count(run_id, delta) for run_id, delta in deltas.items()}
+        return BulkUpsertedOrders(orders=orders, participant_counts=counts, conflicts=unwritten(writes, orders))
+
+    async def active_participants(self, run_ids: Iterable[UUID]) -> dict[UUID, set[UUID]]:
+        ids = set(run_ids)
+        if not ids:
+            return {}
+        return participants_by_run(ids, await self._session.execute(active_participants_statement(ids)))
+
+    async def cancel_order_with_count(
+        self, *, run_id: str | UUID, user_id: str | UUID
+    ) -> CanceledOrder | None:
+        run_uuid = as_uuid(run_id)
+        now = self._clock()
+        canceled = cancel_statement(run_uuid, as_uuid(user_id), now)
+
+        if self._session.get_bind().dialect.name == "postgresql":
+            row = (await self._session.execute(counted_cancel_statement(canceled, run_uuid))).first()
+            if row is None:
+                return None
+            order_id, version, count = row[0], row[1], int(row[2])
+            sync_loaded(self._session.sync_session, Run, run_uuid, active_order_count=count)
+        else:
+            row = (await self._session.execute(canceled)).first()
+            if row is None:
+                return None
+            order_id, version = row
+            count = await self._add_to_active_count(run_uuid, -1)
+
+        sync_loaded(self._session.sync_session, Order, order_id, canceled_at=now, updated_at=now, version=version)
+        return CanceledOrder(order_id=order_id, participant_count=count)
+
+    async def get_order(self, *, run_id: str | UUID, user_id: str | UUID) -> Order | None:
+        return await self._session.scalar(
+            select(Order).where(Order.run_id == as_uuid(run_id), Order.user_id == as_uuid(user_id))
+        )
+
+    async def count_active_orders(self, *, run_id: str | UUID) -> int:
+        count = await self._session.scalar(
+            select(func.count(Order.id)).where(Order.run_id == as_uuid(run_id), Order.canceled_at.is_(None))
+        )
+        return int(count or 0)
+
+    async def _observe(
+        self, run_ids: Iterable[UUID], user_ids: Iterable[UUID]
+    ) -> dict[tuple[UUID, UUID], Row]:
+        return observed_by_key(await self._session.execute(observe_statement(run_ids, user_ids)))
+
+    async def _add_to_active_count(self, run_id: UUID, delta: int) -> int:
+        count = (await self._session.execute(add_to_active_count_statement(run_id, delta))).scalar_one()
+        sync_loaded(self._session.sync_session, Run, run_id, active_order_count=count)
+        return int(count)
+
+    def _fallback(self, session) -> OrderRepository:
+        return OrderRepository(session, clock=self._clock)
+
+
+class AsyncRunRepository:
+    """:class:`RunRepository` for an ``AsyncSession``."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self._session = session
+
+    async def get(self, run_id: str | UUID) -> Run:
+        run = await self._session.scalar(select(Run).where(Run.id == as_uuid(run_id)))
+        if not run:
+            raise RunNotFoundError(f"Run {run_id} was not found.")
+        return run
+
+    async def get_many(self, run_ids: Iterable[UUID]) -> dict[UUID, Run]:
+        ids = set(run_ids)
+        if not ids:
+            return {}
+        return {run.id: run for run in await self._session.scalars(select(Run).where(Run.id.in_(ids)))}
+
+    async def get_open_run(self, run_id: str | UUID) -> Run:
+        return ensure_open(await self.get(run_id), run_id)
+
+    async def get_open_run_with_user(self, run_id: str | UUID, user_id: str | UUID) -> tuple[Run, User]:
+        result = await self._session.execute(run_with_user_statement(as_uuid(run_id), as_uuid(user_id)))
+        return open_run_with_user(result.first(), run_id, user_id)
+
+
+class AsyncUserRepository:
+    """:class:`UserRepository` for an ``AsyncSession``, served from ``identity_cache`` when given."""
+
+    def __init__(self, session: AsyncSession, *, identity_cache: IdentityCache | None = None) -> None:
+        self._session = session
+        self._identity_cache = identity_cache
+
+    async def get(self, user_id: str | UUID) -> User:
+        if self._identity_cache is not None:
+            user = await self._identity_cache.aget_user(self._session, as_uuid(user_id))
+        else:
+            user = await self._session.get(User, as_uuid(user_id))
+        if not user:
+            raise UserNotFoundError(f"User {user_id} does not exist.")
+        return user
+
+    async def get_by_slack_id(self, slack_user_id: str) -> User:
+        if self._identity_cache is not None:
+            user = await self._identity_cache.aget_user_by_slack_id(self._session, slack_user_id)
+        else:
+            user = await self._session.scalar(select(User).where(User.slack_user_id == slack_user_id))
+        if not user:
+            raise UserNotFoundError(f"Slack user {slack_user_id} is not registered with CoffeeBuddy.")
+        return user
+
+    async def get_many(self, user_ids: Iterable[UUID]) -> dict[UUID, User]:
+        ids = set(user_ids)
+        if not ids:
+            return {}
+        return {user.id: user for user in await self._session.scalars(select(User).where(User.id.in_(ids)))}
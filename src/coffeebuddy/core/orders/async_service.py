@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+from collections.abc import Awaitable, Callable, Sequence
+from datetime import datetime, timezone
+from typing import TypeVar
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from coffeebuddy.core.orders.async_repository import (
+    AsyncOrderRepository,
+    AsyncRunRepository,
+    AsyncUserRepository,
+)
+from coffeebuddy.core.orders.exceptions import OrderConflictError, OrderError
+from coffeebuddy.core.orders.metrics import ORDER_WRITE_CONFLICTS_TOTAL
+from coffeebuddy.core.orders.models import (
+    BulkOrderSubmissionResult,
+    Clock,
+    OrderCancellationResult,
+    OrderProvenance,
+    OrderSubmissionRequest,
+    OrderSubmissionResult,
+    UseLastOrderResult,
+)
+from coffeebuddy.core.orders.planning import (
+    accept_requests,
+    bulk_result,
+    cancellation_result,
+    confirmed_preferences,
+    fail_pending,
+    has_capacity,
+    merge_upserted,
+    no_preference,
+    plan_writes,
+    retry_or_raise,
+    run_full_error,
+    submission_result,
+)
+from coffeebuddy.core.orders.repository import OrderWrite
+from coffeebuddy.core.orders.service import ORDER_QUERY_BUDGETS, OrderValidator
+from coffeebuddy.infra.db.identity import IdentityCache
+from coffeebuddy.infra.db.models import Order, Run, User
+from coffeebuddy.infra.db.query_budget import QueryBudget
+from coffeebuddy.services.preferences import (
+    AsyncPreferenceService,
+    PreferenceCache,
+    PreferenceConflictError,
+)
+
+T = TypeVar("T")
+
+
+class AsyncOrderService:
+    """:class:`OrderService` for an ``AsyncSession``.
+
+    Same operations, validation, result models, retries and query budgets;
+    every statement is awaited on the session, so async handlers can call it
+    without a thread hop.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        *,
+        clock: Clock | None = None,
+        validator: OrderValidator | None = None,
+        preference_service: AsyncPreferenceService | None = None,
+        order_repository_factory: Callable[[AsyncSession], AsyncOrderRepository] | None = None,
+        preference_cache: PreferenceCache | None = None,
+        identity_cache: IdentityCache | None = None,
+        max_write_attempts: int = 3,
+        query_budget: QueryBudget | None = None,
+    ) -> None:
+        if max_write_attempts < 1:
+            raise ValueError("max_write_attempts must be at least 1.")
+        self._session = session
+        self._max_write_attempts = max_write_attempts
+        self._clock = clock or (lambda: datetime.now(timezone.utc))
+        self._validator = validator or OrderValidator()
+        self._orders = (
+            order_repository_factory(session)
+            if order_repository_factory
+            else AsyncOrderRepository(session, clock=self._clock)
+        )
+        self._runs = AsyncRunRepository(session)
+        self._users = AsyncUserRepository(session, identity_cache=identity_cache)
+        self._identity_cache = identity_cache
+        self._budget = query_budget or QueryBudget(ORDER_QUERY_BUDGETS)
+        self._preferences = preference_service or AsyncPreferenceService(
+            session, clock=self._clock, cache=preference_cache
+        )
+
+    async def submit_order(self, request: OrderSubmissionRequest) -> OrderSubmissionResult:
+        async with self._budget.atrack(self._session, "orders.submit_order"):
+            run, user = await self._open_run_and_user(request.run_id, request.user_id)
+            normalized = self._validator.validate(request.order_text)
+            result = await self._with_retries(
+                lambda interned: self._persist_order(
+                    run=run,
+                    user=user,
+                    order_text=normalized,
+                    confirm=request.confirm,
+                    provenance=request.provenance,
+                    interned=interned,
+                )
+            )
+            # See OrderService.submit_order: a new preference row is counted.
+            await self._session.flush()
+            return result
+
+    async def submit_orders(
+        self, requests: Sequence[OrderSubmissionRequest]
+    ) -> BulkOrderSubmissionResult:
+        async with self._budget.atrack(self._session, "orders.submit_orders"):
+            errors: dict[int, OrderError] = {}
+            accepted = accept_requests(requests, self._validator, errors)
+            runs = await self._runs.get_many(run_id for _, run_id, _, _ in accepted)
+            users = await self._users.get_many(user_id for _, _, user_id, _ in accepted)
+            participants = await self._orders.active_participants(
+                run.id for run in runs.values() if run.max_participants is not None
+            )
+            writes = plan_writes(requests, accepted, runs, users, participants, errors)
+            orders, participant_counts = await self._upsert_with_retries(writes, errors)
+            await self._preferences.set_preferences(confirmed_preferences(writes, runs), interned=True)
+            return bulk_result(requests, writes, errors, orders, participant_counts)
+
+    async def use_last_order(self, *, run_id: str, user_id: str) -> UseLastOrderResult:
+        async with self._budget.atrack(self._session, "orders.use_last_order"):
+            run, user = await self._open_run_and_user(run_id, user_id)
+            return await self._with_retries(
+                lambda interned: self._use_preference(run=run, user=user, interned=interned)
+            )
+
+    async def cancel_order(self, *, run_id: str, user_id: str) -> OrderCancellationResult:
+        async with self._budget.atrack(self._session, "orders.cancel_order"):
+            run, _ = await self._open_run_and_user(run_id, user_id)
+            canceled = await self._orders.cancel_order_with_count(run_id=run.id, user_id=user_id)
+        return cancellation_result(canceled, run_id, user_id)
+
+    async def _use_preference(self, *, run: Run, user: User, interned: bool) -> UseLastOrderResult:
+        preference = await self._preferences.get_preference(user_id=user.id, channel_id=run.channel_id)
+        if not preference:
+            raise no_preference(user)
+        normalized = self._validator.validate(preference.last_order_text)
+        submission = await self._persist_order(
+            run=run,
+            user=user,
+            order_text=normalized,
+            confirm=True,
+            provenance=OrderProvenance.PREFERENCE,
+            interned=interned,
+        )
+        await self._preferences.mark_used(preference)
+        return UseLastOrderResult(preference_id=str(preference.id), submission=submission)
+
+    async def _open_run_and_user(self, run_id: str | UUID, user_id: str | UUID) -> tuple[Run, User]:
+        if self._identity_cache is not None:
+            return await self._runs.get_open_run(run_id), await self._users.get(user_id)
+        return await self._runs.get_open_run_with_user(run_id, user_id)
+
+    async def _persist_order(
+        self,
+        *,
+        run: Run,
+        user: User,
+        order_text: str,
+        confirm: bool,
+        provenance: OrderProvenance,
+        interned: bool = False,
+    ) -> OrderSubmissionResult:
+        if run.max_participants is not None:
+            participants = await self._orders.active_participants([run.id])
+            if not has_capacity(run, user.id, participants):
+                raise run_full_error(run)
+        upserted = await self._orders.upsert_order_with_count(
+            run_id=run.id,
+            user_id=user.id,
+            order_text=order_text,
+            confirm=confirm,
+            provenance=provenance,
+            interned=interned,
+        )
+        if confirm:
+            await self._preferences.set_preference(
+                user_id=user.id,
+                channel_id=run.channel_id,
+                order_text=upserted.order.order_text,
+                interned=True,
+            )
+        return submission_result(upserted, provenance=provenance, preference_updated=confirm)
+
+    async def _with_retries(self, write: Callable[[bool], Awaitable[T]]) -> T:
+        attempt = 1
+        while True:
+            try:
+                return await write(attempt > 1)
+            except (OrderConflictError, PreferenceConflictError) as exc:
+                retry_or_raise(attempt, self._max_write_attempts, exc)
+                attempt += 1
+
+    async def _upsert_with_retries(
+        self, writes: dict[int, OrderWrite], errors: dict[int, OrderError]
+    ) -> tuple[dict[tuple[UUID, UUID], Order], dict[UUID, int]]:
+        orders: dict[tuple[UUID, UUID], Order] = {}
+        participant_counts: dict[UUID, int] = {}
+        pending = list(writes.items())
+        for attempt in range(1, self._max_write_attempts + 1):
+            upserted = await self._orders.upsert_orders_with_counts(
+                [write for _, write in pending], interned=attempt > 1
+            )
+            pending = merge_upserted(upserted, pending, orders, participant_counts)
+            if not pending:
+                break
+            if attempt < self._max_write_attempts:
+                ORDER_WRITE_CONFLICTS_TOTAL.labels(outcome="retried").inc(len(pending))
+        fail_pending(pending, writes, errors)
+        return orders, participant_counts
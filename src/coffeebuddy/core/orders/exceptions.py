@@ -21,6 +21,10 @@ class RunNotOpenError(OrderError):
     """Raised when a run is not accepting orders."""
 
 
+class RunFullError(OrderError):
+    """Raised when a new participant would exceed the run's ``max_participants``."""
+
+
 class PreferenceNotFoundError(OrderError):
     """Raised when a user attempts to re-use a non-existent preference."""
 
@@ -30,4 +34,7 @@ class OrderNotFoundError(OrderError):
 
 
 class UserNotFoundError(OrderError):
-    """Raised when the referenced user is missing in persistence."""
\ No newline at end of file
+    """Raised when the referenced user is missing in persistence."""
+
+class OrderConflictError(OrderError):
+    """Raised when an order kept changing underneath a write after every retry."""
@@ -0,0 +1,9 @@
+from __future__ import annotations
+
+from prometheus_client import Counter
+
+ORDER_WRITE_CONFLICTS_TOTAL = Counter(
+    "coffeebuddy_order_write_conflicts_total",
+    "Order and preference writes that lost a version check, by outcome (retried or exhausted).",
+    ("outcome",),
+)
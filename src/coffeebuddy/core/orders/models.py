@@ -5,6 +5,8 @@ from datetime import datetime
 from enum import Enum
 from typing import Callable
 
+from coffeebuddy.core.orders.exceptions import OrderError
+
 
 Clock = Callable[[], datetime]
 
@@ -41,6 +43,33 @@ class OrderCancellationResult:
     participant_count: int
 
 
+@dataclass(frozen=True, slots=True)
+class BulkOrderItemResult:
+    """Outcome of one request in a bulk submission; exactly one of result/error is set."""
+
+    index: int
+    request: OrderSubmissionRequest
+    result: OrderSubmissionResult | None = None
+    error: OrderError | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass(frozen=True, slots=True)
+class BulkOrderSubmissionResult:
+    items: tuple[BulkOrderItemResult, ...]
+
+    @property
+    def succeeded(self) -> tuple[BulkOrderItemResult, ...]:
+        return tuple(item for item in self.items if item.ok)
+
+    @property
+    def failed(self) -> tuple[BulkOrderItemResult, ...]:
+        return tuple(item for item in self.items if not item.ok)
+
+
 @dataclass(frozen=True, slots=True)
 class UseLastOrderResult:
     preference_id: str
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import Sequence
+from typing import TYPE_CHECKING
+from uuid import UUID
+
+from coffeebuddy.core.orders.exceptions import (
+    OrderConflictError,
+    OrderError,
+    OrderNotFoundError,
+    OrderValidationError,
+    PreferenceNotFoundError,
+    RunFullError,
+    RunNotFoundError,
+    RunNotOpenError,
+    UserNotFoundError,
+)
+from coffeebuddy.core.orders.metrics import ORDER_WRITE_CONFLICTS_TOTAL
+from coffeebuddy.core.orders.models import (
+    BulkOrderItemResult,
+    BulkOrderSubmissionResult,
+    OrderCancellationResult,
+    OrderProvenance,
+    OrderSubmissionRequest,
+    OrderSubmissionResult,
+)
+from coffeebuddy.core.orders.repository import BulkUpsertedOrders, CanceledOrder, OrderWrite, UpsertedOrder
+from coffeebuddy.infra.db.models import Order, Run, RunStatus, User
+from coffeebuddy.services.preferences import PreferenceConflictError
+
+if TYPE_CHECKING:
+    from coffeebuddy.core.orders.service import OrderValidator
+
+logger = logging.getLogger(__name__)
+
+
+def has_capacity(run: Run, user_id: UUID, participants: dict[UUID, set[UUID]]) -> bool:
+    """Admits ``user_id`` into ``participants`` unless the run is already full."""
+    if run.max_participants is None:
+        return True
+    active = participants[run.id]
+    if user_id not in active:
+        if len(active) >= run.max_participants:
+            return False
+        active.add(user_id)
+    return True
+
+
+def accept_requests(
+    requests: Sequence[OrderSubmissionRequest], validator: OrderValidator, errors: dict[int, OrderError]
+) -> list[tuple[int, UUID, UUID, str]]:
+    """Validates each request on its own; failures go to ``errors``."""
+    accepted: list[tuple[int, UUID, UUID, str]] = []
+    for index, request in enumerate(requests):
+        try:
+            normalized = validator.validate(request.order_text)
+            run_id = _parse_id(request.run_id, RunNotFoundError, "Run")
+            user_id = _parse_id(request.user_id, UserNotFoundError, "User")
+        except OrderError as exc:
+            errors[index] = exc
+            continue
+        accepted.append((index, run_id, user_id, normalized))
+    return accepted
+
+
+def plan_writes(
+    requests: Sequence[OrderSubmissionRequest],
+    accepted: list[tuple[int, UUID, UUID, str]],
+    runs: dict[UUID, Run],
+    users: dict[UUID, User],
+    participants: dict[UUID, set[UUID]],
+    errors: dict[int, OrderError],
+) -> dict[int, OrderWrite]:
+    """Checks the loaded runs and users and turns the accepted requests into writes."""
+    writes: dict[int, OrderWrite] = {}
+    seen: set[tuple[UUID, UUID]] = set()
+    for index, run_id, user_id, normalized in accepted:
+        request = requests[index]
+        run = runs.get(run_id)
+        if run is None:
+            errors[index] = RunNotFoundError(f"Run {request.run_id} was not found.")
+        elif run.status != RunStatus.OPEN:
+            errors[index] = RunNotOpenError(f"Run {request.run_id} is not open for orders.")
+        elif user_id not in users:
+            errors[index] = UserNotFoundError(f"User {request.user_id} does not exist.")
+        elif (run_id, user_id) in seen:
+            errors[index] = OrderValidationError(
+                f"User {request.user_id} already has an order in this batch for run {request.run_id}.",
+                field="user_id",
+            )
+        elif not has_capacity(run, user_id, participants):
+            errors[index] = run_full_error(run)
+        else:
+            seen.add((run_id, user_id))
+            writes[index] = OrderWrite(
+                run_id=run_id,
+                user_id=user_id,
+                order_text=normalized,
+                confirm=request.confirm,
+                provenance=request.provenance,
+            )
+    return writes
+
+
+def confirmed_preferences(
+    writes: dict[int, OrderWrite], runs: dict[UUID, Run]
+) -> list[tuple[UUID, UUID, str]]:
+    return [
+        (write.user_id, runs[write.run_id].channel_id, write.order_text)
+        for write in writes.values()
+        if write.confirm
+    ]
+
+
+def merge_upserted(
+    upserted: BulkUpsertedOrders,
+    pending: list[tuple[int, OrderWrite]],
+    orders: dict[tuple[UUID, UUID], Order],
+    participant_counts: dict[UUID, int],
+) -> list[tuple[int, OrderWrite]]:
+    """Collects one bulk attempt and returns the writes that still conflict."""
+    orders.update(upserted.orders)
+    participant_counts.update(upserted.participant_counts)
+    conflicts = set(upserted.conflicts)
+    return [(index, write) for index, write in pending if write in conflicts]
+
+
+def fail_pending(
+    pending: list[tuple[int, OrderWrite]], writes: dict[int, OrderWrite], errors: dict[int, OrderError]
+) -> None:
+    """Moves writes that exhausted their attempts from ``writes`` to ``errors``."""
+    if pending:
+        ORDER_WRITE_CONFLICTS_TOTAL.labels(outcome="exhausted").inc(len(pending))
+    for index, _ in pending:
+        del writes[index]
+        errors[index] = _write_conflict()
+
+
+def bulk_result(
+    requests: Sequence[OrderSubmissionRequest],
+    writes: dict[int, OrderWrite],
+    errors: dict[int, OrderError],
+    orders: dict[tuple[UUID, UUID], Order],
+    participant_counts: dict[UUID, int],
+) -> BulkOrderSubmissionResult:
+    items: list[BulkOrderItemResult] = []
+    for index, request in enumerate(requests):
+        if index in errors:
+            items.append(BulkOrderItemResult(index=index, request=request, error=errors[index]))
+            continue
+        write = writes[index]
+        order = orders[(write.run_id, write.user_id)]
+        items.append(
+            BulkOrderItemResult(
+                index=index,
+                request=request,
+                result=OrderSubmissionResult(
+                    order_id=str(order.id),
+                    participant_count=participant_counts[write.run_id],
+                    order_text=order.order_text,
+                    provenance=request.provenance,
+                    preference_updated=write.confirm,
+                ),
+            )
+        )
+    return BulkOrderSubmissionResult(items=tuple(items))
+
+
+def submission_result(
+    upserted: UpsertedOrder, *, provenance: OrderProvenance, preference_updated: bool
+) -> OrderSubmissionResult:
+    return OrderSubmissionResult(
+        order_id=str(upserted.order.id),
+        participant_count=upserted.participant_count,
+        order_text=upserted.order.order_text,
+        provenance=provenance,
+        preference_updated=preference_updated,
+    )
+
+
+def cancellation_result(
+    canceled: CanceledOrder | None, run_id: str, user_id: str
+) -> OrderCancellationResult:
+    if canceled is None:
+        raise OrderNotFoundError(
+            f"No active order for user {user_id} in run {run_id}."
+        )
+    return OrderCancellationResult(
+        order_id=str(canceled.order_id),
+        participant_count=canceled.participant_count,
+    )
+
+
+def retry_or_raise(attempt: int, max_attempts: int, exc: OrderError | PreferenceConflictError) -> None:
+    """Counts a lost version check; raises once ``attempt`` was the last one allowed."""
+    if attempt >= max_attempts:
+        ORDER_WRITE_CONFLICTS_TOTAL.labels(outcome="exhausted").inc()
+        logger.warning(
+            "Order write kept conflicting",
+            extra={"attempts": attempt, "error": str(exc)},
+        )
+        raise _write_conflict() from exc
+    ORDER_WRITE_CONFLICTS_TOTAL.labels(outcome="retried").inc()
+
+
+def no_preference(user: User) -> PreferenceNotFoundError:
+    return PreferenceNotFoundError(
+        f"No saved order found for user {user.id} in this channel."
+    )
+
+
+def _write_conflict() -> OrderConflictError:
+    return OrderConflictError("Your order changed while it was being saved. Please try again.")
+
+
+def run_full_error(run: Run) -> RunFullError:
+    return RunFullError(f"This run is full ({run.max_participants} participants).")
+
+
+def _parse_id(value: str | UUID, error: type[OrderError], label: str) -> UUID:
+    if isinstance(value, UUID):
+        return value
+    try:
+        return UUID(value)
+    except ValueError as exc:
+        raise error(f"{label} {value} was not found.") from exc
@@ -1,27 +1,83 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Callable
+from typing import Callable, Iterable, Sequence
 from uuid import UUID, uuid4
 
-from sqlalchemy import func, select
+from sqlalchemy import Row, func, select
 from sqlalchemy.orm import Session
 
-from coffeebuddy.core.orders.exceptions import (
-    RunNotFoundError,
-    RunNotOpenError,
-    UserNotFoundError,
-)
+from coffeebuddy.core.orders.exceptions import RunNotFoundError, UserNotFoundError
 from coffeebuddy.core.orders.models import Clock, OrderProvenance
-from coffeebuddy.infra.db.models import Order, Run, RunStatus, User
+from coffeebuddy.core.orders.statements import (
+    REFRESH,
+    activation_deltas,
+    active_participants_statement,
+    add_to_active_count_statement,
+    as_uuid,
+    cancel_statement,
+    conflict_error,
+    counted_cancel_statement,
+    counted_upsert_statement,
+    ensure_open,
+    observe_statement,
+    observed_by_key,
+    open_run_with_user,
+    participants_by_run,
+    run_with_user_statement,
+    sync_loaded,
+    unwritten,
+    upsert_statement,
+)
+from coffeebuddy.infra.db.identity import IdentityCache
+from coffeebuddy.infra.db.models import Order, Run, User
+from coffeebuddy.services.catalog import OrderCatalog, catalog_hash
+
+
+@dataclass(frozen=True, slots=True)
+class UpsertedOrder:
+    order: Order
+    participant_count: int
+
+
+@dataclass(frozen=True, slots=True)
+class OrderWrite:
+    run_id: UUID
+    user_id: UUID
+    order_text: str
+    confirm: bool
+    provenance: OrderProvenance
+
+
+@dataclass(frozen=True, slots=True)
+class BulkUpsertedOrders:
+    orders: dict[tuple[UUID, UUID], Order]
+    participant_counts: dict[UUID, int]
+    conflicts: tuple[OrderWrite, ...] = ()
+
+
+@dataclass(frozen=True, slots=True)
+class CanceledOrder:
+    order_id: UUID
+    participant_count: int
 
 
 class OrderRepository:
-    """Persistence helpers for order rows."""
+    """Persistence helpers for order rows.
+
+    The ``*_with_count`` writers intern the order text into the order catalog
+    (one upsert per call, skipped with ``interned=True``) and store its
+    ``catalog_hash`` on the order. They take no row locks: each write is a
+    compare-and-swap on ``orders.version`` against the state read just
+    before it, and a write that loses the race is reported as a conflict for
+    the caller to retry.
+    """
 
     def __init__(self, session: Session, *, clock: Clock | None = None) -> None:
         self._session = session
         self._clock = clock or (lambda: datetime.now(timezone.utc))
+        self._catalog = OrderCatalog(session, clock=self._clock)
 
     def upsert_order(
         self,
@@ -36,28 +92,196 @@ class OrderRepository:
         now = self._clock()
         if order:
             order.order_text = order_text
+            order.catalog_hash = catalog_hash(order_text)
             order.is_final = confirm
             order.provenance = provenance.value
             order.canceled_at = None
             order.updated_at = now
+            order.version += 1
         else:
             order = Order(
                 id=uuid4(),
-                run_id=self._as_uuid(run_id),
-                user_id=self._as_uuid(user_id),
+                run_id=as_uuid(run_id),
+                user_id=as_uuid(user_id),
                 order_text=order_text,
+                catalog_hash=catalog_hash(order_text),
                 is_final=confirm,
                 provenance=provenance.value,
+                version=1,
                 created_at=now,
                 updated_at=now,
             )
             self._session.add(order)
         return order
 
+    def upsert_order_with_count(
+        self,
+        *,
+        run_id: str | UUID,
+        user_id: str | UUID,
+        order_text: str,
+        confirm: bool,
+        provenance: OrderProvenance,
+        interned: bool = False,
+    ) -> UpsertedOrder:
+        """Writes the order through ``uq_orders_run_user`` and maintains ``runs.active_order_count``.
+
+        The existing row (if any) is read first, so the counter only moves
+        when the order becomes active: a fresh insert or a revived
+        cancellation. The upsert only applies if the row still has the version
+        that was read (or still does not exist) and raises
+        :class:`OrderConflictError` otherwise. On PostgreSQL the upsert and the
+        counter update then run as one statement (two CTEs); SQLite cannot
+        nest DML in a CTE and issues them separately. Other dialects fall back
+        to the ORM path.
+        """
+        run_uuid = as_uuid(run_id)
+        user_uuid = as_uuid(user_id)
+        previous = self._observe([run_uuid], [user_uuid]).get((run_uuid, user_uuid))
+        if not interned:
+            self._catalog.intern([order_text])
+        revived = previous is not None and previous.canceled_at is not None
+        dialect = self._session.get_bind().dialect.name
+
+        if dialect not in ("postgresql", "sqlite"):
+            order = self.upsert_order(
+                run_id=run_uuid,
+                user_id=user_uuid,
+                order_text=order_text,
+                confirm=confirm,
+                provenance=provenance,
+            )
+            self._session.flush()
+            delta = 1 if previous is None or revived else 0
+            return UpsertedOrder(order=order, participant_count=self._add_to_active_count(run_uuid, delta))
+
+        write = OrderWrite(
+            run_id=run_uuid,
+            user_id=user_uuid,
+            order_text=order_text,
+            confirm=confirm,
+            provenance=provenance,
+        )
+        upsert = upsert_statement(
+            dialect, [write], {(run_uuid, user_uuid): previous.version} if previous else {}, self._clock()
+        )
+        # The version check rejects a write based on a stale read, so what was
+        # read decides whether the order becomes active.
+        delta = 1 if previous is None or revived else 0
+        if dialect == "sqlite":
+            order = self._session.scalars(upsert.returning(Order), execution_options=REFRESH).one_or_none()
+            if order is None:
+                raise conflict_error(write)
+            return UpsertedOrder(order=order, participant_count=self._add_to_active_count(run_uuid, delta))
+
+        row = self._session.execute(
+            counted_upsert_statement(upsert, run_uuid, delta), execution_options=REFRESH
+        ).first()
+        if row is None:
+            raise conflict_error(write)
+        count = int(row[1])
+        sync_loaded(self._session, Run, run_uuid, active_order_count=count)
+        return UpsertedOrder(order=row[0], participant_count=count)
+
+    def upsert_orders_with_counts(
+        self, writes: Sequence[OrderWrite], *, interned: bool = False
+    ) -> BulkUpsertedOrders:
+        """Multi-row variant of :meth:`upsert_order_with_count`.
+
+        Existing rows are read with one query, all orders are written with
+        one multi-row upsert, and each touched run's counter is moved once.
+        Writes whose row changed since the read are skipped and returned in
+        ``conflicts``. ``writes`` must not repeat a ``(run_id, user_id)`` pair.
+        """
+        if not writes:
+            return BulkUpsertedOrders(orders={}, participant_counts={})
+        run_ids = {write.run_id for write in writes}
+        observed = self._observe(run_ids, {write.user_id for write in writes})
+        if not interned:
+            self._catalog.intern([write.order_text for write in writes])
+        previous = {key: row.canceled_at for key, row in observed.items()}
+        dialect = self._session.get_bind().dialect.name
+
+        orders: dict[tuple[UUID, UUID], Order] = {}
+        if dialect not in ("postgresql", "sqlite"):
+            for write in writes:
+                orders[(write.run_id, write.user_id)] = self.upsert_order(
+                    run_id=write.run_id,
+                    user_id=write.user_id,
+                    order_text=write.order_text,
+                    confirm=write.confirm,
+                    provenance=write.provenance,
+                )
+            self._session.flush()
+            inserted_keys = set(orders) - set(previous)
+        else:
+            upsert = upsert_statement(
+                dialect, writes, {key: row.version for key, row in observed.items()}, self._clock()
+            )
+            returned = self._session.scalars(upsert.returning(Order), execution_options=REFRESH).all()
+            inserted_keys = {(order.run_id, order.user_id) for order in returned} - set(previous)
+            orders = {(order.run_id, order.user_id): order for order in returned}
+
+        deltas = activation_deltas(run_ids, orders, inserted_keys, previous)
+        counts = {run_id: self._add_to_active_count(run_id, delta) for run_id, delta in deltas.items()}
+        return BulkUpsertedOrders(orders=orders, participant_counts=counts, conflicts=unwritten(writes, orders))
+
+    def active_participants(self, run_ids: Iterable[UUID]) -> dict[UUID, set[UUID]]:
+        """Returns the users holding an active order in each run.
+
+        The runs' rows are locked (``FOR UPDATE OF runs``) so concurrent
+        capacity checks on the same run serialize instead of both admitting
+        the last free slot.
+        """
+        ids = set(run_ids)
+        if not ids:
+            return {}
+        return participants_by_run(ids, self._session.execute(active_participants_statement(ids)))
+
+    def cancel_order_with_count(
+        self, *, run_id: str | UUID, user_id: str | UUID
+    ) -> CanceledOrder | None:
+        """Cancels the user's active order and decrements ``runs.active_order_count``.
+
+        Returns None when the user has no active order. The ``canceled_at IS
+        NULL`` guard is re-checked under the row lock, so concurrent cancels
+        decrement once. The cancel bumps ``version`` so a concurrent edit that
+        read the order as active fails its compare-and-swap instead of
+        reviving it without moving the counter.
+        """
+        run_uuid = as_uuid(run_id)
+        now = self._clock()
+        canceled = cancel_statement(run_uuid, as_uuid(user_id), now)
+
+        if self._session.get_bind().dialect.name == "postgresql":
+            row = self._session.execute(counted_cancel_statement(canceled, run_uuid)).first()
+            if row is None:
+                return None
+            order_id, version, count = row[0], row[1], int(row[2])
+            sync_loaded(self._session, Run, run_uuid, active_order_count=count)
+        else:
+            row = self._session.execute(canceled).first()
+            if row is None:
+                return None
+            order_id, version = row
+            count = self._add_to_active_count(run_uuid, -1)
+
+        sync_loaded(self._session, Order, order_id, canceled_at=now, updated_at=now, version=version)
+        return CanceledOrder(order_id=order_id, participant_count=count)
+
+    def _observe(self, run_ids: Iterable[UUID], user_ids: Iterable[UUID]) -> dict[tuple[UUID, UUID], Row]:
+        """Reads ``canceled_at`` and ``version`` of the existing orders, without locking them."""
+        return observed_by_key(self._session.execute(observe_statement(run_ids, user_ids)))
+
+    def _add_to_active_count(self, run_id: UUID, delta: int) -> int:
+        count = self._session.execute(add_to_active_count_statement(run_id, delta)).scalar_one()
+        sync_loaded(self._session, Run, run_id, active_order_count=count)
+        return int(count)
+
     def get_order(self, *, run_id: str | UUID, user_id: str | UUID) -> Order | None:
         stmt = select(Order).where(
-            Order.run_id == self._as_uuid(run_id),
-            Order.user_id == self._as_uuid(user_id),
+            Order.run_id == as_uuid(run_id),
+            Order.user_id == as_uuid(user_id),
         )
         return self._session.scalar(stmt)
 
@@ -70,16 +294,10 @@ class OrderRepository:
     def count_active_orders(self, *, run_id: str | UUID) -> int:
         stmt = (
             select(func.count(Order.id))
-            .where(Order.run_id == self._as_uuid(run_id), Order.canceled_at.is_(None))
+            .where(Order.run_id == as_uuid(run_id), Order.canceled_at.is_(None))
         )
         return int(self._session.scalar(stmt) or 0)
 
-    @staticmethod
-    def _as_uuid(value: str | UUID) -> UUID:
-        if isinstance(value, UUID):
-            return value
-        return UUID(value)
-
 
 class RunRepository:
     """Lookup helpers for run metadata."""
@@ -88,39 +306,61 @@ class RunRepository:
         self._session = session
 
     def get(self, run_id: str | UUID) -> Run:
-        stmt = select(Run).where(Run.id == self._as_uuid(run_id))
+        stmt = select(Run).where(Run.id == as_uuid(run_id))
         run = self._session.scalar(stmt)
         if not run:
             raise RunNotFoundError(f"Run {run_id} was not found.")
         return run
 
+    def get_many(self, run_ids: Iterable[UUID]) -> dict[UUID, Run]:
+        ids = set(run_ids)
+        if not ids:
+            return {}
+        return {run.id: run for run in self._session.scalars(select(Run).where(Run.id.in_(ids)))}
+
     def get_open_run(self, run_id: str | UUID) -> Run:
-        run = self.get(run_id)
-        if run.status != RunStatus.OPEN:
-            raise RunNotOpenError(f"Run {run_id} is not open for orders.")
-        return run
+        return ensure_open(self.get(run_id), run_id)
+
+    def get_open_run_with_user(self, run_id: str | UUID, user_id: str | UUID) -> tuple[Run, User]:
+        """Validates the run and the user with one statement.
 
-    @staticmethod
-    def _as_uuid(value: str | UUID) -> UUID:
-        if isinstance(value, UUID):
-            return value
-        return UUID(value)
+        The user is outer-joined on its id, so a missing user still returns
+        the run row and the errors match :meth:`get_open_run` followed by
+        :meth:`UserRepository.get`.
+        """
+        row = self._session.execute(
+            run_with_user_statement(as_uuid(run_id), as_uuid(user_id))
+        ).first()
+        return open_run_with_user(row, run_id, user_id)
 
 
 class UserRepository:
-    """Lookup helpers for Slack users."""
+    """Lookup helpers for Slack users, served from ``identity_cache`` when given."""
 
-    def __init__(self, session: Session) -> None:
+    def __init__(self, session: Session, *, identity_cache: IdentityCache | None = None) -> None:
         self._session = session
+        self._identity_cache = identity_cache
 
     def get(self, user_id: str | UUID) -> User:
-        user = self._session.get(User, self._as_uuid(user_id))
+        if self._identity_cache is not None:
+            user = self._identity_cache.get_user(self._session, as_uuid(user_id))
+        else:
+            user = self._session.get(User, as_uuid(user_id))
         if not user:
             raise UserNotFoundError(f"User {user_id} does not exist.")
         return user
 
-    @staticmethod
-    def _as_uuid(value: str | UUID) -> UUID:
-        if isinstance(value, UUID):
-            return value
-        return UUID(value)
\ No newline at end of file
+    def get_by_slack_id(self, slack_user_id: str) -> User:
+        if self._identity_cache is not None:
+            user = self._identity_cache.get_user_by_slack_id(self._session, slack_user_id)
+        else:
+            user = self._session.scalar(select(User).where(User.slack_user_id == slack_user_id))
+        if not user:
+            raise UserNotFoundError(f"Slack user {slack_user_id} is not registered with CoffeeBuddy.")
+        return user
+
+    def get_many(self, user_ids: Iterable[UUID]) -> dict[UUID, User]:
+        ids = set(user_ids)
+        if not ids:
+            return {}
+        return {user.id: user for user in self._session.scalars(select(User).where(User.id.in_(ids)))}
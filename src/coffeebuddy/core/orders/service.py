@@ -1,19 +1,16 @@
 from __future__ import annotations
 
+from collections.abc import Sequence
 from datetime import datetime, timezone
-from typing import Callable
+from typing import Callable, TypeVar
+from uuid import UUID
 
 from sqlalchemy.orm import Session
 
-from coffeebuddy.core.orders.exceptions import (
-    OrderNotFoundError,
-    OrderValidationError,
-    PreferenceNotFoundError,
-    RunNotFoundError,
-    RunNotOpenError,
-    UserNotFoundError,
-)
+from coffeebuddy.core.orders.exceptions import OrderConflictError, OrderError, OrderValidationError
+from coffeebuddy.core.orders.metrics import ORDER_WRITE_CONFLICTS_TOTAL
 from coffeebuddy.core.orders.models import (
+    BulkOrderSubmissionResult,
     Clock,
     OrderCancellationResult,
     OrderProvenance,
@@ -21,13 +18,42 @@ from coffeebuddy.core.orders.models import (
     OrderSubmissionResult,
     UseLastOrderResult,
 )
-from coffeebuddy.core.orders.repository import (
-    OrderRepository,
-    RunRepository,
-    UserRepository,
+from coffeebuddy.core.orders.planning import (
+    accept_requests,
+    bulk_result,
+    cancellation_result,
+    confirmed_preferences,
+    fail_pending,
+    has_capacity,
+    merge_upserted,
+    no_preference,
+    plan_writes,
+    retry_or_raise,
+    run_full_error,
+    submission_result,
 )
-from coffeebuddy.infra.db.models import Run, User
-from coffeebuddy.services.preferences import PreferenceService
+from coffeebuddy.core.orders.repository import OrderRepository, OrderWrite, RunRepository, UserRepository
+from coffeebuddy.infra.db.identity import IdentityCache
+from coffeebuddy.infra.db.query_budget import QueryBudget
+from coffeebuddy.infra.db.models import Order, Run, User
+from coffeebuddy.services.preferences import PreferenceCache, PreferenceConflictError, PreferenceService
+
+T = TypeVar("T")
+
+# Most statements one uncontended call may issue, on any supported dialect.
+# Each retry after a version conflict repeats the write statements. The
+# preference write is a compare-and-swap UPDATE or, on a user's first
+# confirm in a channel, an INSERT flushed before the call returns.
+ORDER_QUERY_BUDGETS: dict[str, int] = {
+    # Run and user (two statements on an identity cache miss), capacity
+    # check, version read, catalog intern, upsert, counter bump (SQLite
+    # only), preference read and write.
+    "orders.submit_order": 9,
+    # As submit_order, plus the preference lookup and ``mark_used``.
+    "orders.use_last_order": 11,
+    # Run and user, cancel, counter bump (SQLite only).
+    "orders.cancel_order": 4,
+}
 
 
 class OrderValidator:
@@ -48,7 +74,17 @@ class OrderValidator:
 
 
 class OrderService:
-    """Provides core order capture, edits, preference reuse and cancellation."""
+    """Provides core order capture, edits, preference reuse and cancellation.
+
+    Order and preference writes are optimistic: each one is a compare-and-swap
+    on the row's ``version``. A write that loses a race with a concurrent
+    click is re-read and retried, up to ``max_write_attempts`` in total,
+    before :class:`OrderConflictError` is raised.
+
+    Every public call is measured against ``query_budget`` (by default
+    :data:`ORDER_QUERY_BUDGETS`). Without an identity cache the run and the
+    user are validated with one joined lookup.
+    """
 
     def __init__(
         self,
@@ -58,8 +94,15 @@ class OrderService:
         validator: OrderValidator | None = None,
         preference_service: PreferenceService | None = None,
         order_repository_factory: Callable[[Session], OrderRepository] | None = None,
+        preference_cache: PreferenceCache | None = None,
+        identity_cache: IdentityCache | None = None,
+        max_write_attempts: int = 3,
+        query_budget: QueryBudget | None = None,
     ) -> None:
+        if max_write_attempts < 1:
+            raise ValueError("max_write_attempts must be at least 1.")
         self._session = session
+        self._max_write_attempts = max_write_attempts
         self._clock = clock or (lambda: datetime.now(timezone.utc))
         self._validator = validator or OrderValidator()
         self._orders = (
@@ -68,38 +111,77 @@ class OrderService:
             else OrderRepository(session, clock=self._clock)
         )
         self._runs = RunRepository(session)
-        self._users = UserRepository(session)
+        self._users = UserRepository(session, identity_cache=identity_cache)
+        self._identity_cache = identity_cache
+        self._budget = query_budget or QueryBudget(ORDER_QUERY_BUDGETS)
         self._preferences = preference_service or PreferenceService(
-            session, clock=self._clock
+            session, clock=self._clock, cache=preference_cache
         )
 
     def submit_order(self, request: OrderSubmissionRequest) -> OrderSubmissionResult:
-        try:
-            run = self._runs.get_open_run(request.run_id)
-        except RunNotFoundError:
-            raise
-        except RunNotOpenError:
-            raise
-        user = self._users.get(request.user_id)
-        normalized = self._validator.validate(request.order_text)
-        return self._persist_order(
-            run=run,
-            user=user,
-            order_text=normalized,
-            confirm=request.confirm,
-            provenance=request.provenance,
+        with self._budget.track(self._session, "orders.submit_order"):
+            run, user = self._open_run_and_user(request.run_id, request.user_id)
+            normalized = self._validator.validate(request.order_text)
+            result = self._with_retries(
+                lambda interned: self._persist_order(
+                    run=run,
+                    user=user,
+                    order_text=normalized,
+                    confirm=request.confirm,
+                    provenance=request.provenance,
+                    interned=interned,
+                )
+            )
+            # A first confirm adds the preference row; flushing it here
+            # counts its INSERT against the budget.
+            self._session.flush()
+            return result
+
+    def submit_orders(
+        self, requests: Sequence[OrderSubmissionRequest]
+    ) -> BulkOrderSubmissionResult:
+        """Submits many orders with a fixed number of queries.
+
+        Each request is validated on its own and failures are reported per
+        item without blocking the rest. Runs and users are loaded with one
+        ``IN`` query each; orders and preferences are written with multi-row
+        upserts. A repeated run/user pair in the batch is rejected.
+
+        The statement count grows with the number of distinct runs (one
+        counter update each), so this operation is measured but has no
+        budget.
+        """
+        with self._budget.track(self._session, "orders.submit_orders"):
+            return self._submit_orders(requests)
+
+    def _submit_orders(
+        self, requests: Sequence[OrderSubmissionRequest]
+    ) -> BulkOrderSubmissionResult:
+        errors: dict[int, OrderError] = {}
+        accepted = accept_requests(requests, self._validator, errors)
+        runs = self._runs.get_many(run_id for _, run_id, _, _ in accepted)
+        users = self._users.get_many(user_id for _, _, user_id, _ in accepted)
+        participants = self._orders.active_participants(
+            run.id for run in runs.values() if run.max_participants is not None
         )
+        writes = plan_writes(requests, accepted, runs, users, participants, errors)
+        orders, participant_counts = self._upsert_with_retries(writes, errors)
+        self._preferences.set_preferences(confirmed_preferences(writes, runs), interned=True)
+        return bulk_result(requests, writes, errors, orders, participant_counts)
 
     def use_last_order(self, *, run_id: str, user_id: str) -> UseLastOrderResult:
-        run = self._runs.get_open_run(run_id)
-        user = self._users.get(user_id)
+        with self._budget.track(self._session, "orders.use_last_order"):
+            run, user = self._open_run_and_user(run_id, user_id)
+            return self._with_retries(
+                lambda interned: self._use_preference(run=run, user=user, interned=interned)
+            )
+
+    def _use_preference(self, *, run: Run, user: User, interned: bool) -> UseLastOrderResult:
         preference = self._preferences.get_preference(
             user_id=user.id, channel_id=run.channel_id
         )
         if not preference:
-            raise PreferenceNotFoundError(
-                f"No saved order found for user {user_id} in this channel."
-            )
+            raise no_preference(user)
         normalized = self._validator.validate(preference.last_order_text)
         submission = self._persist_order(
             run=run,
@@ -107,6 +189,7 @@ class OrderService:
             order_text=normalized,
             confirm=True,
             provenance=OrderProvenance.PREFERENCE,
+            interned=interned,
         )
         self._preferences.mark_used(preference)
         return UseLastOrderResult(
@@ -115,19 +198,16 @@ class OrderService:
         )
 
     def cancel_order(self, *, run_id: str, user_id: str) -> OrderCancellationResult:
-        run = self._runs.get_open_run(run_id)
-        _ = self._users.get(user_id)
-        order = self._orders.get_order(run_id=run.id, user_id=user_id)
-        if not order or order.canceled_at is not None:
-            raise OrderNotFoundError(
-                f"No active order for user {user_id} in run {run_id}."
-            )
-        self._orders.cancel_order(order)
-        participant_count = self._orders.count_active_orders(run_id=run.id)
-        return OrderCancellationResult(
-            order_id=str(order.id),
-            participant_count=participant_count,
-        )
+        with self._budget.track(self._session, "orders.cancel_order"):
+            run, _ = self._open_run_and_user(run_id, user_id)
+            canceled = self._orders.cancel_order_with_count(run_id=run.id, user_id=user_id)
+        return cancellation_result(canceled, run_id, user_id)
+
+    def _open_run_and_user(self, run_id: str | UUID, user_id: str | UUID) -> tuple[Run, User]:
+        if self._identity_cache is not None:
+            # A cached user costs no statement, so only the run is read.
+            return self._runs.get_open_run(run_id), self._users.get(user_id)
+        return self._runs.get_open_run_with_user(run_id, user_id)
 
     def _persist_order(
         self,
@@ -137,27 +217,62 @@ class OrderService:
         order_text: str,
         confirm: bool,
         provenance: OrderProvenance,
+        interned: bool = False,
     ) -> OrderSubmissionResult:
-        order = self._orders.upsert_order(
+        if run.max_participants is not None:
+            participants = self._orders.active_participants([run.id])
+            if not has_capacity(run, user.id, participants):
+                raise run_full_error(run)
+        upserted = self._orders.upsert_order_with_count(
             run_id=run.id,
             user_id=user.id,
             order_text=order_text,
             confirm=confirm,
             provenance=provenance,
+            interned=interned,
         )
-        preference_updated = False
         if confirm:
             self._preferences.set_preference(
                 user_id=user.id,
                 channel_id=run.channel_id,
-                order_text=order.order_text,
+                order_text=upserted.order.order_text,
+                interned=True,
             )
-            preference_updated = True
-        participant_count = self._orders.count_active_orders(run_id=run.id)
-        return OrderSubmissionResult(
-            order_id=str(order.id),
-            participant_count=participant_count,
-            order_text=order.order_text,
-            provenance=provenance,
-            preference_updated=preference_updated,
-        )
\ No newline at end of file
+        return submission_result(upserted, provenance=provenance, preference_updated=confirm)
+
+    def _with_retries(self, write: Callable[[bool], T]) -> T:
+        """Runs ``write`` until it stops losing version checks or attempts run out.
+
+        ``write`` receives whether the order text is already interned, so
+        retries do not count the same order twice in the catalog.
+        """
+        attempt = 1
+        while True:
+            try:
+                return write(attempt > 1)
+            except (OrderConflictError, PreferenceConflictError) as exc:
+                retry_or_raise(attempt, self._max_write_attempts, exc)
+                attempt += 1
+
+    def _upsert_with_retries(
+        self, writes: dict[int, OrderWrite], errors: dict[int, OrderError]
+    ) -> tuple[dict[tuple[UUID, UUID], Order], dict[UUID, int]]:
+        """Bulk counterpart of :meth:`_with_retries`: only conflicting writes are retried.
+
+        Writes still conflicting after the last attempt are moved from
+        ``writes`` to ``errors``.
+        """
+        orders: dict[tuple[UUID, UUID], Order] = {}
+        participant_counts: dict[UUID, int] = {}
+        pending = list(writes.items())
+        for attempt in range(1, self._max_write_attempts + 1):
+            upserted = self._orders.upsert_orders_with_counts(
+                [write for _, write in pending], interned=attempt > 1
+            )
+            pending = merge_upserted(upserted, pending, orders, participant_counts)
+            if not pending:
+                break
+            if attempt < self._max_write_attempts:
+                ORDER_WRITE_CONFLICTS_TOTAL.labels(outcome="retried").inc(len(pending))
+        fail_pending(pending, writes, errors)
+        return orders, participant_counts
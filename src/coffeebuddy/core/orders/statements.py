@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import TYPE_CHECKING, Iterable, Sequence
+from uuid import UUID, uuid4
+
+from sqlalchemy import Row, and_, exists, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
+
+from coffeebuddy.core.orders.exceptions import (
+    OrderConflictError,
+    RunNotFoundError,
+    RunNotOpenError,
+    UserNotFoundError,
+)
+from coffeebuddy.infra.db.models import Order, Run, RunStatus, User
+from coffeebuddy.services.catalog import catalog_hash
+
+if TYPE_CHECKING:
+    from coffeebuddy.core.orders.repository import OrderWrite
+
+
+# populate_existing refreshes an Order already in the identity map.
+REFRESH = {"populate_existing": True}
+
+
+def conflict_error(write: OrderWrite) -> OrderConflictError:
+    return OrderConflictError(
+        f"Order for user {write.user_id} in run {write.run_id} changed while it was being written."
+    )
+
+
+def unwritten(
+    writes: Sequence[OrderWrite], orders: dict[tuple[UUID, UUID], Order]
+) -> tuple[OrderWrite, ...]:
+    return tuple(write for write in writes if (write.run_id, write.user_id) not in orders)
+
+
+def observe_statement(run_ids: Iterable[UUID], user_ids: Iterable[UUID]):
+    return select(Order.run_id, Order.user_id, Order.canceled_at, Order.version).where(
+        Order.run_id.in_(set(run_ids)), Order.user_id.in_(set(user_ids))
+    )
+
+
+def observed_by_key(rows: Iterable[Row]) -> dict[tuple[UUID, UUID], Row]:
+    return {(row.run_id, row.user_id): row for row in rows}
+
+
+def upsert_statement(
+    dialect: str, writes: Sequence[OrderWrite], versions: dict[tuple[UUID, UUID], int], now: datetime
+):
+    """Builds the compare-and-swap upsert for ``writes``.
+
+    Each row carries the version it should end up with: one past the
+    version read in ``versions``, or 1 for an order that did not exist.
+    A conflicting row is only updated if it is still one version behind,
+    so a row that was inserted or edited concurrently is left alone and
+    missing from ``RETURNING``.
+    """
+    insert = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(Order).values(
+        [
+            {
+                "id": uuid4(),
+                "run_id": write.run_id,
+                "user_id": write.user_id,
+                "order_text": write.order_text,
+                "catalog_hash": catalog_hash(write.order_text),
+                "is_final": write.confirm,
+                "provenance": write.provenance.value,
+                "canceled_at": None,
+                "version": versions.get((write.run_id, write.user_id), 0) + 1,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for write in writes
+        ]
+    )
+    orders = Order.__table__
+    return insert.on_conflict_do_update(
+        index_elements=[Order.run_id, Order.user_id],
+        set_={
+            "order_text": insert.excluded.order_text,
+            "catalog_hash": insert.excluded.catalog_hash,
+            "is_final": insert.excluded.is_final,
+            "provenance": insert.excluded.provenance,
+            "canceled_at": None,
+            "updated_at": insert.excluded.updated_at,
+            "version": insert.excluded.version,
+        },
+        where=orders.c.version + 1 == insert.excluded.version,
+    )
+
+
+def counted_upsert_statement(upsert, run_id: UUID, delta: int):
+    """PostgreSQL: the upsert and the counter bump as one statement returning ``(Order, count)``."""
+    upserted = upsert.returning(*Order.__table__.c).cte("upserted")
+    runs = Run.__table__
+    bumped = (
+        update(runs)
+        .where(runs.c.id == run_id, exists(select(upserted.c.id)))
+        .values(active_order_count=runs.c.active_order_count + delta)
+        .returning(runs.c.active_order_count)
+        .cte("bumped")
+    )
+    return select(aliased(Order, upserted), bumped.c.active_order_count)
+
+
+def activation_deltas(
+    run_ids: Iterable[UUID],
+    orders: dict[tuple[UUID, UUID], Order],
+    inserted_keys: set[tuple[UUID, UUID]],
+    previous: dict[tuple[UUID, UUID], datetime | None],
+) -> dict[UUID, int]:
+    """Counts, per run, the written orders that became active: inserts and revived cancellations."""
+    deltas = dict.fromkeys(run_ids, 0)
+    for key in orders:
+        if key in inserted_keys or previous.get(key) is not None:
+            deltas[key[0]] += 1
+    return deltas
+
+
+def active_participants_statement(run_ids: set[UUID]):
+    return (
+        select(Run.id, Order.user_id)
+        .outerjoin(Order, and_(Order.run_id == Run.id, Order.canceled_at.is_(None)))
+        .where(Run.id.in_(run_ids))
+        .with_for_update(of=Run)
+    )
+
+
+def participants_by_run(run_ids: set[UUID], rows: Iterable[Row]) -> dict[UUID, set[UUID]]:
+    participants: dict[UUID, set[UUID]] = {run_id: set() for run_id in run_ids}
+    for run_id, user_id in rows:
+        if user_id is not None:
+            participants[run_id].add(user_id)
+    return participants
+
+
+def cancel_statement(run_id: UUID, user_id: UUID, now: datetime):
+    orders = Order.__table__
+    return (
+        update(orders)
+        .where(
+            orders.c.run_id == run_id,
+            orders.c.user_id == user_id,
+            orders.c.canceled_at.is_(None),
+        )
+        .values(canceled_at=now, updated_at=now, version=orders.c.version + 1)
+        .returning(orders.c.id, orders.c.version)
+    )
+
+
+def counted_cancel_statement(canceled, run_id: UUID):
+    """PostgreSQL: the cancel and the counter decrement as one statement returning ``(id, version, count)``."""
+    canceled_cte = canceled.cte("canceled")
+    runs = Run.__table__
+    bumped = (
+        update(runs)
+        .where(runs.c.id == run_id, exists(select(canceled_cte.c.id)))
+        .values(active_order_count=runs.c.active_order_count - 1)
+        .returning(runs.c.active_order_count)
+        .cte("bumped")
+    )
+    return select(canceled_cte.c.id, canceled_cte.c.version, bumped.c.active_order_count)
+
+
+def add_to_active_count_statement(run_id: UUID, delta: int):
+    runs = Run.__table__
+    return (
+        update(runs)
+        .where(runs.c.id == run_id)
+        .values(active_order_count=runs.c.active_order_count + delta)
+        .returning(runs.c.active_order_count)
+    )
+
+
+def sync_loaded(session: Session, entity: type, pk: UUID, **values: object) -> None:
+    """Mirrors a Core-level write onto the instance in the identity map, if loaded."""
+    instance = session.identity_map.get(identity_key(entity, pk))
+    if instance is not None:
+        for name, value in values.items():
+            set_committed_value(instance, name, value)
+
+
+def open_run_with_user(row: Row | None, run_id: str | UUID, user_id: str | UUID) -> tuple[Run, User]:
+    if row is None:
+        raise RunNotFoundError(f"Run {run_id} was not found.")
+    run, user = row
+    ensure_open(run, run_id)
+    if user is None:
+        raise UserNotFoundError(f"User {user_id} does not exist.")
+    return run, user
+
+
+def ensure_open(run: Run, run_id: str | UUID) -> Run:
+    if run.status != RunStatus.OPEN:
+        raise RunNotOpenError(f"Run {run_id} is not open for orders.")
+    return run
+
+
+def run_with_user_statement(run_id: UUID, user_id: UUID):
+    return select(Run, User).outerjoin(User, User.id == user_id).where(Run.id == run_id)
+
+
+def as_uuid(value: str | UUID) -> UUID:
+    if isinstance(value, UUID):
+        return value
+    return UUID(value)
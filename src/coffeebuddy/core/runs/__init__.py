@@ -1,6 +1,15 @@
 """Run lifecycle orchestration helpers."""
 
-from .models import CloseRunRequest, CloseRunResult, ParticipantOrder, RunSummary
+from .models import (
+    CloseRunRequest,
+    CloseRunResult,
+    OrderGroup,
+    ParticipantOrder,
+    RepeatRunRequest,
+    RepeatRunResult,
+    RunSummary,
+)
+from .repeat import RunRepeatService
 from .service import CloseRunAuthorizer, CloseRunService
 
 __all__ = [
@@ -8,6 +17,10 @@ __all__ = [
     "CloseRunRequest",
     "CloseRunResult",
     "CloseRunService",
+    "OrderGroup",
     "ParticipantOrder",
+    "RepeatRunRequest",
+    "RepeatRunResult",
+    "RunRepeatService",
     "RunSummary",
 ]
\ No newline at end of file
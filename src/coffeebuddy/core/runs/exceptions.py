@@ -18,4 +18,19 @@ class UnauthorizedRunCloseError(RunCloseError):
 
 
 class RunnerSelectionError(RunCloseError):
-    """Raised when a runner cannot be chosen according to fairness criteria."""
\ No newline at end of file
+    """Raised when a runner cannot be chosen according to fairness criteria."""
+
+
+class PreviousRunNotFoundError(RunCloseError):
+    """Raised when a channel has no closed run to repeat."""
+
+
+class ChannelUnavailableError(RunCloseError):
+    """Raised when a run cannot be opened because the channel is unknown or disabled."""
+
+
+class RunAlreadyOpenError(RunCloseError):
+    """Raised when a channel already has an open run."""
+
+class RunCloseInProgressError(RunCloseError):
+    """Raised when another transaction is closing the run or choosing a runner in its channel."""
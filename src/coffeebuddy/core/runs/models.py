@@ -19,11 +19,20 @@ class ParticipantOrder:
     """Snapshot of a participant order at run close."""
 
     user_id: str
+    slack_user_id: str
     display_name: str
     order_text: str
     provenance: str
 
 
+@dataclass(frozen=True, slots=True)
+class OrderGroup:
+    """Identical orders (after canonicalization) collapsed to one line."""
+
+    order_text: str
+    quantity: int
+
+
 @dataclass(frozen=True, slots=True)
 class RunSummary:
     """Aggregated view of the run suitable for Slack channel + DM payloads."""
@@ -32,6 +41,7 @@ class RunSummary:
     channel_id: str
     channel_name: str
     runner_user_id: str
+    runner_slack_user_id: str
     runner_display_name: str
     pickup_time: datetime | None
     pickup_note: str | None
@@ -41,6 +51,8 @@ class RunSummary:
     reminders_enabled: bool | None
     last_call_enabled: bool | None
     closed_at: datetime
+    pickup_timezone: str | None = None
+    grouped_orders: Tuple[OrderGroup, ...] = ()
 
 
 @dataclass(frozen=True, slots=True)
@@ -52,4 +64,24 @@ class CloseRunResult:
     runner_user_id: str
     closed_at: datetime
     summary: RunSummary
-    fairness_note: str
\ No newline at end of file
+    fairness_note: str
+
+
+@dataclass(frozen=True, slots=True)
+class RepeatRunRequest:
+    """Opens a new run in ``channel_id`` pre-filled with the previous run's orders."""
+
+    channel_id: str
+    initiator_user_id: str
+    pickup_time: datetime | None = None
+    pickup_note: str | None = None
+    exclude_user_ids: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True, slots=True)
+class RepeatRunResult:
+    """Outcome of cloning the previous run's orders into a new run."""
+
+    run_id: str
+    source_run_id: str
+    copied_orders: int
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from uuid import UUID, uuid4
+
+from sqlalchemy import false, insert, literal, null, select, update
+from sqlalchemy.orm import Session
+
+from coffeebuddy.core.orders.models import Clock, OrderProvenance
+from coffeebuddy.core.runs.exceptions import (
+    ChannelUnavailableError,
+    PreviousRunNotFoundError,
+    RunAlreadyOpenError,
+)
+from coffeebuddy.core.runs.models import RepeatRunRequest, RepeatRunResult
+from coffeebuddy.events.run import RunCreatedEvent
+from coffeebuddy.infra.db.models import Channel, Order, Run, RunStatus, User, UTCDateTime, UUIDType
+from coffeebuddy.infra.kafka.outbox import OutboxRunEventPublisher
+
+
+class RunRepeatService:
+    """Opens a run that starts with the orders of the channel's last closed run.
+
+    The channel row is locked first, so two repeats in one channel cannot
+    both pass the "no open run" check. On PostgreSQL the orders are copied
+    with a single ``INSERT ... SELECT``, which relies on the ``orders.id``
+    server default. Other dialects select the rows and insert them with ids
+    generated in Python. Copies are marked ``OrderProvenance.PREFERENCE``.
+    Inactive users are skipped, along with ``exclude_user_ids`` (people who
+    opted out of this repeat). ``run_created`` is staged in the outbox in the
+    same transaction.
+    """
+
+    def __init__(
+        self,
+        *,
+        session: Session,
+        clock: Clock | None = None,
+        event_publisher: OutboxRunEventPublisher | None = None,
+    ) -> None:
+        self._session = session
+        self._clock = clock or (lambda: datetime.now(timezone.utc))
+        self._events = event_publisher or OutboxRunEventPublisher(session, clock=self._clock)
+
+    def repeat_last_run(self, request: RepeatRunRequest) -> RepeatRunResult:
+        channel_id = _as_uuid(request.channel_id)
+        enabled = self._session.scalar(
+            select(Channel.enabled).where(Channel.id == channel_id).with_for_update()
+        )
+        if enabled is None:
+            raise ChannelUnavailableError(f"Channel {request.channel_id} is not registered.")
+        if not enabled:
+            raise ChannelUnavailableError(f"CoffeeBuddy is disabled in channel {request.channel_id}.")
+        open_run_id = self._session.scalar(
+            select(Run.id).where(Run.channel_id == channel_id, Run.status == RunStatus.OPEN.value).limit(1)
+        )
+        if open_run_id is not None:
+            raise RunAlreadyOpenError(f"Channel {request.channel_id} already has open run {open_run_id}.")
+
+        source_run_id = self._session.scalar(
+            select(Run.id)
+            .where(Run.channel_id == channel_id, Run.status == RunStatus.CLOSED.value)
+            .order_by(Run.closed_at.desc().nulls_last(), Run.started_at.desc())
+            .limit(1)
+        )
+        if source_run_id is None:
+            raise PreviousRunNotFoundError(f"Channel {request.channel_id} has no closed run to repeat.")
+
+        now = self._clock()
+        run = Run(
+            id=uuid4(),
+            channel_id=channel_id,
+            initiator_user_id=_as_uuid(request.initiator_user_id),
+            status=RunStatus.OPEN.value,
+            pickup_time=request.pickup_time,
+            pickup_note=request.pickup_note,
+            correlation_id=uuid4().hex,
+            started_at=now,
+            created_at=now,
+            updated_at=now,
+        )
+        self._session.add(run)
+        self._events.stage_run_created(
+            RunCreatedEvent(
+                run_id=str(run.id),
+                channel_id=str(channel_id),
+                initiator_user_id=str(run.initiator_user_id),
+                pickup_time=run.pickup_time.isoformat() if run.pickup_time else None,
+                pickup_note=run.pickup_note,
+                correlation_id=run.correlation_id,
+                created_at=now.isoformat(),
+            )
+        )
+        self._session.flush()
+
+        copied = self._copy_orders(source_run_id=source_run_id, run_id=run.id, request=request, now=now)
+        if copied:
+            self._session.execute(
+                update(Run)
+                .where(Run.id == run.id)
+                .values(active_order_count=copied)
+                .execution_options(synchronize_session=False)
+            )
+            self._session.expire(run, ["active_order_count"])
+
+        return RepeatRunResult(run_id=str(run.id), source_run_id=str(source_run_id), copied_orders=copied)
+
+    def _copy_orders(
+        self, *, source_run_id: UUID, run_id: UUID, request: RepeatRunRequest, now: datetime
+    ) -> int:
+        copy = {
+            "run_id": literal(run_id, UUIDType()),
+            "is_final": false(),
+            "provenance": literal(OrderProvenance.PREFERENCE.value),
+            "canceled_at": null(),
+            "created_at": literal(now, UTCDateTime()),
+            "updated_at": literal(now, UTCDateTime()),
+        }
+        source = (
+            select(Order.user_id, Order.order_text, Order.catalog_hash)
+            .join(User, User.id == Order.user_id)
+            .where(
+                Order.run_id == source_run_id,
+                Order.canceled_at.is_(None),
+                User.is_active.is_(True),
+            )
+        )
+        excluded = [_as_uuid(user_id) for user_id in request.exclude_user_ids]
+        if excluded:
+            source = source.where(Order.user_id.not_in(excluded))
+
+        if self._session.get_bind().dialect.name == "postgresql":
+            # ``orders.id`` comes from the server default (uuid_generate_v4()).
+            result = self._session.execute(
+                insert(Order).from_select(
+                    ["user_id", "order_text", "catalog_hash", *copy], source.add_columns(*copy.values())
+                )
+            )
+            return max(0, result.rowcount or 0)
+
+        rows = [
+            {
+                "id": uuid4(),
+                "run_id": run_id,
+                "user_id": user_id,
+                "order_text": order_text,
+                "catalog_hash": text_hash,
+                "is_final": False,
+                "provenance": OrderProvenance.PREFERENCE.value,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for user_id, order_text, text_hash in self._session.execute(source)
+        ]
+        if rows:
+            self._session.execute(insert(Order), rows)
+        return len(rows)
+
+
+def _as_uuid(value: str | UUID) -> UUID:
+    if isinstance(value, UUID):
+        return value
+    return UUID(value)
+
+
+__all__ = ["RunRepeatService"]
@@ -1,14 +1,17 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Protocol
+from typing import TYPE_CHECKING, Protocol
 from uuid import UUID
 
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, func, select, true, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, aliased
 
 from coffeebuddy.core.orders.models import Clock
 from coffeebuddy.core.runs.exceptions import (
+    RunCloseInProgressError,
     RunNotFoundError,
     RunNotOpenError,
     RunnerSelectionError,
@@ -17,11 +20,17 @@ from coffeebuddy.core.runs.exceptions import (
 from coffeebuddy.core.runs.models import (
     CloseRunRequest,
     CloseRunResult,
+    OrderGroup,
     ParticipantOrder,
     RunSummary,
 )
-from coffeebuddy.infra.db.models import Channel, Order, Run, RunStatus, User
-from coffeebuddy.services.fairness.service import FairnessService
+from coffeebuddy.infra.db.identity import IdentityCache
+from coffeebuddy.infra.db.models import Channel, Order, OrderCatalogEntry, Run, RunStatus, User
+from coffeebuddy.infra.db.query_budget import QueryBudget
+
+if TYPE_CHECKING:
+    # Annotation only: fairness.service imports core.runs.exceptions.
+    from coffeebuddy.services.fairness.service import FairnessService
 
 
 class CloseRunAuthorizer(Protocol):
@@ -31,8 +40,56 @@ class CloseRunAuthorizer(Protocol):
         """Return True when the actor can close the run."""
 
 
+# Most statements one uncontended close may issue, whatever the number of
+# participants: the run read and the channel (on an identity cache miss);
+# the conditional open-to-closed update; the channel's advisory lock
+# (PostgreSQL), the fairness ring, index hydration, new participants' stats
+# and the chosen runner's stats; the flush of the run's runner, of new and
+# updated runner stats and of the ring slot; and the bulk order finalize.
+RUN_QUERY_BUDGETS: dict[str, int] = {
+    "runs.close_run": 13,
+}
+
+# PostgreSQL's lock_not_available, raised by FOR UPDATE NOWAIT.
+_LOCK_NOT_AVAILABLE = "55P03"
+
+
+@dataclass(frozen=True, slots=True)
+class _ActiveOrder:
+    user_id: UUID
+    slack_user_id: str
+    display_name: str
+    order_text: str
+    provenance: str
+    canonical_text: str | None
+    quantity: int | None
+
+
+@dataclass(frozen=True, slots=True)
+class _CloseState:
+    run: Run
+    channel: Channel | None
+    previous_runner_id: UUID | None
+    orders: list[_ActiveOrder]
+
+
 class CloseRunService:
-    """Coordinates validation, fairness, and summary generation for run closing."""
+    """Coordinates validation, fairness, and summary generation for run closing.
+
+    The run, its channel, the previous runner and the active orders with
+    their users, catalog entries and per-entry quantities are read in one
+    statement, and the
+    orders are finalized with one bulk UPDATE, so a close issues the same
+    number of statements (see :data:`RUN_QUERY_BUDGETS`) for any number of
+    participants.
+
+    On PostgreSQL concurrent closes never wait on each other: the run row is
+    read ``FOR UPDATE NOWAIT`` and the runner is chosen under the channel's
+    advisory lock. On any database the run only moves to closed if it is
+    still open, so every close but one fails with
+    :class:`RunCloseInProgressError` (or :class:`RunNotOpenError` once the
+    winner has committed).
+    """
 
     def __init__(
         self,
@@ -41,14 +98,23 @@ class CloseRunService:
         fairness: FairnessService,
         authorizer: CloseRunAuthorizer,
         clock: Clock | None = None,
+        identity_cache: IdentityCache | None = None,
+        query_budget: QueryBudget | None = None,
     ) -> None:
         self._session = session
         self._fairness = fairness
         self._authorizer = authorizer
         self._clock = clock or (lambda: datetime.now(timezone.utc))
+        self._identity_cache = identity_cache
+        self._budget = query_budget or QueryBudget(RUN_QUERY_BUDGETS)
 
     def close_run(self, request: CloseRunRequest) -> CloseRunResult:
-        run = self._get_run(request.run_id)
+        with self._budget.track(self._session, "runs.close_run"):
+            return self._close_run(request)
+
+    def _close_run(self, request: CloseRunRequest) -> CloseRunResult:
+        state = self._load_close_state(request.run_id)
+        run = state.run
         if run.status != RunStatus.OPEN:
             raise RunNotOpenError(f"Run {request.run_id} is not open.")
         if not self._authorizer.is_authorized(run=run, actor_user_id=request.actor_user_id):
@@ -56,39 +122,64 @@ class CloseRunService:
                 f"Actor {request.actor_user_id} is not allowed to close run {request.run_id}."
             )
 
-        channel = self._get_channel(run.channel_id)
-        orders = self._load_active_orders(run.id)
+        channel = state.channel or self._get_channel(run.channel_id)
+        orders = state.orders
         if not orders:
             raise RunnerSelectionError("Cannot close run without active participant orders.")
 
-        last_runner_id = self._get_previous_runner_id(run)
+        excluded = set(run.excluded_runner_slack_ids or ())
+        candidates = [str(active.user_id) for active in orders if active.slack_user_id not in excluded]
+        if not candidates:
+            raise RunnerSelectionError("Every participant is excluded from running this run.")
+
+        now = self._clock()
+        # The close's first write, ahead of the runner stats and ring: on
+        # SQLite a racing close waits here for the winner to commit and then
+        # fails, instead of writing stats it read before the winner's.
+        self._claim_run(run=run, closed_at=now)
+
+        last_runner_id = str(state.previous_runner_id) if state.previous_runner_id else None
         decision = self._fairness.assign_runner(
             channel_id=str(channel.id),
-            participant_user_ids=[str(order.user_id) for order, _ in orders],
+            participant_user_ids=candidates,
             last_runner_id=last_runner_id,
             allow_immediate_repeat=request.allow_immediate_repeat,
+            window_runs=channel.fairness_window_runs,
         )
 
         runner_uuid = _as_uuid(decision.runner_user_id)
-        runner = self._session.get(User, runner_uuid)
+        runner = next((active for active in orders if active.user_id == runner_uuid), None)
         if runner is None:
             raise RunnerSelectionError(
                 f"Runner {decision.runner_user_id} missing from persistence during close."
             )
 
-        now = self._clock()
-        self._finalize_run(run=run, runner_id=runner_uuid, closed_at=now)
-        participants = self._snapshot_orders(orders=orders, snapshot_at=now)
+        run.runner_user_id = runner_uuid
+        self._session.flush()
+        self._finalize_orders(run_id=run.id, finalized_at=now)
+        participants = [
+            ParticipantOrder(
+                user_id=str(active.user_id),
+                slack_user_id=active.slack_user_id,
+                display_name=active.display_name,
+                order_text=active.order_text,
+                provenance=active.provenance,
+            )
+            for active in orders
+        ]
 
         summary = RunSummary(
             run_id=str(run.id),
             channel_id=str(channel.id),
             channel_name=channel.name,
             runner_user_id=decision.runner_user_id,
+            runner_slack_user_id=runner.slack_user_id,
             runner_display_name=runner.display_name,
             pickup_time=run.pickup_time,
             pickup_note=run.pickup_note,
+            pickup_timezone=run.pickup_timezone,
             participants=tuple(participants),
+            grouped_orders=self._group_orders(orders),
             total_orders=len(participants),
             reminder_offset_minutes=channel.reminder_offset_minutes,
             reminders_enabled=channel.reminders_enabled,
@@ -105,69 +196,143 @@ class CloseRunService:
             fairness_note=decision.rationale,
         )
 
-    def _get_run(self, run_id: str) -> Run:
-        run = self._session.get(Run, _as_uuid(run_id))
-        if run is None:
+    def _load_close_state(self, run_id: str) -> _CloseState:
+        """Reads the run with everything closing it needs in one statement.
+
+        One row per active order (ordered for the summary), or a single row
+        with no order when there is none. Only the run and the channel are
+        loaded as entities; orders and users are plain columns, and each
+        order carries how many active orders share its catalog entry. The
+        channel is joined in unless the identity cache serves it. The run row
+        is locked ``NOWAIT`` (a no-op on SQLite), so a close racing another
+        one fails at once instead of holding a pooled connection while it
+        waits.
+        """
+        run_uuid = _as_uuid(run_id)
+        previous_runner = _previous_runner(run_uuid)
+        quantities = _order_quantities(run_uuid)
+        stmt = (
+            select(
+                Run,
+                previous_runner.c.runner_user_id,
+                Order.user_id,
+                User.slack_user_id,
+                User.display_name,
+                Order.order_text,
+                Order.provenance,
+                OrderCatalogEntry.canonical_text,
+                quantities.c.quantity,
+            )
+            .select_from(Run)
+            .outerjoin(previous_runner, true())
+            .outerjoin(Order, and_(Order.run_id == Run.id, Order.canceled_at.is_(None)))
+            .outerjoin(User, User.id == Order.user_id)
+            .outerjoin(OrderCatalogEntry, OrderCatalogEntry.text_hash == Order.catalog_hash)
+            .outerjoin(quantities, quantities.c.catalog_hash == Order.catalog_hash)
+            .where(Run.id == run_uuid)
+            .order_by(User.display_name.asc(), User.id.asc())
+            .with_for_update(nowait=True, of=Run)
+        )
+        if self._identity_cache is None:
+            stmt = stmt.add_columns(Channel).join_from(Run, Channel, Channel.id == Run.channel_id)
+        try:
+            rows = self._session.execute(stmt).all()
+        except OperationalError as exc:
+            if _sqlstate(exc) == _LOCK_NOT_AVAILABLE:
+                raise RunCloseInProgressError(f"Run {run_id} is already being closed.") from exc
+            raise
+        if not rows:
             raise RunNotFoundError(f"Run {run_id} not found.")
-        return run
+        first = rows[0]
+        return _CloseState(
+            run=first[0],
+            channel=first[9] if self._identity_cache is None else None,
+            previous_runner_id=first[1],
+            orders=[_ActiveOrder(*row[2:9]) for row in rows if row[2] is not None],
+        )
 
     def _get_channel(self, channel_id: UUID) -> Channel:
-        channel = self._session.get(Channel, channel_id)
+        if self._identity_cache is not None:
+            channel = self._identity_cache.get_channel(self._session, channel_id)
+        else:
+            channel = self._session.get(Channel, channel_id)
         if channel is None:
             raise RunNotFoundError(f"Channel {channel_id} missing for run close.")
         return channel
 
-    def _load_active_orders(self, run_id: UUID) -> list[tuple[Order, User]]:
-        stmt = (
-            select(Order, User)
-            .join(User, User.id == Order.user_id)
-            .where(
-                Order.run_id == run_id,
-                Order.canceled_at.is_(None),
-            )
-            .order_by(User.display_name.asc(), User.id.asc())
+    def _finalize_orders(self, *, run_id: UUID, finalized_at: datetime) -> None:
+        """Marks every active order final with one UPDATE, bumping its version.
+
+        The version bump makes a concurrent compare-and-swap write on one of
+        these orders fail instead of editing a finalized order.
+        """
+        self._session.execute(
+            update(Order)
+            .where(Order.run_id == run_id, Order.canceled_at.is_(None))
+            .values(is_final=True, updated_at=finalized_at, version=Order.version + 1),
+            execution_options={"synchronize_session": "evaluate"},
         )
-        rows = self._session.execute(stmt).all()
-        return [(row[0], row[1]) for row in rows]
-
-    def _snapshot_orders(
-        self, *, orders: list[tuple[Order, User]], snapshot_at: datetime
-    ) -> list[ParticipantOrder]:
-        participants: list[ParticipantOrder] = []
-        for order, user in orders:
-            order.is_final = True
-            order.updated_at = snapshot_at
-            participants.append(
-                ParticipantOrder(
-                    user_id=str(order.user_id),
-                    display_name=user.display_name,
-                    order_text=order.order_text,
-                    provenance=order.provenance,
-                )
-            )
-        return participants
 
-    def _finalize_run(self, *, run: Run, runner_id: UUID, closed_at: datetime) -> None:
-        run.runner_user_id = runner_id
-        run.status = RunStatus.CLOSED
-        run.closed_at = closed_at
-        run.updated_at = closed_at
+    def _group_orders(self, orders: list[_ActiveOrder]) -> tuple[OrderGroup, ...]:
+        """The catalog entries of the active orders with their counted quantities, most ordered first."""
+        quantities = {
+            active.canonical_text: active.quantity for active in orders if active.canonical_text is not None
+        }
+        ranked = sorted(quantities.items(), key=lambda item: (-item[1], item[0]))
+        return tuple(OrderGroup(order_text=text, quantity=count) for text, count in ranked)
 
-    def _get_previous_runner_id(self, run: Run) -> str | None:
-        stmt = (
-            select(Run.runner_user_id)
-            .where(
-                Run.channel_id == run.channel_id,
-                Run.status == RunStatus.CLOSED,
-                Run.closed_at.is_not(None),
-                Run.id != run.id,
-                Run.runner_user_id.is_not(None),
-            )
-            .order_by(Run.closed_at.desc())
-            .limit(1)
+    def _claim_run(self, *, run: Run, closed_at: datetime) -> None:
+        """Closes the run only if it is still open in the database.
+
+        Of two closes that both read the run as open, only one matches; the
+        other raises :class:`RunCloseInProgressError`.
+        """
+        result = self._session.execute(
+            update(Run)
+            .where(Run.id == run.id, Run.status == RunStatus.OPEN)
+            .values(status=RunStatus.CLOSED, closed_at=closed_at, updated_at=closed_at),
+            execution_options={"synchronize_session": "evaluate"},
         )
-        result = self._session.scalars(stmt).first()
-        return str(result) if result else None
+        if result.rowcount != 1:
+            raise RunCloseInProgressError(f"Run {run.id} was closed by another request.")
+
+
+def _previous_runner(run_id: UUID):
+    """CTE with the runner of the most recent other closed run in ``run_id``'s channel."""
+    previous = aliased(Run)
+    channel_id = select(Run.channel_id).where(Run.id == run_id).scalar_subquery()
+    return (
+        select(previous.runner_user_id)
+        .where(
+            previous.channel_id == channel_id,
+            previous.status == RunStatus.CLOSED,
+            previous.closed_at.is_not(None),
+            previous.id != run_id,
+            previous.runner_user_id.is_not(None),
+        )
+        .order_by(previous.closed_at.desc())
+        .limit(1)
+        .cte("previous_runner")
+    )
+
+
+def _order_quantities(run_id: UUID):
+    """CTE counting ``run_id``'s active orders per catalog entry.
+
+    Joined rather than computed as a window over the read: PostgreSQL does
+    not allow window functions or ``GROUP BY`` next to ``FOR UPDATE``.
+    """
+    return (
+        select(Order.catalog_hash, func.count().label("quantity"))
+        .where(Order.run_id == run_id, Order.canceled_at.is_(None))
+        .group_by(Order.catalog_hash)
+        .cte("order_quantities")
+    )
+
+
+def _sqlstate(exc: OperationalError) -> str | None:
+    """SQLSTATE of a driver error (psycopg exposes ``sqlstate``, psycopg2 ``pgcode``)."""
+    return getattr(exc.orig, "sqlstate", None) or getattr(exc.orig, "pgcode", None)
 
 
 def _as_uuid(value: str | UUID) -> UUID:
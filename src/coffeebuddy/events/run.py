@@ -19,5 +19,5 @@ class RunCreatedEvent:
 
 
 class RunEventPublisher(Protocol):
-    def publish_run_created(self, event: RunCreatedEvent) -> None:
+    async def publish_run_created(self, event: RunCreatedEvent) -> None:
         ...
\ No newline at end of file
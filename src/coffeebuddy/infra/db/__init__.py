@@ -1,14 +1,23 @@
 """Database session factory and ORM models for CoffeeBuddy."""
 
-from .session import DatabaseConfig, DbCredentials, create_session_factory
+from .session import (
+    DatabaseConfig,
+    DbCredentials,
+    create_async_session_factory,
+    create_session_factory,
+)
+from .hooks import after_commit, has_pending_write
+from .identity import IdentityCache
 from .models import (
     Base,
     Channel,
     ChannelAdminAction,
     Order,
+    OutboxEvent,
     Run,
     RunStatus,
     RunnerStat,
+    SlackIdempotencyKey,
     User,
     UserPreference,
 )
@@ -19,11 +28,17 @@ __all__ = [
     "ChannelAdminAction",
     "DatabaseConfig",
     "DbCredentials",
+    "IdentityCache",
     "Order",
+    "OutboxEvent",
     "Run",
     "RunStatus",
     "RunnerStat",
+    "SlackIdempotencyKey",
     "User",
     "UserPreference",
+    "after_commit",
+    "create_async_session_factory",
     "create_session_factory",
+    "has_pending_write",
 ]
\ No newline at end of file
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Hashable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+_SESSION_INFO_KEY = "coffeebuddy.after_commit"
+
+
+class _SessionWrites:
+    __slots__ = ("keys", "actions")
+
+    def __init__(self) -> None:
+        self.keys: set[Hashable] = set()
+        self.actions: list[Callable[[], None]] = []
+
+    def run(self, _session: Session) -> None:
+        actions, self.actions = self.actions, []
+        self.keys.clear()
+        for action in actions:
+            action()
+
+    def discard(self, _session: Session) -> None:
+        self.actions.clear()
+        self.keys.clear()
+
+
+def _session_writes(session: Session) -> _SessionWrites:
+    writes = session.info.get(_SESSION_INFO_KEY)
+    if writes is None:
+        writes = session.info[_SESSION_INFO_KEY] = _SessionWrites()
+        event.listen(session, "after_commit", writes.run)
+        event.listen(session, "after_rollback", writes.discard)
+    return writes
+
+
+def after_commit(session: Session, action: Callable[[], None], *, key: Hashable | None = None) -> None:
+    """Runs ``action`` once ``session`` commits; dropped if it rolls back.
+
+    ``key`` marks a row written in this transaction so reads in the same
+    session do not copy uncommitted state into a process-wide cache.
+    """
+    writes = _session_writes(session)
+    writes.actions.append(action)
+    if key is not None:
+        writes.keys.add(key)
+
+
+def has_pending_write(session: Session, key: Hashable) -> bool:
+    writes = session.info.get(_SESSION_INFO_KEY)
+    return writes is not None and key in writes.keys
+
+
+__all__ = ["after_commit", "has_pending_write"]
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, TypeVar
+from uuid import UUID
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.util import identity_key
+
+from coffeebuddy.infra.db.metrics import IDENTITY_CACHE_TOTAL
+from coffeebuddy.infra.db.models import Channel, User
+
+Entity = TypeVar("Entity", User, Channel)
+
+_SLACK_ID_COLUMNS: dict[type, str] = {User: "slack_user_id", Channel: "slack_channel_id"}
+_ENTITY_LABELS: dict[type, str] = {User: "user", Channel: "channel"}
+
+
+class _Missing:
+    __slots__ = ()
+
+
+_MISSING = _Missing()
+
+
+@dataclass(frozen=True, slots=True)
+class _Snapshot:
+    values: tuple[tuple[str, Any], ...]
+
+    @classmethod
+    def of(cls, row: User | Channel) -> _Snapshot:
+        columns = inspect(type(row)).column_attrs
+        return cls(values=tuple((column.key, getattr(row, column.key)) for column in columns))
+
+
+@dataclass(slots=True)
+class _Entry:
+    value: Any
+    expires_at: float
+
+
+class IdentityCache:
+    """Process-wide cache of ``User`` and ``Channel`` rows.
+
+    Rows are looked up by primary key or by Slack ID and handed back bound to
+    the caller's session, so a hit costs no SELECT. Unknown IDs are cached
+    for ``negative_ttl_seconds`` so a stray Slack user cannot hammer the
+    database, while a newly registered user shows up soon after.
+
+    Rows found dirty in the caller's session are returned as-is and never
+    copied into the cache. Writers call :meth:`invalidate_channel` or
+    :meth:`invalidate_user`; passing the session defers a second eviction
+    until commit so concurrent readers cannot re-cache the old row.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 10_000,
+        ttl_seconds: float = 600.0,
+        negative_ttl_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._negative_ttl = negative_ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[tuple[type, str, Any], _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_user(self, session: Session, user_id: UUID) -> User | None:
+        return self._get(session, User, user_id)
+
+    def get_channel(self, session: Session, channel_id: UUID) -> Channel | None:
+        return self._get(session, Channel, channel_id)
+
+    def get_user_by_slack_id(self, session: Session, slack_user_id: str) -> User | None:
+        return self._get_by_slack_id(session, User, slack_user_id)
+
+    async def aget_user(self, session: AsyncSession, user_id: UUID) -> User | None:
+        """:meth:`get_user` for an ``AsyncSession``."""
+        found = self._peek(session.sync_session, User, user_id)
+        if found is not _MISSING:
+            return found
+        row = await session.get(User, user_id)
+        self._store(User, user_id, row)
+        return row
+
+    async def aget_user_by_slack_id(self, session: AsyncSession, slack_user_id: str) -> User | None:
+        """:meth:`get_user_by_slack_id` for an ``AsyncSession``."""
+        cached = self._lookup((User, "slack", slack_user_id), User)
+        if cached is None:
+            return None
+        if cached is not _MISSING:
+            return await self.aget_user(session, cached)
+        row = await session.scalar(select(User).where(User.slack_user_id == slack_user_id))
+        self._remember_slack_lookup(User, slack_user_id, row)
+        return row
+
+    def get_channel_by_slack_id(self, session: Session, slack_channel_id: str) -> Channel | None:
+        return self._get_by_slack_id(session, Channel, slack_channel_id)
+
+    def resolve_channel_id(self, session: Session, slack_channel_id: str) -> UUID | None:
+        """Maps a Slack channel ID to ``channels.id`` without attaching the row."""
+        key = (Channel, "slack", slack_channel_id)
+        cached = self._lookup(key, Channel)
+        if cached is not _MISSING:
+            return cached
+        channel = self._load_by_slack_id(session, Channel, slack_channel_id)
+        return channel.id if channel is not None else None
+
+    def invalidate_user(self, user: User, *, session: Session | None = None) -> None:
+        self._invalidate(User, user.id, user.slack_user_id, session)
+
+    def invalidate_channel(self, channel: Channel, *, session: Session | None = None) -> None:
+        self._invalidate(Channel, channel.id, channel.slack_channel_id, session)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _get(self, session: Session, model: type[Entity], pk: UUID) -> Entity | None:
+        found = self._peek(session, model, pk)
+        if found is not _MISSING:
+            return found
+        row = session.get(model, pk)
+        self._store(model, pk, None if row is None else row)
+        return row
+
+    def _peek(self, session: Session, model: type[Entity], pk: UUID) -> Entity | None | _Missing:
+        """Answers from the identity map or the cache without I/O; ``_MISSING`` means load it."""
+        loaded = session.identity_map.get(identity_key(model, pk))
+        if loaded is not None:
+            return loaded
+        cached = self._lookup((model, "id", pk), model)
+        if cached is None or cached is _MISSING:
+            return cached
+        return self._attach(session, model, cached)
+
+    def _get_by_slack_id(self, session: Session, model: type[Entity], slack_id: str) -> Entity | None:
+        cached = self._lookup((model, "slack", slack_id), model)
+        if cached is None:
+            return None
+        if cached is not _MISSING:
+            return self._get(session, model, cached)
+        return self._load_by_slack_id(session, model, slack_id)
+
+    def _load_by_slack_id(self, session: Session, model: type[Entity], slack_id: str) -> Entity | None:
+        column = getattr(model, _SLACK_ID_COLUMNS[model])
+        row = session.scalar(select(model).where(column == slack_id))
+        self._remember_slack_lookup(model, slack_id, row)
+        return row
+
+    def _remember_slack_lookup(self, model: type, slack_id: str, row: User | Channel | None) -> None:
+        if row is None:
+            self._put((model, "slack", slack_id), None, self._negative_ttl)
+        else:
+            self._store(model, row.id, row)
+
+    def _store(self, model: type, pk: UUID, row: User | Channel | None) -> None:
+        if row is None:
+            self._put((model, "id", pk), None, self._negative_ttl)
+            return
+        if inspect(row).modified:
+            return
+        self._put((model, "id", pk), _Snapshot.of(row), self._ttl)
+        self._put((model, "slack", getattr(row, _SLACK_ID_COLUMNS[model])), pk, self._ttl)
+
+    def _lookup(self, key: tuple[type, str, Any], model: type) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at > self._clock():
+                self._entries.move_to_end(key)
+                IDENTITY_CACHE_TOTAL.labels(entity=_ENTITY_LABELS[model], result="hit").inc()
+                return entry.value
+            if entry is not None:
+                del self._entries[key]
+        IDENTITY_CACHE_TOTAL.labels(entity=_ENTITY_LABELS[model], result="miss").inc()
+        return _MISSING
+
+    def _put(self, key: tuple[type, str, Any], value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = _Entry(value=value, expires_at=self._clock() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def _invalidate(self, model: type, pk: UUID, slack_id: str, session: Session | None) -> None:
+        def _evict(*_args: Any) -> None:
+            with self._lock:
+                self._entries.pop((model, "id", pk), None)
+                self._entries.pop((model, "slack", slack_id), None)
+
+        _evict()
+        if session is not None:
+            event.listen(session, "after_commit", _evict, once=True)
+
+    @staticmethod
+    def _attach(session: Session, model: type[Entity], snapshot: _Snapshot) -> Entity:
+        row = model(**dict(snapshot.values))
+        make_transient_to_detached(row)
+        return session.merge(row, load=False)
+
+
+__all__ = ["IdentityCache"]
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from prometheus_client import Counter, Histogram
+
+IDENTITY_CACHE_TOTAL = Counter(
+    "coffeebuddy_identity_cache_total",
+    "Identity cache lookups by entity (user or channel) and result (hit or miss).",
+    ("entity", "result"),
+)
+
+DB_OPERATION_STATEMENTS = Histogram(
+    "coffeebuddy_db_operation_statements",
+    "SQL statements issued per tracked service operation.",
+    ("operation",),
+    buckets=(1, 2, 4, 6, 8, 10, 12, 16, 24, 32, float("inf")),
+)
+
+DB_OPERATION_SECONDS = Histogram(
+    "coffeebuddy_db_operation_seconds",
+    "Time spent executing SQL per tracked service operation.",
+    ("operation",),
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, float("inf")),
+)
+
+DB_QUERY_BUDGET_EXCEEDED_TOTAL = Counter(
+    "coffeebuddy_db_query_budget_exceeded_total",
+    "Tracked operations that issued more statements than their budget.",
+    ("operation",),
+)
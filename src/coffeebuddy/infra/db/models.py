@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 from dataclasses import asdict, dataclass
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
 from typing import Any, Dict, Mapping
+import uuid
 
 from sqlalchemy import (
     Boolean,
@@ -13,14 +14,42 @@ from sqlalchemy import (
     ForeignKey,
     Index,
     Integer,
+    JSON,
+    LargeBinary,
     String,
     Text,
+    TypeDecorator,
     UniqueConstraint,
+    text,
 )
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
+class UTCDateTime(TypeDecorator):
+    """Timezone-aware timestamp that stays aware on backends without tz support."""
+
+    impl = DateTime(timezone=True)
+    cache_ok = True
+
+    def process_result_value(self, value: datetime | None, dialect) -> datetime | None:
+        if value is not None and value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value
+
+
+class UUIDType(TypeDecorator):
+    """UUID column that also accepts canonical string identifiers on bind."""
+
+    impl = UUID(as_uuid=True)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if isinstance(value, str):
+            return uuid.UUID(value)
+        return value
+
+
 class Base(DeclarativeBase):
     """Declarative base for CoffeeBuddy ORM models."""
 
@@ -41,10 +70,10 @@ class SerializableMixin:
 
 class TimestampMixin:
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), nullable=False
+        UTCDateTime(), nullable=False
     )
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), nullable=False
+        UTCDateTime(), nullable=False
     )
 
 
@@ -59,7 +88,7 @@ class User(Base, SerializableMixin, TimestampMixin):
     __tablename__ = "users"
 
     id: Mapped[str] = mapped_column(
-        UUID(as_uuid=True),
+        UUIDType(),
         primary_key=True,
         server_default="uuid_generate_v4()",
     )
@@ -77,7 +106,7 @@ class Channel(Base, SerializableMixin, TimestampMixin):
     )
 
     id: Mapped[str] = mapped_column(
-        UUID(as_uuid=True),
+        UUIDType(),
         primary_key=True,
         server_default="uuid_generate_v4()",
     )
@@ -90,7 +119,7 @@ class Channel(Base, SerializableMixin, TimestampMixin):
     reminders_enabled: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
     last_call_enabled: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
     last_call_lead_minutes: Mapped[int | None] = mapped_column(Integer)
-    last_reset_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    last_reset_at: Mapped[datetime | None] = mapped_column(UTCDateTime())
 
 
 class Run(Base, SerializableMixin, TimestampMixin):
@@ -100,31 +129,67 @@ class Run(Base, SerializableMixin, TimestampMixin):
             "status IN ('open','closed','canceled','failed')",
             name="chk_run_status",
         ),
+        CheckConstraint("active_order_count >= 0", name="chk_runs_active_order_count"),
+        CheckConstraint(
+            "max_participants IS NULL OR max_participants > 0", name="chk_runs_max_participants"
+        ),
+        CheckConstraint(
+            "max_participants IS NULL OR active_order_count <= max_participants",
+            name="chk_runs_participant_capacity",
+        ),
         Index("idx_runs_channel_status", "channel_id", "status"),
         Index("idx_runs_runner", "runner_user_id", "started_at"),
     )
 
     id: Mapped[str] = mapped_column(
-        UUID(as_uuid=True),
+        UUIDType(),
         primary_key=True,
         server_default="uuid_generate_v4()",
     )
     channel_id: Mapped[str] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("channels.id", ondelete="RESTRICT"), nullable=False
+        UUIDType(), ForeignKey("channels.id", ondelete="RESTRICT"), nullable=False
     )
     initiator_user_id: Mapped[str] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("users.id", ondelete="RESTRICT"), nullable=False
+        UUIDType(), ForeignKey("users.id", ondelete="RESTRICT"), nullable=False
     )
     runner_user_id: Mapped[str | None] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("users.id", ondelete="RESTRICT")
+        UUIDType(), ForeignKey("users.id", ondelete="RESTRICT")
     )
     status: Mapped[RunStatus] = mapped_column(String(16), nullable=False, default=RunStatus.OPEN.value)
-    pickup_time: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    pickup_time: Mapped[datetime | None] = mapped_column(UTCDateTime())
     pickup_note: Mapped[str | None] = mapped_column(Text)
-    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
-    closed_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    # IANA zone the pickup time was given in; pickup_time itself is stored in UTC.
+    pickup_timezone: Mapped[str | None] = mapped_column(String(64))
+    max_participants: Mapped[int | None] = mapped_column(Integer)
+    # Slack user IDs that must not be picked as runner for this run.
+    excluded_runner_slack_ids: Mapped[list[str]] = mapped_column(
+        JSONB().with_variant(JSON(), "sqlite"),
+        nullable=False,
+        default=list,
+        server_default=text("'[]'"),
+    )
+    started_at: Mapped[datetime] = mapped_column(UTCDateTime(), nullable=False)
+    closed_at: Mapped[datetime | None] = mapped_column(UTCDateTime())
     failure_reason: Mapped[str | None] = mapped_column(Text)
-    correlation_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    correlation_id: Mapped[str] = mapped_column(
+        String(64), nullable=False, default=lambda: uuid.uuid4().hex
+    )
+    # Maintained by the order upsert/cancel paths; see ActiveOrderCountReconciler.
+    active_order_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default=text("0")
+    )
+
+
+class OrderCatalogEntry(Base, SerializableMixin, TimestampMixin):
+    """One canonical order text, keyed by the SHA-256 of its canonical form."""
+
+    __tablename__ = "order_catalog"
+
+    text_hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    canonical_text: Mapped[str] = mapped_column(Text, nullable=False)
+    usage_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default=text("0")
+    )
 
 
 class Order(Base, SerializableMixin, TimestampMixin):
@@ -133,23 +198,28 @@ class Order(Base, SerializableMixin, TimestampMixin):
         UniqueConstraint("run_id", "user_id", name="uq_orders_run_user"),
         Index("idx_orders_run", "run_id"),
         Index("idx_orders_user", "user_id"),
+        Index("idx_orders_run_catalog", "run_id", "catalog_hash"),
     )
 
     id: Mapped[str] = mapped_column(
-        UUID(as_uuid=True),
+        UUIDType(),
         primary_key=True,
         server_default="uuid_generate_v4()",
     )
     run_id: Mapped[str] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("runs.id", ondelete="CASCADE"), nullable=False
+        UUIDType(), ForeignKey("runs.id", ondelete="CASCADE"), nullable=False
     )
     user_id: Mapped[str] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+        UUIDType(), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
     order_text: Mapped[str] = mapped_column(Text, nullable=False)
+    catalog_hash: Mapped[str | None] = mapped_column(
+        String(64), ForeignKey("order_catalog.text_hash", ondelete="RESTRICT")
+    )
     is_final: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     provenance: Mapped[str] = mapped_column(String(32), nullable=False, default="manual")
-    canceled_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    canceled_at: Mapped[datetime | None] = mapped_column(UTCDateTime())
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default=text("1"))
 
 
 class UserPreference(Base, SerializableMixin, TimestampMixin):
@@ -157,18 +227,22 @@ class UserPreference(Base, SerializableMixin, TimestampMixin):
     __table_args__ = (UniqueConstraint("user_id", "channel_id", name="uq_preferences_user_channel"),)
 
     id: Mapped[str] = mapped_column(
-        UUID(as_uuid=True),
+        UUIDType(),
         primary_key=True,
         server_default="uuid_generate_v4()",
     )
     user_id: Mapped[str] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+        UUIDType(), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
     channel_id: Mapped[str] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("channels.id", ondelete="CASCADE"), nullable=False
+        UUIDType(), ForeignKey("channels.id", ondelete="CASCADE"), nullable=False
     )
     last_order_text: Mapped[str] = mapped_column(Text, nullable=False)
-    last_used_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    catalog_hash: Mapped[str | None] = mapped_column(
+        String(64), ForeignKey("order_catalog.text_hash", ondelete="RESTRICT")
+    )
+    last_used_at: Mapped[datetime | None] = mapped_column(UTCDateTime())
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default=text("1"))
 
 
 class RunnerStat(Base, SerializableMixin, TimestampMixin):
@@ -179,18 +253,43 @@ class RunnerStat(Base, SerializableMixin, TimestampMixin):
     )
 
     id: Mapped[str] = mapped_column(
-        UUID(as_uuid=True),
+        UUIDType(),
         primary_key=True,
         server_default="uuid_generate_v4()",
     )
     user_id: Mapped[str] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+        UUIDType(), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
     channel_id: Mapped[str] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("channels.id", ondelete="CASCADE"), nullable=False
+        UUIDType(), ForeignKey("channels.id", ondelete="CASCADE"), nullable=False
     )
     runs_served_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
-    last_run_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    last_run_at: Mapped[datetime | None] = mapped_column(UTCDateTime())
+
+
+# Largest allowed ``channels.fairness_window_runs``; every window fits in the ring.
+FAIRNESS_WINDOW_CAPACITY = 50
+
+
+class RunnerWindowSlot(Base, SerializableMixin):
+    """One slot of a channel's ring buffer of recent runner assignments.
+
+    Assignment ``sequence`` of a channel is stored in slot
+    ``sequence % FAIRNESS_WINDOW_CAPACITY``, overwriting the assignment made
+    ``FAIRNESS_WINDOW_CAPACITY`` runs earlier.
+    """
+
+    __tablename__ = "runner_window_slots"
+
+    channel_id: Mapped[str] = mapped_column(
+        UUIDType(), ForeignKey("channels.id", ondelete="CASCADE"), primary_key=True
+    )
+    slot: Mapped[int] = mapped_column(Integer, primary_key=True)
+    sequence: Mapped[int] = mapped_column(Integer, nullable=False)
+    user_id: Mapped[str] = mapped_column(
+        UUIDType(), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    assigned_at: Mapped[datetime] = mapped_column(UTCDateTime(), nullable=False)
 
 
 class ChannelAdminAction(Base, SerializableMixin):
@@ -204,16 +303,63 @@ class ChannelAdminAction(Base, SerializableMixin):
     )
 
     id: Mapped[str] = mapped_column(
-        UUID(as_uuid=True),
+        UUIDType(),
         primary_key=True,
         server_default="uuid_generate_v4()",
     )
     channel_id: Mapped[str] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("channels.id", ondelete="CASCADE"), nullable=False
+        UUIDType(), ForeignKey("channels.id", ondelete="CASCADE"), nullable=False
     )
     admin_user_id: Mapped[str] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+        UUIDType(), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
     )
     action_type: Mapped[str] = mapped_column(String(32), nullable=False)
-    action_details: Mapped[Mapping[str, Any]] = mapped_column(JSONB, nullable=False, default=dict)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
\ No newline at end of file
+    action_details: Mapped[Mapping[str, Any]] = mapped_column(
+        JSONB().with_variant(JSON(), "sqlite"), nullable=False, default=dict
+    )
+    created_at: Mapped[datetime] = mapped_column(UTCDateTime(), nullable=False)
+
+
+class OutboxEvent(Base, SerializableMixin):
+    """Event staged in the same transaction as the state change it describes."""
+
+    __tablename__ = "outbox"
+    __table_args__ = (
+        Index(
+            "idx_outbox_unpublished",
+            "created_at",
+            postgresql_where=text("published_at IS NULL AND dead_lettered_at IS NULL"),
+        ),
+    )
+
+    id: Mapped[str] = mapped_column(
+        UUIDType(),
+        primary_key=True,
+        server_default="uuid_generate_v4()",
+    )
+    topic: Mapped[str] = mapped_column(String(249), nullable=False)
+    message_key: Mapped[str | None] = mapped_column(String(128))
+    event_type: Mapped[str] = mapped_column(String(64), nullable=False)
+    correlation_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    payload: Mapped[Mapping[str, Any]] = mapped_column(
+        JSONB().with_variant(JSON(), "sqlite"), nullable=False, default=dict
+    )
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_error: Mapped[str | None] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(UTCDateTime(), nullable=False)
+    published_at: Mapped[datetime | None] = mapped_column(UTCDateTime())
+    # Failed rows are skipped until next_attempt_at; dead-lettered rows are never retried.
+    next_attempt_at: Mapped[datetime | None] = mapped_column(UTCDateTime())
+    dead_lettered_at: Mapped[datetime | None] = mapped_column(UTCDateTime())
+
+
+class SlackIdempotencyKey(Base):
+    """Response recorded for a Slack request so retries can be answered from it."""
+
+    __tablename__ = "slack_idempotency_keys"
+    __table_args__ = (Index("idx_slack_idempotency_expires_at", "expires_at"),)
+
+    key: Mapped[str] = mapped_column(String(128), primary_key=True)
+    response: Mapped[bytes | None] = mapped_column(LargeBinary)
+    created_at: Mapped[datetime] = mapped_column(UTCDateTime(), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(UTCDateTime(), nullable=False)
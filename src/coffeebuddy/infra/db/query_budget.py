@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import AsyncIterator, Callable, Iterator, Mapping
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from coffeebuddy.infra.db.metrics import (
+    DB_OPERATION_SECONDS,
+    DB_OPERATION_STATEMENTS,
+    DB_QUERY_BUDGET_EXCEEDED_TOTAL,
+)
+
+logger = logging.getLogger(__name__)
+
+_RECORDER_INFO_KEY = "coffeebuddy.query_recorder"
+_INSTALL_LOCK = threading.Lock()
+
+
+@dataclass(frozen=True, slots=True)
+class RecordedStatement:
+    statement: str
+    duration_seconds: float
+
+
+class QueryBudgetExceededError(RuntimeError):
+    """Raised by an enforcing :class:`QueryBudget` when an operation overspends."""
+
+    def __init__(self, operation: str, budget: int, statements: list[RecordedStatement]) -> None:
+        self.operation = operation
+        self.budget = budget
+        self.statements = statements
+        super().__init__(
+            f"{operation} issued {len(statements)} statements, over its budget of {budget}."
+        )
+
+
+class QueryRecorder:
+    """Records the statements a session executes, with their cursor time.
+
+    Only the connection the session holds on entry is observed, so other
+    sessions sharing the engine (other requests, other threads) do not leak
+    into the recording. Recorders on the same connection nest; the innermost
+    one records. Use ``async with`` for an ``AsyncSession``.
+    """
+
+    def __init__(self, session: Session | AsyncSession, *, clock: Callable[[], float] = time.perf_counter) -> None:
+        self._session = session
+        self._clock = clock
+        self._connection: Connection | None = None
+        self._previous: QueryRecorder | None = None
+        self._started_at: float | None = None
+        self.statements: list[RecordedStatement] = []
+
+    def __enter__(self) -> QueryRecorder:
+        return self._start(self._session.connection())
+
+    def __exit__(self, *_exc: object) -> None:
+        if self._connection is not None:
+            self._connection.info[_RECORDER_INFO_KEY] = self._previous
+            self._connection = None
+
+    async def __aenter__(self) -> QueryRecorder:
+        connection = await self._session.connection()
+        return self._start(connection.sync_connection)
+
+    async def __aexit__(self, *exc: object) -> None:
+        self.__exit__(*exc)
+
+    def _start(self, connection: Connection) -> QueryRecorder:
+        self._connection = connection
+        _install(connection.engine)
+        self._previous = connection.info.get(_RECORDER_INFO_KEY)
+        connection.info[_RECORDER_INFO_KEY] = self
+        return self
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(statement.duration_seconds for statement in self.statements)
+
+    def _before(self) -> None:
+        self._started_at = self._clock()
+
+    def _after(self, statement: str) -> None:
+        started_at = self._started_at if self._started_at is not None else self._clock()
+        self.statements.append(RecordedStatement(statement=statement, duration_seconds=self._clock() - started_at))
+        self._started_at = None
+
+
+class QueryBudget:
+    """Per-operation statement budgets, checked around :meth:`track`.
+
+    Every tracked operation reports its statement count and SQL time. One
+    that goes over its budget is counted and logged, and with ``enforce``
+    it raises :class:`QueryBudgetExceededError` (meant for tests and
+    benchmarks). Operations without a budget are only measured.
+    """
+
+    def __init__(self, budgets: Mapping[str, int], *, enforce: bool = False) -> None:
+        self._budgets = dict(budgets)
+        self._enforce = enforce
+
+    @property
+    def budgets(self) -> Mapping[str, int]:
+        return dict(self._budgets)
+
+    def enforcing(self) -> QueryBudget:
+        """Returns a copy of these budgets that raises when one is exceeded."""
+        return QueryBudget(self._budgets, enforce=True)
+
+    @contextmanager
+    def track(self, session: Session, operation: str) -> Iterator[QueryRecorder]:
+        with QueryRecorder(session) as recorder:
+            yield recorder
+        self._check(operation, recorder)
+
+    @asynccontextmanager
+    async def atrack(self, session: AsyncSession, operation: str) -> AsyncIterator[QueryRecorder]:
+        """:meth:`track` for an ``AsyncSession``."""
+        async with QueryRecorder(session) as recorder:
+            yield recorder
+        self._check(operation, recorder)
+
+    def _check(self, operation: str, recorder: QueryRecorder) -> None:
+        DB_OPERATION_STATEMENTS.labels(operation=operation).observe(recorder.count)
+        DB_OPERATION_SECONDS.labels(operation=operation).observe(recorder.total_seconds)
+        budget = self._budgets.get(operation)
+        if budget is None or recorder.count <= budget:
+            return
+        DB_QUERY_BUDGET_EXCEEDED_TOTAL.labels(operation=operation).inc()
+        logger.warning(
+            "Operation exceeded its statement budget",
+            extra={"operation": operation, "budget": budget, "statements": recorder.count},
+        )
+        if self._enforce:
+            raise QueryBudgetExceededError(operation, budget, recorder.statements)
+
+
+def _install(engine: Engine) -> None:
+    """Adds the engine-wide hooks once; they dispatch to the connection's recorder."""
+    with _INSTALL_LOCK:
+        if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+            return
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _recorder(conn: Connection) -> QueryRecorder | None:
+    return conn.info.get(_RECORDER_INFO_KEY)
+
+
+def _before_cursor_execute(conn: Connection, *_args: Any) -> None:
+    recorder = _recorder(conn)
+    if recorder is not None:
+        recorder._before()
+
+
+def _after_cursor_execute(conn: Connection, _cursor: Any, statement: str, *_args: Any) -> None:
+    recorder = _recorder(conn)
+    if recorder is not None:
+        recorder._after(statement)
+
+
+__all__ = [
+    "QueryBudget",
+    "QueryBudgetExceededError",
+    "QueryRecorder",
+    "RecordedStatement",
+]
@@ -10,6 +10,7 @@ from urllib.parse import quote_plus
 import hvac
 from sqlalchemy import create_engine
 from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 LOGGER = logging.getLogger(__name__)
@@ -137,4 +138,28 @@ def _create_engine(cfg: DatabaseConfig) -> Engine:
         pool_timeout=cfg.pool_timeout,
         pool_pre_ping=True,
         future=True,
-    )
\ No newline at end of file
+    )
+
+
+def create_async_session_factory(
+    config: Optional[DatabaseConfig] = None,
+) -> async_sessionmaker:
+    """Async twin of :func:`create_session_factory` for request handlers.
+
+    ``postgresql+psycopg`` URLs work unchanged: psycopg 3 ships both sync and
+    asyncio drivers under the same dialect name.
+    """
+    cfg = config or DatabaseConfig.from_env()
+    engine = _create_async_engine(cfg)
+    return async_sessionmaker(bind=engine, expire_on_commit=False)
+
+
+def _create_async_engine(cfg: DatabaseConfig) -> AsyncEngine:
+    return create_async_engine(
+        cfg.url,
+        echo=cfg.echo,
+        pool_size=cfg.pool_size,
+        max_overflow=cfg.max_overflow,
+        pool_timeout=cfg.pool_timeout,
+        pool_pre_ping=True,
+    )
@@ -11,6 +11,8 @@ from .models import KafkaEvent, ReminderPayload, ReminderType
 from .producer import KafkaEventProducer
 from .consumer import KafkaEventConsumer
 from .reminder_worker import ReminderWorker, ReminderSender
+from .outbox import OutboxRelay, OutboxRunEventPublisher
+from .run_publisher import KafkaRunEventPublisher
 from .topics import (
     TOPIC_REGISTRY,
     ACL_REQUIREMENTS,
@@ -27,6 +29,9 @@ __all__ = [
     "ReminderType",
     "KafkaEventProducer",
     "KafkaEventConsumer",
+    "KafkaRunEventPublisher",
+    "OutboxRelay",
+    "OutboxRunEventPublisher",
     "ReminderWorker",
     "ReminderSender",
     "TOPIC_REGISTRY",
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from prometheus_client import Counter, Histogram
+from prometheus_client import Counter, Gauge, Histogram
 
 KAFKA_PRODUCE_TOTAL = Counter(
     "coffeebuddy_kafka_produce_total",
@@ -24,4 +24,26 @@ REMINDER_DELAY_SECONDS = Histogram(
     "coffeebuddy_reminder_delay_seconds",
     "Observed delay between scheduled reminder time and processing time.",
     buckets=(0.0, 5.0, 15.0, 30.0, 60.0, 120.0, float("inf")),
-)
\ No newline at end of file
+)
+OUTBOX_RELAY_BATCH_SIZE = Histogram(
+    "coffeebuddy_outbox_relay_batch_size",
+    "Outbox rows claimed per relay iteration.",
+    buckets=(0, 1, 5, 10, 25, 50, 100, 250, float("inf")),
+)
+
+OUTBOX_RELAY_LAG_SECONDS = Histogram(
+    "coffeebuddy_outbox_relay_lag_seconds",
+    "Delay between an outbox row being written and it being published to Kafka.",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 15.0, 60.0, float("inf")),
+)
+
+OUTBOX_RELAY_OLDEST_PENDING_SECONDS = Gauge(
+    "coffeebuddy_outbox_relay_oldest_pending_seconds",
+    "Age of the oldest outbox row claimed by the most recent relay iteration.",
+)
+
+OUTBOX_RELAY_FAILURES_TOTAL = Counter(
+    "coffeebuddy_outbox_relay_failures_total",
+    "Outbox publish failures by outcome (retry scheduled or dead-lettered).",
+    ("outcome",),
+)
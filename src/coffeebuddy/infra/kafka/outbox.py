@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import Callable, Iterable
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from coffeebuddy.events.run import RunCreatedEvent, RunEventPublisher
+from coffeebuddy.infra.db.models import OutboxEvent
+
+from .metrics import (
+    OUTBOX_RELAY_BATCH_SIZE,
+    OUTBOX_RELAY_FAILURES_TOTAL,
+    OUTBOX_RELAY_LAG_SECONDS,
+    OUTBOX_RELAY_OLDEST_PENDING_SECONDS,
+)
+from .models import KafkaEvent
+from .producer import KafkaEventProducer
+from .topics import RUN_EVENTS_TOPIC, TOPIC_REGISTRY, TopicConfig
+
+logger = logging.getLogger(__name__)
+
+Clock = Callable[[], datetime]
+
+
+class OutboxRunEventPublisher(RunEventPublisher):
+    """Stages run events as outbox rows inside the caller's transaction.
+
+    Works with a sync ``Session`` too: call :meth:`stage_run_created` there.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession | Session,
+        *,
+        topic: TopicConfig = RUN_EVENTS_TOPIC,
+        clock: Clock | None = None,
+    ) -> None:
+        self._session = session
+        self._topic = topic
+        self._clock = clock or (lambda: datetime.now(timezone.utc))
+
+    async def publish_run_created(self, event: RunCreatedEvent) -> None:
+        self.stage_run_created(event)
+
+    def stage_run_created(self, event: RunCreatedEvent) -> None:
+        self._session.add(
+            OutboxEvent(
+                id=uuid4(),
+                topic=self._topic.name,
+                message_key=event.run_id,
+                event_type="run_created",
+                correlation_id=event.correlation_id,
+                payload=event.to_payload(),
+                attempts=0,
+                created_at=self._clock(),
+            )
+        )
+
+
+class OutboxRelay:
+    """Drains unpublished outbox rows to Kafka in batches.
+
+    Rows are claimed with ``FOR UPDATE SKIP LOCKED`` so several relays can
+    run side by side without publishing the same row twice; claimed rows
+    are produced concurrently and marked published in the same transaction.
+
+    A row that fails is retried with exponential backoff (``next_attempt_at``)
+    so it cannot monopolize the batch; after ``max_attempts`` failures it is
+    dead-lettered and left for an operator.
+    """
+
+    def __init__(
+        self,
+        *,
+        session_factory: Callable[[], AsyncSession],
+        producer: KafkaEventProducer,
+        topics: Iterable[TopicConfig] = TOPIC_REGISTRY,
+        batch_size: int = 100,
+        poll_interval_seconds: float = 0.5,
+        max_attempts: int = 10,
+        backoff_base_seconds: float = 1.0,
+        backoff_max_seconds: float = 300.0,
+        clock: Clock | None = None,
+    ) -> None:
+        self._session_factory = session_factory
+        self._producer = producer
+        self._topics = {topic.name: topic for topic in topics}
+        self._batch_size = batch_size
+        self._poll_interval = poll_interval_seconds
+        self._max_attempts = max_attempts
+        self._backoff_base = backoff_base_seconds
+        self._backoff_max = backoff_max_seconds
+        self._clock = clock or (lambda: datetime.now(timezone.utc))
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        await self._producer.start()
+        self._task = asyncio.create_task(self._relay_loop())
+        logger.info("Outbox relay started", extra={"batch_size": self._batch_size})
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        await self._producer.stop()
+        logger.info("Outbox relay stopped")
+
+    async def relay_once(self) -> int:
+        """Publish one batch; returns the number of rows published."""
+        async with self._session_factory() as session:
+            async with session.begin():
+                now = self._clock()
+                stmt = (
+                    select(OutboxEvent)
+                    .where(
+                        OutboxEvent.published_at.is_(None),
+                        OutboxEvent.dead_lettered_at.is_(None),
+                        or_(OutboxEvent.next_attempt_at.is_(None), OutboxEvent.next_attempt_at <= now),
+                    )
+                    .order_by(OutboxEvent.created_at)
+                    .limit(self._batch_size)
+                    .with_for_update(skip_locked=True)
+                )
+                rows = (await session.scalars(stmt)).all()
+                OUTBOX_RELAY_BATCH_SIZE.observe(len(rows))
+                if not rows:
+                    OUTBOX_RELAY_OLDEST_PENDING_SECONDS.set(0)
+                    return 0
+                OUTBOX_RELAY_OLDEST_PENDING_SECONDS.set(
+                    (self._clock() - rows[0].created_at).total_seconds()
+                )
+                outcomes = await asyncio.gather(
+                    *(self._publish(row) for row in rows), return_exceptions=True
+                )
+                published_at = self._clock()
+                published = 0
+                for row, outcome in zip(rows, outcomes):
+                    if isinstance(outcome, BaseException):
+                        self._record_failure(row, outcome, failed_at=published_at)
+                        continue
+                    row.published_at = published_at
+                    OUTBOX_RELAY_LAG_SECONDS.observe(
+                        (published_at - row.created_at).total_seconds()
+                    )
+                    published += 1
+        return published
+
+    def _record_failure(self, row: OutboxEvent, error: BaseException, *, failed_at: datetime) -> None:
+        row.attempts += 1
+        row.last_error = str(error)[:500]
+        if row.attempts >= self._max_attempts:
+            row.dead_lettered_at = failed_at
+            OUTBOX_RELAY_FAILURES_TOTAL.labels(outcome="dead_lettered").inc()
+            logger.error(
+                "Outbox row dead-lettered",
+                extra={"outbox_id": str(row.id), "topic": row.topic, "attempts": row.attempts},
+            )
+            return
+        delay = min(self._backoff_base * 2 ** (row.attempts - 1), self._backoff_max)
+        row.next_attempt_at = failed_at + timedelta(seconds=delay)
+        OUTBOX_RELAY_FAILURES_TOTAL.labels(outcome="retry").inc()
+
+    async def _publish(self, row: OutboxEvent) -> None:
+        topic = self._topics.get(row.topic)
+        if topic is None:
+            raise LookupError(f"Outbox topic {row.topic} is not registered with the relay.")
+        await self._producer.send(
+            topic,
+            KafkaEvent(
+                event_type=row.event_type,
+                correlation_id=row.correlation_id,
+                payload=dict(row.payload),
+                occurred_at=row.created_at,
+            ),
+            key=row.message_key,
+        )
+
+    async def _relay_loop(self) -> None:
+        while True:
+            try:
+                published = await self.relay_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Outbox relay iteration failed")
+                published = 0
+            if published < self._batch_size:
+                await asyncio.sleep(self._poll_interval)
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from coffeebuddy.events.run import RunCreatedEvent, RunEventPublisher
+
+from .models import KafkaEvent
+from .producer import KafkaEventProducer
+from .topics import RUN_EVENTS_TOPIC, TopicConfig
+
+
+class KafkaRunEventPublisher(RunEventPublisher):
+    """Publishes run lifecycle events through the shared aiokafka producer."""
+
+    def __init__(
+        self,
+        producer: KafkaEventProducer,
+        *,
+        topic: TopicConfig = RUN_EVENTS_TOPIC,
+    ) -> None:
+        self._producer = producer
+        self._topic = topic
+
+    async def start(self) -> None:
+        await self._producer.start()
+
+    async def stop(self) -> None:
+        await self._producer.stop()
+
+    async def publish_run_created(self, event: RunCreatedEvent) -> None:
+        await self._producer.send(
+            self._topic,
+            KafkaEvent(
+                event_type="run_created",
+                correlation_id=event.correlation_id,
+                payload=event.to_payload(),
+            ),
+            key=event.run_id,
+        )
@@ -0,0 +1,5 @@
+"""Consistency checks for denormalized CoffeeBuddy data."""
+
+from .counters import ActiveOrderCountReconciler, ReconciliationReport, RunCounterDrift
+
+__all__ = ["ActiveOrderCountReconciler", "ReconciliationReport", "RunCounterDrift"]
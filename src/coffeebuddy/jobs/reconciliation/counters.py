@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import Sequence
+from dataclasses import dataclass
+from uuid import UUID
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from coffeebuddy.infra.db.models import Order, Run, RunStatus
+from coffeebuddy.jobs.reconciliation.metrics import RUN_COUNTER_DRIFT_TOTAL
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class RunCounterDrift:
+    run_id: UUID
+    recorded: int
+    actual: int
+
+
+@dataclass(frozen=True, slots=True)
+class ReconciliationReport:
+    checked: int
+    drifted: tuple[RunCounterDrift, ...]
+
+
+class ActiveOrderCountReconciler:
+    """Compares ``runs.active_order_count`` with the orders it summarizes.
+
+    Runs are scanned in primary-key pages. Drifted rows are repaired with an
+    ``UPDATE`` that recounts inside the statement, so an order written
+    between the scan and the repair is not lost.
+    """
+
+    def __init__(
+        self,
+        session: Session,
+        *,
+        statuses: Sequence[RunStatus] = (RunStatus.OPEN,),
+        batch_size: int = 500,
+    ) -> None:
+        self._session = session
+        self._statuses = [status.value for status in statuses]
+        self._batch_size = batch_size
+
+    def reconcile(self, *, repair: bool = True) -> ReconciliationReport:
+        checked = 0
+        drifted: list[RunCounterDrift] = []
+        last_id: UUID | None = None
+        while True:
+            page = self._load_page(after=last_id)
+            if not page:
+                break
+            checked += len(page)
+            last_id = page[-1][0]
+            page_drift = [
+                RunCounterDrift(run_id=run_id, recorded=recorded, actual=int(actual))
+                for run_id, recorded, actual in page
+                if recorded != actual
+            ]
+            if page_drift and repair:
+                self._repair([drift.run_id for drift in page_drift])
+            drifted.extend(page_drift)
+
+        for drift in drifted:
+            LOGGER.warning(
+                "Run active_order_count drift detected",
+                extra={
+                    "run_id": str(drift.run_id),
+                    "recorded": drift.recorded,
+                    "actual": drift.actual,
+                    "repaired": repair,
+                },
+            )
+        if drifted:
+            RUN_COUNTER_DRIFT_TOTAL.labels(repaired=str(repair).lower()).inc(len(drifted))
+        return ReconciliationReport(checked=checked, drifted=tuple(drifted))
+
+    def _load_page(self, *, after: UUID | None) -> list[tuple[UUID, int, int]]:
+        stmt = (
+            select(Run.id, Run.active_order_count, self._actual_count(Run.__table__))
+            .where(Run.status.in_(self._statuses))
+            .order_by(Run.id)
+            .limit(self._batch_size)
+        )
+        if after is not None:
+            stmt = stmt.where(Run.id > after)
+        return [tuple(row) for row in self._session.execute(stmt)]
+
+    def _repair(self, run_ids: list[UUID]) -> None:
+        runs = Run.__table__
+        self._session.execute(
+            update(runs)
+            .where(runs.c.id.in_(run_ids))
+            .values(active_order_count=self._actual_count(runs))
+        )
+
+    @staticmethod
+    def _actual_count(runs):
+        orders = Order.__table__
+        return (
+            select(func.count(orders.c.id))
+            .where(orders.c.run_id == runs.c.id, orders.c.canceled_at.is_(None))
+            .scalar_subquery()
+        )
+
+
+__all__ = ["ActiveOrderCountReconciler", "ReconciliationReport", "RunCounterDrift"]
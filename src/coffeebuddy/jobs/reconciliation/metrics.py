@@ -0,0 +1,9 @@
+from __future__ import annotations
+
+from prometheus_client import Counter
+
+RUN_COUNTER_DRIFT_TOTAL = Counter(
+    "coffeebuddy_run_active_order_count_drift_total",
+    "Runs whose active_order_count disagreed with their orders, by whether it was repaired.",
+    ("repaired",),
+)
@@ -0,0 +1,8 @@
+"""ASGI entrypoint: ``uvicorn coffeebuddy.main:app``."""
+from __future__ import annotations
+
+from coffeebuddy.app import create_app
+
+app = create_app()
+
+__all__ = ["app"]
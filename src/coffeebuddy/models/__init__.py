@@ -1,4 +1,8 @@
-"""ORM models."""
-from .run import Run
+"""ORM models.
 
-__all__ = ["Run"]
\ No newline at end of file
+Kept as an alias of :mod:`coffeebuddy.infra.db.models` so there is exactly
+one mapping of each table.
+"""
+from coffeebuddy.infra.db.models import Base, Run
+
+__all__ = ["Base", "Run"]
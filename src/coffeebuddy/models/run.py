@@ -1,25 +0,0 @@
-from __future__ import annotations
-
-from datetime import datetime
-from sqlalchemy.orm import Mapped, mapped_column
-
-from sqlalchemy import String, DateTime
-
-from coffeebuddy.infra.db import Base
-
-
-class Run(Base):
-    """ORM model for coffee runs."""
-
-    __tablename__ = "runs"
-
-    id: Mapped[str] = mapped_column(String(36), primary_key=True)
-    channel_id: Mapped[str] = mapped_column(String(32), nullable=False, index=True)
-    initiator_user_id: Mapped[str] = mapped_column(String(32), nullable=False, index=True)
-    status: Mapped[str] = mapped_column(String(16), nullable=False, default="open")
-    pickup_time: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
-    pickup_note: Mapped[str | None] = mapped_column(String(200), nullable=True)
-    correlation_id: Mapped[str] = mapped_column(String(36), nullable=False, index=True)
-    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
-    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, default=datetime.utcnow)
\ No newline at end of file
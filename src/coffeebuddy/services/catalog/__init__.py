@@ -0,0 +1,5 @@
+"""Interned order-text catalog shared by orders, preferences and summaries."""
+
+from .service import AsyncOrderCatalog, OrderCatalog, canonicalize, catalog_hash
+
+__all__ = ["AsyncOrderCatalog", "OrderCatalog", "canonicalize", "catalog_hash"]
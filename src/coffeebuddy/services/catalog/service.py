@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import hashlib
+from collections import Counter
+from collections.abc import Callable, Iterable
+from datetime import datetime, timezone
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from coffeebuddy.infra.db.models import OrderCatalogEntry
+
+Clock = Callable[[], datetime]
+
+
+def canonicalize(order_text: str) -> str:
+    """Collapses whitespace and case so "Oat  Flat White" and "oat flat white" match.
+
+    Mirrors the V0007 backfill, which trims ``^\\s+|\\s+$`` before collapsing
+    ``\\s+`` to one space and lower-casing.
+    """
+    return " ".join(order_text.split()).lower()
+
+
+def catalog_hash(order_text: str) -> str:
+    """Key of ``order_text`` in ``order_catalog``: SHA-256 hex of the canonical text."""
+    return hashlib.sha256(canonicalize(order_text).encode("utf-8")).hexdigest()
+
+
+class OrderCatalog:
+    """Interns order texts into ``order_catalog`` and counts how often each is ordered.
+
+    Keys are computed in Python, so callers can reference an entry without
+    reading it back; a batch is written with one multi-row upsert.
+    """
+
+    def __init__(self, session: Session, *, clock: Clock | None = None) -> None:
+        self._session = session
+        self._clock = clock or (lambda: datetime.now(timezone.utc))
+
+    def intern(self, order_texts: Iterable[str], *, count_usage: bool = True) -> dict[str, str]:
+        """Ensures an entry exists for every text and returns ``{text: catalog_hash}``.
+
+        With ``count_usage`` each occurrence adds one to ``usage_count``;
+        otherwise existing entries are left untouched.
+        """
+        hashes, rows = _catalog_rows(order_texts, count_usage=count_usage, now=self._clock())
+        if not rows:
+            return {}
+        dialect = self._session.get_bind().dialect.name
+        if dialect not in ("postgresql", "sqlite"):
+            _intern_with_orm(self._session, rows)
+        else:
+            self._session.execute(_upsert_statement(dialect, rows, count_usage=count_usage))
+        return hashes
+
+
+class AsyncOrderCatalog:
+    """:class:`OrderCatalog` for an ``AsyncSession``; issues the same statements."""
+
+    def __init__(self, session: AsyncSession, *, clock: Clock | None = None) -> None:
+        self._session = session
+        self._clock = clock or (lambda: datetime.now(timezone.utc))
+
+    async def intern(self, order_texts: Iterable[str], *, count_usage: bool = True) -> dict[str, str]:
+        hashes, rows = _catalog_rows(order_texts, count_usage=count_usage, now=self._clock())
+        if not rows:
+            return {}
+        dialect = self._session.get_bind().dialect.name
+        if dialect not in ("postgresql", "sqlite"):
+            await self._session.run_sync(_intern_with_orm, rows)
+        else:
+            await self._session.execute(_upsert_statement(dialect, rows, count_usage=count_usage))
+        return hashes
+
+
+def _catalog_rows(
+    order_texts: Iterable[str], *, count_usage: bool, now: datetime
+) -> tuple[dict[str, str], list[dict[str, object]]]:
+    hashes = {text: catalog_hash(text) for text in order_texts}
+    usage = Counter(hashes.values()) if count_usage else Counter(dict.fromkeys(hashes.values(), 0))
+    canonical = {key: canonicalize(text) for text, key in hashes.items()}
+    rows = [
+        {
+            "text_hash": key,
+            "canonical_text": canonical[key],
+            "usage_count": count,
+            "created_at": now,
+            "updated_at": now,
+        }
+        # Sorted so concurrent batches lock catalog rows in the same order.
+        for key, count in sorted(usage.items())
+    ]
+    return hashes, rows
+
+
+def _upsert_statement(dialect: str, rows: list[dict[str, object]], *, count_usage: bool):
+    insert = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(OrderCatalogEntry).values(rows)
+    if count_usage:
+        return insert.on_conflict_do_update(
+            index_elements=[OrderCatalogEntry.text_hash],
+            set_={
+                "usage_count": OrderCatalogEntry.usage_count + insert.excluded.usage_count,
+                "updated_at": insert.excluded.updated_at,
+            },
+        )
+    return insert.on_conflict_do_nothing(index_elements=[OrderCatalogEntry.text_hash])
+
+
+def _intern_with_orm(session: Session, rows: list[dict[str, object]]) -> None:
+    """Fallback for dialects without ``ON CONFLICT``."""
+    for row in rows:
+        entry = session.get(OrderCatalogEntry, row["text_hash"])
+        if entry is None:
+            session.add(OrderCatalogEntry(**row))
+        elif row["usage_count"]:
+            entry.usage_count += row["usage_count"]
+            entry.updated_at = row["updated_at"]
+    session.flush()
+
+
+__all__ = ["AsyncOrderCatalog", "OrderCatalog", "canonicalize", "catalog_hash"]
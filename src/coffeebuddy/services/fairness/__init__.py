@@ -1,6 +1,7 @@
 """Fairness services for runner assignment."""
 
+from .index import FairnessIndex
 from .models import FairnessDecision
 from .service import FairnessService
 
-__all__ = ["FairnessDecision", "FairnessService"]
\ No newline at end of file
+__all__ = ["FairnessDecision", "FairnessIndex", "FairnessService"]
\ No newline at end of file
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import heapq
+import threading
+import time
+from collections.abc import Callable, Collection, Iterable
+from dataclasses import dataclass
+from datetime import datetime
+from uuid import UUID
+
+from coffeebuddy.services.fairness.metrics import FAIRNESS_INDEX_TOTAL
+
+# (runs_served_count, last_run_at or epoch, created_at, user_id): lower runs next.
+StatKey = tuple[int, datetime, datetime, str]
+
+
+class ChannelHeap:
+    """Indexed binary min-heap of one channel's runner stats.
+
+    ``positions`` maps each user to its slot, so a user's key can be moved
+    in O(log n) after an assignment. :meth:`min_among` walks the heap in key
+    order (best-first over the tree) and stops at the first eligible user,
+    so it only visits the users ranked ahead of the answer; when that is
+    more than the candidates themselves it compares the candidates directly.
+    """
+
+    __slots__ = ("_heap", "_positions")
+
+    def __init__(self, entries: Iterable[tuple[str, StatKey]] = ()) -> None:
+        self._heap: list[tuple[StatKey, str]] = [(key, user_id) for user_id, key in entries]
+        heapq.heapify(self._heap)
+        self._positions = {user_id: index for index, (_, user_id) in enumerate(self._heap)}
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __contains__(self, user_id: object) -> bool:
+        return user_id in self._positions
+
+    def key(self, user_id: str) -> StatKey | None:
+        position = self._positions.get(user_id)
+        return None if position is None else self._heap[position][0]
+
+    def upsert(self, user_id: str, key: StatKey) -> None:
+        position = self._positions.get(user_id)
+        if position is None:
+            self._heap.append((key, user_id))
+            self._positions[user_id] = len(self._heap) - 1
+            self._sift_up(len(self._heap) - 1)
+            return
+        previous = self._heap[position][0]
+        self._heap[position] = (key, user_id)
+        if key < previous:
+            self._sift_up(position)
+        else:
+            self._sift_down(position)
+
+    def min_among(
+        self, candidates: Collection[str], *, exclude: Collection[str] = ()
+    ) -> tuple[str, StatKey] | None:
+        """Returns the lowest-keyed user in ``candidates`` that is not in ``exclude``.
+
+        Candidates missing from the heap are ignored.
+        """
+        if not self._heap:
+            return None
+        frontier = [(self._heap[0][0], 0)]
+        budget = len(candidates)
+        while frontier and budget:
+            key, position = heapq.heappop(frontier)
+            user_id = self._heap[position][1]
+            if user_id not in exclude and user_id in candidates:
+                return user_id, key
+            budget -= 1
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < len(self._heap):
+                    heapq.heappush(frontier, (self._heap[child][0], child))
+        if not frontier:
+            return None
+        # Many non-candidates rank first: scanning the candidates is cheaper.
+        keyed = [
+            (self._heap[self._positions[user_id]][0], user_id)
+            for user_id in candidates
+            if user_id not in exclude and user_id in self._positions
+        ]
+        if not keyed:
+            return None
+        key, user_id = min(keyed)
+        return user_id, key
+
+    def _sift_up(self, position: int) -> None:
+        heap = self._heap
+        entry = heap[position]
+        while position:
+            parent = (position - 1) >> 1
+            if heap[parent] <= entry:
+                break
+            self._place(position, heap[parent])
+            position = parent
+        self._place(position, entry)
+
+    def _sift_down(self, position: int) -> None:
+        heap = self._heap
+        entry = heap[position]
+        size = len(heap)
+        while True:
+            child = 2 * position + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1] < heap[child]:
+                child += 1
+            if entry <= heap[child]:
+                break
+            self._place(position, heap[child])
+            position = child
+        self._place(position, entry)
+
+    def _place(self, position: int, entry: tuple[StatKey, str]) -> None:
+        self._heap[position] = entry
+        self._positions[entry[1]] = position
+
+
+@dataclass(slots=True)
+class _Channel:
+    heap: ChannelHeap
+    expires_at: float
+
+
+class FairnessIndex:
+    """Process-wide, per-channel runner priority index.
+
+    A channel is hydrated from ``runner_stats`` on first use and kept for
+    ``ttl_seconds``. Keys only grow (runs are counted up, ``last_run_at``
+    moves forward), so an entry can lag the database but never lead it:
+    :class:`FairnessService` re-reads the chosen user's row and, if it moved
+    on, refreshes the entry and picks again.
+
+    A channel data reset deletes the stats and invalidates only the index of
+    the process that ran it. Every other process notices on its next
+    selection in the channel, because the chosen user's row is then behind
+    its entry or was re-created with a new ``created_at``, and re-hydrates
+    the channel. Until then it keeps the stale entries in memory, but nothing
+    reads them. Writers that shrink stats in place instead of deleting them
+    are only noticed through the chosen row, so they must :meth:`invalidate`
+    the channel in every process themselves.
+    """
+
+    def __init__(self, *, ttl_seconds: float = 600.0, clock: Callable[[], float] = time.monotonic) -> None:
+        self._ttl = ttl_seconds
+        self._clock = clock
+        self._channels: dict[UUID, _Channel] = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, channel_id: object) -> bool:
+        with self._lock:
+            entry = self._channels.get(channel_id)  # type: ignore[arg-type]
+            return entry is not None and entry.expires_at > self._clock()
+
+    def hydrate(self, channel_id: UUID, entries: Iterable[tuple[str, StatKey]]) -> None:
+        heap = ChannelHeap(entries)
+        with self._lock:
+            self._channels[channel_id] = _Channel(heap=heap, expires_at=self._clock() + self._ttl)
+        FAIRNESS_INDEX_TOTAL.labels(result="hydrated").inc()
+
+    def missing(self, channel_id: UUID, user_ids: Iterable[str]) -> list[str]:
+        """Returns the users the channel's index does not know (all of them if it is not hydrated)."""
+        with self._lock:
+            heap = self._heap(channel_id)
+            return [user_id for user_id in user_ids if heap is None or user_id not in heap]
+
+    def min_among(
+        self, channel_id: UUID, candidates: Collection[str], *, exclude: Collection[str] = ()
+    ) -> tuple[str, StatKey] | None:
+        """See :meth:`ChannelHeap.min_among`.
+
+        Returns None when the channel is not hydrated or does not know every
+        candidate (it was invalidated or re-hydrated concurrently), so the
+        caller can fill it in and ask again instead of skipping someone.
+        """
+        with self._lock:
+            heap = self._heap(channel_id)
+            if heap is None or any(user_id not in heap for user_id in candidates):
+                return None
+            return heap.min_among(candidates, exclude=exclude)
+
+    def update(self, channel_id: UUID, user_id: str, key: StatKey) -> None:
+        """Moves ``user_id`` to ``key``; ignored if the channel is not hydrated."""
+        with self._lock:
+            entry = self._channels.get(channel_id)
+            if entry is not None:
+                entry.heap.upsert(user_id, key)
+
+    def invalidate(self, channel_id: UUID) -> None:
+        with self._lock:
+            self._channels.pop(channel_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._channels.clear()
+
+    def _heap(self, channel_id: UUID) -> ChannelHeap | None:
+        entry = self._channels.get(channel_id)
+        return None if entry is None else entry.heap
+
+
+__all__ = ["ChannelHeap", "FairnessIndex", "StatKey"]
@@ -0,0 +1,9 @@
+from __future__ import annotations
+
+from prometheus_client import Counter
+
+FAIRNESS_INDEX_TOTAL = Counter(
+    "coffeebuddy_fairness_index_total",
+    "Fairness index events: channel hydrations, stale entries refreshed on selection and resets detected on selection.",
+    ("result",),
+)
@@ -1,26 +1,57 @@
 from __future__ import annotations
 
+from collections import Counter
 from datetime import datetime, timezone
 from typing import Sequence
 from uuid import UUID, uuid4
 
-from sqlalchemy import select
+from sqlalchemy import event, func, select
 from sqlalchemy.orm import Session
 
 from coffeebuddy.core.orders.models import Clock
-from coffeebuddy.core.runs.exceptions import RunnerSelectionError
-from coffeebuddy.infra.db.models import RunnerStat
+from coffeebuddy.core.runs.exceptions import RunCloseInProgressError, RunnerSelectionError
+from coffeebuddy.infra.db.hooks import after_commit
+from coffeebuddy.infra.db.models import RunnerStat, RunnerWindowSlot
+from coffeebuddy.services.fairness.index import FairnessIndex, StatKey
+from coffeebuddy.services.fairness.metrics import FAIRNESS_INDEX_TOTAL
 from coffeebuddy.services.fairness.models import FairnessDecision
+from coffeebuddy.services.fairness.window import record_assignment, window_counts
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
 
 
 class FairnessService:
-    """Encapsulates runner selection logic based on historical participation."""
+    """Encapsulates runner selection logic based on historical participation.
+
+    Participants are ranked by how often they ran among the channel's last
+    ``window_runs`` runs (kept in the ``runner_window_slots`` ring), then by
+    all-time runs served, earliest ``last_run_at`` and user id. Without a
+    window only the all-time ranking applies.
+
+    Without an ``index`` every participant's ``RunnerStat`` row is loaded and
+    compared. With a shared :class:`FairnessIndex` the channel's stats are
+    read once per hydration; a selection then loads only the rows of
+    participants the index does not know yet, of those inside the window and
+    of the chosen runner, which also confirms the index entry is current.
 
-    _EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+    On PostgreSQL a selection first takes a transaction-scoped advisory lock
+    on the channel, so two closes in one channel cannot both read the same
+    stats and ring; the second fails fast with
+    :class:`RunCloseInProgressError` instead of waiting for the first.
+    """
 
-    def __init__(self, session: Session, *, clock: Clock | None = None) -> None:
+    _EPOCH = _EPOCH
+
+    def __init__(
+        self,
+        session: Session,
+        *,
+        clock: Clock | None = None,
+        index: FairnessIndex | None = None,
+    ) -> None:
         self._session = session
         self._clock = clock or (lambda: datetime.now(timezone.utc))
+        self._index = index
 
     def assign_runner(
         self,
@@ -29,32 +60,37 @@ class FairnessService:
         participant_user_ids: Sequence[str | UUID],
         last_runner_id: str | None,
         allow_immediate_repeat: bool,
+        window_runs: int | None = None,
     ) -> FairnessDecision:
         participants = self._unique_ordered(participant_user_ids)
         if not participants:
             raise RunnerSelectionError("No eligible participants to evaluate for runner assignment.")
 
         channel_uuid = _as_uuid(channel_id)
-        stats = self._load_stats(channel_uuid, participants)
-        previous_counts = {uid: stat.runs_served_count for uid, stat in stats.items()}
-
-        candidate_stats = list(stats.values())
-        excluded_last_runner = False
-        if (
+        self._lock_channel(channel_uuid)
+        excluded_last_runner = bool(
             not allow_immediate_repeat
             and last_runner_id
-            and last_runner_id in stats
-            and len(candidate_stats) > 1
-        ):
-            candidate_stats = [
-                stat for stat in candidate_stats if str(stat.user_id) != last_runner_id
-            ]
-            excluded_last_runner = True
-
-        if not candidate_stats:
-            candidate_stats = list(stats.values())
-
-        chosen = min(candidate_stats, key=self._sort_key)
+            and last_runner_id in participants
+            and len(participants) > 1
+        )
+        exclude = last_runner_id if excluded_last_runner else None
+        ring = self._load_ring(channel_uuid)
+        recent = window_counts(ring.values(), window_runs) if window_runs else Counter()
+        pending = _pending_channels(self._session)
+        if self._index is None or channel_uuid in pending:
+            # Rows this transaction already assigned are ahead of the index
+            # until it commits, so they must not be published to it.
+            stats = self._load_stats(channel_uuid, participants)
+            chosen = min(
+                (stat for uid, stat in stats.items() if uid != exclude),
+                key=lambda stat: (recent[str(stat.user_id)], self._sort_key(stat)),
+            )
+        else:
+            chosen = self._choose_indexed(channel_uuid, participants, exclude, recent)
+
+        previous_count = chosen.runs_served_count
+        window_count = recent[str(chosen.user_id)]
         now = self._clock()
 
         if getattr(chosen, "created_at", None) is None:
@@ -62,17 +98,122 @@ class FairnessService:
         chosen.runs_served_count += 1
         chosen.last_run_at = now
         chosen.updated_at = now
+        record_assignment(
+            self._session, ring, channel_id=channel_uuid, user_id=_as_uuid(chosen.user_id), assigned_at=now
+        )
+        if self._index is not None:
+            index, key = self._index, self._sort_key(chosen)
+            pending.add(channel_uuid)
+            after_commit(self._session, lambda: index.update(channel_uuid, key[3], key))
 
         rationale = self._build_rationale(
-            previous_count=previous_counts[str(chosen.user_id)],
+            previous_count=previous_count,
             excluded_last_runner=excluded_last_runner,
+            window_runs=window_runs,
+            window_count=window_count,
         )
 
         return FairnessDecision(runner_user_id=str(chosen.user_id), rationale=rationale)
 
+    def _lock_channel(self, channel_id: UUID) -> None:
+        """Holds the channel's advisory lock until the transaction ends (PostgreSQL only)."""
+        if self._session.get_bind().dialect.name != "postgresql":
+            return
+        if not self._session.scalar(select(func.pg_try_advisory_xact_lock(_advisory_key(channel_id)))):
+            raise RunCloseInProgressError(f"A runner is already being chosen in channel {channel_id}.")
+
+    def _choose_indexed(
+        self,
+        channel_id: UUID,
+        participants: list[str],
+        exclude: str | None,
+        recent: Counter[str],
+    ) -> RunnerStat:
+        """Picks the runner from the index, falling back to the window's runners.
+
+        Anyone who did not run inside the window outranks everyone who did,
+        so the index only has to rank the former; the at most ``window_runs``
+        others are compared directly when nobody else is eligible.
+        """
+        windowed = [uid for uid in participants if recent[uid] and uid != exclude]
+        skipped = {*windowed, exclude} if exclude else set(windowed)
+        chosen = self._pick_indexed(channel_id, participants, skipped)
+        if chosen is not None:
+            return chosen
+        stats = self._load_stats(channel_id, windowed)
+        return min(stats.values(), key=lambda stat: (recent[str(stat.user_id)], self._sort_key(stat)))
+
+    def _pick_indexed(
+        self, channel_id: UUID, participants: list[str], exclude: set[str]
+    ) -> RunnerStat | None:
+        """Picks the lowest-keyed participant outside ``exclude`` from the index.
+
+        Index keys never run ahead of the database, so when the chosen row
+        still matches its entry no other participant can rank lower. A row
+        that moved on (another process assigned it) refreshes its entry and
+        the pick is repeated. A row that is behind its entry or was
+        re-created means the channel was reset, possibly by another replica
+        whose invalidation never reached this index: the channel is dropped
+        and hydrated again.
+        """
+        assert self._index is not None
+        stats: dict[str, RunnerStat] = {}
+        while True:
+            if channel_id not in self._index:
+                self._hydrate(channel_id)
+            missing = self._index.missing(channel_id, participants)
+            stats.update(self._load_stats(channel_id, missing))
+            for user_id in missing:
+                self._index.update(channel_id, user_id, self._sort_key(stats[user_id]))
+
+            picked = self._index.min_among(channel_id, participants, exclude=exclude)
+            if picked is None:
+                if channel_id in self._index and not self._index.missing(channel_id, participants):
+                    return None
+                # Invalidated or re-hydrated elsewhere meanwhile; fill it in again.
+                continue
+            user_id, key = picked
+            if user_id not in stats:
+                stats.update(self._load_stats(channel_id, [user_id]))
+            actual = self._sort_key(stats[user_id])
+            if actual == key:
+                return stats[user_id]
+            if _reset_since(key, actual):
+                FAIRNESS_INDEX_TOTAL.labels(result="reset").inc()
+                self._index.invalidate(channel_id)
+                continue
+            FAIRNESS_INDEX_TOTAL.labels(result="stale").inc()
+            self._index.update(channel_id, user_id, actual)
+
+    def _load_ring(self, channel_id: UUID) -> dict[int, RunnerWindowSlot]:
+        slots = self._session.scalars(
+            select(RunnerWindowSlot).where(RunnerWindowSlot.channel_id == channel_id)
+        )
+        return {slot.slot: slot for slot in slots}
+
+    def _hydrate(self, channel_id: UUID) -> None:
+        rows = self._session.execute(
+            select(
+                RunnerStat.runs_served_count,
+                RunnerStat.last_run_at,
+                RunnerStat.created_at,
+                RunnerStat.user_id,
+            ).where(RunnerStat.channel_id == channel_id)
+        )
+        assert self._index is not None
+        self._index.hydrate(
+            channel_id,
+            (
+                (str(user_id), _stat_key(count, last_run_at, created_at, user_id))
+                for count, last_run_at, created_at, user_id in rows
+            ),
+        )
+
     def _load_stats(
         self, channel_id: UUID, participants: list[str]
     ) -> dict[str, RunnerStat]:
+        if not participants:
+            return {}
         stmt = (
             select(RunnerStat)
             .where(
@@ -100,14 +241,26 @@ class FairnessService:
                 self._session.add(stat)
         return stats
 
-    def _sort_key(self, stat: RunnerStat) -> tuple[int, datetime, datetime, str]:
-        last_run = stat.last_run_at or self._EPOCH
-        created_at = getattr(stat, "created_at", self._EPOCH)
-        return (stat.runs_served_count, last_run, created_at, str(stat.user_id))
+    def _sort_key(self, stat: RunnerStat) -> StatKey:
+        return _stat_key(
+            stat.runs_served_count, stat.last_run_at, getattr(stat, "created_at", None), stat.user_id
+        )
 
-    def _build_rationale(self, *, previous_count: int, excluded_last_runner: bool) -> str:
+    def _build_rationale(
+        self,
+        *,
+        previous_count: int,
+        excluded_last_runner: bool,
+        window_runs: int | None = None,
+        window_count: int = 0,
+    ) -> str:
+        window = (
+            f"fewest runs in the channel's last {window_runs} runs ({window_count}), then "
+            if window_runs
+            else ""
+        )
         base = (
-            "Runner chosen by minimum recent runs served "
+            f"Runner chosen by {window}minimum recent runs served "
             f"(count before assignment: {previous_count}). "
             "Tie-breakers: earliest last_run_at then deterministic user id."
         )
@@ -127,6 +280,35 @@ class FairnessService:
         return ordered
 
 
+_PENDING_INFO_KEY = "coffeebuddy.fairness_pending"
+
+
+def _pending_channels(session: Session) -> set[UUID]:
+    """Channels with a runner assigned in the session's open transaction."""
+    pending = session.info.get(_PENDING_INFO_KEY)
+    if pending is None:
+        pending = session.info[_PENDING_INFO_KEY] = set()
+        event.listen(session, "after_commit", lambda _session: pending.clear())
+        event.listen(session, "after_rollback", lambda _session: pending.clear())
+    return pending
+
+
+def _stat_key(
+    runs_served_count: int, last_run_at: datetime | None, created_at: datetime | None, user_id: str | UUID
+) -> StatKey:
+    return (runs_served_count, last_run_at or _EPOCH, created_at or _EPOCH, str(user_id))
+
+
+def _reset_since(entry: StatKey, actual: StatKey) -> bool:
+    """Whether the row behind ``entry`` was deleted since: a kept row only grows and keeps its ``created_at``."""
+    return actual[2] != entry[2] or actual < entry
+
+
+def _advisory_key(channel_id: UUID) -> int:
+    """Signed 64-bit advisory lock key for a channel."""
+    return int.from_bytes(channel_id.bytes[:8], "big", signed=True)
+
+
 def _as_uuid(value: str | UUID) -> UUID:
     if isinstance(value, UUID):
         return value
@@ -0,0 +1,400 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from coffeebuddy.infra.db.models import (
+    FAIRNESS_WINDOW_CAPACITY,
+    Base,
+    Channel,
+    Order,
+    Run,
+    RunStatus,
+    User,
+)
+from coffeebuddy.services.fairness.index import FairnessIndex
+from coffeebuddy.services.fairness.service import FairnessService
+
+_NOBODY = -1
+# Simulated ids share a hex prefix with a letter, so they sort by index and
+# SQLite does not read an all-digit id back as a number.
+_ID_PREFIX = 0xC0FFEE << 104
+
+
+@dataclass(frozen=True, slots=True)
+class Scenario:
+    """Synthetic channel history: who shows up for each of ``runs`` runs.
+
+    Each user attends a run with their own probability, drawn uniformly from
+    ``attendance``, unless they are away: a present user leaves with
+    probability ``absence_rate`` per run and stays away for
+    ``mean_absence_runs`` runs on average. ``simulations`` independent
+    channels are drawn at once.
+    """
+
+    users: int = 12
+    runs: int = 10_000
+    simulations: int = 100
+    attendance: tuple[float, float] = (0.3, 0.9)
+    absence_rate: float = 0.02
+    mean_absence_runs: float = 10.0
+    seed: int = 0
+
+
+@dataclass(frozen=True, slots=True)
+class Policy:
+    """A runner-selection rule, applied to the eligible participants of a run.
+
+    Every policy ends with the production tie-breakers: earliest last run,
+    earliest first appearance, then user order. ``current`` ranks by all-time
+    runs served, like :class:`FairnessService` without a window;
+    ``windowed`` ranks by runs among the channel's last ``window_runs`` runs
+    first, like :class:`FairnessService` with ``window_runs``; ``decayed``
+    ranks by runs served weighted ``0.5 ** (age / half_life_runs)``, with age
+    counted in runs, and has no production counterpart.
+    """
+
+    name: str
+    window_runs: int | None = None
+    half_life_runs: float | None = None
+
+    @classmethod
+    def current(cls) -> Policy:
+        return cls("current")
+
+    @classmethod
+    def windowed(cls, window_runs: int) -> Policy:
+        if not 0 < window_runs <= FAIRNESS_WINDOW_CAPACITY:
+            raise ValueError(f"window_runs must be between 1 and {FAIRNESS_WINDOW_CAPACITY}.")
+        return cls(f"windowed({window_runs})", window_runs=window_runs)
+
+    @classmethod
+    def decayed(cls, half_life_runs: float) -> Policy:
+        if half_life_runs <= 0:
+            raise ValueError("half_life_runs must be positive.")
+        return cls(f"decayed({half_life_runs:g})", half_life_runs=half_life_runs)
+
+
+@dataclass(frozen=True, slots=True)
+class SimulationResult:
+    """Runner of every run, and each user's load, per simulated channel.
+
+    ``runners`` is ``(runs, simulations)`` user indexes (-1 where nobody
+    attended, so the run did not close); ``served`` and ``fair_share`` are
+    ``(simulations, users)``, the latter summing ``1 / participants`` over
+    the runs each user attended.
+    """
+
+    policy: Policy
+    runners: np.ndarray
+    served: np.ndarray
+    fair_share: np.ndarray
+    elapsed_seconds: float
+
+    @property
+    def closed_runs(self) -> int:
+        return int((self.runners != _NOBODY).sum())
+
+
+@dataclass(frozen=True, slots=True)
+class PolicyReport:
+    """How one policy spread the runs of a set of simulated channels.
+
+    ``gini`` is the mean, over channels, of the Gini coefficient of each
+    user's runs served divided by their fair share (0 when everyone ran in
+    proportion to how often they attended). ``production_deviation`` is the
+    share of replayed runs where :class:`FairnessService` chose a different
+    runner than the vectorized reference (None for policies production does
+    not implement).
+    """
+
+    policy: str
+    runs: int
+    gini: float
+    max_streak: int
+    runs_per_second: float
+    production_deviation: float | None
+
+
+def synthesize(scenario: Scenario) -> np.ndarray:
+    """Draws a ``(runs, simulations, users)`` attendance mask for ``scenario``."""
+    rng = np.random.default_rng(scenario.seed)
+    shape = (scenario.simulations, scenario.users)
+    low, high = scenario.attendance
+    attendance = rng.uniform(low, high, size=shape)
+    returns = 1.0 / max(scenario.mean_absence_runs, 1.0)
+    away = np.zeros(shape, dtype=bool)
+    participation = np.empty((scenario.runs, *shape), dtype=bool)
+    for run in range(scenario.runs):
+        draws = rng.random((2, *shape))
+        away = np.where(away, draws[0] >= returns, draws[0] < scenario.absence_rate)
+        participation[run] = ~away & (draws[1] < attendance)
+    return participation
+
+
+def history_participation(session: Session, channel_id: UUID) -> tuple[np.ndarray, list[UUID]]:
+    """Reads a channel's closed runs as a ``(runs, 1, users)`` attendance mask.
+
+    Users are ordered by their id's string form, the order production uses
+    to break ties, so the mask can be fed to :func:`simulate` directly.
+    """
+    rows = session.execute(
+        select(Run.id, Order.user_id)
+        .join(Order, Order.run_id == Run.id)
+        .where(Run.channel_id == channel_id, Run.status == RunStatus.CLOSED, Order.canceled_at.is_(None))
+        .order_by(Run.closed_at.asc(), Run.id.asc())
+    ).all()
+    users = sorted({user_id for _, user_id in rows}, key=str)
+    columns = {user_id: column for column, user_id in enumerate(users)}
+    runs: dict[UUID, int] = {}
+    for run_id, _ in rows:
+        runs.setdefault(run_id, len(runs))
+    participation = np.zeros((len(runs), 1, len(users)), dtype=bool)
+    for run_id, user_id in rows:
+        participation[runs[run_id], 0, columns[user_id]] = True
+    return participation, users
+
+
+def simulate(participation: np.ndarray, policy: Policy, *, exclude_back_to_back: bool = True) -> SimulationResult:
+    """Replays ``participation`` (``(runs, simulations, users)``) under ``policy``.
+
+    Runs are sequential, but every step updates all simulated channels and
+    users at once. With ``exclude_back_to_back`` the previous runner is not
+    eligible when anyone else attended, as when a close does not allow an
+    immediate repeat.
+    """
+    runs, simulations, users = participation.shape
+    channels = np.arange(simulations)
+    rank = np.broadcast_to(np.arange(users), (simulations, users))
+    served = np.zeros((simulations, users), dtype=np.int64)
+    last_run = np.full((simulations, users), _NOBODY, dtype=np.int64)
+    first_seen = np.full((simulations, users), runs, dtype=np.int64)
+    fair_share = np.zeros((simulations, users))
+    previous = np.full(simulations, _NOBODY, dtype=np.int64)
+    closed_count = np.zeros(simulations, dtype=np.int64)
+    runners = np.full((runs, simulations), _NOBODY, dtype=np.int64)
+
+    if policy.window_runs:
+        in_window = np.zeros((simulations, users), dtype=np.int64)
+        ring = np.full((simulations, policy.window_runs), _NOBODY, dtype=np.int64)
+    if policy.half_life_runs:
+        decay = 0.5 ** (1.0 / policy.half_life_runs)
+        score = np.zeros((simulations, users))
+
+    started = time.perf_counter()
+    for run in range(runs):
+        present = participation[run]
+        attended = present.sum(axis=1)
+        first_seen = np.minimum(first_seen, np.where(present, run, runs))
+        fair_share += present / np.maximum(attended, 1)[:, None]
+
+        eligible = present
+        if exclude_back_to_back:
+            repeat = (previous != _NOBODY) & (attended > 1)
+            eligible = present.copy()
+            eligible[channels[repeat], previous[repeat]] = False
+
+        if policy.window_runs:
+            keys = (in_window, served, last_run, first_seen, rank)
+        elif policy.half_life_runs:
+            keys = (score, last_run, first_seen, rank)
+        else:
+            keys = (served, last_run, first_seen, rank)
+        chosen = _lexargmin(eligible, keys)
+
+        closed = channels[attended > 0]
+        runner = chosen[closed]
+        served[closed, runner] += 1
+        last_run[closed, runner] = run
+        if policy.window_runs:
+            slot = closed_count[closed] % policy.window_runs
+            evicted = ring[closed, slot]
+            held = evicted != _NOBODY
+            in_window[closed[held], evicted[held]] -= 1
+            ring[closed, slot] = runner
+            in_window[closed, runner] += 1
+        if policy.half_life_runs:
+            score *= decay
+            score[closed, runner] += 1.0
+        closed_count[closed] += 1
+        previous[closed] = runner
+        runners[run, closed] = runner
+
+    return SimulationResult(
+        policy=policy,
+        runners=runners,
+        served=served,
+        fair_share=fair_share,
+        elapsed_seconds=time.perf_counter() - started,
+    )
+
+
+def gini(values: np.ndarray, valid: np.ndarray | None = None) -> np.ndarray:
+    """Gini coefficient of each row of ``values`` over its ``valid`` entries.
+
+    0 when the values are equal, approaching 1 as they concentrate in one
+    entry. Rows with no valid entry or a zero total score 0.
+    """
+    if valid is None:
+        valid = np.ones(values.shape, dtype=bool)
+    ordered = np.sort(np.where(valid, values, np.inf), axis=1)
+    count = valid.sum(axis=1)[:, None]
+    position = np.arange(1, values.shape[1] + 1)
+    ordered = np.where(position <= count, ordered, 0.0)
+    total = ordered.sum(axis=1)
+    weighted = ((2 * position - count - 1) * ordered).sum(axis=1)
+    denominator = count[:, 0] * total
+    return np.divide(weighted, denominator, out=np.zeros_like(total), where=denominator > 0)
+
+
+def max_streaks(runners: np.ndarray) -> np.ndarray:
+    """Longest run of consecutive closed runs with the same runner, per channel."""
+    streaks = np.zeros(runners.shape[1], dtype=np.int64)
+    for channel in range(runners.shape[1]):
+        closed = runners[:, channel][runners[:, channel] != _NOBODY]
+        if closed.size:
+            edges = np.flatnonzero(np.concatenate(([True], closed[1:] != closed[:-1], [True])))
+            streaks[channel] = np.diff(edges).max()
+    return streaks
+
+
+def production_runners(
+    participation: np.ndarray, policy: Policy, *, exclude_back_to_back: bool = True
+) -> np.ndarray:
+    """Replays a ``(runs, users)`` attendance mask through :class:`FairnessService`.
+
+    Uses an in-memory SQLite database, the shared :class:`FairnessIndex` and
+    one committed assignment per run, as closes do in production. User ``i``
+    gets the ``i``-th smallest id and joins participant lists in that order,
+    so the reference's tie-breakers apply unchanged.
+    """
+    if policy.half_life_runs:
+        raise ValueError(f"{policy.name} has no production counterpart.")
+    runs, users = participation.shape
+    clock = _SteppingClock()
+    now = clock()
+    channel = Channel(
+        id=UUID(int=_ID_PREFIX), slack_channel_id="CSIMULATE", name="simulate", created_at=now, updated_at=now
+    )
+    members = [
+        User(
+            id=UUID(int=_ID_PREFIX + index + 1),
+            slack_user_id=f"USIM{index}",
+            display_name=f"User {index}",
+            created_at=now,
+            updated_at=now,
+        )
+        for index in range(users)
+    ]
+    user_ids = [str(member.id) for member in members]
+    columns = {user_id: column for column, user_id in enumerate(user_ids)}
+
+    engine = create_engine("sqlite+pysqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    runners = np.full(runs, _NOBODY, dtype=np.int64)
+    try:
+        with sessionmaker(bind=engine, expire_on_commit=False)() as session:
+            session.add_all([channel, *members])
+            session.commit()
+            service = FairnessService(session, clock=clock, index=FairnessIndex())
+            last_runner_id: str | None = None
+            for run in range(runs):
+                participants = [user_ids[column] for column in np.flatnonzero(participation[run])]
+                if not participants:
+                    continue
+                decision = service.assign_runner(
+                    channel_id=channel.id,
+                    participant_user_ids=participants,
+                    last_runner_id=last_runner_id,
+                    allow_immediate_repeat=not exclude_back_to_back,
+                    window_runs=policy.window_runs,
+                )
+                session.commit()
+                last_runner_id = decision.runner_user_id
+                runners[run] = columns[last_runner_id]
+    finally:
+        engine.dispose()
+    return runners
+
+
+def compare_policies(
+    participation: np.ndarray,
+    policies: Sequence[Policy],
+    *,
+    exclude_back_to_back: bool = True,
+    production_runs: int = 1_000,
+) -> list[PolicyReport]:
+    """Simulates every policy on ``participation`` and summarizes the outcome.
+
+    For policies production implements, the first ``production_runs`` runs of
+    the first simulated channel are also replayed through
+    :class:`FairnessService` and compared run by run with the reference.
+    """
+    reports = []
+    for policy in policies:
+        result = simulate(participation, policy, exclude_back_to_back=exclude_back_to_back)
+        load = np.divide(
+            result.served, result.fair_share, out=np.zeros_like(result.fair_share), where=result.fair_share > 0
+        )
+        deviation = None
+        if production_runs and not policy.half_life_runs:
+            replayed = participation[:production_runs, 0]
+            actual = production_runners(replayed, policy, exclude_back_to_back=exclude_back_to_back)
+            deviation = float((actual != result.runners[:production_runs, 0]).mean())
+        reports.append(
+            PolicyReport(
+                policy=policy.name,
+                runs=result.closed_runs,
+                gini=float(gini(load, result.fair_share > 0).mean()),
+                max_streak=int(max_streaks(result.runners).max(initial=0)),
+                runs_per_second=result.closed_runs / max(result.elapsed_seconds, 1e-9),
+                production_deviation=deviation,
+            )
+        )
+    return reports
+
+
+class _SteppingClock:
+    """Strictly increasing timestamps, so every write orders like a run index."""
+
+    def __init__(self) -> None:
+        self._now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    def __call__(self) -> datetime:
+        self._now += timedelta(milliseconds=1)
+        return self._now
+
+
+def _lexargmin(eligible: np.ndarray, keys: Sequence[np.ndarray]) -> np.ndarray:
+    """Per row, the column with the lexicographically smallest ``keys`` among ``eligible``.
+
+    The last key must be unique per row. Rows with nothing eligible return 0.
+    """
+    remaining = eligible
+    for key in keys:
+        ceiling = np.inf if key.dtype.kind == "f" else np.iinfo(key.dtype).max
+        masked = np.where(remaining, key, ceiling)
+        remaining = remaining & (masked == masked.min(axis=1, keepdims=True))
+    return remaining.argmax(axis=1)
+
+
+__all__ = [
+    "Policy",
+    "PolicyReport",
+    "Scenario",
+    "SimulationResult",
+    "compare_policies",
+    "gini",
+    "history_participation",
+    "max_streaks",
+    "production_runners",
+    "simulate",
+    "synthesize",
+]
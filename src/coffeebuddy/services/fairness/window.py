@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import heapq
+from collections import Counter
+from collections.abc import Iterable, Mapping
+from datetime import datetime
+from operator import attrgetter
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from coffeebuddy.infra.db.models import FAIRNESS_WINDOW_CAPACITY, RunnerWindowSlot
+
+
+def window_counts(slots: Iterable[RunnerWindowSlot], size: int) -> Counter[str]:
+    """Runs per user among the ``size`` most recent assignments in the ring."""
+    recent = heapq.nlargest(min(size, FAIRNESS_WINDOW_CAPACITY), slots, key=attrgetter("sequence"))
+    return Counter(str(slot.user_id) for slot in recent)
+
+
+def record_assignment(
+    session: Session,
+    ring: Mapping[int, RunnerWindowSlot],
+    *,
+    channel_id: UUID,
+    user_id: UUID,
+    assigned_at: datetime,
+) -> RunnerWindowSlot:
+    """Writes the next assignment over the ring's oldest slot (or a free one)."""
+    sequence = max((slot.sequence for slot in ring.values()), default=-1) + 1
+    position = sequence % FAIRNESS_WINDOW_CAPACITY
+    slot = ring.get(position)
+    if slot is None:
+        slot = RunnerWindowSlot(
+            channel_id=channel_id,
+            slot=position,
+            sequence=sequence,
+            user_id=user_id,
+            assigned_at=assigned_at,
+        )
+        session.add(slot)
+        return slot
+    slot.sequence = sequence
+    slot.user_id = user_id
+    slot.assigned_at = assigned_at
+    return slot
+
+
+__all__ = ["record_assignment", "window_counts"]
@@ -1,5 +1,16 @@
 """Preference service utilities."""
 
+from .async_service import AsyncPreferenceService
+from .cache import MISSING, CachedPreference, PreferenceCache, PreferenceInvalidation
+from .exceptions import PreferenceConflictError
 from .service import PreferenceService
 
-__all__ = ["PreferenceService"]
\ No newline at end of file
+__all__ = [
+    "MISSING",
+    "AsyncPreferenceService",
+    "CachedPreference",
+    "PreferenceCache",
+    "PreferenceConflictError",
+    "PreferenceInvalidation",
+    "PreferenceService",
+]
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from datetime import datetime, timezone
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from coffeebuddy.infra.db.hooks import has_pending_write
+from coffeebuddy.infra.db.models import UserPreference
+from coffeebuddy.services.catalog import AsyncOrderCatalog, catalog_hash
+from coffeebuddy.services.preferences.cache import MISSING, PreferenceCache
+from coffeebuddy.services.preferences.service import (
+    Clock,
+    _apply_swap,
+    _attach,
+    _conflict,
+    _edit_values,
+    _key,
+    _new_preference,
+    _select_preference,
+    _snapshot,
+    _swap_statement,
+    _upsert_statement,
+    _write_through,
+)
+
+
+class AsyncPreferenceService:
+    """:class:`PreferenceService` for an ``AsyncSession``.
+
+    Issues the same statements and shares the cache protocol: commit hooks
+    are registered on the session's ``sync_session``.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        *,
+        clock: Clock | None = None,
+        cache: PreferenceCache | None = None,
+    ) -> None:
+        self._session = session
+        self._clock = clock or (lambda: datetime.now(timezone.utc))
+        self._cache = cache
+        self._catalog = AsyncOrderCatalog(session, clock=self._clock)
+
+    async def get_preference(
+        self, *, user_id: str | UUID, channel_id: str | UUID
+    ) -> UserPreference | None:
+        key = _key(user_id, channel_id)
+        cacheable = self._cache is not None and not has_pending_write(self._session.sync_session, key)
+        if cacheable:
+            cached = self._cache.get(key)
+            if cached is None:
+                return None
+            if cached is not MISSING:
+                return _attach(self._session.sync_session, cached)
+
+        preference = await self._session.scalar(_select_preference(key))
+        if cacheable:
+            self._cache.put(key, _snapshot(preference) if preference else None)
+        return preference
+
+    async def set_preference(
+        self, *, user_id: str | UUID, channel_id: str | UUID, order_text: str, interned: bool = False
+    ) -> UserPreference:
+        hashes = await self._intern([order_text], interned=interned)
+        existing = await self.get_preference(user_id=user_id, channel_id=channel_id)
+        now = self._clock()
+        if existing:
+            await self._compare_and_swap(existing, _edit_values(order_text, hashes[order_text], now))
+            preference = existing
+        else:
+            preference = _new_preference(_key(user_id, channel_id), order_text, hashes[order_text], now)
+            self._session.add(preference)
+        _write_through(self._cache, self._session.sync_session, preference)
+        return preference
+
+    async def set_preferences(
+        self, entries: Sequence[tuple[UUID, UUID, str]], *, interned: bool = False
+    ) -> list[UserPreference]:
+        latest = {(user_id, channel_id): text for user_id, channel_id, text in entries}
+        if not latest:
+            return []
+        hashes = await self._intern(latest.values(), interned=interned)
+        dialect = self._session.get_bind().dialect.name
+        if dialect not in ("postgresql", "sqlite"):
+            return [
+                await self.set_preference(user_id=user_id, channel_id=channel_id, order_text=text, interned=True)
+                for (user_id, channel_id), text in latest.items()
+            ]
+
+        upsert = _upsert_statement(dialect, latest, hashes, self._clock())
+        result = await self._session.scalars(upsert, execution_options={"populate_existing": True})
+        preferences = list(result)
+        for preference in preferences:
+            _write_through(self._cache, self._session.sync_session, preference)
+        return preferences
+
+    async def mark_used(self, preference: UserPreference) -> UserPreference:
+        now = self._clock()
+        await self._compare_and_swap(preference, {"last_used_at": now, "updated_at": now})
+        _write_through(self._cache, self._session.sync_session, preference)
+        return preference
+
+    async def _compare_and_swap(self, preference: UserPreference, values: dict[str, object]) -> None:
+        version = (await self._session.execute(_swap_statement(preference, values))).scalar_one_or_none()
+        if version is None:
+            self._session.expire(preference)
+            raise _conflict(self._cache, preference)
+        _apply_swap(preference, values, version)
+
+    async def _intern(self, order_texts: Iterable[str], *, interned: bool) -> dict[str, str]:
+        if interned:
+            return {text: catalog_hash(text) for text in order_texts}
+        return await self._catalog.intern(order_texts, count_usage=False)
+
+
+__all__ = ["AsyncPreferenceService"]
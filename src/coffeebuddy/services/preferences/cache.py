@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime
+from uuid import UUID
+
+from coffeebuddy.services.preferences.metrics import PREFERENCE_CACHE_TOTAL
+
+PreferenceKey = tuple[UUID, UUID]
+
+
+@dataclass(frozen=True, slots=True)
+class CachedPreference:
+    """Column snapshot of a ``UserPreference`` row; safe to share across sessions."""
+
+    id: UUID
+    user_id: UUID
+    channel_id: UUID
+    last_order_text: str
+    last_used_at: datetime | None
+    created_at: datetime
+    updated_at: datetime
+    catalog_hash: str | None = None
+    version: int = 1
+
+
+@dataclass(frozen=True, slots=True)
+class PreferenceInvalidation:
+    """Evicts one user's preference in a channel, or the whole channel when ``user_id`` is None."""
+
+    channel_id: UUID
+    user_id: UUID | None = None
+
+
+InvalidationHook = Callable[[PreferenceInvalidation], None]
+
+
+class _Missing:
+    __slots__ = ()
+
+
+MISSING = _Missing()
+
+
+@dataclass(slots=True)
+class _Entry:
+    value: CachedPreference | None
+    expires_at: float
+
+
+class PreferenceCache:
+    """Process-wide LRU of preferences keyed on ``(user_id, channel_id)``.
+
+    ``None`` is cached too, so repeated "Use last order" clicks from users
+    without a preference stay off the database. Local writes and evictions
+    are reported to ``on_invalidate`` so they can be fanned out to other
+    replicas; invalidations received from elsewhere go through
+    :meth:`apply` and are not re-published.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 10_000,
+        ttl_seconds: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+        on_invalidate: InvalidationHook | None = None,
+    ) -> None:
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._clock = clock
+        self._on_invalidate = on_invalidate
+        self._entries: OrderedDict[PreferenceKey, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: PreferenceKey) -> CachedPreference | None | _Missing:
+        """Returns the cached value (possibly ``None``) or ``MISSING``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at > self._clock():
+                self._entries.move_to_end(key)
+                PREFERENCE_CACHE_TOTAL.labels(result="hit").inc()
+                return entry.value
+            if entry is not None:
+                del self._entries[key]
+        PREFERENCE_CACHE_TOTAL.labels(result="miss").inc()
+        return MISSING
+
+    def put(
+        self, key: PreferenceKey, value: CachedPreference | None, *, publish: bool = False
+    ) -> None:
+        """Stores ``value``; ``publish`` also tells other replicas to drop their copy."""
+        with self._lock:
+            self._entries[key] = _Entry(value=value, expires_at=self._clock() + self._ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        if publish and self._on_invalidate is not None:
+            self._on_invalidate(PreferenceInvalidation(channel_id=key[1], user_id=key[0]))
+
+    def invalidate(self, invalidation: PreferenceInvalidation) -> None:
+        """Evicts locally and notifies ``on_invalidate``."""
+        self.apply(invalidation)
+        if self._on_invalidate is not None:
+            self._on_invalidate(invalidation)
+
+    def apply(self, invalidation: PreferenceInvalidation) -> None:
+        """Evicts locally without notifying; the entry point for remote invalidations."""
+        with self._lock:
+            if invalidation.user_id is not None:
+                self._entries.pop((invalidation.user_id, invalidation.channel_id), None)
+                return
+            for key in [key for key in self._entries if key[1] == invalidation.channel_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+__all__ = [
+    "MISSING",
+    "CachedPreference",
+    "InvalidationHook",
+    "PreferenceCache",
+    "PreferenceInvalidation",
+    "PreferenceKey",
+]
@@ -0,0 +1,5 @@
+from __future__ import annotations
+
+
+class PreferenceConflictError(Exception):
+    """Raised when a preference changed between being read and written."""
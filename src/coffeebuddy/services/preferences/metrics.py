@@ -0,0 +1,9 @@
+from __future__ import annotations
+
+from prometheus_client import Counter
+
+PREFERENCE_CACHE_TOTAL = Counter(
+    "coffeebuddy_preference_cache_total",
+    "Preference cache lookups by result (hit or miss).",
+    ("result",),
+)
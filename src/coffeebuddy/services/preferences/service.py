@@ -1,61 +1,259 @@
 from __future__ import annotations
 
+from collections.abc import Callable, Iterable, Sequence
 from datetime import datetime, timezone
 from uuid import UUID, uuid4
 
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
 
-from coffeebuddy.core.orders.models import Clock
+from coffeebuddy.infra.db.hooks import after_commit, has_pending_write
 from coffeebuddy.infra.db.models import UserPreference
+from coffeebuddy.services.catalog import OrderCatalog, catalog_hash
+from coffeebuddy.services.preferences.cache import (
+    MISSING,
+    CachedPreference,
+    PreferenceCache,
+    PreferenceInvalidation,
+    PreferenceKey,
+)
+from coffeebuddy.services.preferences.exceptions import PreferenceConflictError
+
+Clock = Callable[[], datetime]
 
 
 class PreferenceService:
-    """Manages per-channel user preference snapshots."""
+    """Manages per-channel user preference snapshots.
+
+    With a ``cache`` reads are served from the shared :class:`PreferenceCache`
+    and writes reach it only after the session commits. Preference texts
+    reference the order catalog; pass ``interned=True`` when the caller has
+    already interned them in this transaction (as order writes do).
+
+    Edits to a loaded preference are compare-and-swap on ``version`` and
+    raise :class:`PreferenceConflictError` when another writer got there
+    first; the stale copy is expired and evicted so a retry reads it afresh.
+    """
 
-    def __init__(self, session: Session, *, clock: Clock | None = None) -> None:
+    def __init__(
+        self,
+        session: Session,
+        *,
+        clock: Clock | None = None,
+        cache: PreferenceCache | None = None,
+    ) -> None:
         self._session = session
         self._clock = clock or (lambda: datetime.now(timezone.utc))
+        self._cache = cache
+        self._catalog = OrderCatalog(session, clock=self._clock)
 
     def get_preference(
         self, *, user_id: str | UUID, channel_id: str | UUID
     ) -> UserPreference | None:
-        stmt = select(UserPreference).where(
-            UserPreference.user_id == self._as_uuid(user_id),
-            UserPreference.channel_id == self._as_uuid(channel_id),
-        )
-        return self._session.scalar(stmt)
+        key = _key(user_id, channel_id)
+        cacheable = self._cache is not None and not has_pending_write(self._session, key)
+        if cacheable:
+            cached = self._cache.get(key)
+            if cached is None:
+                return None
+            if cached is not MISSING:
+                return _attach(self._session, cached)
+
+        preference = self._session.scalar(_select_preference(key))
+        if cacheable:
+            self._cache.put(key, _snapshot(preference) if preference else None)
+        return preference
 
     def set_preference(
-        self, *, user_id: str | UUID, channel_id: str | UUID, order_text: str
+        self, *, user_id: str | UUID, channel_id: str | UUID, order_text: str, interned: bool = False
     ) -> UserPreference:
+        hashes = self._intern([order_text], interned=interned)
         existing = self.get_preference(user_id=user_id, channel_id=channel_id)
         now = self._clock()
         if existing:
-            existing.last_order_text = order_text
-            existing.last_used_at = now
-            existing.updated_at = now
+            self._compare_and_swap(existing, _edit_values(order_text, hashes[order_text], now))
             preference = existing
         else:
-            preference = UserPreference(
-                id=uuid4(),
-                user_id=self._as_uuid(user_id),
-                channel_id=self._as_uuid(channel_id),
-                last_order_text=order_text,
-                last_used_at=now,
-                created_at=now,
-                updated_at=now,
-            )
+            preference = _new_preference(_key(user_id, channel_id), order_text, hashes[order_text], now)
             self._session.add(preference)
+        _write_through(self._cache, self._session, preference)
         return preference
 
+    def set_preferences(
+        self, entries: Sequence[tuple[UUID, UUID, str]], *, interned: bool = False
+    ) -> list[UserPreference]:
+        """Upserts ``(user_id, channel_id, order_text)`` snapshots in one statement.
+
+        When a user/channel pair repeats, the last entry wins. Dialects without
+        ``ON CONFLICT`` fall back to :meth:`set_preference` per entry.
+        """
+        latest = {(user_id, channel_id): text for user_id, channel_id, text in entries}
+        if not latest:
+            return []
+        hashes = self._intern(latest.values(), interned=interned)
+        dialect = self._session.get_bind().dialect.name
+        if dialect not in ("postgresql", "sqlite"):
+            return [
+                self.set_preference(user_id=user_id, channel_id=channel_id, order_text=text, interned=True)
+                for (user_id, channel_id), text in latest.items()
+            ]
+
+        upsert = _upsert_statement(dialect, latest, hashes, self._clock())
+        preferences = list(self._session.scalars(upsert, execution_options={"populate_existing": True}))
+        for preference in preferences:
+            _write_through(self._cache, self._session, preference)
+        return preferences
+
     def mark_used(self, preference: UserPreference) -> UserPreference:
-        preference.last_used_at = self._clock()
-        preference.updated_at = preference.last_used_at
+        now = self._clock()
+        self._compare_and_swap(preference, {"last_used_at": now, "updated_at": now})
+        _write_through(self._cache, self._session, preference)
         return preference
 
-    @staticmethod
-    def _as_uuid(value: str | UUID) -> UUID:
-        if isinstance(value, UUID):
-            return value
-        return UUID(value)
\ No newline at end of file
+    def _compare_and_swap(self, preference: UserPreference, values: dict[str, object]) -> None:
+        """Writes ``values`` only if the row still has the version ``preference`` was read at."""
+        version = self._session.execute(_swap_statement(preference, values)).scalar_one_or_none()
+        if version is None:
+            self._session.expire(preference)
+            raise _conflict(self._cache, preference)
+        _apply_swap(preference, values, version)
+
+    def _intern(self, order_texts: Iterable[str], *, interned: bool) -> dict[str, str]:
+        if interned:
+            return {text: catalog_hash(text) for text in order_texts}
+        return self._catalog.intern(order_texts, count_usage=False)
+
+
+def _key(user_id: str | UUID, channel_id: str | UUID) -> PreferenceKey:
+    return _as_uuid(user_id), _as_uuid(channel_id)
+
+
+def _as_uuid(value: str | UUID) -> UUID:
+    if isinstance(value, UUID):
+        return value
+    return UUID(value)
+
+
+def _select_preference(key: PreferenceKey):
+    return select(UserPreference).where(
+        UserPreference.user_id == key[0],
+        UserPreference.channel_id == key[1],
+    )
+
+
+def _edit_values(order_text: str, text_hash: str, now: datetime) -> dict[str, object]:
+    return {"last_order_text": order_text, "catalog_hash": text_hash, "last_used_at": now, "updated_at": now}
+
+
+def _new_preference(key: PreferenceKey, order_text: str, text_hash: str, now: datetime) -> UserPreference:
+    return UserPreference(
+        id=uuid4(),
+        user_id=key[0],
+        channel_id=key[1],
+        last_order_text=order_text,
+        catalog_hash=text_hash,
+        last_used_at=now,
+        version=1,
+        created_at=now,
+        updated_at=now,
+    )
+
+
+def _upsert_statement(
+    dialect: str, latest: dict[tuple[UUID, UUID], str], hashes: dict[str, str], now: datetime
+):
+    insert = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(UserPreference).values(
+        [
+            {
+                "id": uuid4(),
+                "user_id": user_id,
+                "channel_id": channel_id,
+                "last_order_text": text,
+                "catalog_hash": hashes[text],
+                "last_used_at": now,
+                "version": 1,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for (user_id, channel_id), text in latest.items()
+        ]
+    )
+    upsert = insert.on_conflict_do_update(
+        index_elements=[UserPreference.user_id, UserPreference.channel_id],
+        set_={
+            "last_order_text": insert.excluded.last_order_text,
+            "catalog_hash": insert.excluded.catalog_hash,
+            "last_used_at": insert.excluded.last_used_at,
+            "updated_at": insert.excluded.updated_at,
+            "version": UserPreference.__table__.c.version + 1,
+        },
+    )
+    return upsert.returning(UserPreference)
+
+
+def _swap_statement(preference: UserPreference, values: dict[str, object]):
+    table = UserPreference.__table__
+    return (
+        update(table)
+        .where(table.c.id == preference.id, table.c.version == preference.version)
+        .values(**values, version=table.c.version + 1)
+        .returning(table.c.version)
+    )
+
+
+def _apply_swap(preference: UserPreference, values: dict[str, object], version: int) -> None:
+    for name, value in {**values, "version": version}.items():
+        set_committed_value(preference, name, value)
+
+
+def _conflict(cache: PreferenceCache | None, preference: UserPreference) -> PreferenceConflictError:
+    """Evicts the stale cached copy and builds the error for a lost compare-and-swap."""
+    if cache is not None:
+        cache.apply(PreferenceInvalidation(channel_id=preference.channel_id, user_id=preference.user_id))
+    return PreferenceConflictError(f"Preference {preference.id} changed while it was being updated.")
+
+
+def _write_through(cache: PreferenceCache | None, session: Session, preference: UserPreference) -> None:
+    if cache is None:
+        return
+    key = (preference.user_id, preference.channel_id)
+    snapshot = _snapshot(preference)
+    cache.apply(PreferenceInvalidation(channel_id=key[1], user_id=key[0]))
+    after_commit(session, lambda: cache.put(key, snapshot, publish=True), key=key)
+
+
+def _attach(session: Session, cached: CachedPreference) -> UserPreference:
+    """Returns a session-bound instance for ``cached`` without a SELECT."""
+    loaded = session.identity_map.get(identity_key(UserPreference, cached.id))
+    if loaded is not None:
+        return loaded
+    detached = UserPreference(
+        id=cached.id,
+        user_id=cached.user_id,
+        channel_id=cached.channel_id,
+        last_order_text=cached.last_order_text,
+        catalog_hash=cached.catalog_hash,
+        last_used_at=cached.last_used_at,
+        version=cached.version,
+        created_at=cached.created_at,
+        updated_at=cached.updated_at,
+    )
+    make_transient_to_detached(detached)
+    return session.merge(detached, load=False)
+
+
+def _snapshot(preference: UserPreference) -> CachedPreference:
+    return CachedPreference(
+        id=preference.id,
+        user_id=preference.user_id,
+        channel_id=preference.channel_id,
+        last_order_text=preference.last_order_text,
+        last_used_at=preference.last_used_at,
+        created_at=preference.created_at,
+        updated_at=preference.updated_at,
+        catalog_hash=preference.catalog_hash,
+        version=preference.version,
+    )
@@ -0,0 +1,7 @@
+BEGIN;
+
+DROP INDEX IF EXISTS idx_outbox_unpublished;
+
+DROP TABLE IF EXISTS outbox CASCADE;
+
+COMMIT;
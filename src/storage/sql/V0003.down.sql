@@ -0,0 +1,7 @@
+BEGIN;
+
+DROP INDEX IF EXISTS idx_slack_idempotency_expires_at;
+
+DROP TABLE IF EXISTS slack_idempotency_keys CASCADE;
+
+COMMIT;
@@ -0,0 +1,12 @@
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS slack_idempotency_keys (
+    key VARCHAR(128) PRIMARY KEY,
+    response BYTEA,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    expires_at TIMESTAMPTZ NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_slack_idempotency_expires_at ON slack_idempotency_keys (expires_at);
+
+COMMIT;
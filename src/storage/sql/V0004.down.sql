@@ -0,0 +1,7 @@
+BEGIN;
+
+ALTER TABLE runs DROP CONSTRAINT IF EXISTS chk_runs_active_order_count;
+
+ALTER TABLE runs DROP COLUMN IF EXISTS active_order_count;
+
+COMMIT;
@@ -0,0 +1,17 @@
+BEGIN;
+
+ALTER TABLE runs ADD COLUMN IF NOT EXISTS active_order_count INTEGER NOT NULL DEFAULT 0;
+
+UPDATE runs
+SET active_order_count = counts.active
+FROM (
+    SELECT run_id, COUNT(*) AS active
+    FROM orders
+    WHERE canceled_at IS NULL
+    GROUP BY run_id
+) AS counts
+WHERE runs.id = counts.run_id;
+
+ALTER TABLE runs ADD CONSTRAINT chk_runs_active_order_count CHECK (active_order_count >= 0);
+
+COMMIT;
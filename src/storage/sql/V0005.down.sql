@@ -0,0 +1,11 @@
+BEGIN;
+
+DROP INDEX IF EXISTS idx_outbox_unpublished;
+
+CREATE INDEX IF NOT EXISTS idx_outbox_unpublished ON outbox (created_at) WHERE published_at IS NULL;
+
+ALTER TABLE outbox DROP COLUMN IF EXISTS dead_lettered_at;
+
+ALTER TABLE outbox DROP COLUMN IF EXISTS next_attempt_at;
+
+COMMIT;
@@ -0,0 +1,11 @@
+BEGIN;
+
+ALTER TABLE outbox ADD COLUMN IF NOT EXISTS next_attempt_at TIMESTAMPTZ;
+
+ALTER TABLE outbox ADD COLUMN IF NOT EXISTS dead_lettered_at TIMESTAMPTZ;
+
+DROP INDEX IF EXISTS idx_outbox_unpublished;
+
+CREATE INDEX IF NOT EXISTS idx_outbox_unpublished ON outbox (created_at) WHERE published_at IS NULL AND dead_lettered_at IS NULL;
+
+COMMIT;
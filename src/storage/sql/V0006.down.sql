@@ -0,0 +1,13 @@
+BEGIN;
+
+ALTER TABLE runs DROP CONSTRAINT IF EXISTS chk_runs_participant_capacity;
+
+ALTER TABLE runs DROP CONSTRAINT IF EXISTS chk_runs_max_participants;
+
+ALTER TABLE runs DROP COLUMN IF EXISTS excluded_runner_slack_ids;
+
+ALTER TABLE runs DROP COLUMN IF EXISTS max_participants;
+
+ALTER TABLE runs DROP COLUMN IF EXISTS pickup_timezone;
+
+COMMIT;
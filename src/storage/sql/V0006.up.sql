@@ -0,0 +1,13 @@
+BEGIN;
+
+ALTER TABLE runs ADD COLUMN IF NOT EXISTS pickup_timezone VARCHAR(64);
+
+ALTER TABLE runs ADD COLUMN IF NOT EXISTS max_participants INTEGER;
+
+ALTER TABLE runs ADD COLUMN IF NOT EXISTS excluded_runner_slack_ids JSONB NOT NULL DEFAULT '[]';
+
+ALTER TABLE runs ADD CONSTRAINT chk_runs_max_participants CHECK (max_participants IS NULL OR max_participants > 0);
+
+ALTER TABLE runs ADD CONSTRAINT chk_runs_participant_capacity CHECK (max_participants IS NULL OR active_order_count <= max_participants);
+
+COMMIT;
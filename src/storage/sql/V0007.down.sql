@@ -0,0 +1,11 @@
+BEGIN;
+
+DROP INDEX IF EXISTS idx_orders_run_catalog;
+
+ALTER TABLE user_preferences DROP COLUMN IF EXISTS catalog_hash;
+
+ALTER TABLE orders DROP COLUMN IF EXISTS catalog_hash;
+
+DROP TABLE IF EXISTS order_catalog;
+
+COMMIT;
@@ -0,0 +1,38 @@
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS order_catalog (
+    text_hash VARCHAR(64) PRIMARY KEY,
+    canonical_text TEXT NOT NULL,
+    usage_count INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+ALTER TABLE orders ADD COLUMN IF NOT EXISTS catalog_hash VARCHAR(64) REFERENCES order_catalog (text_hash) ON DELETE RESTRICT;
+
+ALTER TABLE user_preferences ADD COLUMN IF NOT EXISTS catalog_hash VARCHAR(64) REFERENCES order_catalog (text_hash) ON DELETE RESTRICT;
+
+-- Canonical form must match coffeebuddy.services.catalog.canonicalize():
+-- strip leading and trailing whitespace of any kind (btrim only strips
+-- spaces), then collapse inner runs to one space and lower-case.
+INSERT INTO order_catalog (text_hash, canonical_text, usage_count)
+SELECT encode(sha256(convert_to(canonical, 'UTF8')), 'hex'), canonical, SUM(uses)
+FROM (
+    SELECT lower(regexp_replace(regexp_replace(order_text, '^\s+|\s+$', '', 'g'), '\s+', ' ', 'g')) AS canonical, 1 AS uses FROM orders
+    UNION ALL
+    SELECT lower(regexp_replace(regexp_replace(last_order_text, '^\s+|\s+$', '', 'g'), '\s+', ' ', 'g')), 0 FROM user_preferences
+) AS texts
+GROUP BY canonical
+ON CONFLICT (text_hash) DO NOTHING;
+
+UPDATE orders
+SET catalog_hash = encode(sha256(convert_to(lower(regexp_replace(regexp_replace(order_text, '^\s+|\s+$', '', 'g'), '\s+', ' ', 'g')), 'UTF8')), 'hex')
+WHERE catalog_hash IS NULL;
+
+UPDATE user_preferences
+SET catalog_hash = encode(sha256(convert_to(lower(regexp_replace(regexp_replace(last_order_text, '^\s+|\s+$', '', 'g'), '\s+', ' ', 'g')), 'UTF8')), 'hex')
+WHERE catalog_hash IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_orders_run_catalog ON orders (run_id, catalog_hash);
+
+COMMIT;
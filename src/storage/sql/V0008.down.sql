@@ -0,0 +1,7 @@
+BEGIN;
+
+ALTER TABLE user_preferences DROP COLUMN IF EXISTS version;
+
+ALTER TABLE orders DROP COLUMN IF EXISTS version;
+
+COMMIT;
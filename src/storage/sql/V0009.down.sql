@@ -0,0 +1,5 @@
+BEGIN;
+
+DROP TABLE IF EXISTS runner_window_slots;
+
+COMMIT;
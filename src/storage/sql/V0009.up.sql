@@ -0,0 +1,26 @@
+BEGIN;
+
+-- Ring buffer of each channel's last 50 runner assignments (the largest
+-- fairness_window_runs); assignment n lives in slot n % 50.
+CREATE TABLE IF NOT EXISTS runner_window_slots (
+    channel_id UUID NOT NULL REFERENCES channels(id) ON DELETE CASCADE,
+    slot INTEGER NOT NULL CHECK (slot BETWEEN 0 AND 49),
+    sequence INTEGER NOT NULL,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    assigned_at TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (channel_id, slot)
+);
+
+-- Seed each ring with the channel's most recent closed runs, oldest first.
+INSERT INTO runner_window_slots (channel_id, slot, sequence, user_id, assigned_at)
+SELECT channel_id, 50 - recency, 50 - recency, runner_user_id, closed_at
+FROM (
+    SELECT channel_id, runner_user_id, closed_at,
+           row_number() OVER (PARTITION BY channel_id ORDER BY closed_at DESC, id DESC) AS recency
+    FROM runs
+    WHERE status = 'closed' AND runner_user_id IS NOT NULL AND closed_at IS NOT NULL
+) AS recent
+WHERE recency <= 50
+ON CONFLICT (channel_id, slot) DO NOTHING;
+
+COMMIT;
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from coffeebuddy.core.orders import OrderService
+from coffeebuddy.core.orders.models import OrderSubmissionRequest
+from coffeebuddy.infra.db.models import Base, Channel, Run, RunStatus, User
+from coffeebuddy.jobs.reconciliation import ActiveOrderCountReconciler
+
+NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture()
+def session() -> Session:
+    engine = create_engine("sqlite+pysqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine, expire_on_commit=False)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def _seed(session: Session, *, runs: int, users: int) -> tuple[list[Run], list[User]]:
+    channel = Channel(id=uuid4(), slack_channel_id="C1", name="coffee", created_at=NOW, updated_at=NOW)
+    user_rows = [
+        User(id=uuid4(), slack_user_id=f"U{i}", display_name=f"User {i}", created_at=NOW, updated_at=NOW)
+        for i in range(users)
+    ]
+    run_rows = [
+        Run(
+            id=uuid4(),
+            channel_id=channel.id,
+            initiator_user_id=user_rows[0].id,
+            status=RunStatus.OPEN,
+            started_at=NOW,
+            created_at=NOW,
+            updated_at=NOW,
+        )
+        for _ in range(runs)
+    ]
+    session.add_all([channel, *user_rows])
+    session.flush()
+    session.add_all(run_rows)
+    session.commit()
+    return run_rows, user_rows
+
+
+def test_reconciler_detects_and_repairs_drift_across_pages(session: Session):
+    runs, users = _seed(session, runs=5, users=3)
+    service = OrderService(session, clock=lambda: NOW)
+    for run in runs:
+        for user in users:
+            service.submit_order(
+                OrderSubmissionRequest(run_id=str(run.id), user_id=str(user.id), order_text="Latte")
+            )
+    service.cancel_order(run_id=str(runs[0].id), user_id=str(users[0].id))
+    session.commit()
+
+    reconciler = ActiveOrderCountReconciler(session, batch_size=2)
+    assert reconciler.reconcile().drifted == ()
+
+    session.execute(update(Run).where(Run.id == runs[0].id).values(active_order_count=7))
+    session.execute(update(Run).where(Run.id == runs[3].id).values(active_order_count=0))
+    session.commit()
+
+    dry_run = reconciler.reconcile(repair=False)
+    assert dry_run.checked == 5
+    assert {(d.run_id, d.recorded, d.actual) for d in dry_run.drifted} == {
+        (runs[0].id, 7, 2),
+        (runs[3].id, 0, 3),
+    }
+
+    report = reconciler.reconcile()
+    assert len(report.drifted) == 2
+    session.expire_all()
+    assert session.get(Run, runs[0].id).active_order_count == 2
+    assert session.get(Run, runs[3].id).active_order_count == 3
+    assert reconciler.reconcile().drifted == ()
+
+
+def test_reconciler_skips_closed_runs_by_default(session: Session):
+    runs, _ = _seed(session, runs=2, users=1)
+    session.execute(
+        update(Run).where(Run.id == runs[1].id).values(status=RunStatus.CLOSED.value, active_order_count=4)
+    )
+    session.commit()
+
+    assert ActiveOrderCountReconciler(session).reconcile().checked == 1
+    report = ActiveOrderCountReconciler(session, statuses=tuple(RunStatus)).reconcile()
+    assert [drift.run_id for drift in report.drifted] == [runs[1].id]
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from coffeebuddy.core.runs.exceptions import RunCloseError, RunCloseInProgressError
+from coffeebuddy.core.runs.models import CloseRunRequest
+from coffeebuddy.core.runs.service import CloseRunService
+from coffeebuddy.infra.db.models import (
+    Base,
+    Channel,
+    Order,
+    Run,
+    RunnerStat,
+    RunnerWindowSlot,
+    RunStatus,
+    User,
+)
+from coffeebuddy.services.fairness.index import FairnessIndex
+from coffeebuddy.services.fairness.service import FairnessService
+
+NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+CLOSERS = 8
+
+
+@pytest.fixture()
+def session_factory(tmp_path):
+    # A file database so every thread gets its own connection and transaction.
+    engine = create_engine(
+        f"sqlite+pysqlite:///{tmp_path / 'runs.db'}", future=True, connect_args={"timeout": 30}
+    )
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine, expire_on_commit=False)
+    engine.dispose()
+
+
+@pytest.fixture()
+def seeded(session_factory) -> SimpleNamespace:
+    channel = Channel(id=uuid4(), slack_channel_id="C123", name="coffee", created_at=NOW, updated_at=NOW)
+    users = [
+        User(id=uuid4(), slack_user_id=f"U{index}", display_name=f"User {index}", created_at=NOW, updated_at=NOW)
+        for index in range(5)
+    ]
+    run = Run(
+        id=uuid4(),
+        channel_id=channel.id,
+        initiator_user_id=users[0].id,
+        status=RunStatus.OPEN,
+        started_at=NOW,
+        created_at=NOW,
+        updated_at=NOW,
+    )
+    with session_factory() as session:
+        session.add_all([channel, *users])
+        session.flush()
+        session.add(run)
+        session.flush()
+        session.execute(
+            insert(Order),
+            [
+                {
+                    "id": uuid4(),
+                    "run_id": run.id,
+                    "user_id": user.id,
+                    "order_text": "Latte",
+                    "created_at": NOW,
+                    "updated_at": NOW,
+                }
+                for user in users
+            ],
+        )
+        session.commit()
+    return SimpleNamespace(channel=channel, users=users, run=run)
+
+
+class _RendezvousAuthorizer:
+    """Holds every closer after it read the run as open until all of them have."""
+
+    def __init__(self, parties: int) -> None:
+        self._barrier = threading.Barrier(parties, timeout=30)
+
+    def is_authorized(self, *, run: Run, actor_user_id: str) -> bool:
+        self._barrier.wait()
+        return True
+
+
+def test_exactly_one_concurrent_close_wins(session_factory, seeded):
+    authorizer = _RendezvousAuthorizer(CLOSERS)
+    index = FairnessIndex()
+
+    def close() -> str | RunCloseError:
+        with session_factory() as session:
+            service = CloseRunService(
+                session=session,
+                fairness=FairnessService(session, index=index),
+                authorizer=authorizer,
+            )
+            try:
+                result = service.close_run(
+                    CloseRunRequest(run_id=str(seeded.run.id), actor_user_id=str(seeded.users[0].id))
+                )
+            except RunCloseError as exc:
+                session.rollback()
+                return exc
+            session.commit()
+            return result.runner_user_id
+
+    with ThreadPoolExecutor(max_workers=CLOSERS) as pool:
+        outcomes = list(pool.map(lambda _: close(), range(CLOSERS)))
+
+    winners = [outcome for outcome in outcomes if isinstance(outcome, str)]
+    losers = [outcome for outcome in outcomes if not isinstance(outcome, str)]
+    assert len(winners) == 1
+    assert all(isinstance(outcome, RunCloseInProgressError) for outcome in losers), losers
+
+    with session_factory() as session:
+        run = session.get(Run, seeded.run.id)
+        assert run.status == RunStatus.CLOSED
+        assert str(run.runner_user_id) == winners[0]
+        assert session.scalar(select(func.sum(RunnerStat.runs_served_count))) == 1
+        assert session.scalar(select(func.count()).select_from(RunnerWindowSlot)) == 1
+        assert session.scalars(select(Order.version)).all() == [2] * len(seeded.users)
+
+
+class _LockNotAvailable(Exception):
+    sqlstate = "55P03"
+
+
+class _PostgresSession:
+    """Fails the way a PostgreSQL session does when another transaction holds the lock."""
+
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+
+    def get_bind(self):
+        return type("Bind", (), {"dialect": postgresql.dialect()})()
+
+    def execute(self, statement):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        raise OperationalError(self.statements[-1], {}, _LockNotAvailable())
+
+    def scalar(self, statement):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        return False
+
+
+def test_close_fails_fast_when_the_run_row_is_locked():
+    session = _PostgresSession()
+    service = CloseRunService(session=session, fairness=None, authorizer=None)
+    with pytest.raises(RunCloseInProgressError):
+        service._load_close_state(str(uuid4()))
+    (statement,) = session.statements
+    assert statement.endswith("FOR UPDATE OF runs NOWAIT")
+
+
+def test_runner_selection_fails_fast_when_the_channel_is_locked():
+    session = _PostgresSession()
+    with pytest.raises(RunCloseInProgressError):
+        FairnessService(session).assign_runner(
+            channel_id=uuid4(), participant_user_ids=["a", "b"], last_runner_id=None, allow_immediate_repeat=True
+        )
+    (statement,) = session.statements
+    assert "pg_try_advisory_xact_lock" in statement
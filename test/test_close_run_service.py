@@ -20,8 +20,10 @@ from coffeebuddy.infra.db.models import (
     Run,
     RunStatus,
     RunnerStat,
+    RunnerWindowSlot,
     User,
 )
+from coffeebuddy.infra.db.query_budget import QueryBudget, QueryBudgetExceededError
 from coffeebuddy.services.fairness.service import FairnessService
 
 
@@ -192,7 +194,12 @@ def test_close_run_service_closes_and_summarizes(session):
     assert result.runner_user_id == str(participant_b.id)
     assert result.summary.total_orders == 2
     assert any(p.display_name == "Bailey" for p in result.summary.participants)
+    assert result.summary.runner_slack_user_id == "U102"
+    assert [p.slack_user_id for p in result.summary.participants] == ["U101", "U102"]
     assert "Runner chosen" in result.fairness_note
+    assert f"last {channel.fairness_window_runs} runs" in result.fairness_note
+    ring = session.scalars(select(RunnerWindowSlot).where(RunnerWindowSlot.channel_id == channel.id)).all()
+    assert [(slot.sequence, slot.user_id) for slot in ring] == [(0, participant_b.id)]
 
     orders = session.execute(
         select(Order).where(Order.run_id == run.id)
@@ -238,4 +245,81 @@ def test_close_run_without_orders_raises(session):
     with pytest.raises(RunnerSelectionError):
         service.close_run(
             CloseRunRequest(run_id=str(run.id), actor_user_id=str(initiator.id))
-        )
\ No newline at end of file
+        )
+
+def test_excluded_participants_are_never_chosen_as_runner(session):
+    channel = _create_channel(session)
+    initiator = _create_user(session, "U400", "Initiator")
+    participant_a = _create_user(session, "U401", "Alex")
+    participant_b = _create_user(session, "U402", "Bailey")
+
+    run = _create_run(session, channel, initiator)
+    # Bailey would win on fairness alone (Alex has served twice).
+    _prime_runner_stat(session, channel, participant_a, runs=2)
+    run.excluded_runner_slack_ids = ["U402"]
+    session.commit()
+    _create_order(session, run, participant_a, "Latte")
+    _create_order(session, run, participant_b, "Mocha")
+
+    service = CloseRunService(
+        session=session,
+        fairness=FairnessService(session=session, clock=_utcnow),
+        authorizer=InitiatorOnlyAuthorizer(),
+        clock=_utcnow,
+    )
+    result = service.close_run(CloseRunRequest(run_id=str(run.id), actor_user_id=str(initiator.id)))
+
+    assert result.runner_user_id == str(participant_a.id)
+    assert result.summary.total_orders == 2
+
+
+def test_close_run_with_every_participant_excluded_raises(session):
+    channel = _create_channel(session)
+    initiator = _create_user(session, "U500", "Initiator")
+    participant = _create_user(session, "U501", "Alex")
+    run = _create_run(session, channel, initiator)
+    run.excluded_runner_slack_ids = ["U501"]
+    session.commit()
+    _create_order(session, run, participant, "Latte")
+
+    service = CloseRunService(
+        session=session,
+        fairness=FairnessService(session=session, clock=_utcnow),
+        authorizer=InitiatorOnlyAuthorizer(),
+        clock=_utcnow,
+    )
+    with pytest.raises(RunnerSelectionError):
+        service.close_run(CloseRunRequest(run_id=str(run.id), actor_user_id=str(initiator.id)))
+
+
+@pytest.mark.parametrize("participants", [1, 20, 200])
+def test_close_run_statement_count_does_not_grow_with_participants(session, participants):
+    channel = _create_channel(session)
+    initiator = _create_user(session, "U600", "Initiator")
+    run = _create_run(session, channel, initiator)
+    for index in range(participants):
+        _create_order(session, run, _create_user(session, f"U7{index:03d}", f"Guest {index:03d}"), "Latte")
+    canceled = _create_order(session, run, initiator, "Mocha")
+    canceled.canceled_at = _utcnow()
+    session.commit()
+
+    service = CloseRunService(
+        session=session,
+        fairness=FairnessService(session=session, clock=_utcnow),
+        authorizer=InitiatorOnlyAuthorizer(),
+        clock=_utcnow,
+        # A zero budget reports every statement the close issued.
+        query_budget=QueryBudget({"runs.close_run": 0}, enforce=True),
+    )
+    with pytest.raises(QueryBudgetExceededError) as excinfo:
+        service.close_run(CloseRunRequest(run_id=str(run.id), actor_user_id=str(initiator.id)))
+
+    # Run read, the open-to-closed claim, fairness ring and stats, then
+    # runner, new stats and ring slot flushed, and one UPDATE for every order.
+    assert len(excinfo.value.statements) == 8
+    session.commit()
+    orders = session.scalars(
+        select(Order).where(Order.run_id == run.id).execution_options(populate_existing=True)
+    ).all()
+    assert sum(order.is_final for order in orders) == participants
+    assert all(order.version == (2 if order.is_final else 1) for order in orders)
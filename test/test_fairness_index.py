@@ -0,0 +1,288 @@
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine, delete
+from sqlalchemy.orm import sessionmaker
+
+from coffeebuddy.api.admin.authorizer import SlackAdminAuthorizer
+from coffeebuddy.api.admin.models import AdminActor
+from coffeebuddy.api.admin.service import AdminService
+from coffeebuddy.core.runs.exceptions import RunnerSelectionError
+from coffeebuddy.infra.db.models import Base, Channel, RunnerStat, RunnerWindowSlot, User
+from coffeebuddy.services.fairness.index import ChannelHeap, FairnessIndex
+from coffeebuddy.services.fairness.service import FairnessService
+
+_BASE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _key(runs: int, minutes: int, user_id: str):
+    return (runs, _BASE + timedelta(minutes=minutes), _BASE, user_id)
+
+
+def test_channel_heap_min_among_matches_brute_force():
+    rng = random.Random(7)
+    users = [f"u{index:02d}" for index in range(40)]
+    heap = ChannelHeap()
+    keys = {}
+    for step in range(2_000):
+        user_id = rng.choice(users)
+        keys[user_id] = _key(rng.randrange(10), rng.randrange(1_000), user_id)
+        heap.upsert(user_id, keys[user_id])
+
+        candidates = rng.sample(users, rng.randint(1, len(users)))
+        exclude = set(rng.sample(candidates, rng.randint(0, len(candidates))))
+        eligible = [(keys[uid], uid) for uid in candidates if uid in keys and uid not in exclude]
+        expected = None if not eligible else (min(eligible)[1], min(eligible)[0])
+        assert heap.min_among(candidates, exclude=exclude) == expected, step
+    assert len(heap) == len(keys)
+    assert all(heap.key(uid) == key for uid, key in keys.items())
+
+
+def test_index_refuses_to_answer_for_unknown_candidates():
+    channel_id = uuid4()
+    index = FairnessIndex()
+    assert index.min_among(channel_id, ["a"]) is None
+    assert index.missing(channel_id, ["a", "b"]) == ["a", "b"]
+
+    index.hydrate(channel_id, [("a", _key(1, 0, "a"))])
+    assert index.missing(channel_id, ["a", "b"]) == ["b"]
+    assert index.min_among(channel_id, ["a", "b"]) is None
+    index.update(channel_id, "b", _key(0, 0, "b"))
+    assert index.min_among(channel_id, ["a", "b"]) == ("b", _key(0, 0, "b"))
+    assert index.min_among(channel_id, ["a", "b"], exclude={"b"}) == ("a", _key(1, 0, "a"))
+    assert index.min_among(channel_id, ["a", "b"], exclude={"a", "b"}) is None
+
+    index.invalidate(channel_id)
+    assert channel_id not in index
+    index.update(channel_id, "a", _key(2, 0, "a"))
+    assert channel_id not in index
+
+
+def test_index_expires_channels_after_ttl():
+    now = [0.0]
+    channel_id = uuid4()
+    index = FairnessIndex(ttl_seconds=10, clock=lambda: now[0])
+    index.hydrate(channel_id, [])
+    assert channel_id in index
+    now[0] = 11
+    assert channel_id not in index
+
+
+def test_indexed_selection_requires_participants():
+    engine = create_engine("sqlite+pysqlite:///:memory:", future=True)
+    with sessionmaker(bind=engine)() as session:
+        service = FairnessService(session, index=FairnessIndex())
+        with pytest.raises(RunnerSelectionError):
+            service.assign_runner(
+                channel_id=uuid4(), participant_user_ids=[], last_runner_id=None, allow_immediate_repeat=False
+            )
+    engine.dispose()
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = _BASE
+
+    def __call__(self) -> datetime:
+        self.now += timedelta(seconds=1)
+        return self.now
+
+
+def _seed(session, rng: random.Random, clock: _Clock) -> tuple[list[Channel], list[User]]:
+    now = clock()
+    users = [
+        User(id=uuid4(), slack_user_id=f"U{index}", display_name=f"User {index}", created_at=now, updated_at=now)
+        for index in range(12)
+    ]
+    channels = [
+        Channel(id=uuid4(), slack_channel_id=f"C{index}", name=f"coffee-{index}", created_at=now, updated_at=now)
+        for index in range(3)
+    ]
+    session.add_all([*users, *channels])
+    session.flush()
+    for channel in channels:
+        for user in rng.sample(users, 6):
+            session.add(
+                RunnerStat(
+                    id=uuid4(),
+                    channel_id=channel.id,
+                    user_id=user.id,
+                    runs_served_count=rng.randrange(4),
+                    last_run_at=rng.choice([None, now - timedelta(hours=rng.randrange(1, 48))]),
+                    created_at=now - timedelta(days=rng.randrange(1, 30)),
+                    updated_at=now,
+                )
+            )
+    session.commit()
+    return channels, users
+
+
+def test_indexed_selection_matches_full_scan():
+    rng = random.Random(2024)
+    clock = _Clock()
+    engine = create_engine("sqlite+pysqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+    with factory() as session:
+        channels, users = _seed(session, rng, clock)
+
+    index = FairnessIndex()
+    last_runner = {channel.id: None for channel in channels}
+    for step in range(300):
+        channel = rng.choice(channels)
+        participants = [str(user.id) for user in rng.sample(users, rng.randint(1, 8))]
+        arguments = dict(
+            channel_id=channel.id,
+            participant_user_ids=participants,
+            last_runner_id=rng.choice([last_runner[channel.id], *participants]),
+            allow_immediate_repeat=rng.random() < 0.3,
+            window_runs=rng.choice([None, 1, 3, 5]),
+        )
+
+        # Sessions share the in-memory connection, so every oracle rolls back
+        # before the indexed session writes anything.
+        with factory() as oracle_session:
+            expected = FairnessService(oracle_session, clock=clock).assign_runner(**arguments)
+            oracle_session.rollback()
+        with factory() as oracle_session:
+            oracle_service = FairnessService(oracle_session, clock=clock)
+            oracle_service.assign_runner(**arguments)
+            expected_again = oracle_service.assign_runner(**arguments)
+            oracle_session.rollback()
+
+        action = rng.random()
+        with factory() as session:
+            if action < 0.15:
+                # Another process assigns this runner without the index seeing it.
+                FairnessService(session, clock=clock).assign_runner(**arguments)
+                session.commit()
+                continue
+            if action < 0.2:
+                session.execute(delete(RunnerStat).where(RunnerStat.channel_id == channel.id))
+                session.execute(delete(RunnerWindowSlot).where(RunnerWindowSlot.channel_id == channel.id))
+                index.invalidate(channel.id)
+                session.commit()
+                continue
+
+            decision = FairnessService(session, clock=clock, index=index).assign_runner(**arguments)
+            assert decision == expected, step
+            if action < 0.3:
+                session.rollback()
+                continue
+            if action < 0.4:
+                # A second close in the same transaction sees the first one.
+                again = FairnessService(session, clock=clock, index=index).assign_runner(**arguments)
+                assert again.runner_user_id == expected_again.runner_user_id, step
+            session.commit()
+            last_runner[channel.id] = decision.runner_user_id
+
+    engine.dispose()
+
+
+def test_admin_reset_drops_channel_from_index():
+    clock = _Clock()
+    engine = create_engine("sqlite+pysqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+    with factory() as session:
+        channels, users = _seed(session, random.Random(1), clock)
+    channel, admin = channels[0], users[0]
+    participants = [str(user.id) for user in users[:3]]
+
+    index = FairnessIndex()
+    with factory() as session:
+        FairnessService(session, clock=clock, index=index).assign_runner(
+            channel_id=channel.id, participant_user_ids=participants, last_runner_id=None, allow_immediate_repeat=True
+        )
+        session.commit()
+    assert channel.id in index
+
+    with factory() as session:
+        AdminService(
+            session,
+            authorizer=SlackAdminAuthorizer(allowed_user_ids=[admin.slack_user_id]),
+            clock=clock,
+            fairness_index=index,
+        ).reset_channel_data(
+            slack_channel_id=channel.slack_channel_id,
+            actor=AdminActor(user_id=str(admin.id), slack_user_id=admin.slack_user_id, slack_roles=("admin",)),
+        )
+        assert channel.id not in index
+        session.commit()
+    assert channel.id not in index
+
+    with factory() as session:
+        decision = FairnessService(session, clock=clock, index=index).assign_runner(
+            channel_id=channel.id, participant_user_ids=participants, last_runner_id=None, allow_immediate_repeat=True
+        )
+    assert decision.runner_user_id == participants[0]
+    engine.dispose()
+
+
+def test_other_process_notices_a_reset_on_its_next_selection():
+    clock = _Clock()
+    engine = create_engine("sqlite+pysqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+    now = clock()
+    admin, *users = [
+        User(id=uuid4(), slack_user_id=f"U{index}", display_name=f"User {index}", created_at=now, updated_at=now)
+        for index in range(4)
+    ]
+    channel = Channel(id=uuid4(), slack_channel_id="C1", name="coffee", created_at=now, updated_at=now)
+    with factory() as session:
+        session.add_all([channel, admin, *users])
+        session.flush()
+        session.add_all(
+            RunnerStat(
+                id=uuid4(),
+                channel_id=channel.id,
+                user_id=user.id,
+                runs_served_count=runs,
+                last_run_at=None,
+                created_at=now,
+                updated_at=now,
+            )
+            for user, runs in zip(users, (0, 3, 5))
+        )
+        session.commit()
+    participants = [str(user.id) for user in users]
+    arguments = dict(
+        channel_id=channel.id, participant_user_ids=participants, last_runner_id=None, allow_immediate_repeat=True
+    )
+
+    # This process hydrates the channel; the reset runs in another one.
+    local, remote = FairnessIndex(), FairnessIndex()
+    with factory() as session:
+        FairnessService(session, clock=clock, index=local).assign_runner(**arguments)
+        session.rollback()
+    with factory() as session:
+        AdminService(
+            session,
+            authorizer=SlackAdminAuthorizer(allowed_user_ids=[admin.slack_user_id]),
+            clock=clock,
+            fairness_index=remote,
+        ).reset_channel_data(
+            slack_channel_id=channel.slack_channel_id,
+            actor=AdminActor(user_id=str(admin.id), slack_user_id=admin.slack_user_id, slack_roles=("admin",)),
+        )
+        session.commit()
+    with factory() as session:
+        FairnessService(session, clock=clock, index=remote).assign_runner(
+            **{**arguments, "participant_user_ids": participants[:1]}
+        )
+        session.commit()
+    assert channel.id in local
+
+    with factory() as oracle_session:
+        expected = FairnessService(oracle_session, clock=clock).assign_runner(**arguments)
+        oracle_session.rollback()
+    with factory() as session:
+        decision = FairnessService(session, clock=clock, index=local).assign_runner(**arguments)
+    # The first user ran once since the reset and still ranks first in the stale entries.
+    assert decision.runner_user_id == expected.runner_user_id == participants[1]
+    engine.dispose()
@@ -8,7 +8,14 @@ from sqlalchemy import create_engine, select
 from sqlalchemy.orm import sessionmaker
 
 from coffeebuddy.core.runs.exceptions import RunnerSelectionError
-from coffeebuddy.infra.db.models import Base, Channel, RunnerStat, User
+from coffeebuddy.infra.db.models import (
+    FAIRNESS_WINDOW_CAPACITY,
+    Base,
+    Channel,
+    RunnerStat,
+    RunnerWindowSlot,
+    User,
+)
 from coffeebuddy.services.fairness.service import FairnessService
 
 
@@ -161,4 +168,59 @@ def test_assign_runner_requires_participants(session):
             participant_user_ids=[],
             last_runner_id=None,
             allow_immediate_repeat=False,
-        )
\ No newline at end of file
+        )
+
+def _assign(fairness: FairnessService, channel: Channel, users: list[User], window_runs: int | None) -> str:
+    return fairness.assign_runner(
+        channel_id=str(channel.id),
+        participant_user_ids=[str(user.id) for user in users],
+        last_runner_id=None,
+        allow_immediate_repeat=True,
+        window_runs=window_runs,
+    ).runner_user_id
+
+
+def test_assign_runner_ranks_by_runs_inside_the_window(session):
+    channel = _create_channel(session)
+    veteran = _create_user(session, "U030", "Veteran")
+    newcomer = _create_user(session, "U031", "Newcomer")
+    _create_runner_stat(session, channel, veteran, runs=10, last_run_delta=timedelta(days=30))
+    _create_runner_stat(session, channel, newcomer, runs=0, last_run_delta=timedelta(days=30))
+
+    fairness = FairnessService(session=session, clock=_utcnow)
+    # Without a window all-time counts keep the veteran off the rota.
+    assert _assign(fairness, channel, [veteran, newcomer], window_runs=None) == str(newcomer.id)
+    assert _assign(fairness, channel, [veteran, newcomer], window_runs=None) == str(newcomer.id)
+
+    # The newcomer ran both of the last two runs; the veteran ran none.
+    decision = fairness.assign_runner(
+        channel_id=str(channel.id),
+        participant_user_ids=[str(veteran.id), str(newcomer.id)],
+        last_runner_id=None,
+        allow_immediate_repeat=True,
+        window_runs=2,
+    )
+    assert decision.runner_user_id == str(veteran.id)
+    assert "last 2 runs (0)" in decision.rationale
+    # Level inside the window, so all-time counts break the tie.
+    assert _assign(fairness, channel, [veteran, newcomer], window_runs=2) == str(newcomer.id)
+    assert _assign(fairness, channel, [veteran, newcomer], window_runs=2) == str(newcomer.id)
+    assert _assign(fairness, channel, [veteran, newcomer], window_runs=2) == str(veteran.id)
+
+
+def test_assignment_ring_keeps_the_last_fifty_runs(session):
+    channel = _create_channel(session)
+    users = [_create_user(session, f"U04{index}", f"User {index}") for index in range(3)]
+    fairness = FairnessService(session=session, clock=_utcnow)
+
+    runners = [_assign(fairness, channel, users, window_runs=50) for _ in range(FAIRNESS_WINDOW_CAPACITY + 7)]
+    session.commit()
+
+    slots = session.scalars(
+        select(RunnerWindowSlot).where(RunnerWindowSlot.channel_id == channel.id)
+    ).all()
+    assert len(slots) == FAIRNESS_WINDOW_CAPACITY
+    assert sorted(slot.sequence for slot in slots) == list(range(7, FAIRNESS_WINDOW_CAPACITY + 7))
+    assert all(slot.slot == slot.sequence % FAIRNESS_WINDOW_CAPACITY for slot in slots)
+    by_sequence = {slot.sequence: str(slot.user_id) for slot in slots}
+    assert [by_sequence[sequence] for sequence in range(7, FAIRNESS_WINDOW_CAPACITY + 7)] == runners[7:]
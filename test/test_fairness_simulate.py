@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from coffeebuddy.infra.db.models import Base, Channel, Order, Run, RunStatus, User
+from coffeebuddy.services.fairness.simulate import (
+    Policy,
+    Scenario,
+    compare_policies,
+    gini,
+    history_participation,
+    max_streaks,
+    production_runners,
+    simulate,
+    synthesize,
+)
+
+NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize("policy", [Policy.current(), Policy.windowed(3)], ids=lambda policy: policy.name)
+@pytest.mark.parametrize("exclude_back_to_back", [True, False])
+def test_reference_matches_fairness_service(policy, exclude_back_to_back):
+    participation = synthesize(Scenario(users=6, runs=250, simulations=1, seed=11))
+    reference = simulate(participation, policy, exclude_back_to_back=exclude_back_to_back)
+    actual = production_runners(participation[:, 0], policy, exclude_back_to_back=exclude_back_to_back)
+    np.testing.assert_array_equal(actual, reference.runners[:, 0])
+
+
+def test_full_attendance_rotates_runners():
+    participation = np.ones((40, 3, 4), dtype=bool)
+    for policy in (Policy.current(), Policy.windowed(2), Policy.decayed(5)):
+        result = simulate(participation, policy)
+        assert (result.served == 10).all(), policy
+        assert (max_streaks(result.runners) == 1).all(), policy
+        np.testing.assert_allclose(result.fair_share, 10.0)
+
+
+def test_empty_runs_do_not_close():
+    participation = np.zeros((3, 1, 2), dtype=bool)
+    participation[0, 0, 0] = participation[2, 0, 0] = True
+    result = simulate(participation, Policy.current())
+    assert result.runners[:, 0].tolist() == [0, -1, 0]
+    assert result.closed_runs == 2
+    assert max_streaks(result.runners).tolist() == [2]
+
+
+def test_gini_ignores_invalid_entries():
+    values = np.array([[1.0, 1.0, 1.0, 1.0], [0.0, 0.0, 0.0, 4.0], [2.0, 9.0, 2.0, 0.0]])
+    valid = np.array([[True] * 4, [True] * 4, [True, False, True, False]])
+    np.testing.assert_allclose(gini(values, valid), [0.0, 0.75, 0.0])
+    np.testing.assert_allclose(gini(np.zeros((1, 3))), [0.0])
+
+
+def test_compare_policies_reports_every_policy():
+    participation = synthesize(Scenario(users=5, runs=120, simulations=4, seed=2))
+    reports = compare_policies(
+        participation, [Policy.current(), Policy.windowed(5), Policy.decayed(8)], production_runs=60
+    )
+    assert [report.policy for report in reports] == ["current", "windowed(5)", "decayed(8)"]
+    assert [report.production_deviation for report in reports] == [0.0, 0.0, None]
+    assert all(report.runs == int(participation.any(axis=2).sum()) for report in reports)
+
+
+def test_policies_validate_their_parameters():
+    with pytest.raises(ValueError):
+        Policy.windowed(51)
+    with pytest.raises(ValueError):
+        Policy.decayed(0)
+    with pytest.raises(ValueError):
+        production_runners(np.ones((2, 2), dtype=bool), Policy.decayed(3))
+
+
+def test_synthesize_is_seeded():
+    scenario = Scenario(users=4, runs=50, simulations=3, seed=5)
+    participation = synthesize(scenario)
+    assert participation.shape == (50, 3, 4)
+    np.testing.assert_array_equal(participation, synthesize(scenario))
+
+
+def test_history_participation_reads_closed_runs_in_order():
+    engine = create_engine("sqlite+pysqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        channel = Channel(id=uuid4(), slack_channel_id="C1", name="coffee", created_at=NOW, updated_at=NOW)
+        users = sorted(
+            (
+                User(id=uuid4(), slack_user_id=f"U{index}", display_name=f"User {index}", created_at=NOW, updated_at=NOW)
+                for index in range(3)
+            ),
+            key=lambda user: str(user.id),
+        )
+        session.add_all([channel, *users])
+        session.flush()
+        attendance = {2: [users[0], users[2]], 1: [users[1]], 3: [users[0]]}
+        for hours, attendees in attendance.items():
+            run = Run(
+                id=uuid4(),
+                channel_id=channel.id,
+                initiator_user_id=users[0].id,
+                status=RunStatus.CLOSED if hours != 3 else RunStatus.OPEN,
+                started_at=NOW,
+                closed_at=NOW + timedelta(hours=hours),
+                created_at=NOW,
+                updated_at=NOW,
+            )
+            session.add(run)
+            session.flush()
+            for user in attendees:
+                session.add(
+                    Order(
+                        id=uuid4(),
+                        run_id=run.id,
+                        user_id=user.id,
+                        order_text="Latte",
+                        created_at=NOW,
+                        updated_at=NOW,
+                    )
+                )
+        session.flush()
+
+        participation, user_ids = history_participation(session, channel.id)
+    engine.dispose()
+
+    assert user_ids == [user.id for user in users]
+    assert participation[:, 0].tolist() == [[False, True, False], [True, False, True]]
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from coffeebuddy.api.admin.authorizer import SlackAdminAuthorizer
+from coffeebuddy.api.admin.models import AdminActor, ChannelConfigPatch
+from coffeebuddy.api.admin.service import AdminService
+from coffeebuddy.core.orders import OrderService
+from coffeebuddy.core.orders.exceptions import UserNotFoundError
+from coffeebuddy.core.orders.models import OrderSubmissionRequest
+from coffeebuddy.core.orders.repository import UserRepository
+from coffeebuddy.infra.db import IdentityCache
+from coffeebuddy.infra.db.models import Base, Channel, Run, RunStatus, User
+
+NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture()
+def engine():
+    engine = create_engine("sqlite+pysqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture()
+def session_factory(engine):
+    return sessionmaker(bind=engine, expire_on_commit=False)
+
+
+@pytest.fixture()
+def identity_selects(engine) -> list[str]:
+    statements: list[str] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany) -> None:
+        if statement.startswith("SELECT") and ("FROM users" in statement or "FROM channels" in statement):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _record)
+    return statements
+
+
+@pytest.fixture()
+def seeded(session_factory) -> SimpleNamespace:
+    channel = Channel(
+        id=uuid4(),
+        slack_channel_id="C123",
+        name="coffee",
+        enabled=True,
+        reminder_offset_minutes=5,
+        fairness_window_runs=5,
+        data_retention_days=90,
+        reminders_enabled=True,
+        last_call_enabled=True,
+        created_at=NOW,
+        updated_at=NOW,
+    )
+    user = User(
+        id=uuid4(),
+        slack_user_id="U123",
+        display_name="Coffee Tester",
+        is_active=True,
+        created_at=NOW,
+        updated_at=NOW,
+    )
+    run = Run(
+        id=uuid4(),
+        channel_id=channel.id,
+        initiator_user_id=user.id,
+        status=RunStatus.OPEN,
+        started_at=NOW,
+        created_at=NOW,
+        updated_at=NOW,
+    )
+    with session_factory() as session:
+        session.add_all([channel, user, run])
+        session.commit()
+    return SimpleNamespace(channel=channel, user=user, run=run)
+
+
+def test_slack_id_resolves_once_across_sessions(session_factory, seeded, identity_selects):
+    cache = IdentityCache()
+    for _ in range(3):
+        with session_factory() as session:
+            user = UserRepository(session, identity_cache=cache).get_by_slack_id("U123")
+            assert user.id == seeded.user.id
+            assert user in session
+            assert UserRepository(session, identity_cache=cache).get(user.id) is user
+
+    assert len(identity_selects) == 1
+
+
+def test_order_submission_skips_user_lookup_when_cached(session_factory, seeded, identity_selects):
+    cache = IdentityCache()
+    with session_factory() as session:
+        UserRepository(session, identity_cache=cache).get(seeded.user.id)
+    identity_selects.clear()
+
+    with session_factory() as session:
+        result = OrderService(session, identity_cache=cache).submit_order(
+            OrderSubmissionRequest(
+                run_id=str(seeded.run.id), user_id=str(seeded.user.id), order_text="Latte"
+            )
+        )
+        session.commit()
+
+    assert result.participant_count == 1
+    assert identity_selects == []
+
+
+def test_unknown_ids_are_cached_for_the_negative_ttl(session_factory, seeded, identity_selects):
+    now = [0.0]
+    cache = IdentityCache(negative_ttl_seconds=5.0, clock=lambda: now[0])
+    with session_factory() as session:
+        repository = UserRepository(session, identity_cache=cache)
+        for _ in range(2):
+            with pytest.raises(UserNotFoundError):
+                repository.get_by_slack_id("UNKNOWN")
+        assert len(identity_selects) == 1
+
+        now[0] = 5.0
+        with pytest.raises(UserNotFoundError):
+            repository.get_by_slack_id("UNKNOWN")
+        assert len(identity_selects) == 2
+
+
+def test_entries_are_bounded(session_factory, seeded):
+    cache = IdentityCache(max_entries=3)
+    with session_factory() as session:
+        for index in range(5):
+            assert cache.get_user_by_slack_id(session, f"U-missing-{index}") is None
+    assert len(cache) == 3
+
+
+def test_dirty_rows_are_not_cached(session_factory, seeded, identity_selects):
+    cache = IdentityCache()
+    with session_factory() as session:
+        user = session.get(User, seeded.user.id)
+        user.display_name = "Renamed"
+        assert cache.get_user(session, seeded.user.id) is user
+        session.rollback()
+    identity_selects.clear()
+
+    with session_factory() as session:
+        assert cache.get_user(session, seeded.user.id).display_name == "Coffee Tester"
+    assert len(identity_selects) == 1
+
+
+def test_admin_update_invalidates_cached_channel(session_factory, seeded):
+    cache = IdentityCache()
+    with session_factory() as session:
+        assert cache.get_channel(session, seeded.channel.id).reminder_offset_minutes == 5
+
+    with session_factory() as session:
+        AdminService(
+            session,
+            authorizer=SlackAdminAuthorizer(allowed_user_ids=[seeded.user.slack_user_id]),
+            identity_cache=cache,
+        ).update_channel_config(
+            slack_channel_id="C123",
+            actor=AdminActor(
+                user_id=str(seeded.user.id),
+                slack_user_id=seeded.user.slack_user_id,
+                slack_roles=("admin",),
+            ),
+            patch=ChannelConfigPatch(reminder_offset_minutes=9),
+        )
+        session.commit()
+
+    with session_factory() as session:
+        assert cache.get_channel(session, seeded.channel.id).reminder_offset_minutes == 9
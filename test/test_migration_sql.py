@@ -8,6 +8,8 @@ import pytest
 from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.engine import Engine
 
+from coffeebuddy.services.catalog import canonicalize, catalog_hash
+
 try:
     from testcontainers.postgres import PostgresContainer
 except ImportError:  # pragma: no cover
@@ -52,9 +54,11 @@ def _run_sql(engine: Engine, sql_file: Path) -> None:
             conn.execute(text(statement))
 
 
-def _apply_up(engine: Engine) -> None:
+def _apply_up(engine: Engine, *, after: str = "", through: str = "V9999") -> None:
+    """Applies the up migrations with versions in ``(after, through]``."""
     for sql in sorted(SQL_PATH.glob("*.up.sql")):
-        _run_sql(engine, sql)
+        if after < sql.name.split(".")[0] <= through:
+            _run_sql(engine, sql)
 
 
 def _apply_down(engine: Engine) -> None:
@@ -76,6 +80,7 @@ def test_migrations_create_expected_tables(engine: Engine) -> None:
         "orders",
         "user_preferences",
         "runner_stats",
+        "runner_window_slots",
         "channel_admin_actions",
     }
     assert expected_tables.issubset(set(inspector.get_table_names()))
@@ -124,4 +129,37 @@ def test_down_and_reapply(engine: Engine) -> None:
 
     _apply_up(engine)
     inspector = inspect(engine)
-    assert "users" in inspector.get_table_names()
\ No newline at end of file
+    assert "users" in inspector.get_table_names()
+
+def test_catalog_backfill_matches_python_canonical_form(engine: Engine) -> None:
+    texts = ["\tOat  Flat White\n", "  latte ", "\r\nMocha\t\tLarge\r\n", "Cortado"]
+    _apply_down(engine)
+    _apply_up(engine, through="V0006")
+    with engine.begin() as conn:
+        channel_id = conn.execute(
+            text("INSERT INTO channels (slack_channel_id, name) VALUES ('CCATALOG', 'catalog') RETURNING id")
+        ).scalar_one()
+        for index, order_text in enumerate(texts):
+            user_id = conn.execute(
+                text("INSERT INTO users (slack_user_id, display_name) VALUES (:slack, 'Catalog') RETURNING id"),
+                {"slack": f"UCATALOG{index}"},
+            ).scalar_one()
+            conn.execute(
+                text(
+                    "INSERT INTO user_preferences (user_id, channel_id, last_order_text) "
+                    "VALUES (:user_id, :channel_id, :order_text)"
+                ),
+                {"user_id": user_id, "channel_id": channel_id, "order_text": order_text},
+            )
+    _apply_up(engine, after="V0006")
+
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text(
+                "SELECT p.last_order_text, p.catalog_hash, c.canonical_text FROM user_preferences p "
+                "JOIN order_catalog c ON c.text_hash = p.catalog_hash"
+            )
+        ).all()
+    assert sorted((row[0], row[1], row[2]) for row in rows) == sorted(
+        (order_text, catalog_hash(order_text), canonicalize(order_text)) for order_text in texts
+    )
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import re
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from coffeebuddy.core.orders import OrderService, OrderSubmissionRequest
+from coffeebuddy.core.runs.models import CloseRunRequest, OrderGroup
+from coffeebuddy.core.runs.service import CloseRunService
+from coffeebuddy.infra.db.models import (
+    Base,
+    Channel,
+    Order,
+    OrderCatalogEntry,
+    Run,
+    RunStatus,
+    User,
+    UserPreference,
+)
+from coffeebuddy.services.catalog import OrderCatalog, canonicalize, catalog_hash
+from coffeebuddy.services.fairness.service import FairnessService
+
+V0007 = Path(__file__).resolve().parents[1] / "src" / "storage" / "sql" / "V0007.up.sql"
+
+
+class _AllowAll:
+    def is_authorized(self, *, run: Run, actor_user_id: str) -> bool:
+        return True
+
+
+@pytest.fixture()
+def session() -> Session:
+    engine = create_engine("sqlite+pysqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine, expire_on_commit=False)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.fixture()
+def seeded(session: Session) -> SimpleNamespace:
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    channel = Channel(
+        id=uuid4(),
+        slack_channel_id="C123",
+        name="coffee",
+        enabled=True,
+        reminder_offset_minutes=5,
+        fairness_window_runs=5,
+        data_retention_days=90,
+        reminders_enabled=True,
+        last_call_enabled=True,
+        created_at=now,
+        updated_at=now,
+    )
+    users = [
+        User(
+            id=uuid4(),
+            slack_user_id=f"U{index:03d}",
+            display_name=f"User {index}",
+            is_active=True,
+            created_at=now,
+            updated_at=now,
+        )
+        for index in range(4)
+    ]
+    run = Run(
+        id=uuid4(),
+        channel_id=channel.id,
+        initiator_user_id=users[0].id,
+        status=RunStatus.OPEN,
+        pickup_time=now + timedelta(minutes=30),
+        started_at=now,
+        correlation_id="corr-catalog",
+        created_at=now,
+        updated_at=now,
+    )
+    session.add_all([channel, *users, run])
+    session.commit()
+    return SimpleNamespace(channel=channel, users=users, run=run)
+
+
+def _submit(session: Session, seeded: SimpleNamespace, texts: list[str]) -> None:
+    OrderService(session).submit_orders(
+        [
+            OrderSubmissionRequest(run_id=str(seeded.run.id), user_id=str(user.id), order_text=text)
+            for user, text in zip(seeded.users, texts)
+        ]
+    )
+    session.commit()
+
+
+def test_canonicalize_collapses_whitespace_and_case():
+    assert canonicalize("  Oat   Flat\tWhite ") == "oat flat white"
+    assert catalog_hash("Oat Flat White") == catalog_hash("oat  flat white")
+    assert catalog_hash("oat flat white") != catalog_hash("flat white")
+
+
+def _regexp_replace(value: str, pattern: str, replacement: str, flags: str) -> str:
+    # PostgreSQL's \s is [[:space:]]; ASCII mode gives Python's \s the same set.
+    return re.sub(pattern, replacement, value, count=0 if "g" in flags else 1, flags=re.ASCII)
+
+
+def test_backfill_canonical_form_matches_canonicalize():
+    expressions = {
+        expression.replace(column, "{}")
+        for expression, column in re.findall(
+            r"(lower\(regexp_replace\(regexp_replace\((\w+),.*?'g'\)\))", V0007.read_text()
+        )
+    }
+    assert len(expressions) == 1, expressions
+    (expression,) = expressions
+
+    connection = sqlite3.connect(":memory:")
+    connection.create_function("regexp_replace", 4, _regexp_replace)
+    texts = ["\tOat  Flat White\n", "  latte ", "\r\nMocha\t\tLarge\r\n", "Cortado", "\x0bflat\x0cwhite\x0b"]
+    for text in texts:
+        (canonical,) = connection.execute(f"SELECT {expression.format('?')}", (text,)).fetchone()
+        assert canonical == canonicalize(text), repr(text)
+    connection.close()
+
+
+def test_orders_reference_one_catalog_entry_per_canonical_text(session: Session, seeded: SimpleNamespace):
+    _submit(session, seeded, ["Oat flat white", "oat  FLAT white", "Long black"])
+
+    entries = {entry.canonical_text: entry for entry in session.scalars(select(OrderCatalogEntry))}
+    assert set(entries) == {"oat flat white", "long black"}
+    assert entries["oat flat white"].usage_count == 2
+    assert entries["long black"].usage_count == 1
+
+    orders = session.scalars(select(Order).order_by(Order.order_text)).all()
+    assert {order.order_text for order in orders} == {"Oat flat white", "oat  FLAT white", "Long black"}
+    assert {order.catalog_hash for order in orders} == set(
+        entry.text_hash for entry in entries.values()
+    )
+    preferences = session.scalars(select(UserPreference)).all()
+    assert all(preference.catalog_hash == catalog_hash(preference.last_order_text) for preference in preferences)
+
+
+def test_interning_without_usage_leaves_counts_untouched(session: Session, seeded: SimpleNamespace):
+    catalog = OrderCatalog(session)
+    catalog.intern(["Mocha", "mocha"])
+    catalog.intern(["MOCHA"], count_usage=False)
+    catalog.intern(["Tea"], count_usage=False)
+
+    counts = dict(session.execute(select(OrderCatalogEntry.canonical_text, OrderCatalogEntry.usage_count)).all())
+    assert counts == {"mocha": 2, "tea": 0}
+
+
+def test_close_run_summary_groups_orders_by_catalog_entry(session: Session, seeded: SimpleNamespace):
+    _submit(session, seeded, ["Oat flat white", "oat flat white ", "Long black", "Oat Flat White"])
+
+    service = CloseRunService(
+        session=session,
+        fairness=FairnessService(session=session),
+        authorizer=_AllowAll(),
+    )
+    result = service.close_run(CloseRunRequest(run_id=str(seeded.run.id), actor_user_id=str(seeded.users[0].id)))
+
+    assert result.summary.total_orders == 4
+    assert result.summary.grouped_orders == (
+        OrderGroup(order_text="oat flat white", quantity=3),
+        OrderGroup(order_text="long black", quantity=1),
+    )
@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from coffeebuddy.core.orders import OrderConflictError, OrderService, OrderSubmissionRequest
+from coffeebuddy.core.orders.repository import OrderRepository
+from coffeebuddy.infra.db.models import (
+    Base,
+    Channel,
+    Order,
+    Run,
+    RunStatus,
+    User,
+    UserPreference,
+)
+from coffeebuddy.services.preferences import PreferenceService
+
+NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture()
+def session_factory(tmp_path):
+    # A file database so every thread gets its own connection and transaction.
+    engine = create_engine(
+        f"sqlite+pysqlite:///{tmp_path / 'orders.db'}", future=True, connect_args={"timeout": 30}
+    )
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine, expire_on_commit=False)
+    engine.dispose()
+
+
+@pytest.fixture()
+def seeded(session_factory) -> SimpleNamespace:
+    channel = Channel(
+        id=uuid4(),
+        slack_channel_id="C123",
+        name="coffee",
+        enabled=True,
+        reminder_offset_minutes=5,
+        fairness_window_runs=5,
+        data_retention_days=90,
+        reminders_enabled=True,
+        last_call_enabled=True,
+        created_at=NOW,
+        updated_at=NOW,
+    )
+    user = User(
+        id=uuid4(),
+        slack_user_id="U123",
+        display_name="Coffee Tester",
+        is_active=True,
+        created_at=NOW,
+        updated_at=NOW,
+    )
+    run = Run(
+        id=uuid4(),
+        channel_id=channel.id,
+        initiator_user_id=user.id,
+        status=RunStatus.OPEN,
+        started_at=NOW,
+        created_at=NOW,
+        updated_at=NOW,
+    )
+    with session_factory() as session:
+        session.add_all([channel, user, run])
+        session.commit()
+    return SimpleNamespace(channel=channel, user=user, run=run)
+
+
+class _RacingRepository(OrderRepository):
+    """Lets another writer edit the order between the version read and the write."""
+
+    def __init__(self, session: Session, races: int) -> None:
+        super().__init__(session)
+        self._races = races
+
+    def _observe(self, run_ids, user_ids):
+        observed = super()._observe(run_ids, user_ids)
+        if self._races:
+            self._races -= 1
+            self._session.execute(
+                update(Order).values(order_text="Competing", version=Order.version + 1)
+            )
+        return observed
+
+
+def _request(seeded: SimpleNamespace, text: str) -> OrderSubmissionRequest:
+    return OrderSubmissionRequest(run_id=str(seeded.run.id), user_id=str(seeded.user.id), order_text=text)
+
+
+def _stored(session_factory, seeded: SimpleNamespace) -> tuple[Order, UserPreference]:
+    with session_factory() as session:
+        order = session.scalar(select(Order).where(Order.user_id == seeded.user.id))
+        preference = session.scalar(select(UserPreference).where(UserPreference.user_id == seeded.user.id))
+        run = session.get(Run, seeded.run.id)
+        assert run.active_order_count == 1
+        return order, preference
+
+
+def _racing_service(session: Session, races: int) -> OrderService:
+    return OrderService(session, order_repository_factory=lambda s: _RacingRepository(s, races))
+
+
+def test_write_that_loses_a_race_is_retried_on_the_new_version(session_factory, seeded):
+    with session_factory() as session:
+        OrderService(session).submit_order(_request(seeded, "Latte"))
+        session.commit()
+
+    with session_factory() as session:
+        result = _racing_service(session, races=2).submit_order(_request(seeded, "Mocha"))
+        session.commit()
+
+    order, _ = _stored(session_factory, seeded)
+    assert result.order_text == "Mocha"
+    assert order.order_text == "Mocha"
+    # The seed, two competing edits and the retried write each bumped it once.
+    assert order.version == 4
+
+
+def test_write_gives_up_after_max_attempts(session_factory, seeded):
+    with session_factory() as session:
+        OrderService(session).submit_order(_request(seeded, "Latte"))
+        session.commit()
+
+    with session_factory() as session:
+        with pytest.raises(OrderConflictError):
+            _racing_service(session, races=3).submit_order(_request(seeded, "Mocha"))
+        assert session.scalar(select(Order.order_text)) == "Competing"
+        session.rollback()
+
+
+class _CancelingRepository(OrderRepository):
+    """Cancels the order between the version read and the write, once."""
+
+    def _observe(self, run_ids, user_ids):
+        observed = super()._observe(run_ids, user_ids)
+        if not getattr(self, "_canceled", False):
+            self._canceled = True
+            for run_id, user_id in list(observed):
+                self.cancel_order_with_count(run_id=run_id, user_id=user_id)
+        return observed
+
+
+def test_cancel_bumps_the_version_so_a_stale_edit_cannot_revive_the_order(session_factory, seeded):
+    with session_factory() as session:
+        OrderService(session).submit_order(_request(seeded, "Latte"))
+        session.commit()
+
+    with session_factory() as session:
+        OrderService(session, order_repository_factory=_CancelingRepository).submit_order(
+            _request(seeded, "Mocha")
+        )
+        session.commit()
+
+    order, _ = _stored(session_factory, seeded)
+    assert order.canceled_at is None
+    # Seed, cancel, then the retried write that revived it and re-counted it.
+    assert (order.order_text, order.version) == ("Mocha", 3)
+
+
+def test_bulk_submission_retries_only_conflicting_writes(session_factory, seeded):
+    with session_factory() as session:
+        OrderService(session).submit_order(_request(seeded, "Latte"))
+        session.commit()
+
+    with session_factory() as session:
+        result = _racing_service(session, races=1).submit_orders([_request(seeded, "Mocha")])
+        session.commit()
+    assert not result.failed
+    order, _ = _stored(session_factory, seeded)
+    assert (order.order_text, order.version) == ("Mocha", 3)
+
+    with session_factory() as session:
+        result = _racing_service(session, races=3).submit_orders([_request(seeded, "Tea")])
+        assert isinstance(result.items[0].error, OrderConflictError)
+        session.rollback()
+
+
+class _CountingRepository(OrderRepository):
+    def __init__(self, session: Session) -> None:
+        super().__init__(session)
+        self.writes = 0
+
+    def upsert_order_with_count(self, **kwargs):
+        upserted = super().upsert_order_with_count(**kwargs)
+        self.writes += 1
+        return upserted
+
+
+class _CountingPreferences(PreferenceService):
+    def __init__(self, session: Session) -> None:
+        super().__init__(session)
+        self.writes = 0
+
+    def _compare_and_swap(self, *args, **kwargs):
+        super()._compare_and_swap(*args, **kwargs)
+        self.writes += 1
+
+
+def test_concurrent_clicks_lose_no_updates(session_factory, seeded):
+    """Place order and Use last order hammer one user's order from many threads.
+
+    Every successful order or preference write bumps its row's ``version``
+    exactly once, so the final versions must equal the writes made by the
+    committed clicks. A retry inside a click writes again, which is why the
+    writes are counted rather than derived from the clicks; a lost update
+    would show up as a version lower than that count.
+    """
+    with session_factory() as session:
+        OrderService(session).submit_order(_request(seeded, "Seed"))
+        session.commit()
+
+    outcomes: list[str] = []
+    committed = {"orders": 0, "preferences": 0}
+    lock = threading.Lock()
+
+    def click(index: int) -> None:
+        with session_factory() as session:
+            repository = _CountingRepository(session)
+            preferences = _CountingPreferences(session)
+            service = OrderService(
+                session,
+                max_write_attempts=5,
+                order_repository_factory=lambda _session: repository,
+                preference_service=preferences,
+            )
+            try:
+                if index % 3 == 2:
+                    service.use_last_order(run_id=str(seeded.run.id), user_id=str(seeded.user.id))
+                    outcome = "reused"
+                else:
+                    service.submit_order(_request(seeded, f"Order {index}"))
+                    outcome = "placed"
+                session.commit()
+            except OrderConflictError:
+                session.rollback()
+                outcome = "conflict"
+        with lock:
+            outcomes.append(outcome)
+            if outcome != "conflict":
+                committed["orders"] += repository.writes
+                committed["preferences"] += preferences.writes
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(click, range(60)))
+
+    placed, reused = outcomes.count("placed"), outcomes.count("reused")
+    assert placed + reused + outcomes.count("conflict") == 60
+    assert placed and reused
+    assert committed["orders"] >= placed + reused
+    assert committed["preferences"] >= placed + 2 * reused
+    order, preference = _stored(session_factory, seeded)
+    assert order.version == 1 + committed["orders"]
+    assert preference.version == 1 + committed["preferences"]
+    assert preference.last_order_text == order.order_text
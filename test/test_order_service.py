@@ -1,20 +1,28 @@
 from __future__ import annotations
 
+import asyncio
+import inspect
 from datetime import datetime, timedelta, timezone
 from types import SimpleNamespace
 from uuid import uuid4
 
 import pytest
-from sqlalchemy import create_engine, select
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
 
-from coffeebuddy.core.orders import OrderService
+from coffeebuddy.core.orders import AsyncOrderService, OrderService
+from coffeebuddy.core.orders.async_repository import AsyncOrderRepository
 from coffeebuddy.core.orders.exceptions import (
     OrderNotFoundError,
     OrderValidationError,
     PreferenceNotFoundError,
+    RunFullError,
 )
 from coffeebuddy.core.orders.models import OrderProvenance, OrderSubmissionRequest
+from coffeebuddy.core.orders.repository import OrderRepository
 from coffeebuddy.infra.db.models import (
     Base,
     Channel,
@@ -39,17 +47,82 @@ def ticking_clock():
     return _tick
 
 
+class _Blocking:
+    """Drives an async object from a sync test: awaitable results are run to completion."""
+
+    def __init__(self, target, loop: asyncio.AbstractEventLoop) -> None:
+        self.target = target
+        self._loop = loop
+
+    def __getattr__(self, name):
+        attribute = getattr(self.target, name)
+        if not callable(attribute):
+            return attribute
+
+        def call(*args, **kwargs):
+            result = attribute(*args, **kwargs)
+            return self._loop.run_until_complete(result) if inspect.isawaitable(result) else result
+
+        return call
+
+
+@pytest.fixture(params=["sync", "async"])
+def backend(request) -> str:
+    return request.param
+
+
 @pytest.fixture()
-def session() -> Session:
-    engine = create_engine("sqlite+pysqlite:///:memory:", future=True)
-    Base.metadata.create_all(engine)
-    SessionLocal = sessionmaker(bind=engine, expire_on_commit=False)
-    session = SessionLocal()
+def session(backend):
+    """A sync ``Session``, or an ``AsyncSession`` (aiosqlite) driven through :class:`_Blocking`."""
+    if backend == "sync":
+        engine = create_engine("sqlite+pysqlite:///:memory:", future=True)
+        Base.metadata.create_all(engine)
+        SessionLocal = sessionmaker(bind=engine, expire_on_commit=False)
+        session = SessionLocal()
+        try:
+            yield session
+        finally:
+            session.close()
+            engine.dispose()
+        return
+
+    loop = asyncio.new_event_loop()
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:", poolclass=StaticPool)
+
+    async def create_schema() -> None:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    loop.run_until_complete(create_schema())
+    session = _Blocking(AsyncSession(engine, expire_on_commit=False), loop)
     try:
         yield session
     finally:
         session.close()
-        engine.dispose()
+        loop.run_until_complete(engine.dispose())
+        loop.close()
+
+
+@pytest.fixture()
+def order_service(session):
+    """Builds the order service for the session's backend."""
+
+    def build(**kwargs):
+        if isinstance(session, _Blocking):
+            return _Blocking(AsyncOrderService(session.target, **kwargs), session._loop)
+        return OrderService(session, **kwargs)
+
+    return build
+
+
+@pytest.fixture()
+def order_repository(session):
+    def build(**kwargs):
+        if isinstance(session, _Blocking):
+            return _Blocking(AsyncOrderRepository(session.target, **kwargs), session._loop)
+        return OrderRepository(session, **kwargs)
+
+    return build
 
 
 @pytest.fixture()
@@ -117,9 +190,9 @@ def _create_run(session: Session, channel: Channel, user: User) -> Run:
 
 
 def test_submit_order_creates_row_and_preference(
-    session: Session, seeded_entities: SimpleNamespace, ticking_clock
+    session: Session, seeded_entities: SimpleNamespace, ticking_clock, order_service
 ):
-    service = OrderService(session, clock=ticking_clock)
+    service = order_service(clock=ticking_clock)
     request = OrderSubmissionRequest(
         run_id=str(seeded_entities.run.id),
         user_id=str(seeded_entities.user.id),
@@ -140,9 +213,9 @@ def test_submit_order_creates_row_and_preference(
 
 
 def test_submit_order_updates_existing_entry(
-    session: Session, seeded_entities: SimpleNamespace, ticking_clock
+    session: Session, seeded_entities: SimpleNamespace, ticking_clock, order_service
 ):
-    service = OrderService(session, clock=ticking_clock)
+    service = order_service(clock=ticking_clock)
     base_request = OrderSubmissionRequest(
         run_id=str(seeded_entities.run.id),
         user_id=str(seeded_entities.user.id),
@@ -169,9 +242,9 @@ def test_submit_order_updates_existing_entry(
 
 
 def test_use_last_order_replays_preference_into_new_run(
-    session: Session, seeded_entities: SimpleNamespace, ticking_clock
+    session: Session, seeded_entities: SimpleNamespace, ticking_clock, order_service
 ):
-    service = OrderService(session, clock=ticking_clock)
+    service = order_service(clock=ticking_clock)
     service.submit_order(
         OrderSubmissionRequest(
             run_id=str(seeded_entities.run.id),
@@ -198,9 +271,9 @@ def test_use_last_order_replays_preference_into_new_run(
 
 
 def test_use_last_order_without_preference_fails(
-    session: Session, seeded_entities: SimpleNamespace, ticking_clock
+    session: Session, seeded_entities: SimpleNamespace, ticking_clock, order_service
 ):
-    service = OrderService(session, clock=ticking_clock)
+    service = order_service(clock=ticking_clock)
     new_run = _create_run(session, seeded_entities.channel, seeded_entities.user)
 
     with pytest.raises(PreferenceNotFoundError):
@@ -210,9 +283,9 @@ def test_use_last_order_without_preference_fails(
 
 
 def test_cancel_order_marks_row_and_updates_count(
-    session: Session, seeded_entities: SimpleNamespace, ticking_clock
+    session: Session, seeded_entities: SimpleNamespace, ticking_clock, order_service
 ):
-    service = OrderService(session, clock=ticking_clock)
+    service = order_service(clock=ticking_clock)
     submission = service.submit_order(
         OrderSubmissionRequest(
             run_id=str(seeded_entities.run.id),
@@ -238,9 +311,9 @@ def test_cancel_order_marks_row_and_updates_count(
 
 
 def test_cancel_missing_order_errors(
-    session: Session, seeded_entities: SimpleNamespace, ticking_clock
+    session: Session, seeded_entities: SimpleNamespace, ticking_clock, order_service
 ):
-    service = OrderService(session, clock=ticking_clock)
+    service = order_service(clock=ticking_clock)
 
     with pytest.raises(OrderNotFoundError):
         service.cancel_order(
@@ -249,9 +322,9 @@ def test_cancel_missing_order_errors(
 
 
 def test_blank_orders_are_rejected(
-    session: Session, seeded_entities: SimpleNamespace, ticking_clock
+    session: Session, seeded_entities: SimpleNamespace, ticking_clock, order_service
 ):
-    service = OrderService(session, clock=ticking_clock)
+    service = order_service(clock=ticking_clock)
 
     with pytest.raises(OrderValidationError):
         service.submit_order(
@@ -260,4 +333,239 @@ def test_blank_orders_are_rejected(
                 user_id=str(seeded_entities.user.id),
                 order_text="   ",
             )
-        )
\ No newline at end of file
+        )
+
+class _StatementCounter:
+    def __init__(self, session: Session) -> None:
+        self.statements: list[str] = []
+        self._engine = session.get_bind()
+
+    def __enter__(self) -> "_StatementCounter":
+        event.listen(self._engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        event.remove(self._engine, "before_cursor_execute", self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.statements.append(statement)
+
+
+def test_upsert_and_cancel_maintain_run_counter_without_count_queries(
+    session: Session, seeded_entities: SimpleNamespace, ticking_clock, order_repository
+):
+    repository = order_repository(clock=ticking_clock)
+    kwargs = dict(
+        run_id=seeded_entities.run.id,
+        user_id=seeded_entities.user.id,
+        confirm=True,
+        provenance=OrderProvenance.MANUAL,
+    )
+
+    with _StatementCounter(session) as counter:
+        first = repository.upsert_order_with_count(order_text="Latte", **kwargs)
+    # Version read (no row lock), catalog intern, compare-and-swap upsert, counter bump.
+    assert len(counter.statements) == 4
+    assert "FOR UPDATE" not in counter.statements[0]
+    assert counter.statements[1].startswith("INSERT INTO order_catalog")
+    assert "ON CONFLICT" in counter.statements[2]
+    assert not any("count(" in statement for statement in counter.statements)
+    assert first.participant_count == 1
+
+    edited = repository.upsert_order_with_count(order_text="Oat latte", **kwargs)
+    assert edited.participant_count == 1
+
+    with _StatementCounter(session) as counter:
+        canceled = repository.cancel_order_with_count(
+            run_id=seeded_entities.run.id, user_id=seeded_entities.user.id
+        )
+    assert len(counter.statements) == 2
+    assert canceled.participant_count == 0
+    assert first.order.canceled_at is not None
+    assert repository.cancel_order_with_count(
+        run_id=seeded_entities.run.id, user_id=seeded_entities.user.id
+    ) is None
+
+    revived = repository.upsert_order_with_count(order_text="Mocha", **kwargs)
+    assert revived.order is first.order
+    assert revived.order.order_text == "Mocha"
+    assert revived.order.canceled_at is None
+    assert revived.participant_count == 1
+    assert seeded_entities.run.active_order_count == 1
+    assert repository.count_active_orders(run_id=seeded_entities.run.id) == 1
+
+
+def test_postgres_upsert_and_cancel_update_the_counter_in_one_statement(
+    seeded_entities: SimpleNamespace, backend: str
+):
+    statements = []
+
+    class _PostgresSession:
+        identity_map = {}
+
+        def get_bind(self):
+            return SimpleNamespace(dialect=postgresql.dialect())
+
+        def execute(self, statement, execution_options=None):
+            statements.append(str(statement.compile(dialect=postgresql.dialect())))
+            if len(statements) <= 2:
+                return []
+            if len(statements) == 3:
+                return SimpleNamespace(first=lambda: (SimpleNamespace(id=uuid4(), order_text="Latte"), 3))
+            return SimpleNamespace(first=lambda: (uuid4(), 2, 2))
+
+    class _AsyncPostgresSession(_PostgresSession):
+        @property
+        def sync_session(self):
+            return self
+
+        async def execute(self, statement, execution_options=None):
+            return _PostgresSession.execute(self, statement, execution_options)
+
+    if backend == "sync":
+        repository = OrderRepository(_PostgresSession())
+    else:
+        loop = asyncio.new_event_loop()
+        repository = _Blocking(AsyncOrderRepository(_AsyncPostgresSession()), loop)
+    result = repository.upsert_order_with_count(
+        run_id=seeded_entities.run.id,
+        user_id=seeded_entities.user.id,
+        order_text="Latte",
+        confirm=True,
+        provenance=OrderProvenance.MANUAL,
+    )
+
+    assert result.participant_count == 3
+    assert len(statements) == 3
+    assert "FOR UPDATE" not in statements[0]
+    assert statements[1].startswith("INSERT INTO order_catalog")
+    upsert = statements[2]
+    assert upsert.startswith("WITH upserted AS")
+    assert "ON CONFLICT (run_id, user_id) DO UPDATE" in upsert
+    assert "WHERE orders.version + %(version_1)s = excluded.version" in upsert
+    assert "bumped AS" in upsert
+    assert "count(" not in upsert
+
+    canceled = repository.cancel_order_with_count(
+        run_id=seeded_entities.run.id, user_id=seeded_entities.user.id
+    )
+    assert canceled.participant_count == 2
+    assert statements[3].startswith("WITH canceled AS")
+    assert "version + " in statements[3]
+    assert "active_order_count - " in statements[3]
+    if backend == "async":
+        loop.close()
+
+
+def _add_users(session: Session, count: int) -> list[User]:
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    users = [
+        User(id=uuid4(), slack_user_id=f"UB{i}", display_name=f"Bulk {i}", created_at=now, updated_at=now)
+        for i in range(count)
+    ]
+    session.add_all(users)
+    session.commit()
+    return users
+
+
+def test_submit_orders_reports_partial_failures(
+    session: Session, seeded_entities: SimpleNamespace, ticking_clock, order_service
+):
+    service = order_service(clock=ticking_clock)
+    run_id = str(seeded_entities.run.id)
+    users = _add_users(session, 2)
+    closed_run = _create_run(session, seeded_entities.channel, seeded_entities.user)
+    closed_run.status = RunStatus.CLOSED
+    session.commit()
+    service.submit_order(
+        OrderSubmissionRequest(run_id=run_id, user_id=str(users[1].id), order_text="Tea")
+    )
+    service.cancel_order(run_id=run_id, user_id=str(users[1].id))
+
+    result = service.submit_orders(
+        [
+            OrderSubmissionRequest(run_id=run_id, user_id=str(seeded_entities.user.id), order_text=" Latte "),
+            OrderSubmissionRequest(run_id=run_id, user_id=str(users[0].id), order_text="   "),
+            OrderSubmissionRequest(run_id=run_id, user_id=str(uuid4()), order_text="Mocha"),
+            OrderSubmissionRequest(run_id=str(closed_run.id), user_id=str(users[0].id), order_text="Mocha"),
+            OrderSubmissionRequest(run_id="not-a-run", user_id=str(users[0].id), order_text="Mocha"),
+            OrderSubmissionRequest(run_id=run_id, user_id=str(users[1].id), order_text="Chai", confirm=False),
+            OrderSubmissionRequest(run_id=run_id, user_id=str(seeded_entities.user.id), order_text="Again"),
+        ]
+    )
+
+    assert [item.index for item in result.succeeded] == [0, 5]
+    assert [type(item.error).__name__ for item in result.failed] == [
+        "OrderValidationError",
+        "UserNotFoundError",
+        "RunNotOpenError",
+        "RunNotFoundError",
+        "OrderValidationError",
+    ]
+    latte, chai = (item.result for item in result.succeeded)
+    assert latte.order_text == "Latte" and latte.preference_updated
+    assert chai.preference_updated is False
+    assert latte.participant_count == chai.participant_count == 2
+
+    orders = session.scalars(select(Order).where(Order.run_id == seeded_entities.run.id)).all()
+    assert sorted(order.order_text for order in orders) == ["Chai", "Latte"]
+    assert all(order.canceled_at is None for order in orders)
+    assert seeded_entities.run.active_order_count == 2
+    preferences = session.scalars(select(UserPreference)).all()
+    assert {pref.user_id: pref.last_order_text for pref in preferences} == {
+        seeded_entities.user.id: "Latte",
+        users[1].id: "Tea",
+    }
+
+
+def test_submit_orders_uses_a_fixed_number_of_statements(
+    session: Session, seeded_entities: SimpleNamespace, ticking_clock, order_service
+):
+    service = order_service(clock=ticking_clock)
+    users = _add_users(session, 40)
+
+    def submit(batch: list[User]) -> int:
+        requests = [
+            OrderSubmissionRequest(run_id=str(seeded_entities.run.id), user_id=str(user.id), order_text="Flat white")
+            for user in batch
+        ]
+        with _StatementCounter(session) as counter:
+            result = service.submit_orders(requests)
+        assert not result.failed
+        return len(counter.statements)
+
+    assert submit(users[:3]) == submit(users[3:]) == 7
+    assert seeded_entities.run.active_order_count == 40
+
+
+def test_max_participants_caps_new_participants_only(
+    session: Session, seeded_entities: SimpleNamespace, ticking_clock, order_service
+):
+    service = order_service(clock=ticking_clock)
+    run = seeded_entities.run
+    run.max_participants = 2
+    session.commit()
+    users = _add_users(session, 3)
+    run_id = str(run.id)
+
+    service.submit_order(OrderSubmissionRequest(run_id=run_id, user_id=str(users[0].id), order_text="Tea"))
+    service.submit_order(OrderSubmissionRequest(run_id=run_id, user_id=str(users[1].id), order_text="Mocha"))
+    with pytest.raises(RunFullError):
+        service.submit_order(OrderSubmissionRequest(run_id=run_id, user_id=str(users[2].id), order_text="Latte"))
+    # Editing an existing order does not take a new slot.
+    edited = service.submit_order(
+        OrderSubmissionRequest(run_id=run_id, user_id=str(users[1].id), order_text="Chai")
+    )
+    assert edited.participant_count == 2
+
+    # A cancellation frees the slot for the bulk path, which admits in request order.
+    service.cancel_order(run_id=run_id, user_id=str(users[0].id))
+    result = service.submit_orders(
+        [
+            OrderSubmissionRequest(run_id=run_id, user_id=str(users[2].id), order_text="Latte"),
+            OrderSubmissionRequest(run_id=run_id, user_id=str(users[0].id), order_text="Tea"),
+        ]
+    )
+    assert [item.index for item in result.succeeded] == [0]
+    assert [type(item.error) for item in result.failed] == [RunFullError]
+    assert run.active_order_count == 2
@@ -0,0 +1,235 @@
+import hashlib
+import hmac
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from coffeebuddy.app import create_app
+from coffeebuddy.config import Settings
+from coffeebuddy.events.run import RunCreatedEvent
+from coffeebuddy.infra.db import OutboxEvent
+from coffeebuddy.infra.kafka import RUN_EVENTS_TOPIC, OutboxRelay, OutboxRunEventPublisher
+from coffeebuddy.models import Base, Run
+
+SECRET = "test-signing-secret"
+
+
+class StubProducer:
+    def __init__(self, *, fail_keys: set[str] | None = None) -> None:
+        self.sent: list[tuple[str, str, str | None]] = []
+        self._fail_keys = fail_keys or set()
+
+    async def start(self) -> None:
+        return None
+
+    async def stop(self) -> None:
+        return None
+
+    async def send(self, topic, event, *, key=None, headers=None) -> None:
+        if key in self._fail_keys:
+            raise RuntimeError("broker unavailable")
+        self.sent.append((topic.name, event.event_type, key))
+
+
+class ExplodingPublisher:
+    async def publish_run_created(self, event: RunCreatedEvent) -> None:
+        raise AssertionError("direct publisher must not be used in outbox mode")
+
+
+async def _engine():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine, async_sessionmaker(bind=engine, expire_on_commit=False)
+
+
+def _event(run_id: str) -> RunCreatedEvent:
+    return RunCreatedEvent(
+        run_id=run_id,
+        channel_id="C1",
+        initiator_user_id="U1",
+        pickup_time=None,
+        pickup_note=None,
+        correlation_id=f"corr-{run_id}",
+        created_at="2024-01-01T09:00:00+00:00",
+    )
+
+
+@pytest.mark.asyncio
+async def test_slash_command_stages_outbox_row_in_run_transaction():
+    engine, session_factory = await _engine()
+    app = create_app(
+        settings=Settings(
+            slack_signing_secret=SECRET,
+            database_url="sqlite+aiosqlite://",
+            kafka_bootstrap_servers="localhost:9092",
+            run_events_outbox=True,
+        ),
+        session_factory=session_factory,
+        event_publisher=ExplodingPublisher(),
+    )
+    body = (
+        b"token=abc&team_id=T1&channel_id=C1&channel_name=general&user_id=U1"
+        b"&user_name=alex&text=note=Lobby&trigger_id=123&response_url=https://example"
+    )
+    timestamp = str(int(time.time()))
+    digest = hmac.new(SECRET.encode(), f"v0:{timestamp}:".encode() + body, hashlib.sha256).hexdigest()
+    headers = {
+        "X-Slack-Request-Timestamp": timestamp,
+        "X-Slack-Signature": f"v0={digest}",
+        "Content-Type": "application/x-www-form-urlencoded",
+    }
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/slack/commands", content=body, headers=headers)
+
+    assert response.status_code == 200
+    async with session_factory() as session:
+        run = (await session.scalars(select(Run))).one()
+        row = (await session.scalars(select(OutboxEvent))).one()
+    assert row.message_key == str(run.id)
+    assert row.event_type == "run_created"
+    assert row.correlation_id == run.correlation_id
+    assert row.payload["run_id"] == str(run.id)
+    assert row.published_at is None
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_relay_publishes_batch_and_marks_rows():
+    engine, session_factory = await _engine()
+    base = datetime(2024, 1, 1, 9, 0, tzinfo=timezone.utc)
+    async with session_factory() as session:
+        for index in range(3):
+            publisher = OutboxRunEventPublisher(session, clock=lambda i=index: base + timedelta(seconds=i))
+            await publisher.publish_run_created(_event(f"run-{index}"))
+        await session.commit()
+
+    producer = StubProducer()
+    relay = OutboxRelay(
+        session_factory=session_factory,
+        producer=producer,
+        batch_size=2,
+        clock=lambda: base + timedelta(seconds=10),
+    )
+
+    assert await relay.relay_once() == 2
+    assert await relay.relay_once() == 1
+    assert await relay.relay_once() == 0
+
+    assert [key for _, _, key in producer.sent] == ["run-0", "run-1", "run-2"]
+    assert {topic for topic, _, _ in producer.sent} == {RUN_EVENTS_TOPIC.name}
+    async with session_factory() as session:
+        rows = (await session.scalars(select(OutboxEvent))).all()
+    assert all(row.published_at == base + timedelta(seconds=10) for row in rows)
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_relay_keeps_failed_rows_pending_with_error():
+    engine, session_factory = await _engine()
+    async with session_factory() as session:
+        publisher = OutboxRunEventPublisher(session)
+        await publisher.publish_run_created(_event("run-ok"))
+        await publisher.publish_run_created(_event("run-bad"))
+        await session.commit()
+
+    relay = OutboxRelay(session_factory=session_factory, producer=StubProducer(fail_keys={"run-bad"}))
+
+    assert await relay.relay_once() == 1
+    async with session_factory() as session:
+        failed = (
+            await session.scalars(select(OutboxEvent).where(OutboxEvent.published_at.is_(None)))
+        ).one()
+    assert failed.message_key == "run-bad"
+    assert failed.attempts == 1
+    assert "broker unavailable" in failed.last_error
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_failed_row_backs_off_and_does_not_block_the_batch():
+    engine, session_factory = await _engine()
+    base = datetime(2024, 1, 1, 9, 0, tzinfo=timezone.utc)
+    async with session_factory() as session:
+        publisher = OutboxRunEventPublisher(session, clock=lambda: base)
+        await publisher.publish_run_created(_event("run-bad"))
+        await session.commit()
+
+    now = [base]
+    producer = StubProducer(fail_keys={"run-bad"})
+    relay = OutboxRelay(
+        session_factory=session_factory,
+        producer=producer,
+        batch_size=1,
+        backoff_base_seconds=2.0,
+        clock=lambda: now[0],
+    )
+
+    assert await relay.relay_once() == 0
+    async with session_factory() as session:
+        await OutboxRunEventPublisher(session, clock=lambda: base + timedelta(seconds=1)).publish_run_created(
+            _event("run-ok")
+        )
+        await session.commit()
+
+    # The failing row is not due again for two seconds, so the next row gets the batch.
+    assert await relay.relay_once() == 1
+    assert producer.sent[-1][2] == "run-ok"
+
+    now[0] = base + timedelta(seconds=2)
+    assert await relay.relay_once() == 0
+    async with session_factory() as session:
+        failed = (await session.scalars(select(OutboxEvent).where(OutboxEvent.message_key == "run-bad"))).one()
+    assert failed.attempts == 2
+    assert failed.next_attempt_at == base + timedelta(seconds=6)
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_row_is_dead_lettered_after_max_attempts():
+    engine, session_factory = await _engine()
+    base = datetime(2024, 1, 1, 9, 0, tzinfo=timezone.utc)
+    async with session_factory() as session:
+        session.add(
+            OutboxEvent(
+                id=uuid4(),
+                topic="coffeebuddy.unknown",
+                message_key="poison",
+                event_type="run_created",
+                correlation_id="corr-poison",
+                payload={},
+                attempts=0,
+                created_at=base,
+            )
+        )
+        await session.commit()
+
+    now = [base]
+    relay = OutboxRelay(
+        session_factory=session_factory,
+        producer=StubProducer(),
+        max_attempts=3,
+        backoff_base_seconds=1.0,
+        clock=lambda: now[0],
+    )
+    for _ in range(3):
+        assert await relay.relay_once() == 0
+        now[0] += timedelta(minutes=5)
+
+    async with session_factory() as session:
+        row = (await session.scalars(select(OutboxEvent))).one()
+    assert row.attempts == 3
+    assert row.dead_lettered_at is not None
+    assert "coffeebuddy.unknown" in row.last_error
+
+    assert await relay.relay_once() == 0
+    async with session_factory() as session:
+        assert (await session.scalars(select(OutboxEvent))).one().attempts == 3
+    await engine.dispose()
@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from uuid import UUID, uuid4
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from coffeebuddy.api.admin.authorizer import SlackAdminAuthorizer
+from coffeebuddy.api.admin.models import AdminActor
+from coffeebuddy.api.admin.service import AdminService
+from coffeebuddy.core.orders import AsyncOrderService, OrderService
+from coffeebuddy.infra.db.models import Base, Channel, Run, RunStatus, User, UserPreference
+from coffeebuddy.services.preferences import (
+    MISSING,
+    AsyncPreferenceService,
+    PreferenceCache,
+    PreferenceInvalidation,
+    PreferenceService,
+)
+
+NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture()
+def session_factory():
+    engine = create_engine("sqlite+pysqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine, expire_on_commit=False)
+    engine.dispose()
+
+
+def _entities() -> SimpleNamespace:
+    channel = Channel(
+        id=uuid4(),
+        slack_channel_id="C123",
+        name="coffee",
+        enabled=True,
+        reminder_offset_minutes=5,
+        fairness_window_runs=5,
+        data_retention_days=90,
+        reminders_enabled=True,
+        last_call_enabled=True,
+        created_at=NOW,
+        updated_at=NOW,
+    )
+    user = User(
+        id=uuid4(),
+        slack_user_id="U123",
+        display_name="Coffee Tester",
+        is_active=True,
+        created_at=NOW,
+        updated_at=NOW,
+    )
+    run = Run(
+        id=uuid4(),
+        channel_id=channel.id,
+        initiator_user_id=user.id,
+        status=RunStatus.OPEN,
+        started_at=NOW,
+        created_at=NOW,
+        updated_at=NOW,
+    )
+    return SimpleNamespace(channel=channel, user=user, run=run)
+
+
+@pytest.fixture()
+def seeded(session_factory) -> SimpleNamespace:
+    seeded = _entities()
+    with session_factory() as session:
+        session.add_all([seeded.channel, seeded.user, seeded.run])
+        session.commit()
+    return seeded
+
+
+def _preference_selects(session: Session) -> list[str]:
+    statements: list[str] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany) -> None:
+        if statement.startswith("SELECT") and "user_preferences" in statement:
+            statements.append(statement)
+
+    event.listen(session.get_bind(), "before_cursor_execute", _record)
+    return statements
+
+
+def test_hit_serves_preference_without_select(session_factory, seeded):
+    cache = PreferenceCache()
+    with session_factory() as session:
+        PreferenceService(session, cache=cache).set_preference(
+            user_id=seeded.user.id, channel_id=seeded.channel.id, order_text="Flat white"
+        )
+        session.commit()
+
+    with session_factory() as session:
+        selects = _preference_selects(session)
+        result = OrderService(session, preference_cache=cache).use_last_order(
+            run_id=str(seeded.run.id), user_id=str(seeded.user.id)
+        )
+        session.commit()
+
+    assert result.submission.order_text == "Flat white"
+    assert selects == []
+    with session_factory() as session:
+        stored = session.get(UserPreference, UUID(result.preference_id))
+        assert stored.last_used_at is not None
+
+
+@pytest.mark.asyncio
+async def test_async_services_share_the_cache_protocol():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    seeded = _entities()
+    async with session_factory() as session:
+        session.add_all([seeded.channel, seeded.user, seeded.run])
+        await session.commit()
+
+    cache = PreferenceCache()
+    key = (seeded.user.id, seeded.channel.id)
+    async with session_factory() as session:
+        await AsyncPreferenceService(session, cache=cache).set_preference(
+            user_id=key[0], channel_id=key[1], order_text="Flat white"
+        )
+        assert cache.get(key) is MISSING
+        await session.commit()
+    assert cache.get(key).last_order_text == "Flat white"
+
+    async with session_factory() as session:
+        selects = _preference_selects(session.sync_session)
+        result = await AsyncOrderService(session, preference_cache=cache).use_last_order(
+            run_id=str(seeded.run.id), user_id=str(seeded.user.id)
+        )
+        await session.commit()
+    assert result.submission.order_text == "Flat white"
+    assert selects == []
+    assert cache.get(key).last_used_at is not None
+    await engine.dispose()
+
+
+def test_missing_preference_is_cached_negatively(session_factory, seeded):
+    cache = PreferenceCache()
+    with session_factory() as session:
+        selects = _preference_selects(session)
+        service = PreferenceService(session, cache=cache)
+        for _ in range(3):
+            assert service.get_preference(user_id=seeded.user.id, channel_id=seeded.channel.id) is None
+
+    assert len(selects) == 1
+
+
+def test_write_reaches_cache_only_after_commit(session_factory, seeded):
+    cache = PreferenceCache()
+    key = (seeded.user.id, seeded.channel.id)
+
+    with session_factory() as session:
+        service = PreferenceService(session, cache=cache)
+        service.set_preference(user_id=key[0], channel_id=key[1], order_text="Mocha")
+        assert cache.get(key) is MISSING
+        # Reads inside the writing transaction bypass the shared cache.
+        assert service.get_preference(user_id=key[0], channel_id=key[1]).last_order_text == "Mocha"
+        assert cache.get(key) is MISSING
+        session.rollback()
+    assert cache.get(key) is MISSING
+
+    with session_factory() as session:
+        PreferenceService(session, cache=cache).set_preference(
+            user_id=key[0], channel_id=key[1], order_text="Cortado"
+        )
+        session.commit()
+    assert cache.get(key).last_order_text == "Cortado"
+
+
+def test_entries_expire_and_are_bounded():
+    now = [0.0]
+    cache = PreferenceCache(max_entries=2, ttl_seconds=10.0, clock=lambda: now[0])
+    keys = [(uuid4(), uuid4()) for _ in range(3)]
+    for key in keys:
+        cache.put(key, None)
+
+    assert len(cache) == 2
+    assert cache.get(keys[0]) is MISSING
+    assert cache.get(keys[2]) is None
+
+    now[0] = 10.0
+    assert cache.get(keys[2]) is MISSING
+
+
+def test_local_invalidations_are_published_and_remote_ones_are_not():
+    published: list[PreferenceInvalidation] = []
+    cache = PreferenceCache(on_invalidate=published.append)
+    channel_id = uuid4()
+    keys = [(uuid4(), channel_id), (uuid4(), channel_id), (uuid4(), uuid4())]
+    for key in keys:
+        cache.put(key, None)
+
+    cache.apply(PreferenceInvalidation(channel_id=channel_id, user_id=keys[0][0]))
+    assert published == []
+    assert cache.get(keys[0]) is MISSING
+    assert cache.get(keys[1]) is None
+
+    cache.invalidate(PreferenceInvalidation(channel_id=channel_id))
+    assert published == [PreferenceInvalidation(channel_id=channel_id)]
+    assert cache.get(keys[1]) is MISSING
+    assert cache.get(keys[2]) is None
+
+
+def test_admin_reset_invalidates_channel_on_commit(session_factory, seeded):
+    published: list[PreferenceInvalidation] = []
+    cache = PreferenceCache(on_invalidate=published.append)
+    key = (seeded.user.id, seeded.channel.id)
+    with session_factory() as session:
+        PreferenceService(session, cache=cache).set_preference(
+            user_id=key[0], channel_id=key[1], order_text="Latte"
+        )
+        session.commit()
+    published.clear()
+
+    with session_factory() as session:
+        AdminService(
+            session,
+            authorizer=SlackAdminAuthorizer(allowed_user_ids=[seeded.user.slack_user_id]),
+            clock=lambda: NOW + timedelta(days=1),
+            preference_cache=cache,
+        ).reset_channel_data(
+            slack_channel_id=seeded.channel.slack_channel_id,
+            actor=AdminActor(
+                user_id=str(seeded.user.id),
+                slack_user_id=seeded.user.slack_user_id,
+                slack_roles=("admin",),
+            ),
+        )
+        assert cache.get(key) is MISSING
+        assert published == []
+        session.commit()
+
+    assert published == [PreferenceInvalidation(channel_id=seeded.channel.id)]
+    with session_factory() as session:
+        assert PreferenceService(session, cache=cache).get_preference(
+            user_id=key[0], channel_id=key[1]
+        ) is None
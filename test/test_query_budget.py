@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from coffeebuddy.core.orders import (
+    AsyncOrderService,
+    OrderService,
+    OrderSubmissionRequest,
+    RunNotFoundError,
+    RunNotOpenError,
+    UserNotFoundError,
+)
+from coffeebuddy.core.orders.repository import RunRepository
+from coffeebuddy.core.orders.service import ORDER_QUERY_BUDGETS
+from coffeebuddy.infra.db.identity import IdentityCache
+from coffeebuddy.infra.db.models import Base, Channel, Run, RunStatus, User
+from coffeebuddy.infra.db.query_budget import (
+    QueryBudget,
+    QueryBudgetExceededError,
+    QueryRecorder,
+)
+
+NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture()
+def session_factory(tmp_path):
+    # A file database gives each session its own connection.
+    engine = create_engine(f"sqlite+pysqlite:///{tmp_path / 'budget.db'}", future=True)
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine, expire_on_commit=False)
+    engine.dispose()
+
+
+def _entities() -> SimpleNamespace:
+    channel = Channel(
+        id=uuid4(),
+        slack_channel_id="C123",
+        name="coffee",
+        enabled=True,
+        reminder_offset_minutes=5,
+        fairness_window_runs=5,
+        data_retention_days=90,
+        reminders_enabled=True,
+        last_call_enabled=True,
+        created_at=NOW,
+        updated_at=NOW,
+    )
+    user = User(
+        id=uuid4(),
+        slack_user_id="U123",
+        display_name="Coffee Tester",
+        is_active=True,
+        created_at=NOW,
+        updated_at=NOW,
+    )
+    run = Run(
+        id=uuid4(),
+        channel_id=channel.id,
+        initiator_user_id=user.id,
+        status=RunStatus.OPEN,
+        max_participants=5,
+        started_at=NOW,
+        created_at=NOW,
+        updated_at=NOW,
+    )
+    return SimpleNamespace(channel=channel, user=user, run=run)
+
+
+@pytest.fixture()
+def seeded(session_factory) -> SimpleNamespace:
+    seeded = _entities()
+    with session_factory() as session:
+        session.add_all([seeded.channel, seeded.user, seeded.run])
+        session.commit()
+    return seeded
+
+
+def test_recorder_sees_only_its_own_session(session_factory):
+    with session_factory() as mine, session_factory() as other:
+        with QueryRecorder(mine) as recorder:
+            mine.execute(text("SELECT 1"))
+            other.execute(text("SELECT 2"))
+            with QueryRecorder(mine) as inner:
+                mine.execute(text("SELECT 3"))
+            mine.execute(text("SELECT 4"))
+        mine.execute(text("SELECT 5"))
+
+    assert [statement.statement for statement in recorder.statements] == ["SELECT 1", "SELECT 4"]
+    assert [statement.statement for statement in inner.statements] == ["SELECT 3"]
+    assert recorder.total_seconds >= 0
+
+
+def test_budget_logs_overruns_and_raises_when_enforcing(session_factory, caplog):
+    budget = QueryBudget({"demo": 1})
+    with session_factory() as session:
+        with caplog.at_level(logging.WARNING):
+            with budget.track(session, "demo") as recorder:
+                session.execute(text("SELECT 1"))
+                session.execute(text("SELECT 2"))
+        assert recorder.count == 2
+        assert any(record.operation == "demo" for record in caplog.records)
+
+        with pytest.raises(QueryBudgetExceededError) as excinfo:
+            with budget.enforcing().track(session, "demo"):
+                session.execute(text("SELECT 1"))
+                session.execute(text("SELECT 2"))
+        assert excinfo.value.budget == 1
+        assert len(excinfo.value.statements) == 2
+
+        with QueryBudget({}, enforce=True).track(session, "unbudgeted"):
+            session.execute(text("SELECT 1"))
+            session.execute(text("SELECT 2"))
+
+
+@pytest.mark.parametrize("identity_cache", [None, IdentityCache()], ids=["joined", "identity-cache"])
+def test_order_operations_stay_within_their_budgets(session_factory, seeded, identity_cache):
+    budget = QueryBudget(ORDER_QUERY_BUDGETS).enforcing()
+    run_id, user_id = str(seeded.run.id), str(seeded.user.id)
+
+    def service(session):
+        return OrderService(session, identity_cache=identity_cache, query_budget=budget)
+
+    with session_factory() as session:
+        service(session).submit_order(OrderSubmissionRequest(run_id=run_id, user_id=user_id, order_text="Latte"))
+        session.commit()
+    with session_factory() as session:
+        service(session).submit_order(OrderSubmissionRequest(run_id=run_id, user_id=user_id, order_text="Mocha"))
+        session.commit()
+    with session_factory() as session:
+        result = service(session).use_last_order(run_id=run_id, user_id=user_id)
+        session.commit()
+    assert result.submission.order_text == "Mocha"
+    with session_factory() as session:
+        assert service(session).cancel_order(run_id=run_id, user_id=user_id).participant_count == 0
+        session.commit()
+
+
+@pytest.mark.parametrize("identity_cache", [None, IdentityCache()], ids=["joined", "identity-cache"])
+def test_first_confirm_counts_the_new_preference_insert(session_factory, seeded, identity_cache):
+    request = OrderSubmissionRequest(run_id=str(seeded.run.id), user_id=str(seeded.user.id), order_text="Latte")
+    with session_factory() as session:
+        # A zero budget reports every statement the call issued.
+        recording = OrderService(
+            session, identity_cache=identity_cache, query_budget=QueryBudget({"orders.submit_order": 0}, enforce=True)
+        )
+        with pytest.raises(QueryBudgetExceededError) as excinfo:
+            recording.submit_order(request)
+        session.rollback()
+
+    statements = [recorded.statement for recorded in excinfo.value.statements]
+    assert any(statement.startswith("INSERT INTO user_preferences") for statement in statements)
+    assert len(statements) <= ORDER_QUERY_BUDGETS["orders.submit_order"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("identity_cache", [None, IdentityCache()], ids=["joined", "identity-cache"])
+async def test_async_order_operations_stay_within_the_same_budgets(tmp_path, identity_cache):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'budget.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    seeded = _entities()
+    async with session_factory() as session:
+        session.add_all([seeded.channel, seeded.user, seeded.run])
+        await session.commit()
+
+    budget = QueryBudget(ORDER_QUERY_BUDGETS).enforcing()
+    run_id, user_id = str(seeded.run.id), str(seeded.user.id)
+
+    def service(session):
+        return AsyncOrderService(session, identity_cache=identity_cache, query_budget=budget)
+
+    for text_ in ("Latte", "Mocha"):
+        async with session_factory() as session:
+            await service(session).submit_order(
+                OrderSubmissionRequest(run_id=run_id, user_id=user_id, order_text=text_)
+            )
+            await session.commit()
+    async with session_factory() as session:
+        result = await service(session).use_last_order(run_id=run_id, user_id=user_id)
+        await session.commit()
+    assert result.submission.order_text == "Mocha"
+    async with session_factory() as session:
+        canceled = await service(session).cancel_order(run_id=run_id, user_id=user_id)
+        await session.commit()
+    assert canceled.participant_count == 0
+
+    # The budgets above only mean something if async sessions are recorded.
+    async with session_factory() as session:
+        async with QueryRecorder(session) as recorder:
+            await session.execute(text("SELECT 1"))
+        with pytest.raises(QueryBudgetExceededError):
+            async with QueryBudget({"demo": 0}, enforce=True).atrack(session, "demo"):
+                await session.execute(text("SELECT 2"))
+    assert [statement.statement for statement in recorder.statements] == ["SELECT 1"]
+    await engine.dispose()
+
+
+def test_joined_lookup_reads_run_and_user_in_one_statement(session_factory, seeded):
+    with session_factory() as session, QueryRecorder(session) as recorder:
+        run, user = RunRepository(session).get_open_run_with_user(seeded.run.id, str(seeded.user.id))
+    assert (run.id, user.id) == (seeded.run.id, seeded.user.id)
+    assert recorder.count == 1
+    assert "LEFT OUTER JOIN users" in recorder.statements[0].statement
+
+
+def test_joined_lookup_reports_the_run_before_the_user(session_factory, seeded):
+    with session_factory() as session:
+        repository = RunRepository(session)
+        with pytest.raises(RunNotFoundError):
+            repository.get_open_run_with_user(uuid4(), uuid4())
+        with pytest.raises(UserNotFoundError):
+            repository.get_open_run_with_user(seeded.run.id, uuid4())
+
+        session.scalar(select(Run).where(Run.id == seeded.run.id)).status = RunStatus.CLOSED
+        with pytest.raises(RunNotOpenError):
+            repository.get_open_run_with_user(seeded.run.id, uuid4())
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
+
+import pytest
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+
+from coffeebuddy.core.runs import RepeatRunRequest, RunRepeatService
+from coffeebuddy.core.runs.exceptions import (
+    ChannelUnavailableError,
+    PreviousRunNotFoundError,
+    RunAlreadyOpenError,
+)
+from coffeebuddy.infra.db.models import Base, Channel, Order, OutboxEvent, Run, RunStatus, User
+
+NOW = datetime(2024, 1, 8, 9, tzinfo=timezone.utc)
+
+
+@pytest.fixture()
+def session():
+    engine = create_engine("sqlite+pysqlite:///:memory:", future=True)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, expire_on_commit=False)
+    sess = Session()
+    try:
+        yield sess
+    finally:
+        sess.close()
+        engine.dispose()
+
+
+def _user(session, slack_id: str, *, is_active: bool = True) -> User:
+    user = User(
+        id=uuid4(),
+        slack_user_id=slack_id,
+        display_name=slack_id,
+        is_active=is_active,
+        created_at=NOW,
+        updated_at=NOW,
+    )
+    session.add(user)
+    return user
+
+
+def _channel(session, *, enabled: bool = True) -> Channel:
+    channel = Channel(
+        id=uuid4(),
+        slack_channel_id="C1",
+        name="coffee",
+        enabled=enabled,
+        created_at=NOW,
+        updated_at=NOW,
+    )
+    session.add(channel)
+    return channel
+
+
+def _run(session, channel: Channel, initiator: User, *, status: RunStatus, closed_at: datetime | None) -> Run:
+    run = Run(
+        id=uuid4(),
+        channel_id=channel.id,
+        initiator_user_id=initiator.id,
+        status=status.value,
+        started_at=(closed_at or NOW) - timedelta(minutes=30),
+        closed_at=closed_at,
+        created_at=NOW,
+        updated_at=NOW,
+    )
+    session.add(run)
+    return run
+
+
+def _order(session, run: Run, user: User, text: str, *, canceled: bool = False) -> None:
+    session.add(
+        Order(
+            id=uuid4(),
+            run_id=run.id,
+            user_id=user.id,
+            order_text=text,
+            is_final=True,
+            provenance="manual",
+            canceled_at=NOW if canceled else None,
+            created_at=NOW,
+            updated_at=NOW,
+        )
+    )
+
+
+def test_repeat_copies_active_orders_from_latest_closed_run(session):
+    channel = _channel(session)
+    alice, bob, carol, dave, erin = (
+        _user(session, "UALICE"),
+        _user(session, "UBOB"),
+        _user(session, "UCAROL"),
+        _user(session, "UDAVE", is_active=False),
+        _user(session, "UERIN"),
+    )
+    older = _run(session, channel, alice, status=RunStatus.CLOSED, closed_at=NOW - timedelta(days=7))
+    latest = _run(session, channel, alice, status=RunStatus.CLOSED, closed_at=NOW - timedelta(days=1))
+    _order(session, older, alice, "Espresso")
+    _order(session, latest, alice, "Flat white")
+    _order(session, latest, bob, "Tea", canceled=True)
+    _order(session, latest, carol, "Mocha")
+    _order(session, latest, dave, "Latte")
+    _order(session, latest, erin, "Cortado")
+    session.commit()
+
+    statements: list[str] = []
+    event.listen(
+        session.get_bind(),
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: statements.append(statement),
+    )
+    result = RunRepeatService(session=session, clock=lambda: NOW).repeat_last_run(
+        RepeatRunRequest(
+            channel_id=str(channel.id),
+            initiator_user_id=str(carol.id),
+            exclude_user_ids=(str(erin.id),),
+        )
+    )
+    session.commit()
+
+    assert result.source_run_id == str(latest.id)
+    assert result.copied_orders == 2
+    # Channel lock, open-run check, source lookup, run + outbox inserts,
+    # source order select, one executemany insert, counter update.
+    assert len(statements) == 8
+    assert sum(statement.startswith("INSERT INTO orders") for statement in statements) == 1
+    assert "NULLS LAST" in statements[2]
+
+    run = session.get(Run, UUID(result.run_id))
+    assert run.status == RunStatus.OPEN.value
+    assert run.initiator_user_id == carol.id
+    assert run.active_order_count == 2
+    copies = session.execute(
+        select(Order.user_id, Order.order_text, Order.provenance, Order.is_final)
+        .where(Order.run_id == run.id)
+        .order_by(Order.order_text)
+    ).all()
+    assert copies == [
+        (alice.id, "Flat white", "preference", False),
+        (carol.id, "Mocha", "preference", False),
+    ]
+    staged = session.scalars(select(OutboxEvent)).one()
+    assert (staged.event_type, staged.message_key) == ("run_created", result.run_id)
+    assert staged.payload["channel_id"] == str(channel.id)
+    assert staged.correlation_id == run.correlation_id
+
+
+def test_repeat_without_closed_run_raises(session):
+    channel = _channel(session)
+    alice = _user(session, "UALICE")
+    _run(session, channel, alice, status=RunStatus.CANCELED, closed_at=None)
+    session.commit()
+
+    with pytest.raises(PreviousRunNotFoundError):
+        RunRepeatService(session=session).repeat_last_run(
+            RepeatRunRequest(channel_id=str(channel.id), initiator_user_id=str(alice.id))
+        )
+
+
+def test_repeat_refuses_disabled_channel_and_open_run(session):
+    disabled = _channel(session, enabled=False)
+    alice = _user(session, "UALICE")
+    _run(session, disabled, alice, status=RunStatus.CLOSED, closed_at=NOW)
+    session.commit()
+    service = RunRepeatService(session=session, clock=lambda: NOW)
+
+    with pytest.raises(ChannelUnavailableError):
+        service.repeat_last_run(RepeatRunRequest(channel_id=str(disabled.id), initiator_user_id=str(alice.id)))
+    with pytest.raises(ChannelUnavailableError):
+        service.repeat_last_run(RepeatRunRequest(channel_id=str(uuid4()), initiator_user_id=str(alice.id)))
+
+    disabled.enabled = True
+    _run(session, disabled, alice, status=RunStatus.OPEN, closed_at=None)
+    session.commit()
+    with pytest.raises(RunAlreadyOpenError):
+        service.repeat_last_run(RepeatRunRequest(channel_id=str(disabled.id), initiator_user_id=str(alice.id)))
+    assert session.scalars(select(OutboxEvent)).all() == []
+
+
+def test_postgres_copy_relies_on_server_generated_ids():
+    captured = []
+
+    class _Result:
+        rowcount = 0
+
+    class _Session:
+        def get_bind(self):
+            return type("Bind", (), {"dialect": postgresql.dialect()})()
+
+        def execute(self, statement):
+            captured.append(str(statement.compile(dialect=postgresql.dialect())))
+            return _Result()
+
+    service = RunRepeatService(session=_Session(), clock=lambda: NOW)
+    service._copy_orders(
+        source_run_id=uuid4(),
+        run_id=uuid4(),
+        request=RepeatRunRequest(channel_id=str(uuid4()), initiator_user_id=str(uuid4())),
+        now=NOW,
+    )
+
+    (statement,) = captured
+    assert statement.startswith("INSERT INTO orders (user_id, order_text, catalog_hash, run_id")
+    assert "orders (id" not in statement
+    assert "JOIN users" in statement
@@ -0,0 +1,148 @@
+import hashlib
+import hmac
+import time
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from coffeebuddy.api.slack_runs.admission import SlackAdmissionController, TokenBucketLimiter
+from coffeebuddy.api.slack_runs.router import BUSY_MESSAGE
+from coffeebuddy.app import create_app
+from coffeebuddy.config import Settings
+from coffeebuddy.models import Base
+
+SECRET = "test-signing-secret"
+
+
+class NullPublisher:
+    async def publish_run_created(self, event) -> None:
+        return None
+
+
+def _limiter(now: list[float], *, rate: float = 1.0, burst: int = 2, max_keys: int = 100) -> TokenBucketLimiter:
+    return TokenBucketLimiter(rate_per_second=rate, burst=burst, max_keys=max_keys, clock=lambda: now[0])
+
+
+def test_bucket_allows_burst_then_refills_at_rate():
+    now = [0.0]
+    limiter = _limiter(now)
+
+    assert [limiter.try_acquire("C1") for _ in range(3)] == [True, True, False]
+    assert limiter.try_acquire("C2")
+
+    now[0] = 0.5
+    assert not limiter.try_acquire("C1")
+    now[0] = 1.0
+    assert limiter.try_acquire("C1")
+    now[0] = 100.0
+    assert [limiter.try_acquire("C1") for _ in range(3)] == [True, True, False]
+
+
+def test_bucket_tracks_only_recent_keys():
+    now = [0.0]
+    limiter = _limiter(now, max_keys=2)
+    for key in ("a", "b", "c"):
+        limiter.try_acquire(key)
+    assert len(limiter) == 2
+
+
+def test_controller_refunds_channel_token_when_workspace_sheds():
+    now = [0.0]
+    controller = SlackAdmissionController(channel=_limiter(now, burst=2), workspace=_limiter(now, burst=3))
+
+    assert controller.admit(team_id="T1", channel_id="C1")
+    assert controller.admit(team_id="T1", channel_id="C1")
+    assert not controller.admit(team_id="T1", channel_id="C1")
+    assert controller.admit(team_id="T1", channel_id="C2")
+    # Workspace is now empty; C2 keeps the token it was refunded.
+    assert not controller.admit(team_id="T1", channel_id="C2")
+    assert controller.admit(team_id="T2", channel_id="C2")
+
+    now[0] = 1.0
+    assert controller.admit(team_id="T1", channel_id="C2")
+
+
+def test_controller_refund_returns_both_tokens():
+    now = [0.0]
+    controller = SlackAdmissionController(channel=_limiter(now, burst=1), workspace=_limiter(now, burst=1))
+
+    assert controller.admit(team_id="T1", channel_id="C1")
+    assert not controller.admit(team_id="T1", channel_id="C1")
+    controller.refund(team_id="T1", channel_id="C1")
+    assert controller.admit(team_id="T1", channel_id="C1")
+
+
+def _signed_command(index: int, channel_id: str, *, offset: int = 0) -> tuple[bytes, dict[str, str]]:
+    body = (
+        f"token=abc&team_id=T1&channel_id={channel_id}&channel_name=general&user_id=U1"
+        f"&user_name=alex&text=&trigger_id={index}&response_url=https://example"
+    ).encode()
+    timestamp = str(int(time.time()) + offset)
+    digest = hmac.new(SECRET.encode(), f"v0:{timestamp}:".encode() + body, hashlib.sha256).hexdigest()
+    return body, {
+        "X-Slack-Request-Timestamp": timestamp,
+        "X-Slack-Signature": f"v0={digest}",
+        "Content-Type": "application/x-www-form-urlencoded",
+    }
+
+
+@pytest.mark.asyncio
+async def test_noisy_channel_is_shed_with_busy_reply():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    app = create_app(
+        settings=Settings(
+            slack_signing_secret=SECRET,
+            database_url="sqlite+aiosqlite://",
+            kafka_bootstrap_servers="localhost:9092",
+            slack_admission_channel_rate_per_second=0.001,
+            slack_admission_channel_burst=2,
+        ),
+        session_factory=async_sessionmaker(bind=engine, expire_on_commit=False),
+        event_publisher=NullPublisher(),
+    )
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        replies = []
+        for index, channel_id in enumerate(("C1", "C1", "C1", "C2")):
+            body, headers = _signed_command(index, channel_id)
+            replies.append((await client.post("/slack/commands", content=body, headers=headers)).json())
+
+    assert [reply["response_type"] for reply in replies] == ["in_channel", "in_channel", "ephemeral", "in_channel"]
+    assert replies[2]["text"] == BUSY_MESSAGE
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_retry_of_handled_command_replays_without_spending_a_token():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    app = create_app(
+        settings=Settings(
+            slack_signing_secret=SECRET,
+            database_url="sqlite+aiosqlite://",
+            kafka_bootstrap_servers="localhost:9092",
+            slack_admission_channel_rate_per_second=0.001,
+            slack_admission_channel_burst=1,
+        ),
+        session_factory=async_sessionmaker(bind=engine, expire_on_commit=False),
+        event_publisher=NullPublisher(),
+    )
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        body, headers = _signed_command(0, "C1")
+        first = await client.post("/slack/commands", content=body, headers=headers)
+        # Slack re-signs the retry, so only the timestamp and signature differ.
+        body, headers = _signed_command(0, "C1", offset=1)
+        retry = await client.post("/slack/commands", content=body, headers=headers)
+        body, headers = _signed_command(1, "C1")
+        fresh = await client.post("/slack/commands", content=body, headers=headers)
+
+    assert first.json()["response_type"] == "in_channel"
+    assert retry.content == first.content
+    assert fresh.json()["text"] == BUSY_MESSAGE
+    await engine.dispose()
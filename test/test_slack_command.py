@@ -7,15 +7,16 @@ import time
 from datetime import datetime, timezone
 
 import pytest
+import pytest_asyncio
 from httpx import AsyncClient, ASGITransport
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.pool import StaticPool
 
+from coffeebuddy.api.slack_runs.service import CHANNEL_DISABLED_MESSAGE
 from coffeebuddy.app import create_app
 from coffeebuddy.events.run import RunCreatedEvent, RunEventPublisher
-from coffeebuddy.infra.db import Base
-from coffeebuddy.models.run import Run
+from coffeebuddy.infra.db.models import Base, Channel, Run, User
 from coffeebuddy.config import Settings
 
 
@@ -23,34 +24,47 @@ class FakePublisher(RunEventPublisher):
     def __init__(self) -> None:
         self.events: list[RunCreatedEvent] = []
 
-    def publish_run_created(self, event: RunCreatedEvent) -> None:
+    async def publish_run_created(self, event: RunCreatedEvent) -> None:
         self.events.append(event)
 
 
+class GatedPublisher(FakePublisher):
+    """Holds every publish until ``expected`` requests are in flight at once."""
+
+    def __init__(self, expected: int) -> None:
+        super().__init__()
+        self._expected = expected
+        self._all_in_flight = asyncio.Event()
+
+    async def publish_run_created(self, event: RunCreatedEvent) -> None:
+        self.events.append(event)
+        if len(self.events) >= self._expected:
+            self._all_in_flight.set()
+        await asyncio.wait_for(self._all_in_flight.wait(), timeout=2)
+
+
 def _make_signature(secret: str, timestamp: str, body: bytes) -> str:
     sig_basestring = f"v0:{timestamp}:{body.decode()}".encode()
     digest = hmac.new(secret.encode(), sig_basestring, hashlib.sha256).hexdigest()
     return f"v0={digest}"
 
 
-@pytest.fixture
-def test_app(tmp_path):
+async def _build_app(publisher: FakePublisher):
     os.environ["COFFEEBUDDY_SLACK_SIGNING_SECRET"] = "test-signing-secret"
     settings = Settings(
         slack_signing_secret="test-signing-secret",
-        database_url="sqlite+pysqlite:///:memory:",
+        database_url="sqlite+aiosqlite:///:memory:",
         kafka_bootstrap_servers="localhost:9092",
     )
 
-    engine = create_engine(
-        "sqlite+pysqlite://",
+    engine = create_async_engine(
+        "sqlite+aiosqlite://",
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
-        future=True,
     )
-    Base.metadata.create_all(engine)
-    session_factory = sessionmaker(bind=engine, expire_on_commit=False)
-    publisher = FakePublisher()
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
 
     app = create_app(
         settings=settings,
@@ -59,9 +73,31 @@ def test_app(tmp_path):
     )
     app.state.publisher = publisher  # attach for assertions
     app.state.session_factory = session_factory
+    app.state.engine = engine
     return app
 
 
+@pytest_asyncio.fixture
+async def test_app():
+    app = await _build_app(FakePublisher())
+    yield app
+    await app.state.engine.dispose()
+
+
+def _signed_command(text: str = "", *, channel_id: str = "C1") -> tuple[bytes, dict[str, str]]:
+    body = (
+        f"token=abc&team_id=T1&channel_id={channel_id}&channel_name=general&user_id=U1"
+        f"&user_name=alex&text={text}&trigger_id=123&response_url=https://example"
+    ).encode()
+    timestamp = str(int(time.time()))
+    headers = {
+        "X-Slack-Request-Timestamp": timestamp,
+        "X-Slack-Signature": _make_signature("test-signing-secret", timestamp, body),
+        "Content-Type": "application/x-www-form-urlencoded",
+    }
+    return body, headers
+
+
 @pytest.mark.asyncio
 async def test_slash_command_requires_valid_signature(test_app):
     client = AsyncClient(transport=ASGITransport(app=test_app), base_url="http://test")
@@ -97,17 +133,82 @@ async def test_slash_command_creates_run_and_emits_event(test_app):
     assert response.status_code == 200
     payload = response.json()
     assert payload["response_type"] == "in_channel"
-    assert any("Lobby" in block.get("text", "") for block in payload["blocks"] if block.get("type") == "section")
+    assert any("Lobby" in block.get("text", {}).get("text", "") for block in payload["blocks"] if block.get("type") == "section")
 
-    session = test_app.state.session_factory()
-    runs = session.query(Run).all()
+    async with test_app.state.session_factory() as session:
+        runs = (await session.scalars(select(Run))).all()
+        channel = (await session.scalars(select(Channel))).one()
+        user = (await session.scalars(select(User))).one()
     assert len(runs) == 1
     run = runs[0]
-    assert run.channel_id == "C1"
+    assert (channel.slack_channel_id, channel.name) == ("C1", "general")
+    assert (user.slack_user_id, user.display_name) == ("U1", "alex")
+    assert run.channel_id == channel.id
+    assert run.initiator_user_id == user.id
     assert run.pickup_note == "Lobby"
     assert run.pickup_time == datetime(2030, 1, 1, 9, tzinfo=timezone.utc)
 
     publisher: FakePublisher = test_app.state.publisher
     assert len(publisher.events) == 1
-    assert publisher.events[0].run_id == run.id
-    await client.aclose()
\ No newline at end of file
+    assert publisher.events[0].run_id == str(run.id)
+    assert publisher.events[0].channel_id == str(channel.id)
+    actions = next(block for block in payload["blocks"] if block["type"] == "actions")
+    assert {element["value"] for element in actions["elements"]} == {str(run.id)}
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_slow_publish_does_not_block_concurrent_commands():
+    concurrency = 5
+    app = await _build_app(GatedPublisher(expected=concurrency))
+    client = AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+    requests = [_signed_command(channel_id=f"C{i}") for i in range(concurrency)]
+    responses = await asyncio.gather(
+        *(client.post("/slack/commands", content=body, headers=headers) for body, headers in requests)
+    )
+
+    assert [response.status_code for response in responses] == [200] * concurrency
+    assert len(app.state.publisher.events) == concurrency
+    await client.aclose()
+    await app.state.engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_known_channel_and_user_are_reused_and_disabled_channel_is_refused(test_app):
+    client = AsyncClient(transport=ASGITransport(app=test_app), base_url="http://test")
+    for index in range(2):
+        body, headers = _signed_command(text=f"note=n{index}")
+        assert (await client.post("/slack/commands", content=body, headers=headers)).status_code == 200
+
+    async with test_app.state.session_factory() as session:
+        assert len((await session.scalars(select(Channel))).all()) == 1
+        assert len((await session.scalars(select(User))).all()) == 1
+        assert len((await session.scalars(select(Run))).all()) == 2
+        channel = (await session.scalars(select(Channel))).one()
+        channel.enabled = False
+        await session.commit()
+
+    body, headers = _signed_command(text="note=again")
+    payload = (await client.post("/slack/commands", content=body, headers=headers)).json()
+    assert payload == {"response_type": "ephemeral", "text": CHANNEL_DISABLED_MESSAGE}
+    async with test_app.state.session_factory() as session:
+        assert len((await session.scalars(select(Run))).all()) == 2
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_run_options_are_persisted_on_the_run(test_app):
+    client = AsyncClient(transport=ASGITransport(app=test_app), base_url="http://test")
+    body, headers = _signed_command(text="pickup=10:30 tz=Europe/Berlin max=3 exclude=U222,U333")
+
+    payload = (await client.post("/slack/commands", content=body, headers=headers)).json()
+
+    async with test_app.state.session_factory() as session:
+        run = (await session.scalars(select(Run))).one()
+    assert run.pickup_timezone == "Europe/Berlin"
+    assert run.max_participants == 3
+    assert run.excluded_runner_slack_ids == ["U222", "U333"]
+    pickup_text = json.dumps(payload["blocks"])
+    assert "10:30 Europe/Berlin" in pickup_text
+    await client.aclose()
@@ -0,0 +1,136 @@
+import hashlib
+import hmac
+import json
+import time
+from typing import Any
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from coffeebuddy.api.slack_runs.deferred import FAILURE_MESSAGE
+from coffeebuddy.api.slack_runs.router import BUSY_MESSAGE
+from coffeebuddy.app import create_app
+from coffeebuddy.config import Settings
+from coffeebuddy.events.run import RunCreatedEvent, RunEventPublisher
+from coffeebuddy.models import Base, Run
+
+SECRET = "test-signing-secret"
+
+
+class FakePublisher(RunEventPublisher):
+    def __init__(self, *, fail: bool = False) -> None:
+        self.events: list[RunCreatedEvent] = []
+        self._fail = fail
+
+    async def publish_run_created(self, event: RunCreatedEvent) -> None:
+        if self._fail:
+            raise RuntimeError("broker unavailable")
+        self.events.append(event)
+
+
+class RecordingSender:
+    def __init__(self) -> None:
+        self.sent: list[tuple[str, dict[str, Any]]] = []
+
+    async def send(self, response_url: str, body: bytes) -> None:
+        self.sent.append((response_url, json.loads(body)))
+
+
+def _signed_command(channel_id: str = "C1") -> tuple[bytes, dict[str, str]]:
+    body = (
+        f"token=abc&team_id=T1&channel_id={channel_id}&channel_name=general&user_id=U1"
+        "&user_name=alex&text=note=Lobby&trigger_id=123&response_url=https://hooks.example/r1"
+    ).encode()
+    timestamp = str(int(time.time()))
+    digest = hmac.new(SECRET.encode(), f"v0:{timestamp}:".encode() + body, hashlib.sha256).hexdigest()
+    return body, {
+        "X-Slack-Request-Timestamp": timestamp,
+        "X-Slack-Signature": f"v0={digest}",
+        "Content-Type": "application/x-www-form-urlencoded",
+    }
+
+
+async def _build_app(publisher: FakePublisher, sender: RecordingSender, *, max_pending: int = 10):
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    app = create_app(
+        settings=Settings(
+            slack_signing_secret=SECRET,
+            database_url="sqlite+aiosqlite://",
+            kafka_bootstrap_servers="localhost:9092",
+            slack_deferred_ack=True,
+            slack_deferred_max_pending=max_pending,
+            slack_deferred_concurrency=2,
+        ),
+        session_factory=session_factory,
+        event_publisher=publisher,
+        response_sender=sender,
+    )
+    return app, engine, session_factory
+
+
+@pytest.mark.asyncio
+async def test_deferred_mode_acks_empty_and_posts_to_response_url():
+    publisher, sender = FakePublisher(), RecordingSender()
+    app, engine, session_factory = await _build_app(publisher, sender)
+    queue = app.state.command_queue
+    await queue.start()
+
+    body, headers = _signed_command()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.post("/slack/commands", content=body, headers=headers)
+
+    assert response.status_code == 200
+    assert response.content == b""
+
+    await queue.stop()
+    assert queue.depth == 0
+    assert len(sender.sent) == 1
+    url, payload = sender.sent[0]
+    assert url == "https://hooks.example/r1"
+    assert payload["response_type"] == "in_channel"
+    async with session_factory() as session:
+        runs = (await session.scalars(select(Run))).all()
+    assert len(runs) == 1
+    assert publisher.events[0].run_id == str(runs[0].id)
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_full_queue_sheds_with_ephemeral_busy_reply():
+    publisher, sender = FakePublisher(), RecordingSender()
+    app, engine, _ = await _build_app(publisher, sender, max_pending=1)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        body, headers = _signed_command("C1")
+        first = await client.post("/slack/commands", content=body, headers=headers)
+        body, headers = _signed_command("C2")
+        second = await client.post("/slack/commands", content=body, headers=headers)
+
+    assert first.content == b""
+    assert second.json() == {"response_type": "ephemeral", "text": BUSY_MESSAGE}
+    assert app.state.command_queue.depth == 1
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_failed_job_notifies_user_via_response_url():
+    publisher, sender = FakePublisher(fail=True), RecordingSender()
+    app, engine, session_factory = await _build_app(publisher, sender)
+    queue = app.state.command_queue
+    await queue.start()
+
+    body, headers = _signed_command()
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        await client.post("/slack/commands", content=body, headers=headers)
+    await queue.stop()
+
+    assert sender.sent == [("https://hooks.example/r1", {"response_type": "ephemeral", "text": FAILURE_MESSAGE})]
+    async with session_factory() as session:
+        assert (await session.scalars(select(Run))).all() == []
+    await engine.dispose()
@@ -0,0 +1,53 @@
+from urllib.parse import parse_qs, urlencode
+
+import pytest
+
+from coffeebuddy.api.slack_runs.forms import (
+    SlackFormError,
+    SlackPayloadTooLargeError,
+    decode_command_form,
+)
+
+
+def test_decodes_command_fields_like_parse_qs():
+    fields = {
+        "token": "abc",
+        "team_id": "T1",
+        "channel_id": "C1",
+        "channel_name": "general",
+        "user_id": "U1",
+        "user_name": "alex",
+        "text": "pickup=09:30 note=\"Café lobby & door #2\"",
+        "trigger_id": "123.456",
+        "response_url": "https://hooks.slack.com/commands/T1/1/abc",
+        "api_app_id": "A1",
+        "is_enterprise_install": "false",
+    }
+    body = urlencode(fields).encode()
+
+    payload = decode_command_form(body)
+
+    expected = {key: values[0] for key, values in parse_qs(body.decode()).items()}
+    assert payload.text == expected["text"] == fields["text"]
+    assert payload.response_url == expected["response_url"]
+    assert payload.channel_id == "C1"
+    assert not hasattr(payload, "api_app_id")
+
+
+def test_missing_fields_default_to_empty_and_first_value_wins():
+    payload = decode_command_form(b"channel_id=C1&channel_id=C2&text=a+b&user_id")
+
+    assert payload.channel_id == "C1"
+    assert payload.text == "a b"
+    assert payload.user_id == ""
+    assert payload.team_id == ""
+
+
+def test_enforces_max_body_size():
+    with pytest.raises(SlackPayloadTooLargeError):
+        decode_command_form(b"text=" + b"x" * 100, max_bytes=64)
+
+
+def test_rejects_invalid_utf8():
+    with pytest.raises(SlackFormError):
+        decode_command_form(b"text=%FF%FE")
@@ -0,0 +1,206 @@
+import asyncio
+import hashlib
+import hmac
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from coffeebuddy.api.slack_runs.idempotency import (
+    InMemoryIdempotencyStore,
+    SlackIdempotencyGuard,
+    SqlIdempotencyStore,
+)
+from coffeebuddy.app import create_app
+from coffeebuddy.config import Settings
+from coffeebuddy.events.run import RunCreatedEvent
+from coffeebuddy.infra.db.models import Base as InfraBase
+from coffeebuddy.models import Base, Run
+
+SECRET = "test-signing-secret"
+BODY = (
+    b"token=abc&team_id=T1&channel_id=C1&channel_name=general&user_id=U1"
+    b"&user_name=alex&text=note=Lobby&trigger_id=13345.6789&response_url=https://hooks.example/r1"
+)
+
+
+class GatedPublisher:
+    def __init__(self) -> None:
+        self.events: list[RunCreatedEvent] = []
+        self.entered = asyncio.Event()
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def publish_run_created(self, event: RunCreatedEvent) -> None:
+        self.entered.set()
+        await self.gate.wait()
+        self.events.append(event)
+
+
+def _headers(body: bytes, *, retry: int | None = None, offset: int = 0) -> dict[str, str]:
+    timestamp = str(int(time.time()) + offset)
+    digest = hmac.new(SECRET.encode(), f"v0:{timestamp}:".encode() + body, hashlib.sha256).hexdigest()
+    headers = {
+        "X-Slack-Request-Timestamp": timestamp,
+        "X-Slack-Signature": f"v0={digest}",
+        "Content-Type": "application/x-www-form-urlencoded",
+    }
+    if retry is not None:
+        headers["X-Slack-Retry-Num"] = str(retry)
+        headers["X-Slack-Retry-Reason"] = "http_timeout"
+    return headers
+
+
+@pytest_asyncio.fixture
+async def env():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    publisher = GatedPublisher()
+    app = create_app(
+        settings=Settings(
+            slack_signing_secret=SECRET,
+            database_url="sqlite+aiosqlite://",
+            kafka_bootstrap_servers="localhost:9092",
+        ),
+        session_factory=session_factory,
+        event_publisher=publisher,
+    )
+    client = AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+    yield client, session_factory, publisher
+    await client.aclose()
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_retried_command_returns_original_reply_without_new_run(env):
+    client, session_factory, publisher = env
+    first = await client.post("/slack/commands", content=BODY, headers=_headers(BODY))
+    # Slack signs each retry afresh, so it carries a new timestamp and signature.
+    retry = await client.post("/slack/commands", content=BODY, headers=_headers(BODY, retry=1, offset=1))
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.content == first.content
+    async with session_factory() as session:
+        assert len((await session.scalars(select(Run))).all()) == 1
+    assert len(publisher.events) == 1
+
+
+@pytest.mark.asyncio
+async def test_replay_without_retry_header_is_still_rejected(env):
+    client, _, _ = env
+    headers = _headers(BODY)
+
+    await client.post("/slack/commands", content=BODY, headers=headers)
+    replay = await client.post("/slack/commands", content=BODY, headers=headers)
+
+    assert replay.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_replay_with_forged_retry_header_is_rejected(env):
+    client, session_factory, _ = env
+    headers = _headers(BODY)
+
+    await client.post("/slack/commands", content=BODY, headers=headers)
+    replay = await client.post(
+        "/slack/commands",
+        content=BODY,
+        headers={**headers, "X-Slack-Retry-Num": "1", "X-Slack-Retry-Reason": "http_timeout"},
+    )
+
+    assert replay.status_code == 401
+    async with session_factory() as session:
+        assert len((await session.scalars(select(Run))).all()) == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_while_original_in_flight_is_acked_empty(env):
+    client, session_factory, publisher = env
+    publisher.gate.clear()
+
+    original = asyncio.create_task(client.post("/slack/commands", content=BODY, headers=_headers(BODY)))
+    await asyncio.wait_for(publisher.entered.wait(), timeout=5)
+    retry = await client.post("/slack/commands", content=BODY, headers=_headers(BODY, retry=1, offset=1))
+    publisher.gate.set()
+    first = await original
+
+    assert retry.status_code == 200
+    assert retry.content == b""
+    assert first.json()["response_type"] == "in_channel"
+    async with session_factory() as session:
+        assert len((await session.scalars(select(Run))).all()) == 1
+
+
+@pytest.mark.asyncio
+async def test_guard_releases_key_when_handler_fails():
+    guard = SlackIdempotencyGuard(InMemoryIdempotencyStore())
+    calls = 0
+
+    async def failing() -> bytes:
+        nonlocal calls
+        calls += 1
+        raise RuntimeError("boom")
+
+    async def succeeding() -> bytes:
+        return b'{"ok":true}'
+
+    with pytest.raises(RuntimeError):
+        await guard.run("k", failing)
+    assert await guard.run("k", succeeding) == b'{"ok":true}'
+    assert await guard.run("k", failing) == b'{"ok":true}'
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_in_memory_store_expires_entries():
+    now = [0.0]
+    store = InMemoryIdempotencyStore(ttl_seconds=10, lease_seconds=2, max_entries=2, clock=lambda: now[0])
+
+    assert await store.claim("a")
+    assert not await store.claim("a")
+    now[0] = 3.0
+    assert await store.claim("a")
+    await store.put("a", b"reply")
+    now[0] = 12.0
+    assert await store.get("a") == b"reply"
+    now[0] = 13.0
+    assert await store.get("a") is None
+
+    await store.claim("b")
+    await store.claim("c")
+    await store.claim("d")
+    assert len(store) == 2
+
+
+@pytest.mark.asyncio
+async def test_sql_store_claims_once_and_takes_over_expired_keys():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(InfraBase.metadata.create_all)
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    now = [datetime(2030, 1, 1, 9, tzinfo=timezone.utc)]
+    store = SqlIdempotencyStore(session_factory, ttl_seconds=60, lease_seconds=5, clock=lambda: now[0])
+
+    assert await store.claim("command:x")
+    assert not await store.claim("command:x")
+    assert await store.get("command:x") is None
+
+    await store.put("command:x", b"reply")
+    now[0] += timedelta(seconds=30)
+    assert await store.get("command:x") == b"reply"
+    assert not await store.claim("command:x")
+
+    now[0] += timedelta(seconds=31)
+    assert await store.get("command:x") is None
+    assert await store.claim("command:x")
+
+    await store.release("command:x")
+    assert await store.claim("command:x")
+    await engine.dispose()
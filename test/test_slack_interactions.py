@@ -0,0 +1,205 @@
+import hashlib
+import hmac
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlencode
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from coffeebuddy.api.slack_runs.messages import SlackMessageBuilder
+from coffeebuddy.app import create_app
+from coffeebuddy.config import Settings
+from coffeebuddy.infra.db.models import Base, Channel, Order, Run, RunStatus, User
+
+SECRET = "test-signing-secret"
+
+
+class NullPublisher:
+    async def publish_run_created(self, event) -> None:
+        return None
+
+
+class RecordingSender:
+    def __init__(self) -> None:
+        self.sent: list[tuple[str, dict]] = []
+
+    async def send(self, response_url: str, body: bytes) -> None:
+        self.sent.append((response_url, json.loads(body)))
+
+
+@pytest_asyncio.fixture
+async def env():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    now = datetime.now(timezone.utc)
+    channel = Channel(id=uuid4(), slack_channel_id="C1", name="coffee", created_at=now, updated_at=now)
+    alex = User(id=uuid4(), slack_user_id="U1", display_name="Alex", created_at=now, updated_at=now)
+    sam = User(id=uuid4(), slack_user_id="U2", display_name="Sam", created_at=now, updated_at=now)
+    run = Run(
+        id=uuid4(),
+        channel_id=channel.id,
+        initiator_user_id=alex.id,
+        status=RunStatus.OPEN,
+        pickup_time=now + timedelta(minutes=30),
+        pickup_note="Lobby",
+        started_at=now,
+        created_at=now,
+        updated_at=now,
+    )
+    async with session_factory() as session:
+        session.add_all([channel, alex, sam])
+        await session.flush()
+        session.add(run)
+        await session.commit()
+
+    sender = RecordingSender()
+    app = create_app(
+        settings=Settings(
+            slack_signing_secret=SECRET,
+            database_url="sqlite+aiosqlite://",
+            kafka_bootstrap_servers="localhost:9092",
+        ),
+        session_factory=session_factory,
+        event_publisher=NullPublisher(),
+        response_sender=sender,
+    )
+    client = AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+    yield client, session_factory, str(run.id), sender
+    await client.aclose()
+    await engine.dispose()
+
+
+def _block_action(action_id: str, run_id: str, user_id: str = "U1", order_text: str | None = None) -> dict:
+    payload = {
+        "type": "block_actions",
+        "user": {"id": user_id},
+        "response_url": "https://hooks.example/r1",
+        "actions": [{"action_id": action_id, "value": run_id}],
+    }
+    if order_text is not None:
+        payload["state"] = {"values": {"order": {"order_text": {"type": "plain_text_input", "value": order_text}}}}
+    return payload
+
+
+async def _post(client: AsyncClient, payload: dict):
+    body = urlencode({"payload": json.dumps(payload)}).encode()
+    timestamp = str(int(time.time()))
+    digest = hmac.new(SECRET.encode(), f"v0:{timestamp}:".encode() + body, hashlib.sha256).hexdigest()
+    return await client.post(
+        "/slack/interactions",
+        content=body,
+        headers={
+            "X-Slack-Request-Timestamp": timestamp,
+            "X-Slack-Signature": f"v0={digest}",
+            "Content-Type": "application/x-www-form-urlencoded",
+        },
+    )
+
+
+def _click_from_message(message: dict, action_id: str, *, typed: str | None) -> dict:
+    """Builds the block_actions payload Slack sends when a button in ``message`` is pressed."""
+    actions_block = next(block for block in message["blocks"] if block["type"] == "actions")
+    button = next(element for element in actions_block["elements"] if element["action_id"] == action_id)
+    values = {}
+    for block in message["blocks"]:
+        if block["type"] == "input":
+            element = block["element"]
+            values[block["block_id"]] = {element["action_id"]: {"type": element["type"], "value": typed}}
+    return {
+        "type": "block_actions",
+        "user": {"id": "U1"},
+        "response_url": "https://hooks.example/r1",
+        "actions": [{"type": "button", "block_id": "actions", **button}],
+        "state": {"values": values},
+    }
+
+
+@pytest.mark.asyncio
+async def test_rendered_place_order_button_submits_typed_text(env):
+    client, session_factory, run_id, _ = env
+    async with session_factory() as session:
+        run = await session.get(Run, run_id)
+    message = json.loads(SlackMessageBuilder.render_run_created(run, slack_channel_id="C1", slack_user_id="U1"))
+
+    response = await _post(client, _click_from_message(message, "order:new", typed=None))
+    assert response.json()["text"] == "Type your order in the box above, then press Place order."
+
+    response = await _post(client, _click_from_message(message, "order:new", typed="Cortado"))
+    assert "*Cortado*" in response.json()["blocks"][0]["text"]["text"]
+    async with session_factory() as session:
+        assert [order.order_text for order in (await session.scalars(select(Order))).all()] == ["Cortado"]
+
+
+@pytest.mark.asyncio
+async def test_order_new_then_reuse_and_close(env):
+    client, session_factory, run_id, sender = env
+
+    response = await _post(client, _block_action("order:new", run_id, order_text="Flat white"))
+    assert response.status_code == 200
+    assert "*Flat white*" in response.json()["blocks"][0]["text"]["text"]
+    assert sender.sent[-1][0] == "https://hooks.example/r1"
+
+    response = await _post(client, _block_action("order:reuse", run_id, user_id="U2"))
+    assert response.json()["response_type"] == "ephemeral"
+    assert response.json()["text"].startswith("No saved order found")
+
+    response = await _post(client, _block_action("order:reuse", run_id))
+    assert response.json()["response_type"] == "ephemeral"
+    assert "*Flat white*" in response.json()["blocks"][0]["text"]["text"]
+
+    response = await _post(client, _block_action("run:close", run_id, user_id="U2"))
+    assert "not allowed to close" in response.json()["text"]
+
+    response = await _post(client, _block_action("run:close", run_id))
+    payload = response.json()
+    assert payload["response_type"] == "in_channel"
+    assert payload["blocks"][1]["fields"][0]["text"] == "*Runner*\n<@U1>"
+    assert payload["blocks"][-2]["text"]["text"] == "• <@U1> — Flat white"
+
+    async with session_factory() as session:
+        run = await session.get(Run, run_id)
+        orders = (await session.scalars(select(Order))).all()
+    assert run.status == RunStatus.CLOSED
+    assert [order.order_text for order in orders] == ["Flat white"]
+
+
+@pytest.mark.asyncio
+async def test_unknown_action_is_acknowledged_and_bad_payloads_rejected(env):
+    client, _, run_id, _ = env
+
+    response = await _post(client, _block_action("order_text", ""))
+    assert response.status_code == 200
+    assert response.content == b""
+
+    response = await _post(client, _block_action("order:new", "not-a-run"))
+    assert response.status_code == 400
+
+    response = await _post(client, {"type": "shortcut"})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_interaction_requires_valid_signature(env):
+    client, _, run_id, _ = env
+    body = urlencode({"payload": json.dumps(_block_action("run:close", run_id))}).encode()
+
+    response = await client.post(
+        "/slack/interactions",
+        content=body,
+        headers={
+            "X-Slack-Request-Timestamp": str(int(time.time())),
+            "X-Slack-Signature": "v0=bad",
+            "Content-Type": "application/x-www-form-urlencoded",
+        },
+    )
+    assert response.status_code == 401
@@ -0,0 +1,143 @@
+import json
+from datetime import datetime, timezone
+
+from coffeebuddy.api.slack_runs.messages import SlackMessageBuilder
+from coffeebuddy.api.slack_runs.templates import BlockTemplate, slot, spread_slot
+from coffeebuddy.core.orders.models import OrderProvenance, OrderSubmissionResult
+from coffeebuddy.core.runs.models import CloseRunResult, OrderGroup, ParticipantOrder, RunSummary
+from coffeebuddy.infra.db.models import Run
+
+
+def _run(**overrides) -> Run:
+    values = dict(
+        id="run-1",
+        channel_id="8d0f2a43-6c1e-4d9b-9a59-2f7c1f0e6a11",
+        initiator_user_id="0b7e6f2c-3a51-4f0e-8c3d-5d2b9e7a4c20",
+        status="open",
+        pickup_time=None,
+        pickup_note=None,
+        correlation_id="corr-1",
+    )
+    values.update(overrides)
+    return Run(**values)
+
+
+def test_template_escapes_text_slots_and_spreads_items():
+    template = BlockTemplate({"items": [{"a": 1}, spread_slot("more")], "text": f"hi {slot('name')}!"})
+
+    rendered = template.render(name='"quoted"\n\\ \x00', more=[b'{"b":2}', b'{"c":3}'])
+
+    assert json.loads(rendered) == {
+        "items": [{"a": 1}, {"b": 2}, {"c": 3}],
+        "text": 'hi "quoted"\n\\ \x00!',
+    }
+    assert json.loads(template.render(name="x", more=[]))["items"] == [{"a": 1}]
+    assert template.slots == {"name", "more"}
+
+
+def test_run_created_matches_block_layout():
+    payload = json.loads(
+        SlackMessageBuilder.render_run_created(
+            _run(pickup_time=datetime(2030, 1, 1, 9, tzinfo=timezone.utc), pickup_note='Lobby "B"'),
+            slack_channel_id="C1",
+            slack_user_id="U1",
+        )
+    )
+
+    assert payload["response_type"] == "in_channel"
+    types = [block["type"] for block in payload["blocks"]]
+    assert types == ["header", "section", "context", "section", "section", "input", "actions"]
+    assert payload["blocks"][1]["fields"][1]["text"] == "*Initiator*\n<@U1>"
+    assert payload["blocks"][3]["fields"][0]["text"] == "*Pickup time*\n2030-01-01 09:00 UTC"
+    assert payload["blocks"][4]["text"]["text"] == '*Pickup note*\nLobby "B"'
+    assert [e["action_id"] for e in payload["blocks"][-1]["elements"]] == ["order:new", "order:reuse", "run:close"]
+
+    bare = json.loads(SlackMessageBuilder.render_run_created(_run(), slack_channel_id="C1", slack_user_id="U1"))
+    assert [block["type"] for block in bare["blocks"]] == ["header", "section", "context", "input", "actions"]
+
+
+def test_order_confirmation_and_run_summary():
+    confirmation = json.loads(
+        SlackMessageBuilder.render_order_confirmation(
+            OrderSubmissionResult(
+                order_id="o1",
+                participant_count=3,
+                order_text="Flat white",
+                provenance=OrderProvenance.MANUAL,
+                preference_updated=True,
+            )
+        )
+    )
+    assert confirmation["response_type"] == "ephemeral"
+    assert "*Flat white*" in confirmation["blocks"][0]["text"]["text"]
+
+    closed_at = datetime(2030, 1, 1, 9, tzinfo=timezone.utc)
+    summary = RunSummary(
+        run_id="run-1",
+        channel_id="C1",
+        channel_name="coffee",
+        runner_user_id="user-2",
+        runner_slack_user_id="U2",
+        runner_display_name="Sam",
+        pickup_time=None,
+        pickup_note="Lobby",
+        participants=(ParticipantOrder("user-1", "U1", "Alex", "Latte", "manual"),),
+        total_orders=1,
+        reminder_offset_minutes=None,
+        reminders_enabled=None,
+        last_call_enabled=None,
+        closed_at=closed_at,
+    )
+    payload = json.loads(
+        SlackMessageBuilder.render_run_summary(
+            CloseRunResult(
+                run_id="run-1",
+                channel_id="C1",
+                runner_user_id="user-2",
+                closed_at=closed_at,
+                summary=summary,
+                fairness_note="Least recent runner.",
+            )
+        )
+    )
+    assert [block["type"] for block in payload["blocks"]] == ["header", "section", "section", "section", "context"]
+    assert payload["blocks"][1]["fields"][0]["text"] == "*Runner*\n<@U2>"
+    assert payload["blocks"][3]["text"]["text"] == "• <@U1> — Latte"
+    assert payload["blocks"][4]["elements"][0]["text"] == "Least recent runner."
+
+
+def test_run_summary_lists_grouped_orders_before_participants():
+    closed_at = datetime(2030, 1, 1, 9, tzinfo=timezone.utc)
+    summary = RunSummary(
+        run_id="run-1",
+        channel_id="C1",
+        channel_name="coffee",
+        runner_user_id="user-2",
+        runner_slack_user_id="U2",
+        runner_display_name="Sam",
+        pickup_time=None,
+        pickup_note=None,
+        participants=(
+            ParticipantOrder("user-1", "U1", "Alex", "Oat flat white", "manual"),
+            ParticipantOrder("user-3", "U3", "Kim", "oat flat white", "manual"),
+        ),
+        total_orders=2,
+        reminder_offset_minutes=None,
+        reminders_enabled=None,
+        last_call_enabled=None,
+        closed_at=closed_at,
+        grouped_orders=(OrderGroup(order_text="oat flat white", quantity=2),),
+    )
+    payload = json.loads(
+        SlackMessageBuilder.render_run_summary(
+            CloseRunResult(
+                run_id="run-1",
+                channel_id="C1",
+                runner_user_id="user-2",
+                closed_at=closed_at,
+                summary=summary,
+                fairness_note="Least recent runner.",
+            )
+        )
+    )
+    assert payload["blocks"][2]["text"]["text"] == "*To order*\n2x oat flat white"
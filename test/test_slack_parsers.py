@@ -0,0 +1,80 @@
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from coffeebuddy.api.slack_runs.parsers import MAX_PARTICIPANTS, _parse_cached, parse_command_text
+
+NOW = datetime(2024, 3, 1, 23, 30, tzinfo=timezone.utc)
+
+
+def test_parses_quoted_note_and_clock_pickup():
+    options = parse_command_text('pickup=10:30 note="Lobby by the plants"', now=NOW)
+
+    assert not options.has_errors()
+    assert options.pickup_time == datetime(2024, 3, 1, 10, 30, tzinfo=timezone.utc)
+    assert options.pickup_note == "Lobby by the plants"
+
+
+def test_naive_iso_pickup_defaults_to_utc():
+    options = parse_command_text("pickup_time=2030-01-01T09:00:00 note='Back door'")
+
+    assert options.pickup_time == datetime(2030, 1, 1, 9, tzinfo=timezone.utc)
+    assert options.pickup_note == "Back door"
+
+
+def test_extended_keys():
+    options = parse_command_text(
+        "exclude=<@U111|sam>,@U222,U111 max=6 tz=Asia/Tokyo pickup=08:15",
+        now=NOW,
+    )
+
+    assert not options.has_errors()
+    assert options.excluded_runner_ids == ("U111", "U222")
+    assert options.max_participants == 6
+    assert options.timezone == "Asia/Tokyo"
+    # 23:30 UTC on March 1st is already March 2nd in Tokyo.
+    assert options.pickup_time == datetime(2024, 3, 2, 8, 15, tzinfo=ZoneInfo("Asia/Tokyo"))
+
+
+def test_reports_every_invalid_value():
+    options = parse_command_text("pickup=25:00 max=0 tz=Mars/Base exclude=bob colour=blue")
+
+    assert options.errors == [
+        "pickup_time must be ISO-8601 date-time or HH:MM (24h).",
+        "max_participants must be a positive whole number.",
+        "Unknown time zone 'Mars/Base'.",
+        "exclude must be a comma-separated list of Slack users.",
+        "Unknown parameter 'colour'.",
+    ]
+
+
+@pytest.mark.parametrize("value", ["1001", "99999999999", "9" * 5000])
+def test_max_participants_is_capped(value):
+    options = parse_command_text(f"max={value}")
+
+    assert options.errors == [f"max_participants must be <= {MAX_PARTICIPANTS}."]
+    assert options.max_participants is None
+
+
+def test_max_participants_accepts_the_cap():
+    assert parse_command_text(f"max={MAX_PARTICIPANTS}").max_participants == MAX_PARTICIPANTS
+    assert parse_command_text("max=007").max_participants == 7
+
+
+def test_unbalanced_quotes_are_an_error_not_a_crash():
+    options = parse_command_text('note="Lobby')
+
+    assert options.errors == ["Could not parse command text; check for unbalanced quotes."]
+
+
+def test_repeated_text_hits_cache_and_returns_independent_options():
+    _parse_cached.cache_clear()
+
+    first = parse_command_text("pickup=10:30 max=4", now=NOW)
+    second = parse_command_text("  pickup=10:30 max=4 ", now=datetime(2024, 3, 5, 8, tzinfo=timezone.utc))
+
+    assert _parse_cached.cache_info().hits == 1
+    assert first is not second
+    assert second.pickup_time == datetime(2024, 3, 5, 10, 30, tzinfo=timezone.utc)
+    assert first.max_participants == second.max_participants == 4
@@ -0,0 +1,82 @@
+import hashlib
+import hmac
+
+import pytest
+
+from coffeebuddy.api.slack_runs.signature import SlackSignatureVerifier, SlackVerificationError
+
+SECRET = "test-signing-secret"
+NOW = 1_700_000_000
+
+
+class FakeClock:
+    def __init__(self, now: float = NOW) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _sign(timestamp: str, body: bytes) -> str:
+    digest = hmac.new(SECRET.encode(), b"v0:" + timestamp.encode() + b":" + body, hashlib.sha256)
+    return f"v0={digest.hexdigest()}"
+
+
+def _verifier(clock: FakeClock, **kwargs) -> SlackSignatureVerifier:
+    return SlackSignatureVerifier(signing_secret=SECRET, tolerance_seconds=300, clock=clock, **kwargs)
+
+
+def test_accepts_bytes_and_memoryview_bodies():
+    verifier = _verifier(FakeClock())
+    body = "token=abc&text=café".encode() * 50
+    timestamp = str(NOW)
+
+    verifier.verify(timestamp=timestamp, signature=_sign(timestamp, body), body=body)
+    other = body + b"&x=1"
+    verifier.verify(timestamp=timestamp, signature=_sign(timestamp, other), body=memoryview(other))
+
+
+def test_rejects_tampered_body_and_stale_timestamp():
+    clock = FakeClock()
+    verifier = _verifier(clock)
+    timestamp = str(NOW - 301)
+
+    with pytest.raises(SlackVerificationError, match="Stale"):
+        verifier.verify(timestamp=timestamp, signature=_sign(timestamp, b"a=1"), body=b"a=1")
+    with pytest.raises(SlackVerificationError, match="mismatch"):
+        verifier.verify(timestamp=str(NOW), signature=_sign(str(NOW), b"a=1"), body=b"a=2")
+    with pytest.raises(SlackVerificationError, match="Invalid"):
+        verifier.verify(timestamp="soon", signature="v0=00", body=b"a=1")
+
+
+def test_replayed_request_is_rejected_within_window():
+    verifier = _verifier(FakeClock())
+    timestamp, body = str(NOW), b"a=1"
+    signature = _sign(timestamp, body)
+
+    verifier.verify(timestamp=timestamp, signature=signature, body=body)
+    with pytest.raises(SlackVerificationError, match="Replayed"):
+        verifier.verify(timestamp=timestamp, signature=signature, body=body)
+
+
+def test_failed_signatures_are_not_cached():
+    verifier = _verifier(FakeClock())
+    timestamp, body = str(NOW), b"a=1"
+
+    with pytest.raises(SlackVerificationError, match="mismatch"):
+        verifier.verify(timestamp=timestamp, signature=_sign(timestamp, b"other"), body=body)
+    verifier.verify(timestamp=timestamp, signature=_sign(timestamp, body), body=body)
+
+
+def test_replay_cache_evicts_expired_entries_and_stays_bounded():
+    clock = FakeClock()
+    verifier = _verifier(clock, replay_cache_size=2)
+    for offset in range(3):
+        timestamp = str(NOW + offset)
+        verifier.verify(timestamp=timestamp, signature=_sign(timestamp, b"a=1"), body=b"a=1")
+    assert len(verifier._replay_cache) == 2
+
+    clock.now = NOW + 303
+    timestamp = str(NOW + 303)
+    verifier.verify(timestamp=timestamp, signature=_sign(timestamp, b"a=1"), body=b"a=1")
+    assert len(verifier._replay_cache) == 1